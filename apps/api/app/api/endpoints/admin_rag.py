@@ -537,3 +537,19 @@ async def delete_rag_policy(
     await db.delete(policy)
     await db.commit()
     return {"status": "ok"}
+
+
+@router.get("/admin/rag/profiles")
+async def list_rag_query_profiles(
+    limit: int = 20,
+    order: str = "slowest",
+    current_user: User = Depends(get_current_user),
+):
+    """Perfis das buscas RAG mais lentas (ou mais recentes) capturados pelo profiler."""
+    _require_admin(current_user)
+    from app.services.rag.core.request_profiler import get_request_profiler
+
+    profiler = get_request_profiler()
+    limit = max(1, min(int(limit), 200))
+    profiles = profiler.recent(limit) if order == "recent" else profiler.slowest(limit)
+    return {"profiler": profiler.stats(), "profiles": profiles}
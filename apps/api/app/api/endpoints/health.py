@@ -3,6 +3,7 @@ Health Check Endpoints
 
 Provides health check endpoints for monitoring service status:
 - /health/rag: Check RAG storage services (OpenSearch, Qdrant)
+- /health/startup: Import-time profile and lazy subsystem load status
 - Circuit breaker states
 - Service connectivity
 """
@@ -171,6 +172,24 @@ async def health_check_qdrant() -> ServiceHealthStatus:
     return await _check_qdrant()
 
 
+@router.get(
+    "/health/startup",
+    summary="Startup Profile",
+    description="Slowest imports at startup and load status of lazily initialised subsystems",
+    tags=["health"],
+)
+async def health_startup(top: int = 25) -> Dict[str, Any]:
+    """Import-time profile (see app.core.import_profiler) and lazy subsystem status."""
+    from app.core.import_profiler import import_profile_report
+    from app.core.lazy import LAZY_STARTUP, subsystems_status
+
+    return {
+        "lazy_startup": LAZY_STARTUP,
+        "subsystems": subsystems_status(),
+        "imports": import_profile_report(top=max(1, min(top, 200))),
+    }
+
+
 @router.post(
     "/health/rag/reset-circuits",
     summary="Reset Circuit Breakers",
@@ -36,7 +36,7 @@ from app.services.billing_service import (
 from app.services.billing_quote_service import estimate_langgraph_job_points, FixedPointsEstimator
 from app.services.poe_like_billing import quote_message as poe_quote_message
 from dataclasses import asdict
-from app.services.ai.langgraph_legal_workflow import legal_workflow_app, DocumentState, append_sources_section
+from app.services.ai.langgraph_legal_workflow import get_legal_workflow_app, DocumentState, append_sources_section
 from app.services.ai.document_store import resolve_full_document
 from app.services.ai.citations.base import append_autos_references_section
 from app.services.ai.model_registry import (
@@ -523,7 +523,7 @@ async def stream_job(jobid: str, db: AsyncSession = Depends(get_db)):
         
         try:
             # Check if job exists
-            current_state = legal_workflow_app.get_state(config)
+            current_state = get_legal_workflow_app().get_state(config)
             recursion_limit = int(current_state.values.get("recursion_limit") or 200) if current_state.values else 200
             config["recursion_limit"] = recursion_limit
             
@@ -717,10 +717,10 @@ async def stream_job(jobid: str, db: AsyncSession = Depends(get_db)):
                     while not stop_event.is_set():
                         now = loop.time()
                         if now - last_billing_emit >= 1.0:
-                            counters = job_manager.get_api_counters(jobid)
-                            points_total = counters.get("points_total") if isinstance(counters, dict) else None
+                            points_total = job_manager.get_api_points_total(jobid)
                             if points_total != last_points_total:
                                 last_points_total = points_total
+                                counters = job_manager.get_api_counters(jobid)
                                 await combined_queue.put((
                                     "job",
                                     job_manager.build_event(
@@ -747,7 +747,7 @@ async def stream_job(jobid: str, db: AsyncSession = Depends(get_db)):
             async def pump_langgraph():
                 with job_context(jobid, user_id=job_manager.get_job_user(jobid)):
                     try:
-                        async for event in legal_workflow_app.astream(None, config, stream_mode="updates"):
+                        async for event in get_legal_workflow_app().astream(None, config, stream_mode="updates"):
                             await combined_queue.put(("langgraph", event))
                     except Exception as exc:
                         await combined_queue.put(("langgraph_error", exc))
@@ -1090,7 +1090,7 @@ async def stream_job(jobid: str, db: AsyncSession = Depends(get_db)):
                 return
 
             # Check for interrupts (HIL checkpoints)
-            final_snapshot = legal_workflow_app.get_state(config)
+            final_snapshot = get_legal_workflow_app().get_state(config)
             
             if final_snapshot.tasks:
                 # There's an interrupt waiting
@@ -2038,7 +2038,7 @@ async def start_job(
             logger.warning(f"⚠️ Falha ao persistir memoria RAG: {e}")
     
     # Save initial state
-    await legal_workflow_app.aupdate_state(config, initial_state)
+    await get_legal_workflow_app().aupdate_state(config, initial_state)
 
     job_manager.emit_event(
         jobid,
@@ -2090,7 +2090,7 @@ async def resume_job(
     hil_iteration = 1
 
     try:
-        current_state = legal_workflow_app.get_state(config)
+        current_state = get_legal_workflow_app().get_state(config)
         recursion_limit = int(current_state.values.get("recursion_limit") or 200) if current_state.values else 200
         config["recursion_limit"] = recursion_limit
 
@@ -2159,7 +2159,7 @@ async def resume_job(
     }
     job_manager.set_job_user(jobid, str(getattr(current_user, "id", "") or ""))
     with job_context(jobid, user_id=job_manager.get_job_user(jobid)):
-        await legal_workflow_app.ainvoke(Command(resume=resume_payload), config)
+        await get_legal_workflow_app().ainvoke(Command(resume=resume_payload), config)
 
     # Emit detailed hil_response event for frontend
     job_manager.emit_event(
@@ -2190,7 +2190,7 @@ async def get_job_status(jobid: str, db: AsyncSession = Depends(get_db)):
     config = {"configurable": {"thread_id": jobid}}
     
     try:
-        state = legal_workflow_app.get_state(config)
+        state = get_legal_workflow_app().get_state(config)
         
         if not state.values:
             return {"status": "not_found", "job_id": jobid}
@@ -1009,22 +1009,34 @@ async def get_stats(
 
 @router.get("/metrics")
 async def get_metrics(
+    window: str = Query("5m", pattern="^(1m|5m|1h|all)$"),
     current_user: User = Depends(get_current_user),
 ) -> Dict[str, Any]:
     """
     Get RAG pipeline latency metrics.
 
-    Returns P50/P95/P99 percentiles per pipeline stage, plus result cache stats.
+    Returns P50/P95/P99 percentiles per pipeline stage over the rolling
+    ``window`` (1m, 5m, 1h or all = since startup), plus result cache,
+    LLM response cache, provider rate governor and Gemini context cache
+    registry stats.
     """
+    from app.services.ai.context_cache_registry import get_context_cache_registry
+    from app.services.ai.llm_response_cache import get_llm_response_cache
+    from app.services.ai.rate_governor import get_rate_governor
     from app.services.rag.core.metrics import get_latency_collector
     from app.services.rag.core.result_cache import get_result_cache
 
     collector = get_latency_collector()
     cache = get_result_cache()
+    llm_cache = get_llm_response_cache()
 
     return {
-        "latency": collector.summary(),
+        "latency": collector.summary(window=window),
+        "latency_window": window,
         "result_cache": cache.stats(),
+        "llm_response_cache": llm_cache.stats() if llm_cache else {"enabled": False},
+        "llm_rate_governor": get_rate_governor().stats(),
+        "gemini_context_caches": get_context_cache_registry().stats(),
     }
 
 
@@ -0,0 +1,137 @@
+"""
+Import-time profiler.
+
+A meta path finder that times every module executed after ``install()``:
+cumulative time (module body including nested imports) and self time
+(excluding them), like ``python -X importtime`` but queryable at runtime.
+The report is served by /health/startup so slow cold starts can be traced to
+the endpoint or service that pulls in torch, SDKs, etc.
+
+Only per-module file loaders are instrumented (source, bytecode and
+extension modules); builtin/frozen modules and custom loaders are left alone.
+Enabled with IMPORT_PROFILE=true (default); app.main uninstalls the finder
+once startup (and the background warmup, when enabled) has finished, so lazy
+imports on the request path are not instrumented.
+"""
+
+from __future__ import annotations
+
+import importlib.machinery
+import os
+import sys
+import threading
+import time
+from importlib.abc import MetaPathFinder
+from typing import Any, Dict, List, Optional
+
+IMPORT_PROFILE_ENABLED = os.getenv("IMPORT_PROFILE", "true").lower() == "true"
+
+_INSTRUMENTED_LOADERS = (
+    importlib.machinery.SourceFileLoader,
+    importlib.machinery.SourcelessFileLoader,
+    importlib.machinery.ExtensionFileLoader,
+)
+
+_local = threading.local()
+_records: Dict[str, List[float]] = {}  # name -> [cumulative_s, self_s]
+_records_lock = threading.Lock()
+_installed_at: Optional[float] = None
+
+
+def _timed_exec(name: str, exec_module):
+    def exec_module_timed(module):
+        stack = _local.__dict__.setdefault("stack", [])
+        child_time = [0.0]
+        stack.append(child_time)
+        started = time.perf_counter()
+        try:
+            exec_module(module)
+        finally:
+            elapsed = time.perf_counter() - started
+            stack.pop()
+            if stack:
+                stack[-1][0] += elapsed
+            with _records_lock:
+                _records[name] = [elapsed, max(0.0, elapsed - child_time[0])]
+
+    return exec_module_timed
+
+
+class _ImportTimingFinder(MetaPathFinder):
+    """Delegates to the remaining finders and instruments the loader it gets back."""
+
+    def find_spec(self, fullname, path, target=None):
+        if getattr(_local, "finding", False):
+            return None
+        _local.finding = True
+        try:
+            spec = None
+            for finder in sys.meta_path:
+                if finder is self:
+                    continue
+                find_spec = getattr(finder, "find_spec", None)
+                if find_spec is None:
+                    continue
+                spec = find_spec(fullname, path, target)
+                if spec is not None:
+                    break
+        finally:
+            _local.finding = False
+
+        loader = getattr(spec, "loader", None)
+        if isinstance(loader, _INSTRUMENTED_LOADERS) and "exec_module" not in vars(loader):
+            loader.exec_module = _timed_exec(fullname, loader.exec_module)
+        return spec
+
+
+_finder = _ImportTimingFinder()
+
+
+def install() -> bool:
+    """Start profiling imports (idempotent). Returns whether profiling is active."""
+    global _installed_at
+    if not IMPORT_PROFILE_ENABLED:
+        return False
+    if _finder not in sys.meta_path:
+        sys.meta_path.insert(0, _finder)
+        if _installed_at is None:
+            _installed_at = time.time()
+    return True
+
+
+def uninstall() -> None:
+    if _finder in sys.meta_path:
+        sys.meta_path.remove(_finder)
+
+
+def reset() -> None:
+    with _records_lock:
+        _records.clear()
+
+
+def import_profile_report(top: int = 25) -> Dict[str, Any]:
+    """Slowest modules by cumulative and self time, plus self time per top-level package."""
+    with _records_lock:
+        records = dict(_records)
+    by_package: Dict[str, float] = {}
+    for name, (_, self_s) in records.items():
+        package = name.split(".", 1)[0]
+        by_package[package] = by_package.get(package, 0.0) + self_s
+
+    def _ms(seconds: float) -> float:
+        return round(seconds * 1000, 1)
+
+    top_cumulative = sorted(records.items(), key=lambda item: item[1][0], reverse=True)[:top]
+    top_self = sorted(records.items(), key=lambda item: item[1][1], reverse=True)[:top]
+    return {
+        "enabled": _finder in sys.meta_path,
+        "installed_at": _installed_at,
+        "modules": len(records),
+        "total_ms": _ms(sum(self_s for _, self_s in records.values())),
+        "top_cumulative_ms": [{"module": n, "ms": _ms(r[0])} for n, r in top_cumulative],
+        "top_self_ms": [{"module": n, "ms": _ms(r[1])} for n, r in top_self],
+        "by_package_ms": {
+            package: _ms(seconds)
+            for package, seconds in sorted(by_package.items(), key=lambda item: item[1], reverse=True)[:top]
+        },
+    }
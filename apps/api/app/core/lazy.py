@@ -0,0 +1,122 @@
+"""
+Registry of lazily initialised heavy subsystems.
+
+Modules register an expensive loader (compiling the legal LangGraph workflow,
+importing sentence-transformers/torch, ...) instead of running it at import
+time. The first caller of ``get()`` pays the cost; concurrent callers wait on
+the same load. Load times and failures are reported by /health/startup.
+
+LAZY_STARTUP=true keeps everything on first use (fast cold start for
+autoscaled pods and test runs). Otherwise the application lifespan warms the
+registered subsystems in a background thread after the server is up.
+"""
+
+from __future__ import annotations
+
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, Generic, Iterable, Optional, TypeVar
+
+from loguru import logger
+
+T = TypeVar("T")
+
+LAZY_STARTUP = os.getenv("LAZY_STARTUP", "false").lower() == "true"
+
+
+class LazySubsystem(Generic[T]):
+    """A value built once, on first use, by ``loader``. Failed loads are retried."""
+
+    def __init__(self, name: str, loader: Callable[[], T], description: str = ""):
+        self.name = name
+        self.description = description
+        self._loader = loader
+        self._lock = threading.Lock()
+        self._value: Optional[T] = None
+        self._loaded = False
+        self.load_seconds: Optional[float] = None
+        self.error: Optional[str] = None
+
+    @property
+    def loaded(self) -> bool:
+        return self._loaded
+
+    def get(self) -> T:
+        if self._loaded:
+            return self._value  # type: ignore[return-value]
+        with self._lock:
+            if not self._loaded:
+                started = time.perf_counter()
+                try:
+                    self._value = self._loader()
+                except Exception as exc:
+                    self.error = f"{type(exc).__name__}: {exc}"
+                    raise
+                self.load_seconds = time.perf_counter() - started
+                self.error = None
+                self._loaded = True
+                logger.info(f"Lazy subsystem '{self.name}' loaded in {self.load_seconds:.2f}s")
+        return self._value  # type: ignore[return-value]
+
+    def set(self, value: T) -> None:
+        """Override the value (tests, or a subsystem built elsewhere)."""
+        with self._lock:
+            self._value = value
+            self._loaded = True
+
+    def reset(self) -> None:
+        with self._lock:
+            self._value = None
+            self._loaded = False
+            self.load_seconds = None
+            self.error = None
+
+    def status(self) -> Dict[str, Any]:
+        return {
+            "loaded": self._loaded,
+            "load_seconds": round(self.load_seconds, 3) if self.load_seconds is not None else None,
+            "error": self.error,
+            "description": self.description,
+        }
+
+
+_registry: Dict[str, LazySubsystem] = {}
+_registry_lock = threading.Lock()
+
+
+def lazy_subsystem(name: str, loader: Callable[[], T], description: str = "") -> LazySubsystem[T]:
+    """Register (or return the already registered) subsystem ``name``."""
+    with _registry_lock:
+        existing = _registry.get(name)
+        if existing is None:
+            existing = LazySubsystem(name, loader, description)
+            _registry[name] = existing
+        return existing
+
+
+def get_subsystem(name: str) -> Optional[LazySubsystem]:
+    return _registry.get(name)
+
+
+def subsystems_status() -> Dict[str, Dict[str, Any]]:
+    with _registry_lock:
+        items = list(_registry.items())
+    return {name: subsystem.status() for name, subsystem in items}
+
+
+def warm_subsystems(names: Optional[Iterable[str]] = None) -> Dict[str, Optional[float]]:
+    """Load the given (default: all registered) subsystems; errors are logged, not raised."""
+    with _registry_lock:
+        targets = [
+            _registry[name] for name in (names if names is not None else list(_registry)) if name in _registry
+        ]
+    timings: Dict[str, Optional[float]] = {}
+    for subsystem in targets:
+        try:
+            subsystem.get()
+            timings[subsystem.name] = subsystem.load_seconds
+        except Exception as exc:
+            logger.warning(f"Lazy subsystem '{subsystem.name}' failed to warm: {exc}")
+            timings[subsystem.name] = None
+    return timings
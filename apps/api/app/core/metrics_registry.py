@@ -0,0 +1,692 @@
+"""
+Unified metrics registry with Prometheus text exposition (GET /metrics).
+
+Two kinds of metrics:
+- Push metrics (``Counter``, ``Histogram``, ``Gauge``) updated on hot paths.
+  Counters and histograms accumulate into per-thread cells: an increment is a
+  dict lookup plus an in-place add on a list owned by the calling thread, with
+  no lock. Cells are summed at scrape time; cells of finished threads are
+  folded into a retired accumulator so thread churn does not grow the set.
+- Pull collectors: callbacks registered with ``register_collector`` that read
+  the stats APIs the subsystems already expose (LatencyCollector, result and
+  TTL caches, SPLADE cache, circuit breakers, rate governor, ...) at scrape
+  time. Default collectors only read singletons that already exist and never
+  import or build a subsystem.
+
+Multi-process (gunicorn / uvicorn --workers): set PROMETHEUS_MULTIPROC_DIR to a
+directory shared by the workers. Each worker writes a JSON snapshot of its
+families there every METRICS_FLUSH_INTERVAL seconds (and at exit); whichever
+worker serves the scrape merges its live values with the other snapshots.
+Counters and histograms are summed (snapshots of exited workers keep counting,
+like prometheus_client); gauges follow their ``multiprocess_mode``: "sum",
+"max", or "all" (one series per live worker, with a ``pid`` label).
+
+Environment:
+    METRICS_ENABLED           expose /metrics (default true)
+    METRICS_TOKEN             if set, /metrics requires "Authorization: Bearer <token>"
+    PROMETHEUS_MULTIPROC_DIR  shared snapshot directory (multi-worker deployments)
+    METRICS_FLUSH_INTERVAL    seconds between snapshot writes (default 5)
+"""
+
+from __future__ import annotations
+
+import atexit
+import bisect
+import json
+import math
+import os
+import sys
+import threading
+import time
+import weakref
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from loguru import logger
+
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "true").lower() == "true"
+METRICS_TOKEN = os.getenv("METRICS_TOKEN", "")
+METRICS_MULTIPROC_DIR = os.getenv("PROMETHEUS_MULTIPROC_DIR", "")
+METRICS_FLUSH_INTERVAL = float(os.getenv("METRICS_FLUSH_INTERVAL", "5"))
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Seconds; covers cache hits (~1ms) up to slow LLM-backed stages (~30s).
+DEFAULT_BUCKETS: Tuple[float, ...] = (
+    0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0,
+)
+
+LabelKey = Tuple[str, ...]
+
+
+# =============================================================================
+# Collected data
+# =============================================================================
+
+
+@dataclass
+class Sample:
+    suffix: str  # "", "_bucket", "_sum", "_count"
+    labels: Dict[str, str]
+    value: float
+
+
+@dataclass
+class MetricFamily:
+    name: str
+    type: str  # counter | gauge | histogram
+    help: str
+    samples: List[Sample] = field(default_factory=list)
+    multiprocess_mode: str = "sum"  # gauges only: sum | max | all
+
+    def add(self, value: float, suffix: str = "", **labels: Any) -> "MetricFamily":
+        self.samples.append(Sample(suffix, {k: str(v) for k, v in labels.items()}, float(value)))
+        return self
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "name": self.name,
+            "type": self.type,
+            "help": self.help,
+            "mode": self.multiprocess_mode,
+            "samples": [[s.suffix, s.labels, s.value] for s in self.samples],
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "MetricFamily":
+        return cls(
+            name=data["name"],
+            type=data["type"],
+            help=data.get("help", ""),
+            samples=[Sample(suffix, labels, float(value)) for suffix, labels, value in data["samples"]],
+            multiprocess_mode=data.get("mode", "sum"),
+        )
+
+
+# =============================================================================
+# Push metrics
+# =============================================================================
+
+
+class _ThreadCells:
+    """Per-thread storage shared by Counter and Histogram."""
+
+    def __init__(self, width: int):
+        self._width = width
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._shards: List[Tuple[weakref.ref, Dict[LabelKey, List[float]]]] = []
+        self._retired: Dict[LabelKey, List[float]] = {}
+
+    def cell(self, key: LabelKey) -> List[float]:
+        try:
+            shard = self._local.shard
+        except AttributeError:
+            shard = self._local.shard = {}
+            with self._lock:
+                self._shards.append((weakref.ref(threading.current_thread()), shard))
+        cell = shard.get(key)
+        if cell is None:
+            cell = shard[key] = [0.0] * self._width
+        return cell
+
+    def totals(self) -> Dict[LabelKey, List[float]]:
+        with self._lock:
+            alive = []
+            for ref, shard in self._shards:
+                thread = ref()
+                if thread is None or not thread.is_alive():
+                    _add_cells(self._retired, dict(shard))
+                else:
+                    alive.append((ref, shard))
+            self._shards = alive
+            totals = {key: list(cell) for key, cell in self._retired.items()}
+            shards = [dict(shard) for _, shard in alive]
+        for shard in shards:
+            _add_cells(totals, shard)
+        return totals
+
+    def clear(self) -> None:
+        with self._lock:
+            for _, shard in self._shards:
+                shard.clear()
+            self._retired.clear()
+
+
+def _add_cells(into: Dict[LabelKey, List[float]], cells: Dict[LabelKey, List[float]]) -> None:
+    for key, cell in cells.items():
+        acc = into.get(key)
+        if acc is None:
+            into[key] = list(cell)
+        else:
+            for i, v in enumerate(cell):
+                acc[i] += v
+
+
+class _Metric:
+    type = ""
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+
+    def _key(self, labels: Dict[str, Any]) -> LabelKey:
+        return tuple(str(labels.get(n, "")) for n in self.labelnames)
+
+    def _labels(self, key: LabelKey) -> Dict[str, str]:
+        return dict(zip(self.labelnames, key))
+
+    def collect(self) -> MetricFamily:  # pragma: no cover - abstract
+        raise NotImplementedError
+
+    def clear(self) -> None:  # pragma: no cover - abstract
+        raise NotImplementedError
+
+
+class Counter(_Metric):
+    """Monotonic counter; by convention the name ends in ``_total``."""
+
+    type = "counter"
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, help, labelnames)
+        self._cells = _ThreadCells(1)
+
+    def inc(self, amount: float = 1.0, **labels: Any) -> None:
+        self._cells.cell(self._key(labels))[0] += amount
+
+    def value(self, **labels: Any) -> float:
+        return self._cells.totals().get(self._key(labels), [0.0])[0]
+
+    def collect(self) -> MetricFamily:
+        family = MetricFamily(self.name, self.type, self.help)
+        for key, cell in sorted(self._cells.totals().items()):
+            family.add(cell[0], **self._labels(key))
+        return family
+
+    def clear(self) -> None:
+        self._cells.clear()
+
+
+class Histogram(_Metric):
+    """Histogram with fixed upper bounds; cells hold per-bucket counts + sum."""
+
+    type = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        help: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ):
+        super().__init__(name, help, labelnames)
+        self.buckets = tuple(sorted(float(b) for b in buckets if not math.isinf(b)))
+        # one slot per bucket, one for +Inf, one for the sum
+        self._cells = _ThreadCells(len(self.buckets) + 2)
+
+    def observe(self, value: float, **labels: Any) -> None:
+        cell = self._cells.cell(self._key(labels))
+        cell[bisect.bisect_left(self.buckets, value)] += 1
+        cell[-1] += value
+
+    def collect(self) -> MetricFamily:
+        family = MetricFamily(self.name, self.type, self.help)
+        for key, cell in sorted(self._cells.totals().items()):
+            labels = self._labels(key)
+            cumulative = 0.0
+            for bound, count in zip(self.buckets + (math.inf,), cell[:-1]):
+                cumulative += count
+                family.add(cumulative, "_bucket", **labels, le=_format_bound(bound))
+            family.add(cell[-1], "_sum", **labels)
+            family.add(cumulative, "_count", **labels)
+        return family
+
+    def clear(self) -> None:
+        self._cells.clear()
+
+
+class Gauge(_Metric):
+    """Last-value gauge (lock-protected; meant for low-frequency updates)."""
+
+    type = "gauge"
+
+    def __init__(
+        self,
+        name: str,
+        help: str,
+        labelnames: Sequence[str] = (),
+        multiprocess_mode: str = "sum",
+    ):
+        super().__init__(name, help, labelnames)
+        self.multiprocess_mode = multiprocess_mode
+        self._lock = threading.Lock()
+        self._values: Dict[LabelKey, float] = {}
+
+    def set(self, value: float, **labels: Any) -> None:
+        with self._lock:
+            self._values[self._key(labels)] = float(value)
+
+    def inc(self, amount: float = 1.0, **labels: Any) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def dec(self, amount: float = 1.0, **labels: Any) -> None:
+        self.inc(-amount, **labels)
+
+    def collect(self) -> MetricFamily:
+        family = MetricFamily(self.name, self.type, self.help, multiprocess_mode=self.multiprocess_mode)
+        with self._lock:
+            values = sorted(self._values.items())
+        for key, value in values:
+            family.add(value, **self._labels(key))
+        return family
+
+    def clear(self) -> None:
+        with self._lock:
+            self._values.clear()
+
+
+# =============================================================================
+# Registry
+# =============================================================================
+
+
+Collector = Callable[[], Iterable[MetricFamily]]
+
+
+class MetricsRegistry:
+    """Holds push metrics and pull collectors; renders Prometheus text format."""
+
+    def __init__(self, multiproc_dir: str = "", flush_interval: float = METRICS_FLUSH_INTERVAL):
+        self.multiproc_dir = multiproc_dir
+        self.flush_interval = flush_interval
+        self._lock = threading.Lock()
+        self._metrics: Dict[str, _Metric] = {}
+        self._collectors: Dict[str, Collector] = {}
+        self._flusher: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        if multiproc_dir:
+            os.makedirs(multiproc_dir, exist_ok=True)
+
+    # ------------------------------------------------------------------
+    # Registration
+    # ------------------------------------------------------------------
+
+    def _get_or_create(self, cls, name: str, *args: Any, **kwargs: Any):
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = self._metrics[name] = cls(name, *args, **kwargs)
+        if not isinstance(metric, cls):
+            raise ValueError(f"Metric {name} already registered as {metric.type}")
+        self._ensure_flusher()
+        return metric
+
+    def counter(self, name: str, help: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self._get_or_create(Counter, name, help, labelnames)
+
+    def histogram(
+        self,
+        name: str,
+        help: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ) -> Histogram:
+        return self._get_or_create(Histogram, name, help, labelnames, buckets)
+
+    def gauge(
+        self,
+        name: str,
+        help: str,
+        labelnames: Sequence[str] = (),
+        multiprocess_mode: str = "sum",
+    ) -> Gauge:
+        return self._get_or_create(Gauge, name, help, labelnames, multiprocess_mode)
+
+    def register_collector(self, name: str, collector: Collector) -> None:
+        """Register (or replace) a scrape-time collector."""
+        with self._lock:
+            self._collectors[name] = collector
+
+    def unregister_collector(self, name: str) -> None:
+        with self._lock:
+            self._collectors.pop(name, None)
+
+    # ------------------------------------------------------------------
+    # Collection / exposition
+    # ------------------------------------------------------------------
+
+    def collect(self) -> List[MetricFamily]:
+        """Families of this process (push metrics + collectors)."""
+        with self._lock:
+            metrics = list(self._metrics.values())
+            collectors = list(self._collectors.items())
+        families = [m.collect() for m in metrics]
+        for name, collector in collectors:
+            try:
+                families.extend(collector())
+            except Exception as e:  # a broken collector must not break the scrape
+                logger.debug(f"Metrics collector {name} failed: {e}")
+        return families
+
+    def render(self) -> str:
+        families = self.collect()
+        if self.multiproc_dir:
+            self.flush(families)
+            families = merge_families(self._read_snapshots(), live_pid=os.getpid())
+        return render_families(families)
+
+    def clear(self) -> None:
+        """Zero push metrics (for testing)."""
+        with self._lock:
+            metrics = list(self._metrics.values())
+        for metric in metrics:
+            metric.clear()
+
+    # ------------------------------------------------------------------
+    # Multi-process snapshots
+    # ------------------------------------------------------------------
+
+    def _snapshot_path(self, pid: int) -> str:
+        return os.path.join(self.multiproc_dir, f"metrics_{pid}.json")
+
+    def flush(self, families: Optional[List[MetricFamily]] = None) -> None:
+        """Write this worker's snapshot atomically (no-op without a multiproc dir)."""
+        if not self.multiproc_dir:
+            return
+        if families is None:
+            families = self.collect()
+        pid = os.getpid()
+        path = self._snapshot_path(pid)
+        tmp = f"{path}.{threading.get_ident()}.tmp"
+        try:
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump({"pid": pid, "written_at": time.time(), "families": [fam.to_dict() for fam in families]}, f)
+            os.replace(tmp, path)
+        except OSError as e:
+            logger.debug(f"Metrics snapshot write failed: {e}")
+
+    def _read_snapshots(self) -> List[Tuple[int, List[MetricFamily]]]:
+        snapshots = []
+        try:
+            names = os.listdir(self.multiproc_dir)
+        except OSError:
+            return snapshots
+        for fname in names:
+            if not (fname.startswith("metrics_") and fname.endswith(".json")):
+                continue
+            try:
+                with open(os.path.join(self.multiproc_dir, fname), encoding="utf-8") as f:
+                    data = json.load(f)
+                snapshots.append((int(data["pid"]), [MetricFamily.from_dict(d) for d in data["families"]]))
+            except (OSError, ValueError, KeyError) as e:
+                logger.debug(f"Skipping metrics snapshot {fname}: {e}")
+        return snapshots
+
+    def _ensure_flusher(self) -> None:
+        if not self.multiproc_dir or self._flusher is not None:
+            return
+        with self._lock:
+            if self._flusher is not None:
+                return
+            self._flusher = threading.Thread(target=self._flush_loop, name="metrics-flusher", daemon=True)
+            self._flusher.start()
+        atexit.register(self.flush)
+
+    def _flush_loop(self) -> None:
+        while not self._stop.wait(self.flush_interval):
+            self.flush()
+
+    def close(self) -> None:
+        self._stop.set()
+
+
+# =============================================================================
+# Merging / rendering
+# =============================================================================
+
+
+def _pid_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except OSError:
+        return True
+    return True
+
+
+def merge_families(
+    snapshots: List[Tuple[int, List[MetricFamily]]],
+    live_pid: Optional[int] = None,
+) -> List[MetricFamily]:
+    """Merge per-worker snapshots into one family list (see module docstring)."""
+    merged: Dict[str, MetricFamily] = {}
+    values: Dict[str, Dict[Tuple[str, Tuple[Tuple[str, str], ...]], float]] = {}
+    for pid, families in sorted(snapshots, key=lambda s: s[0]):
+        alive = pid == live_pid or _pid_alive(pid)
+        for fam in families:
+            target = merged.setdefault(
+                fam.name, MetricFamily(fam.name, fam.type, fam.help, multiprocess_mode=fam.multiprocess_mode)
+            )
+            acc = values.setdefault(fam.name, {})
+            is_gauge = fam.type == "gauge"
+            if is_gauge and not alive:
+                continue
+            for s in fam.samples:
+                labels = dict(s.labels)
+                if is_gauge and target.multiprocess_mode == "all":
+                    labels["pid"] = str(pid)
+                key = (s.suffix, tuple(sorted(labels.items())))
+                if key not in acc:
+                    acc[key] = s.value
+                elif is_gauge and target.multiprocess_mode == "max":
+                    acc[key] = max(acc[key], s.value)
+                else:
+                    acc[key] += s.value
+    for name, fam in merged.items():
+        fam.samples = [Sample(suffix, dict(labels), v) for (suffix, labels), v in values[name].items()]
+    return list(merged.values())
+
+
+def _format_bound(bound: float) -> str:
+    return "+Inf" if math.isinf(bound) else repr(float(bound))
+
+
+def _format_value(value: float) -> str:
+    if math.isnan(value):
+        return "NaN"
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    return repr(float(value))
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", r"\\").replace("\n", r"\n").replace('"', r"\"")
+
+
+def render_families(families: Iterable[MetricFamily]) -> str:
+    """Prometheus text exposition format 0.0.4."""
+    lines: List[str] = []
+    by_name: Dict[str, MetricFamily] = {}
+    for fam in families:
+        existing = by_name.get(fam.name)
+        if existing is None:
+            by_name[fam.name] = MetricFamily(fam.name, fam.type, fam.help, list(fam.samples), fam.multiprocess_mode)
+        else:
+            existing.samples.extend(fam.samples)
+    for name in sorted(by_name):
+        fam = by_name[name]
+        if not fam.samples:
+            continue
+        lines.append(f"# HELP {name} {fam.help.replace(chr(10), ' ')}")
+        lines.append(f"# TYPE {name} {fam.type}")
+        for s in fam.samples:
+            label_str = ",".join(f'{k}="{_escape(v)}"' for k, v in s.labels.items())
+            label_str = f"{{{label_str}}}" if label_str else ""
+            lines.append(f"{name}{s.suffix}{label_str} {_format_value(s.value)}")
+    return "\n".join(lines) + "\n"
+
+
+# =============================================================================
+# Default collectors (read existing singletons only)
+# =============================================================================
+
+
+def _loaded(module: str, attr: str) -> Any:
+    mod = sys.modules.get(module)
+    return getattr(mod, attr, None) if mod is not None else None
+
+
+def _cache_families(caches: Dict[str, Dict[str, Any]]) -> List[MetricFamily]:
+    hits = MetricFamily("iudex_cache_hits_total", "counter", "Cache hits per cache")
+    misses = MetricFamily("iudex_cache_misses_total", "counter", "Cache misses per cache")
+    evictions = MetricFamily("iudex_cache_evictions_total", "counter", "Cache evictions per cache")
+    entries = MetricFamily("iudex_cache_entries", "gauge", "Entries currently held per cache")
+    for cache, stats in caches.items():
+        hits.add(stats.get("hits", 0), cache=cache)
+        misses.add(stats.get("misses", 0), cache=cache)
+        if "evictions" in stats:
+            evictions.add(stats["evictions"], cache=cache)
+        entries.add(stats.get("entries", 0), cache=cache)
+    return [hits, misses, evictions, entries]
+
+
+def _collect_caches() -> List[MetricFamily]:
+    caches: Dict[str, Dict[str, Any]] = {}
+
+    result_cache = _loaded("app.services.rag.core.result_cache", "_instance")
+    if result_cache is not None:
+        s = result_cache.stats()
+        caches["rag_result"] = {"hits": s["hits"], "misses": s["misses"], "entries": s["size"]}
+
+    qe_service = _loaded("app.services.rag.core.query_expansion", "_service_instance")
+    qe_cache = getattr(qe_service, "_cache", None)
+    if qe_cache is not None:
+        s = qe_cache.stats()
+        caches["query_expansion"] = {"hits": s["hits"], "misses": s["misses"], "entries": s["active_entries"]}
+
+    emb_service = _loaded("app.services.rag.core.embeddings", "_service")
+    emb_cache = getattr(emb_service, "_cache", None)
+    if emb_cache is not None:
+        s = emb_cache.get_stats()
+        caches["embeddings"] = {
+            "hits": s.hits,
+            "misses": s.misses,
+            "evictions": s.evictions,
+            "entries": s.total_entries,
+        }
+
+    encoder = _loaded("app.services.rag.core.splade_encoder", "_encoder")
+    splade_cache = getattr(encoder, "_cache", None)
+    if splade_cache is not None:
+        s = splade_cache.stats()
+        caches["splade"] = {"hits": s["hits"], "misses": s["misses"], "entries": s["entries"]}
+
+    llm_cache = _loaded("app.services.ai.llm_response_cache", "_instance")
+    if llm_cache is not None:
+        s = llm_cache.stats()
+        caches["llm_response"] = {
+            "hits": s["hits"],
+            "misses": s["misses"],
+            "evictions": s["evictions"],
+            "entries": s["size"],
+        }
+
+    return _cache_families(caches) if caches else []
+
+
+def _collect_latency() -> List[MetricFamily]:
+    collector = _loaded("app.services.rag.core.metrics", "_collector")
+    if collector is None:
+        return []
+    fam = MetricFamily(
+        "iudex_rag_stage_latency_ms",
+        "gauge",
+        "Sliding-window latency percentiles per RAG stage (LatencyCollector)",
+        multiprocess_mode="all",
+    )
+    for stage, stats in collector.summary().items():
+        for q in ("p50", "p95", "p99"):
+            fam.add(stats.get(q, 0.0), stage=stage, quantile=f"0.{q[1:]}")
+    return [fam]
+
+
+def _collect_circuit_breakers() -> List[MetricFamily]:
+    get_all = _loaded("app.services.rag.core.resilience", "get_all_circuit_breakers")
+    if get_all is None:
+        return []
+    state = MetricFamily(
+        "iudex_circuit_breaker_state",
+        "gauge",
+        "1 for the current state of each circuit breaker",
+        multiprocess_mode="max",
+    )
+    calls = MetricFamily("iudex_circuit_breaker_calls_total", "counter", "Circuit breaker calls by outcome")
+    for name, breaker in get_all().items():
+        stats = breaker.stats
+        current = getattr(stats.state, "value", str(stats.state))
+        for candidate in ("closed", "open", "half_open"):
+            state.add(1.0 if candidate == current else 0.0, breaker=name, state=candidate)
+        calls.add(stats.total_successes, breaker=name, outcome="success")
+        calls.add(stats.total_failures, breaker=name, outcome="failure")
+        calls.add(stats.total_rejected, breaker=name, outcome="rejected")
+    return [state, calls]
+
+
+def _collect_rate_governor() -> List[MetricFamily]:
+    governor = _loaded("app.services.ai.rate_governor", "_instance")
+    if governor is None:
+        return []
+    in_flight = MetricFamily("iudex_llm_in_flight", "gauge", "LLM calls in flight per provider")
+    limit = MetricFamily(
+        "iudex_llm_concurrency_limit", "gauge", "Adaptive concurrency limit per provider", multiprocess_mode="all"
+    )
+    calls = MetricFamily("iudex_llm_governed_calls_total", "counter", "LLM calls admitted by the rate governor")
+    throttled = MetricFamily(
+        "iudex_llm_throttled_seconds_total", "counter", "Seconds spent waiting on the rate governor"
+    )
+    for provider, s in governor.stats()["providers"].items():
+        in_flight.add(s["in_flight"], provider=provider)
+        limit.add(s["concurrency_limit"], provider=provider)
+        calls.add(s["calls"], provider=provider)
+        throttled.add(s["throttled_seconds"], provider=provider)
+    return [in_flight, limit, calls, throttled]
+
+
+def register_default_collectors(registry: "MetricsRegistry") -> None:
+    registry.register_collector("caches", _collect_caches)
+    registry.register_collector("rag_latency", _collect_latency)
+    registry.register_collector("circuit_breakers", _collect_circuit_breakers)
+    registry.register_collector("rate_governor", _collect_rate_governor)
+
+
+# =============================================================================
+# Singleton
+# =============================================================================
+
+_registry: Optional[MetricsRegistry] = None
+_registry_lock = threading.Lock()
+
+
+def get_metrics_registry() -> MetricsRegistry:
+    global _registry
+    if _registry is None:
+        with _registry_lock:
+            if _registry is None:
+                registry = MetricsRegistry(multiproc_dir=METRICS_MULTIPROC_DIR)
+                register_default_collectors(registry)
+                _registry = registry
+    return _registry
+
+
+def reset_metrics_registry() -> None:
+    """Reset singleton (for testing)."""
+    global _registry
+    with _registry_lock:
+        if _registry is not None:
+            _registry.close()
+        _registry = None
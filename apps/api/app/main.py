@@ -7,6 +7,11 @@ import asyncio
 import os
 from typing import AsyncGenerator
 
+# Profila o tempo de import dos módulos carregados a partir daqui (/health/startup)
+from app.core import import_profiler
+
+import_profiler.install()
+
 from fastapi import FastAPI, Request
 from fastapi.staticfiles import StaticFiles
 from fastapi.responses import JSONResponse
@@ -19,6 +24,7 @@ from loguru import logger
 from app.api.routes import api_router
 from app.core.config import settings
 from app.core.database import init_db
+from app.core.lazy import LAZY_STARTUP, warm_subsystems
 from app.core.logging import setup_logging
 from app.middleware.cache_headers import CacheHeadersMiddleware
 from app.services.api_call_tracker import set_background_loop
@@ -150,7 +156,9 @@ async def lifespan(app: FastAPI) -> AsyncGenerator:
     logger.info("Redis conectado")
 
     # Preload RAG models to eliminate cold start latency
-    await _preload_rag_models()
+    # (LAZY_STARTUP=true: tudo é carregado no primeiro uso)
+    if not LAZY_STARTUP:
+        await _preload_rag_models()
 
     # Inicializar AI Services (tools unificadas, registry, handlers)
     try:
@@ -163,8 +171,22 @@ async def lifespan(app: FastAPI) -> AsyncGenerator:
 
     logger.info(f"✅ API disponível em: http://{settings.HOST}:{settings.PORT}")
     logger.info(f"📝 Documentação: http://{settings.HOST}:{settings.PORT}/docs")
+
+    # Subsistemas pesados (grafo LangGraph, libs de RAG) aquecem em background
+    warmup_future = None
+    if not LAZY_STARTUP:
+        warmup_future = asyncio.get_running_loop().run_in_executor(None, warm_subsystems)
+
+    # Perfil de import só cobre o startup (e o warmup); imports lazy de request não são instrumentados
+    if warmup_future is not None:
+        warmup_future.add_done_callback(lambda _: import_profiler.uninstall())
+    else:
+        import_profiler.uninstall()
     
     yield
+
+    if warmup_future is not None and not warmup_future.done():
+        warmup_future.cancel()
     
     # Shutdown
     logger.info("🛑 Encerrando Iudex API...")
@@ -176,6 +198,13 @@ async def lifespan(app: FastAPI) -> AsyncGenerator:
     except Exception:
         pass
 
+    # Gravar registros de uso de API ainda em buffer
+    try:
+        from app.services.api_usage_writer import get_api_usage_writer
+        await get_api_usage_writer().flush_and_stop()
+    except Exception as e:
+        logger.warning(f"Falha ao gravar uso de API pendente: {e}")
+
 
 # Criar aplicação FastAPI
 app = FastAPI(
@@ -237,6 +266,24 @@ async def health_check():
     }
 
 
+@app.get("/metrics", include_in_schema=False)
+async def metrics(request: Request):
+    """Métricas em formato Prometheus (ver app/core/metrics_registry.py)"""
+    import secrets
+    from fastapi.responses import PlainTextResponse
+    from app.core import metrics_registry
+
+    if not metrics_registry.METRICS_ENABLED:
+        return JSONResponse(status_code=404, content={"detail": "Not Found"})
+    if metrics_registry.METRICS_TOKEN:
+        expected = f"Bearer {metrics_registry.METRICS_TOKEN}"
+        if not secrets.compare_digest(request.headers.get("authorization", ""), expected):
+            return JSONResponse(status_code=401, content={"detail": "Unauthorized"})
+    # Coleta lê stats sob locks e, em multi-worker, arquivos de snapshot: fora do event loop
+    body = await asyncio.to_thread(metrics_registry.get_metrics_registry().render)
+    return PlainTextResponse(body, media_type=metrics_registry.CONTENT_TYPE)
+
+
 @app.get("/")
 async def root():
     """Root endpoint"""
@@ -13,6 +13,8 @@ import time
 import random
 import threading
 import contextvars
+import functools
+import inspect
 from datetime import datetime
 from typing import Optional, Tuple, Dict, List, Any
 from dataclasses import dataclass, field
@@ -20,15 +22,11 @@ from pathlib import Path
 
 logger = logging.getLogger("AgentClients")
 
-CLAUDE_MIN_INTERVAL_SECONDS = float(os.getenv("CLAUDE_MIN_INTERVAL_SECONDS", "0"))
 CLAUDE_MAX_RETRIES = int(os.getenv("CLAUDE_MAX_RETRIES", "3"))
 CLAUDE_BACKOFF_BASE_SECONDS = float(os.getenv("CLAUDE_BACKOFF_BASE_SECONDS", "10"))
 CLAUDE_BACKOFF_MAX_SECONDS = float(os.getenv("CLAUDE_BACKOFF_MAX_SECONDS", "60"))
 ANTHROPIC_FALLBACK_DIRECT = os.getenv("ANTHROPIC_FALLBACK_DIRECT", "true").lower() == "true"
 
-_claude_throttle_lock = threading.Lock()
-_claude_last_call_at = 0.0
-
 from app.services.web_search_service import web_search_service, is_breadth_first
 from app.services.api_call_tracker import record_api_call, billing_context
 from app.services.ai.prompts.debate_prompts import (
@@ -119,6 +117,16 @@ except ImportError:
     types = None
 
 from app.services.ai.genai_utils import extract_genai_text
+from app.services.ai.context_cache_registry import get_context_cache_registry
+from app.services.ai.llm_response_cache import get_llm_response_cache, make_cache_key
+from app.services.ai.rate_governor import (
+    get_rate_governor,
+    is_rate_limit_error,
+    loop_local_client,
+    pooled_async_http_client,
+    pooled_http_client,
+    retry_after_seconds,
+)
 
 # Fallback direct SDKs
 try:
@@ -229,9 +237,10 @@ def init_openai_client():
     if force_direct:
         logger.info("⚡ OPENAI_FORCE_DIRECT=true: Usando API keys diretas (bypass Vertex)")
 
+    http_client = pooled_http_client("openai")
     if base_url:
-        return openai.OpenAI(api_key=api_key, base_url=base_url)
-    return openai.OpenAI(api_key=api_key)
+        return openai.OpenAI(api_key=api_key, base_url=base_url, http_client=http_client)
+    return openai.OpenAI(api_key=api_key, http_client=http_client)
 
 def init_xai_client():
     """Initialize xAI client via OpenAI-compatible SDK."""
@@ -243,7 +252,7 @@ def init_xai_client():
         logger.warning("⚠️ XAI_API_KEY não configurada. xAI desabilitado.")
         return None
     base_url = os.getenv("XAI_BASE_URL", "https://api.x.ai/v1")
-    return openai.OpenAI(api_key=api_key, base_url=base_url)
+    return openai.OpenAI(api_key=api_key, base_url=base_url, http_client=pooled_http_client("xai"))
 
 def init_xai_async_client():
     """Initialize async xAI client via OpenAI-compatible SDK."""
@@ -255,7 +264,7 @@ def init_xai_async_client():
         logger.warning("⚠️ XAI_API_KEY não configurada. xAI async desabilitado.")
         return None
     base_url = os.getenv("XAI_BASE_URL", "https://api.x.ai/v1")
-    return openai.AsyncOpenAI(api_key=api_key, base_url=base_url)
+    return openai.AsyncOpenAI(api_key=api_key, base_url=base_url, http_client=pooled_async_http_client("xai"))
 
 def init_openrouter_client():
     """Initialize OpenRouter client via OpenAI-compatible SDK."""
@@ -274,7 +283,12 @@ def init_openrouter_client():
         headers["HTTP-Referer"] = referer
     if title:
         headers["X-Title"] = title
-    return openai.OpenAI(api_key=api_key, base_url=base_url, default_headers=headers or None)
+    return openai.OpenAI(
+        api_key=api_key,
+        base_url=base_url,
+        default_headers=headers or None,
+        http_client=pooled_http_client("openrouter"),
+    )
 
 def init_openrouter_async_client():
     """Initialize async OpenRouter client via OpenAI-compatible SDK."""
@@ -293,7 +307,12 @@ def init_openrouter_async_client():
         headers["HTTP-Referer"] = referer
     if title:
         headers["X-Title"] = title
-    return openai.AsyncOpenAI(api_key=api_key, base_url=base_url, default_headers=headers or None)
+    return openai.AsyncOpenAI(
+        api_key=api_key,
+        base_url=base_url,
+        default_headers=headers or None,
+        http_client=pooled_async_http_client("openrouter"),
+    )
 
 def init_anthropic_client():
     """Initialize Claude client via Vertex AI (preferred) or direct Anthropic."""
@@ -314,7 +333,7 @@ def init_anthropic_client():
     if not api_key:
         logger.warning("⚠️ ANTHROPIC_API_KEY não configurada. Agente Claude desabilitado.")
         return None
-    return anthropic.Anthropic(api_key=api_key)
+    return anthropic.Anthropic(api_key=api_key, http_client=pooled_http_client("anthropic"))
 
 
 def _is_anthropic_vertex_client(client) -> bool:
@@ -326,6 +345,13 @@ def _is_anthropic_vertex_client(client) -> bool:
         return True
     return False
 
+def _is_async_anthropic_client(client) -> bool:
+    if not client or not anthropic:
+        return False
+    if isinstance(client, anthropic.AsyncAnthropic):
+        return True
+    return bool(AsyncAnthropicVertex and isinstance(client, AsyncAnthropicVertex))
+
 def init_gemini_client():
     """Initialize Vertex AI client for Gemini (Juiz)"""
     return init_vertex_client()
@@ -337,10 +363,7 @@ _anthropic_client = None
 _gemini_client = None
 _xai_client = None
 _openrouter_client = None
-_async_xai_client = None
-_async_openrouter_client = None
-_async_openai_client = None
-_async_anthropic_client = None
+# Async clients are cached per event loop (see rate_governor.loop_local_client)
 
 def get_gpt_client():
     """Get or initialize OpenAI client (singleton)."""
@@ -378,38 +401,30 @@ def get_openrouter_client():
     return _openrouter_client
 
 def get_async_xai_client():
-    """Get or initialize async xAI client (singleton)."""
-    global _async_xai_client
-    if _async_xai_client is None:
-        _async_xai_client = init_xai_async_client()
-    return _async_xai_client
+    """Get or initialize async xAI client (one per event loop)."""
+    return loop_local_client("xai", init_xai_async_client)
 
 def get_async_openrouter_client():
-    """Get or initialize async OpenRouter client (singleton)."""
-    global _async_openrouter_client
-    if _async_openrouter_client is None:
-        _async_openrouter_client = init_openrouter_async_client()
-    return _async_openrouter_client
+    """Get or initialize async OpenRouter client (one per event loop)."""
+    return loop_local_client("openrouter", init_openrouter_async_client)
 
 def get_async_openai_client():
-    """Get or initialize Async OpenAI client (singleton) for direct API."""
-    global _async_openai_client
-    if _async_openai_client is not None:
-        return _async_openai_client
+    """Get or initialize Async OpenAI client (one per event loop) for direct API."""
     if not openai:
         return None
     api_key = os.getenv("OPENAI_API_KEY")
     if not api_key:
         return None
-    _async_openai_client = openai.AsyncOpenAI(api_key=api_key)
-    return _async_openai_client
+    return loop_local_client(
+        "openai",
+        lambda: openai.AsyncOpenAI(api_key=api_key, http_client=pooled_async_http_client("openai")),
+    )
 
 def get_async_claude_client():
-    """Get or initialize Async Anthropic client (Vertex preferred)."""
-    global _async_anthropic_client
-    if _async_anthropic_client is not None:
-        return _async_anthropic_client
+    """Get or initialize Async Anthropic client (Vertex preferred, one per event loop)."""
+    return loop_local_client("anthropic", _init_async_claude_client)
 
+def _init_async_claude_client():
     if not anthropic:
         return None
 
@@ -419,30 +434,21 @@ def get_async_claude_client():
 
     async_vertex = getattr(anthropic, "AsyncAnthropicVertex", None)
     if project_id and async_vertex and not force_direct:
-        _async_anthropic_client = async_vertex(project_id=project_id, region=region)
-        return _async_anthropic_client
+        return async_vertex(project_id=project_id, region=region)
 
     api_key = os.getenv("ANTHROPIC_API_KEY")
     if not api_key:
         return None
 
-    _async_anthropic_client = anthropic.AsyncAnthropic(api_key=api_key)
-    return _async_anthropic_client
+    return anthropic.AsyncAnthropic(api_key=api_key, http_client=pooled_async_http_client("anthropic"))
 
 
-# Cached direct client for code execution fallback (Vertex doesn't support code-execution beta)
-_async_anthropic_direct_client = None
-
 def get_async_claude_direct_client():
     """Get a direct (non-Vertex) Anthropic client for features not supported on Vertex AI.
 
     Used as fallback when the primary client is Vertex but the feature (e.g. code execution)
     requires the direct Anthropic API.
     """
-    global _async_anthropic_direct_client
-    if _async_anthropic_direct_client is not None:
-        return _async_anthropic_direct_client
-
     if not anthropic:
         return None
 
@@ -450,8 +456,46 @@ def get_async_claude_direct_client():
     if not api_key:
         return None
 
-    _async_anthropic_direct_client = anthropic.AsyncAnthropic(api_key=api_key)
-    return _async_anthropic_direct_client
+    return loop_local_client(
+        "anthropic-direct",
+        lambda: anthropic.AsyncAnthropic(api_key=api_key, http_client=pooled_async_http_client("anthropic")),
+    )
+
+
+# Direct clients used as rate-limit / not-found fallbacks (built once, not per call)
+_anthropic_direct_client = None
+_gemini_direct_clients: Dict[str, Any] = {}
+_direct_clients_lock = threading.Lock()
+
+def get_claude_direct_client():
+    """Sync direct Anthropic client for the Vertex rate-limit fallback (singleton)."""
+    global _anthropic_direct_client
+    if _anthropic_direct_client is not None:
+        return _anthropic_direct_client
+    api_key = os.getenv("ANTHROPIC_API_KEY")
+    if not api_key or not anthropic:
+        return None
+    _anthropic_direct_client = anthropic.Anthropic(
+        api_key=api_key, http_client=pooled_http_client("anthropic")
+    )
+    return _anthropic_direct_client
+
+def get_gemini_direct_client(api_key: str):
+    """Direct (API key) Gemini client, one per key."""
+    client = _gemini_direct_clients.get(api_key)
+    if client is None and genai:
+        with _direct_clients_lock:
+            client = _gemini_direct_clients.get(api_key)
+            if client is None:
+                client = genai.Client(api_key=api_key)
+                _gemini_direct_clients[api_key] = client
+    return client
+
+def get_async_perplexity_client(api_key: str):
+    """AsyncPerplexity client, one per key and event loop (keeps its connection pool warm)."""
+    from perplexity import AsyncPerplexity
+
+    return loop_local_client(f"perplexity:{api_key}", lambda: AsyncPerplexity(api_key=api_key))
 
 
 # =============================================================================
@@ -482,7 +526,11 @@ class AgentMetrics:
             "success": success,
             "timeout": timeout
         })
-    
+        try:
+            _export_agent_call(provider, model, input_tokens, output_tokens, latency_ms, success, timeout)
+        except Exception:
+            pass  # metrics are best-effort
+
     def total_tokens(self) -> Dict[str, int]:
         """Get total tokens by provider"""
         totals = {}
@@ -521,6 +569,26 @@ class AgentMetrics:
                 "estimated_cost_usd": self.estimated_cost_usd()
             }, f, indent=2, ensure_ascii=False)
 
+def _export_agent_call(provider: str, model: str, input_tokens: int, output_tokens: int,
+                       latency_ms: int, success: bool, timeout: bool) -> None:
+    """Mirror an AgentMetrics call into the Prometheus registry (/metrics)."""
+    from app.core.metrics_registry import get_metrics_registry
+
+    registry = get_metrics_registry()
+    tokens = registry.counter(
+        "iudex_llm_agent_tokens_total", "Agent LLM tokens by provider/model", ("provider", "model", "direction")
+    )
+    tokens.inc(input_tokens or 0, provider=provider, model=model, direction="input")
+    tokens.inc(output_tokens or 0, provider=provider, model=model, direction="output")
+    outcome = "timeout" if timeout else ("success" if success else "error")
+    registry.counter(
+        "iudex_llm_agent_calls_total", "Agent LLM calls by provider/model and outcome", ("provider", "model", "outcome")
+    ).inc(provider=provider, model=model, outcome=outcome)
+    registry.histogram(
+        "iudex_llm_agent_latency_seconds", "Agent LLM call latency", ("provider",),
+        buckets=(0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 20.0, 30.0, 60.0, 120.0),
+    ).observe((latency_ms or 0) / 1000.0, provider=provider)
+
 # Global metrics instance
 agent_metrics = AgentMetrics()
 
@@ -550,31 +618,121 @@ def _extract_json_obj(text: str) -> Optional[Dict[str, Any]]:
         return None
 
 # =============================================================================
-# CRITIQUE CACHE
+# RESPONSE CACHE (critiques + opt-in deterministic calls)
 # =============================================================================
 
-_critique_cache: Dict[str, str] = {}
 CACHE_TTL_SECONDS = 3600  # 1 hour
 
-def _cache_key(prompt: str) -> str:
-    """Generate cache key from prompt hash"""
-    return hashlib.sha256(prompt.encode()).hexdigest()[:16]
-
-def get_cached_critique(prompt: str) -> Optional[str]:
-    """Get cached critique if available"""
-    key = _cache_key(prompt)
-    return _critique_cache.get(key)
+# Arguments that don't change the generated text
+_CACHE_IGNORED_PARAMS = {"client", "prompt", "timeout"}
+
+def _cache_key(prompt: str, model: str = "") -> str:
+    """Generate cache key from model + full prompt hash"""
+    return make_cache_key("critique", model, prompt)
+
+def get_cached_critique(prompt: str, model: str = "") -> Optional[str]:
+    """Get cached critique if available (and not expired)"""
+    cache = get_llm_response_cache()
+    return cache.get(_cache_key(prompt, model)) if cache else None
+
+def set_cached_critique(prompt: str, critique: str, model: str = ""):
+    """Cache a critique response for CACHE_TTL_SECONDS"""
+    cache = get_llm_response_cache()
+    if cache:
+        cache.set(_cache_key(prompt, model), critique, ttl=CACHE_TTL_SECONDS)
+
+async def aget_cached_critique(prompt: str, model: str = "") -> Optional[str]:
+    """Async get_cached_critique (L2 lookup off the event loop)"""
+    cache = get_llm_response_cache()
+    return await cache.aget(_cache_key(prompt, model)) if cache else None
+
+async def aset_cached_critique(prompt: str, critique: str, model: str = ""):
+    """Async set_cached_critique (L2 write off the event loop)"""
+    cache = get_llm_response_cache()
+    if cache:
+        await cache.aset(_cache_key(prompt, model), critique, ttl=CACHE_TTL_SECONDS)
+
+def _llm_call_cache_key(
+    provider: str, signature: inspect.Signature, args: tuple, kwargs: dict
+) -> Optional[str]:
+    """Key over (provider, model, generation params, prompt); None if not cacheable."""
+    bound = signature.bind(*args, **kwargs)
+    bound.apply_defaults()
+    params: Dict[str, Any] = {}
+    for name, value in bound.arguments.items():
+        if name in _CACHE_IGNORED_PARAMS or value is None or value is False:
+            continue
+        if not isinstance(value, (str, int, float, bool)):
+            return None  # e.g. Gemini cached_content handles are job-scoped
+        params[name] = value
+    model = str(params.pop("model", ""))
+    return make_cache_key(provider, model, bound.arguments.get("prompt") or "", **params)
 
-def set_cached_critique(prompt: str, critique: str):
-    """Cache a critique response"""
-    key = _cache_key(prompt)
-    _critique_cache[key] = critique
+def cacheable_llm_call(provider: str):
+    """
+    Adds opt-in ``cache=True`` (and ``cache_ttl=``) to a call_* helper.
+    Only non-empty responses are stored; failures are never cached.
+    """
+    def decorator(fn):
+        signature = inspect.signature(fn)
+
+        if inspect.iscoroutinefunction(fn):
+            @functools.wraps(fn)
+            async def async_wrapper(*args, cache: bool = False, cache_ttl: Optional[int] = None, **kwargs):
+                store = get_llm_response_cache() if cache else None
+                key = _llm_call_cache_key(provider, signature, args, kwargs) if store else None
+                if key:
+                    hit = await store.aget(key)
+                    if hit is not None:
+                        return hit
+                result = await fn(*args, **kwargs)
+                if key and result:
+                    await store.aset(key, result, ttl=cache_ttl)
+                return result
+            return async_wrapper
+
+        @functools.wraps(fn)
+        def wrapper(*args, cache: bool = False, cache_ttl: Optional[int] = None, **kwargs):
+            store = get_llm_response_cache() if cache else None
+            key = _llm_call_cache_key(provider, signature, args, kwargs) if store else None
+            if key:
+                hit = store.get(key)
+                if hit is not None:
+                    return hit
+            result = fn(*args, **kwargs)
+            if key and result:
+                store.set(key, result, ttl=cache_ttl)
+            return result
+        return wrapper
+
+    return decorator
+
+def governed_stream(provider_for_client):
+    """
+    Runs a stream_* generator under the rate governor: one provider slot is
+    held from the first chunk until the stream is exhausted or closed.
+    """
+    def decorator(fn):
+        signature = inspect.signature(fn)
+
+        @functools.wraps(fn)
+        async def wrapper(*args, **kwargs):
+            bound = signature.bind(*args, **kwargs)
+            bound.apply_defaults()
+            provider = provider_for_client(bound.arguments.get("client"))
+            model = str(bound.arguments.get("model") or "")
+            tokens = len(bound.arguments.get("prompt") or "") // 4
+            async for item in get_rate_governor().stream(provider, model, tokens, fn(*args, **kwargs)):
+                yield item
+        return wrapper
+
+    return decorator
 
 # =============================================================================
 # GEMINI CONTEXT CACHING (v5.3)
 # =============================================================================
 
-# Store active caches by job_id for cleanup
+# Per-process handles by job_id (the shared registry is the source of truth)
 _active_job_caches: Dict[str, Any] = {}
 MIN_CHARS_FOR_CACHE = 50000  # Only cache contexts > 50k chars
 CONTEXT_CACHE_TTL_SECONDS = 3600  # 1 hour default
@@ -620,38 +778,36 @@ def get_or_create_context_cache(
         logger.info(f"♻️ Reusando cache existente para job {job_id[:8]}...")
         return cached
     
-    try:
-        # Generate hash for cache identification
-        content_hash = hashlib.sha256(context_content.encode()).hexdigest()[:12]
-        cache_name = f"iudex_{job_id[:8]}_{content_hash}"
-        
-        # Try to find existing cache with same name
-        try:
-            for c in client.caches.list(page_size=50):
-                if hasattr(c, 'display_name') and c.display_name == cache_name:
-                    logger.info(f"♻️ Cache encontrado: {cache_name}")
-                    _active_job_caches[job_id] = c
-                    return c
-        except Exception as e:
-            logger.debug(f"Cache lookup falhou: {e}")
-        
-        # Calculate dynamic TTL based on expected processing time
-        # Base: 1 hour + 10 min per section
-        ttl_seconds = CONTEXT_CACHE_TTL_SECONDS + (num_sections * 600)
-        ttl_str = f"{ttl_seconds}s"
-        
-        # Create new cache
+    # Calculate dynamic TTL based on expected processing time
+    # Base: 1 hour + 10 min per section
+    ttl_seconds = CONTEXT_CACHE_TTL_SECONDS + (num_sections * 600)
+    ttl_str = f"{ttl_seconds}s"
+
+    def _create(display_name: str):
         cache = client.caches.create(
             model=model_name,
             config=types.CreateCachedContentConfig(
                 contents=[context_content],
                 ttl=ttl_str,
-                display_name=cache_name
+                display_name=display_name
             )
         )
-        
-        _active_job_caches[job_id] = cache
-        logger.info(f"✅ Cache criado: {cache_name} (TTL: {ttl_str}, chars: {len(context_content):,})")
+        logger.info(f"✅ Cache criado: {display_name} (TTL: {ttl_str}, chars: {len(context_content):,})")
+        return cache
+
+    try:
+        # Shared registry keyed by (model, content hash): other jobs and
+        # workers over the same case bundle reuse the provider-side cache.
+        cache = get_context_cache_registry().acquire(
+            client,
+            job_id,
+            context_content,
+            model_name,
+            ttl_seconds,
+            _create,
+        )
+        if cache is not None:
+            _active_job_caches[job_id] = cache
         return cache
         
     except Exception as e:
@@ -661,7 +817,11 @@ def get_or_create_context_cache(
 
 def cleanup_job_cache(job_id: str) -> bool:
     """
-    Clean up context cache for a completed job.
+    Release this job's reference to its context cache.
+
+    The provider-side cache is shared by content hash, so it is not deleted
+    here: the registry sweep removes it once it is unreferenced and idle
+    (or expired).
     
     Args:
         job_id: The job ID to clean up
@@ -669,20 +829,9 @@ def cleanup_job_cache(job_id: str) -> bool:
     Returns:
         True if cleanup was successful, False otherwise
     """
-    if job_id not in _active_job_caches:
-        return True
-    
+    _active_job_caches.pop(job_id, None)
     try:
-        cache = _active_job_caches.pop(job_id)
-        # Note: Gemini caches auto-expire, but we can delete early
-        if hasattr(cache, 'name') and genai:
-            try:
-                client = get_gemini_client()
-                if client:
-                    client.caches.delete(name=cache.name)
-                    logger.info(f"🗑️ Cache deletado: {cache.name}")
-            except Exception:
-                pass  # Cache may have already expired
+        get_context_cache_registry().release(job_id, client=get_gemini_client() if genai else None)
         return True
     except Exception as e:
         logger.warning(f"⚠️ Erro ao limpar cache: {e}")
@@ -784,6 +933,7 @@ def _get_usage_value(obj: Any, *keys: str) -> Optional[Any]:
     return None
 
 
+@cacheable_llm_call("openai")
 def call_openai(
     client,
     prompt: str,
@@ -804,20 +954,22 @@ def call_openai(
     output_tokens = 0
     is_vertex = genai and isinstance(client, genai.Client)
     provider_name = "vertex-openai" if is_vertex else "openai"
+    governor = get_rate_governor()
     
     try:
         if is_vertex:
             system_instruction = system_instruction or DEFAULT_LEGAL_SYSTEM_INSTRUCTION
             
-            response = client.models.generate_content(
-                model=model,
-                contents=prompt,
-                config=types.GenerateContentConfig(
-                    system_instruction=system_instruction,
-                    max_output_tokens=max_tokens,
-                    temperature=temperature,
+            with governor.limit(provider_name, model, input_tokens):
+                response = client.models.generate_content(
+                    model=model,
+                    contents=prompt,
+                    config=types.GenerateContentConfig(
+                        system_instruction=system_instruction,
+                        max_output_tokens=max_tokens,
+                        temperature=temperature,
+                    )
                 )
-            )
             output_text = response.text
             usage = getattr(response, "usage_metadata", None)
             prompt_tokens = _get_usage_value(usage, "prompt_token_count", "input_tokens")
@@ -840,16 +992,17 @@ def call_openai(
             )
         else:
             # Direct OpenAI call
-            response = client.chat.completions.create(
-                model=model,
-                messages=[
-                    {"role": "system", "content": system_instruction or DEFAULT_LEGAL_SYSTEM_INSTRUCTION},
-                    {"role": "user", "content": prompt}
-                ],
-                max_tokens=max_tokens,
-                temperature=temperature,
-                timeout=timeout
-            )
+            with governor.limit(provider_name, model, input_tokens):
+                response = client.chat.completions.create(
+                    model=model,
+                    messages=[
+                        {"role": "system", "content": system_instruction or DEFAULT_LEGAL_SYSTEM_INSTRUCTION},
+                        {"role": "user", "content": prompt}
+                    ],
+                    max_tokens=max_tokens,
+                    temperature=temperature,
+                    timeout=timeout
+                )
             output_text = response.choices[0].message.content
             # Use usage if available from SDK
             usage = getattr(response, "usage", None)
@@ -899,31 +1052,8 @@ def call_openai(
         return None
 
 
-def _throttle_claude() -> None:
-    if CLAUDE_MIN_INTERVAL_SECONDS <= 0:
-        return
-    global _claude_last_call_at
-    with _claude_throttle_lock:
-        now = time.time()
-        wait_time = CLAUDE_MIN_INTERVAL_SECONDS - (now - _claude_last_call_at)
-        if wait_time > 0:
-            logger.info(f"⏳ Claude throttle: aguardando {wait_time:.1f}s")
-            time.sleep(wait_time)
-        _claude_last_call_at = time.time()
-
-
 def _is_claude_rate_limit_error(exc: Exception) -> bool:
-    status_code = getattr(exc, "status_code", None)
-    if status_code == 429:
-        return True
-    message = str(exc).lower()
-    return (
-        "429" in message
-        or "resource_exhausted" in message
-        or "quota" in message
-        or "rate limit" in message
-        or "rate_limit" in message
-    )
+    return is_rate_limit_error(exc)
 
 
 def _get_anthropic_direct_model(model: str) -> str:
@@ -935,6 +1065,7 @@ def _get_anthropic_direct_model(model: str) -> str:
     return model
 
 
+@cacheable_llm_call("anthropic")
 def call_anthropic(
     client,
     prompt: str,
@@ -958,8 +1089,8 @@ def call_anthropic(
     is_vertex = _is_anthropic_vertex_client(client)
     provider_name = "vertex-anthropic" if is_vertex else "anthropic"
     used_direct_fallback = False
+    governor = get_rate_governor()
     for attempt in range(CLAUDE_MAX_RETRIES + 1):
-        _throttle_claude()
         try:
             from app.services.ai.model_registry import get_api_model_name
             model = get_api_model_name(model)
@@ -968,14 +1099,15 @@ def call_anthropic(
                 system_instruction = system_instruction or DEFAULT_LEGAL_SYSTEM_INSTRUCTION
 
                 anthropic_version = os.getenv("ANTHROPIC_VERTEX_VERSION", "vertex-2023-10-16")
-                response = client.messages.create(
-                    model=model,
-                    max_tokens=max_tokens,
-                    temperature=temperature,
-                    system=system_instruction,
-                    messages=[{"role": "user", "content": prompt}],
-                    anthropic_version=anthropic_version,
-                )
+                with governor.limit(provider_name, model, input_tokens):
+                    response = client.messages.create(
+                        model=model,
+                        max_tokens=max_tokens,
+                        temperature=temperature,
+                        system=system_instruction,
+                        messages=[{"role": "user", "content": prompt}],
+                        anthropic_version=anthropic_version,
+                    )
                 if hasattr(response, "content") and response.content:
                     output_text = "".join([getattr(b, "text", "") for b in response.content]).strip()
                 else:
@@ -1002,15 +1134,16 @@ def call_anthropic(
                 )
             else:
                 # Direct Anthropic call
-                response = client.messages.create(
-                    model=model,
-                    max_tokens=max_tokens,
-                    messages=[
-                        {"role": "user", "content": prompt}
-                    ],
-                    system=system_instruction or DEFAULT_LEGAL_SYSTEM_INSTRUCTION,
-                    timeout=timeout
-                )
+                with governor.limit(provider_name, model, input_tokens):
+                    response = client.messages.create(
+                        model=model,
+                        max_tokens=max_tokens,
+                        messages=[
+                            {"role": "user", "content": prompt}
+                        ],
+                        system=system_instruction or DEFAULT_LEGAL_SYSTEM_INSTRUCTION,
+                        timeout=timeout
+                    )
                 output_text = response.content[0].text
                 usage = getattr(response, "usage", None)
                 prompt_tokens = _get_usage_value(usage, "input_tokens", "prompt_tokens")
@@ -1057,19 +1190,19 @@ def call_anthropic(
             )
             if _is_claude_rate_limit_error(e):
                 if is_vertex and ANTHROPIC_FALLBACK_DIRECT and not used_direct_fallback:
-                    api_key = os.getenv("ANTHROPIC_API_KEY")
-                    if api_key and anthropic:
+                    direct_client = get_claude_direct_client()
+                    if direct_client is not None:
                         try:
                             direct_model = _get_anthropic_direct_model(model)
                             logger.warning(f"⚠️ Claude rate-limit no Vertex. Tentando Anthropic direto ({direct_model}).")
-                            direct_client = anthropic.Anthropic(api_key=api_key)
-                            response = direct_client.messages.create(
-                                model=direct_model,
-                                max_tokens=max_tokens,
-                                messages=[{"role": "user", "content": prompt}],
-                                system=system_instruction or DEFAULT_LEGAL_SYSTEM_INSTRUCTION,
-                                timeout=timeout
-                            )
+                            with governor.limit("anthropic", direct_model, input_tokens):
+                                response = direct_client.messages.create(
+                                    model=direct_model,
+                                    max_tokens=max_tokens,
+                                    messages=[{"role": "user", "content": prompt}],
+                                    system=system_instruction or DEFAULT_LEGAL_SYSTEM_INSTRUCTION,
+                                    timeout=timeout
+                                )
                             output_text = response.content[0].text if response.content else ""
                             usage = getattr(response, "usage", None)
                             prompt_tokens = _get_usage_value(usage, "input_tokens", "prompt_tokens")
@@ -1120,6 +1253,8 @@ def call_anthropic(
                         CLAUDE_BACKOFF_BASE_SECONDS * (2 ** attempt)
                     )
                     wait_time = wait_time * (0.7 + random.random() * 0.6)
+                    # The governor already pauses the provider for Retry-After; never retry sooner
+                    wait_time = max(wait_time, retry_after_seconds(e) or 0.0)
                     logger.warning(f"⚠️ Claude rate-limit: {e}. Backoff {wait_time:.1f}s (tentativa {attempt+1}/{CLAUDE_MAX_RETRIES})")
                     time.sleep(wait_time)
                     continue
@@ -1135,6 +1270,7 @@ def call_anthropic(
     return None
 
 
+@cacheable_llm_call("gemini")
 def call_vertex_gemini(
     client,
     prompt: str,
@@ -1192,7 +1328,8 @@ def call_vertex_gemini(
             if hasattr(cached_content, 'name'):
                 generate_kwargs['config'].cached_content = cached_content.name
 
-        response = client.models.generate_content(**generate_kwargs)
+        with get_rate_governor().limit("vertex-gemini", model_id, input_tokens):
+            response = client.models.generate_content(**generate_kwargs)
         output_text = extract_genai_text(response)
         usage = getattr(response, "usage_metadata", None)
         prompt_tokens = _get_usage_value(usage, "prompt_token_count", "input_tokens")
@@ -1265,6 +1402,7 @@ def call_vertex_gemini(
 
 import asyncio
 
+@cacheable_llm_call("openai")
 async def call_openai_async(
     client,
     prompt: str,
@@ -1294,15 +1432,16 @@ async def call_openai_async(
         try:
             system_instruction = system_instruction or DEFAULT_LEGAL_SYSTEM_INSTRUCTION
             
-            response = await client.aio.models.generate_content(
-                model=model,
-                contents=prompt,
-                config=types.GenerateContentConfig(
-                    system_instruction=system_instruction,
-                    max_output_tokens=max_tokens,
-                    temperature=temperature,
+            async with get_rate_governor().alimit("vertex-openai", model, input_tokens):
+                response = await client.aio.models.generate_content(
+                    model=model,
+                    contents=prompt,
+                    config=types.GenerateContentConfig(
+                        system_instruction=system_instruction,
+                        max_output_tokens=max_tokens,
+                        temperature=temperature,
+                    )
                 )
-            )
             
             output_text = response.text
             usage = getattr(response, "usage_metadata", None)
@@ -1370,12 +1509,15 @@ async def call_openai_async(
                         {"role": "user", "content": prompt},
                     ]
                     
-                    response = client.responses.create(
-                        model=model,
-                        input=messages,
-                        max_output_tokens=max_tokens,
-                        reasoning={"effort": effort, "summary": "auto"},
-                    )
+                    # Sync SDK client: run off the event loop
+                    async with get_rate_governor().alimit("openai", model, len(prompt) // 4):
+                        response = await asyncio.to_thread(
+                            client.responses.create,
+                            model=model,
+                            input=messages,
+                            max_output_tokens=max_tokens,
+                            reasoning={"effort": effort, "summary": "auto"},
+                        )
                     record_api_call(
                         kind="llm",
                         provider="openai",
@@ -1411,6 +1553,7 @@ async def call_openai_async(
         )
 
 
+@cacheable_llm_call("anthropic")
 async def call_anthropic_async(
     client,
     prompt: str,
@@ -1474,7 +1617,12 @@ async def call_anthropic_async(
                 
                 logger.info(f"🧠 [Claude Thinking Async] budget={budget_tokens}, max_tokens={effective_max_tokens}")
                 
-                response = client.messages.create(**create_kwargs)
+                async with get_rate_governor().alimit(provider_name, model_id, len(prompt) // 4):
+                    if _is_async_anthropic_client(client):
+                        response = await client.messages.create(**create_kwargs)
+                    else:
+                        # Sync SDK client: run off the event loop
+                        response = await asyncio.to_thread(client.messages.create, **create_kwargs)
                 record_api_call(
                     kind="llm",
                     provider=provider_name,
@@ -1539,7 +1687,7 @@ async def call_perplexity_async(
         return None
 
     try:
-        from perplexity import AsyncPerplexity
+        from perplexity import AsyncPerplexity  # noqa: F401
     except Exception as exc:
         logger.warning(f"⚠️ Perplexity SDK indisponível: {exc}")
         return None
@@ -1567,16 +1715,17 @@ async def call_perplexity_async(
             return obj.get(key, default)
         return getattr(obj, key, default)
 
-    client = AsyncPerplexity(api_key=api_key)
+    client = get_async_perplexity_client(api_key)
     try:
-        resp = await client.chat.completions.create(
-            model=model,
-            messages=messages,
-            temperature=temperature,
-            max_tokens=max_tokens,
-            stream=False,
-            **perplexity_kwargs,
-        )
+        async with get_rate_governor().alimit("perplexity", model, len(prompt) // 4):
+            resp = await client.chat.completions.create(
+                model=model,
+                messages=messages,
+                temperature=temperature,
+                max_tokens=max_tokens,
+                stream=False,
+                **perplexity_kwargs,
+            )
         usage = _get(resp, "usage", None) or _get(resp, "usage_metadata", None)
         tokens_in = _get(usage, "prompt_tokens", None) or _get(usage, "input_tokens", None)
         tokens_out = _get(usage, "completion_tokens", None) or _get(usage, "output_tokens", None)
@@ -1624,6 +1773,7 @@ async def call_perplexity_async(
     return None
 
 
+@cacheable_llm_call("gemini")
 async def call_vertex_gemini_async(
     client,
     prompt: str,
@@ -1702,11 +1852,12 @@ async def call_vertex_gemini_async(
                 config_kwargs["thinking_config"] = thinking_config
 
             async def _call(active_client):
-                return await active_client.aio.models.generate_content(
-                    model=model_id,
-                    contents=prompt,
-                    config=types.GenerateContentConfig(**config_kwargs),
-                )
+                async with get_rate_governor().alimit("vertex-gemini", model_id, input_tokens):
+                    return await active_client.aio.models.generate_content(
+                        model=model_id,
+                        contents=prompt,
+                        config=types.GenerateContentConfig(**config_kwargs),
+                    )
 
             try:
                 response = await _call(client)
@@ -1732,7 +1883,7 @@ async def call_vertex_gemini_async(
                         meta={"fallback": "direct"},
                     )
                     direct_fallback_used = True
-                    direct_client = genai.Client(api_key=api_key)
+                    direct_client = get_gemini_direct_client(api_key)
                     response = await _call(direct_client)
                 else:
                     raise
@@ -1802,6 +1953,7 @@ async def call_vertex_gemini_async(
             return None
 
 
+@governed_stream(lambda client: "vertex-openai" if genai and isinstance(client, genai.Client) else "openai")
 async def stream_openai_async(
     client,
     prompt: str,
@@ -2089,6 +2241,7 @@ async def stream_openai_async(
                 yield ('text', delta)
 
 
+@governed_stream(lambda client: "vertex-anthropic" if _is_anthropic_vertex_client(client) else "anthropic")
 async def stream_anthropic_async(
     client,
     prompt: str,
@@ -2324,6 +2477,7 @@ async def stream_anthropic_async(
         yield ('text', response)
 
 
+@governed_stream(lambda client: "vertex-gemini")
 async def stream_vertex_gemini_async(
     client,
     prompt: str,
@@ -2590,7 +2744,7 @@ async def stream_vertex_gemini_async(
                 success=False,
                 meta={"stream": True, "fallback": "direct"},
             )
-            active_client = genai.Client(api_key=api_key)
+            active_client = get_gemini_direct_client(api_key)
             stream_obj = await _open_stream_with_thinking_fallback()
         else:
             record_api_call(
@@ -2914,13 +3068,13 @@ def generate_section_agent_mode(
     # GPT criticizes Claude's draft
     print(f"   💬 [R2] GPT criticando draft do Claude...")
     critica_gpt_prompt = t_critica.render(texto_colega=versao_claude_v1, rag_context=full_rag)
-    critica_gpt = call_openai(gpt_client, critica_gpt_prompt, model=gpt_model)
+    critica_gpt = call_openai(gpt_client, critica_gpt_prompt, model=gpt_model, cache=True)
     drafts['critica_gpt_on_claude'] = critica_gpt or ""
     
     # Claude criticizes GPT's draft
     print(f"   💬 [R2] Claude criticando draft do GPT...")
     critica_claude_prompt = t_critica.render(texto_colega=versao_gpt_v1, rag_context=full_rag)
-    critica_claude = call_anthropic(claude_client, critica_claude_prompt, model=claude_model)
+    critica_claude = call_anthropic(claude_client, critica_claude_prompt, model=claude_model, cache=True)
     drafts['critica_claude_on_gpt'] = critica_claude or ""
     
     # =========================================================================
@@ -3668,9 +3822,11 @@ async def generate_section_agent_mode_async(
     )
     
     # Check cache first
-    critica_gpt = get_cached_critique(critica_gpt_prompt)
-    critica_claude = get_cached_critique(critica_claude_prompt)
-    critica_gemini = get_cached_critique(critica_gemini_prompt)
+    critica_gpt, critica_claude, critica_gemini = await asyncio.gather(
+        aget_cached_critique(critica_gpt_prompt, gpt_model),
+        aget_cached_critique(critica_claude_prompt, claude_model),
+        aget_cached_critique(critica_gemini_prompt, judge_model_id),
+    )
     
     # Parallel critique calls
     critique_tasks = []
@@ -3711,11 +3867,11 @@ async def generate_section_agent_mode_async(
         
         # Cache the critiques
         if critica_gpt:
-            set_cached_critique(critica_gpt_prompt, critica_gpt)
+            await aset_cached_critique(critica_gpt_prompt, critica_gpt, gpt_model)
         if critica_claude:
-            set_cached_critique(critica_claude_prompt, critica_claude)
+            await aset_cached_critique(critica_claude_prompt, critica_claude, claude_model)
         if critica_gemini:
-            set_cached_critique(critica_gemini_prompt, critica_gemini)
+            await aset_cached_critique(critica_gemini_prompt, critica_gemini, judge_model_id)
     
     drafts['critica_gpt'] = critica_gpt or ""
     drafts['critica_claude'] = critica_claude or ""
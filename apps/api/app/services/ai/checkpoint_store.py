@@ -0,0 +1,658 @@
+"""
+Delta-compressed SQLite checkpointer for the legal LangGraph workflow.
+
+SqliteSaver serialized the whole DocumentState (drafts, RAG contexts,
+citation maps, section records) into every checkpoint, on the same jobs.db
+file JobManager writes to, synchronously from inside the event loop. Long
+multi-section documents produced hundreds of MB of checkpoints.
+
+This saver follows the layout of the Postgres checkpointer:
+
+- A checkpoint row stores only the channel *versions*; channel values live
+  in a separate table keyed by (thread, ns, channel, version), so each step
+  writes just the channels in ``new_versions`` (the ones that changed).
+- Values are content-addressed: identical payloads (a channel re-emitted with
+  the same content, or shared between threads) are stored once, compressed
+  with zstd when available (zlib otherwise).
+- Only the newest LANGGRAPH_CHECKPOINT_KEEP checkpoints per thread are kept;
+  older ones, their writes and any blob no longer referenced are pruned.
+- Async methods run the SQLite work in a worker thread (WAL mode, own file),
+  so ``astream``/``ainvoke`` no longer stall the loop on each step. The sync
+  methods stay available for ``get_state`` callers.
+- Threads written before the switch live only in the legacy SqliteSaver
+  tables of jobs.db. When a ``legacy`` saver is given, reads of a thread the
+  new store has never seen fall back to it (read-only), so in-flight HIL jobs
+  can still be resumed; the first new step of such a thread lands here.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import os
+import random
+import sqlite3
+import threading
+import zlib
+from collections.abc import AsyncIterator, Iterator, Sequence
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+from langchain_core.runnables import RunnableConfig
+from langgraph.checkpoint.base import (
+    WRITES_IDX_MAP,
+    BaseCheckpointSaver,
+    ChannelVersions,
+    Checkpoint,
+    CheckpointMetadata,
+    CheckpointTuple,
+    get_checkpoint_id,
+    get_checkpoint_metadata,
+)
+from loguru import logger
+
+try:  # pragma: no cover - optional dependency
+    import zstandard as _zstd
+except Exception:  # pragma: no cover
+    _zstd = None
+
+LANGGRAPH_CHECKPOINT_KEEP = int(os.getenv("LANGGRAPH_CHECKPOINT_KEEP", "20"))
+LANGGRAPH_CHECKPOINT_COMPRESS_MIN_BYTES = int(os.getenv("LANGGRAPH_CHECKPOINT_COMPRESS_MIN_BYTES", "512"))
+
+_EMPTY = "empty"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS checkpoints (
+    thread_id TEXT NOT NULL,
+    checkpoint_ns TEXT NOT NULL DEFAULT '',
+    checkpoint_id TEXT NOT NULL,
+    parent_checkpoint_id TEXT,
+    checkpoint BLOB NOT NULL,
+    metadata BLOB NOT NULL,
+    PRIMARY KEY (thread_id, checkpoint_ns, checkpoint_id)
+);
+CREATE TABLE IF NOT EXISTS checkpoint_channels (
+    thread_id TEXT NOT NULL,
+    checkpoint_ns TEXT NOT NULL DEFAULT '',
+    channel TEXT NOT NULL,
+    version TEXT NOT NULL,
+    blob_hash TEXT,
+    PRIMARY KEY (thread_id, checkpoint_ns, channel, version)
+);
+CREATE INDEX IF NOT EXISTS idx_checkpoint_channels_blob ON checkpoint_channels (blob_hash);
+CREATE TABLE IF NOT EXISTS checkpoint_blobs (
+    hash TEXT PRIMARY KEY,
+    codec TEXT NOT NULL,
+    data BLOB NOT NULL,
+    raw_size INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS checkpoint_writes (
+    thread_id TEXT NOT NULL,
+    checkpoint_ns TEXT NOT NULL DEFAULT '',
+    checkpoint_id TEXT NOT NULL,
+    task_id TEXT NOT NULL,
+    idx INTEGER NOT NULL,
+    channel TEXT NOT NULL,
+    value BLOB NOT NULL,
+    task_path TEXT NOT NULL DEFAULT '',
+    PRIMARY KEY (thread_id, checkpoint_ns, checkpoint_id, task_id, idx)
+);
+"""
+
+
+def default_checkpoint_db_path() -> str:
+    env_path = os.getenv("LANGGRAPH_CHECKPOINT_DB")
+    if env_path:
+        return env_path
+    try:
+        from app.services.job_manager import job_manager
+
+        return str(Path(job_manager.db_path).with_name("checkpoints.db"))
+    except Exception:
+        return "checkpoints.db"
+
+
+def _compress(raw: bytes) -> Tuple[str, bytes]:
+    if len(raw) < LANGGRAPH_CHECKPOINT_COMPRESS_MIN_BYTES:
+        return "raw", raw
+    if _zstd is not None:
+        return "zstd", _zstd.ZstdCompressor(level=3).compress(raw)
+    return "zlib", zlib.compress(raw, 6)
+
+
+def _decompress(codec: str, data: bytes) -> bytes:
+    if codec == "raw":
+        return data
+    if codec == "zstd":
+        if _zstd is None:
+            raise RuntimeError("checkpoint blob is zstd-compressed but zstandard is not installed")
+        return _zstd.ZstdDecompressor().decompress(data)
+    if codec == "zlib":
+        return zlib.decompress(data)
+    raise ValueError(f"unknown checkpoint codec: {codec}")
+
+
+def _pack(type_: str, payload: bytes) -> bytes:
+    """(serde type, bytes) -> self-describing bytes: b"<type>\\0<payload>"."""
+    return type_.encode() + b"\0" + payload
+
+
+def _unpack(packed: bytes) -> Tuple[str, bytes]:
+    type_, _, payload = bytes(packed).partition(b"\0")
+    return type_.decode(), payload
+
+
+class DeltaSqliteCheckpointer(BaseCheckpointSaver[str]):
+    """Checkpointer that writes only changed channels, deduplicated and compressed."""
+
+    def __init__(
+        self,
+        db_path: Optional[str] = None,
+        *,
+        serde=None,
+        keep_last: int = LANGGRAPH_CHECKPOINT_KEEP,
+        legacy: Optional[BaseCheckpointSaver] = None,
+    ):
+        super().__init__(serde=serde)
+        self.db_path = db_path or default_checkpoint_db_path()
+        self.keep_last = max(0, keep_last)
+        self.legacy = legacy
+        if self.db_path != ":memory:":
+            Path(self.db_path).parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+        self._conn.commit()
+
+        self._raw_bytes = 0
+        self._stored_bytes = 0
+        self._blobs_written = 0
+        self._blobs_deduped = 0
+        self._pruned = 0
+        self._legacy_reads = 0
+
+    # ------------------------------------------------------------------
+    # Encoding
+    # ------------------------------------------------------------------
+
+    def _dump(self, obj: Any) -> Tuple[str, bytes]:
+        type_, payload = self.serde.dumps_typed(obj)
+        return _compress(_pack(type_, payload))
+
+    def _load(self, codec: str, data: bytes) -> Any:
+        return self.serde.loads_typed(_unpack(_decompress(codec, data)))
+
+    def _encode_row(self, obj: Any) -> bytes:
+        codec, data = self._dump(obj)
+        return codec.encode() + b"\0" + data
+
+    def _decode_row(self, blob: bytes) -> Any:
+        codec, _, data = bytes(blob).partition(b"\0")
+        return self._load(codec.decode(), data)
+
+    def _store_blob(self, cur: sqlite3.Cursor, value: Any) -> str:
+        type_, payload = self.serde.dumps_typed(value)
+        packed = _pack(type_, payload)
+        digest = hashlib.blake2b(packed, digest_size=20).hexdigest()
+        self._raw_bytes += len(packed)
+        if cur.execute("SELECT 1 FROM checkpoint_blobs WHERE hash = ?", (digest,)).fetchone():
+            self._blobs_deduped += 1
+            return digest
+        codec, data = _compress(packed)
+        cur.execute(
+            "INSERT INTO checkpoint_blobs (hash, codec, data, raw_size) VALUES (?, ?, ?, ?)",
+            (digest, codec, data, len(packed)),
+        )
+        self._stored_bytes += len(data)
+        self._blobs_written += 1
+        return digest
+
+    # ------------------------------------------------------------------
+    # Read
+    # ------------------------------------------------------------------
+
+    def _load_channel_values(
+        self, cur: sqlite3.Cursor, thread_id: str, checkpoint_ns: str, versions: ChannelVersions
+    ) -> Dict[str, Any]:
+        values: Dict[str, Any] = {}
+        for channel, version in versions.items():
+            row = cur.execute(
+                "SELECT b.codec, b.data FROM checkpoint_channels c "
+                "JOIN checkpoint_blobs b ON b.hash = c.blob_hash "
+                "WHERE c.thread_id = ? AND c.checkpoint_ns = ? AND c.channel = ? AND c.version = ?",
+                (thread_id, checkpoint_ns, channel, str(version)),
+            ).fetchone()
+            if row is not None:
+                values[channel] = self._load(row[0], row[1])
+        return values
+
+    def _build_tuple(self, cur: sqlite3.Cursor, row: Tuple) -> CheckpointTuple:
+        thread_id, checkpoint_ns, checkpoint_id, parent_id, checkpoint_blob, metadata_blob = row
+        checkpoint: Checkpoint = self._decode_row(checkpoint_blob)
+        checkpoint = {
+            **checkpoint,
+            "channel_values": self._load_channel_values(
+                cur, thread_id, checkpoint_ns, checkpoint["channel_versions"]
+            ),
+        }
+        writes = cur.execute(
+            "SELECT task_id, channel, value FROM checkpoint_writes "
+            "WHERE thread_id = ? AND checkpoint_ns = ? AND checkpoint_id = ? ORDER BY task_id, idx",
+            (thread_id, checkpoint_ns, checkpoint_id),
+        ).fetchall()
+        return CheckpointTuple(
+            config={
+                "configurable": {
+                    "thread_id": thread_id,
+                    "checkpoint_ns": checkpoint_ns,
+                    "checkpoint_id": checkpoint_id,
+                }
+            },
+            checkpoint=checkpoint,
+            metadata=self._decode_row(metadata_blob),
+            parent_config=(
+                {
+                    "configurable": {
+                        "thread_id": thread_id,
+                        "checkpoint_ns": checkpoint_ns,
+                        "checkpoint_id": parent_id,
+                    }
+                }
+                if parent_id
+                else None
+            ),
+            pending_writes=[(task_id, channel, self._decode_row(value)) for task_id, channel, value in writes],
+        )
+
+    def get_tuple(self, config: RunnableConfig) -> Optional[CheckpointTuple]:
+        configurable = config["configurable"]
+        thread_id = str(configurable["thread_id"])
+        checkpoint_ns = configurable.get("checkpoint_ns", "")
+        checkpoint_id = get_checkpoint_id(config)
+        columns = "thread_id, checkpoint_ns, checkpoint_id, parent_checkpoint_id, checkpoint, metadata"
+        with self._lock:
+            cur = self._conn.cursor()
+            if checkpoint_id:
+                row = cur.execute(
+                    f"SELECT {columns} FROM checkpoints "
+                    "WHERE thread_id = ? AND checkpoint_ns = ? AND checkpoint_id = ?",
+                    (thread_id, checkpoint_ns, checkpoint_id),
+                ).fetchone()
+            else:
+                row = cur.execute(
+                    f"SELECT {columns} FROM checkpoints WHERE thread_id = ? AND checkpoint_ns = ? "
+                    "ORDER BY checkpoint_id DESC LIMIT 1",
+                    (thread_id, checkpoint_ns),
+                ).fetchone()
+            if row is not None:
+                return self._build_tuple(cur, row)
+            if self.legacy is None or self._has_thread(cur, thread_id, checkpoint_ns):
+                return None
+        return self._legacy_get_tuple(config)
+
+    # ------------------------------------------------------------------
+    # Legacy fallback (SqliteSaver tables in jobs.db)
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def _has_thread(cur: sqlite3.Cursor, thread_id: str, checkpoint_ns: str) -> bool:
+        return (
+            cur.execute(
+                "SELECT 1 FROM checkpoints WHERE thread_id = ? AND checkpoint_ns = ? LIMIT 1",
+                (thread_id, checkpoint_ns),
+            ).fetchone()
+            is not None
+        )
+
+    def _legacy_get_tuple(self, config: RunnableConfig) -> Optional[CheckpointTuple]:
+        try:
+            found = self.legacy.get_tuple(config)  # type: ignore[union-attr]
+        except Exception as exc:
+            logger.warning(f"Legacy checkpointer read failed: {exc}")
+            return None
+        if found is None:
+            return None
+        self._legacy_reads += 1
+        # Writes made against a legacy checkpoint (e.g. a HIL resume) are stored here
+        configurable = found.config["configurable"]
+        with self._lock:
+            writes = self._conn.execute(
+                "SELECT task_id, channel, value FROM checkpoint_writes "
+                "WHERE thread_id = ? AND checkpoint_ns = ? AND checkpoint_id = ? ORDER BY task_id, idx",
+                (
+                    str(configurable["thread_id"]),
+                    configurable.get("checkpoint_ns", ""),
+                    configurable["checkpoint_id"],
+                ),
+            ).fetchall()
+        if not writes:
+            return found
+        return found._replace(
+            pending_writes=list(found.pending_writes or [])
+            + [(task_id, channel, self._decode_row(value)) for task_id, channel, value in writes]
+        )
+
+    def _list_rows(
+        self,
+        config: Optional[RunnableConfig],
+        before: Optional[RunnableConfig],
+    ) -> List[Tuple]:
+        clauses: List[str] = []
+        params: List[Any] = []
+        if config:
+            configurable = config["configurable"]
+            clauses.append("thread_id = ?")
+            params.append(str(configurable["thread_id"]))
+            if configurable.get("checkpoint_ns") is not None:
+                clauses.append("checkpoint_ns = ?")
+                params.append(configurable["checkpoint_ns"])
+            if checkpoint_id := get_checkpoint_id(config):
+                clauses.append("checkpoint_id = ?")
+                params.append(checkpoint_id)
+        if before and (before_id := get_checkpoint_id(before)):
+            clauses.append("checkpoint_id < ?")
+            params.append(before_id)
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        return self._conn.execute(
+            "SELECT thread_id, checkpoint_ns, checkpoint_id, parent_checkpoint_id, checkpoint, metadata "
+            f"FROM checkpoints {where} ORDER BY checkpoint_id DESC",
+            params,
+        ).fetchall()
+
+    def list(
+        self,
+        config: Optional[RunnableConfig],
+        *,
+        filter: Optional[Dict[str, Any]] = None,
+        before: Optional[RunnableConfig] = None,
+        limit: Optional[int] = None,
+    ) -> Iterator[CheckpointTuple]:
+        with self._lock:
+            cur = self._conn.cursor()
+            results: List[CheckpointTuple] = []
+            for row in self._list_rows(config, before):
+                if limit is not None and len(results) >= limit:
+                    break
+                if filter:
+                    metadata = self._decode_row(row[5])
+                    if not all(metadata.get(key) == value for key, value in filter.items()):
+                        continue
+                results.append(self._build_tuple(cur, row))
+        yield from results
+
+        # Threads that only exist in the legacy saver
+        if self.legacy is None or not config or results:
+            return
+        thread_id = str(config["configurable"]["thread_id"])
+        checkpoint_ns = config["configurable"].get("checkpoint_ns", "")
+        with self._lock:
+            if self._has_thread(self._conn.cursor(), thread_id, checkpoint_ns):
+                return
+        try:
+            legacy_items = list(self.legacy.list(config, filter=filter, before=before, limit=limit))
+        except Exception as exc:
+            logger.warning(f"Legacy checkpointer list failed: {exc}")
+            return
+        yield from legacy_items
+
+    # ------------------------------------------------------------------
+    # Write
+    # ------------------------------------------------------------------
+
+    def put(
+        self,
+        config: RunnableConfig,
+        checkpoint: Checkpoint,
+        metadata: CheckpointMetadata,
+        new_versions: ChannelVersions,
+    ) -> RunnableConfig:
+        configurable = config["configurable"]
+        thread_id = str(configurable["thread_id"])
+        checkpoint_ns = configurable.get("checkpoint_ns", "")
+        parent_id = configurable.get("checkpoint_id")
+        stored = checkpoint.copy()
+        values: Dict[str, Any] = stored.pop("channel_values")  # type: ignore[misc]
+
+        with self._lock:
+            cur = self._conn.cursor()
+            try:
+                for channel, version in new_versions.items():
+                    blob_hash = self._store_blob(cur, values[channel]) if channel in values else None
+                    cur.execute(
+                        "INSERT OR REPLACE INTO checkpoint_channels "
+                        "(thread_id, checkpoint_ns, channel, version, blob_hash) VALUES (?, ?, ?, ?, ?)",
+                        (thread_id, checkpoint_ns, channel, str(version), blob_hash),
+                    )
+                cur.execute(
+                    "INSERT OR REPLACE INTO checkpoints "
+                    "(thread_id, checkpoint_ns, checkpoint_id, parent_checkpoint_id, checkpoint, metadata) "
+                    "VALUES (?, ?, ?, ?, ?, ?)",
+                    (
+                        thread_id,
+                        checkpoint_ns,
+                        checkpoint["id"],
+                        parent_id,
+                        self._encode_row(stored),
+                        self._encode_row(get_checkpoint_metadata(config, metadata)),
+                    ),
+                )
+                if self.keep_last:
+                    self._prune(cur, thread_id, checkpoint_ns)
+                self._conn.commit()
+            except Exception:
+                self._conn.rollback()
+                raise
+
+        return {
+            "configurable": {
+                "thread_id": thread_id,
+                "checkpoint_ns": checkpoint_ns,
+                "checkpoint_id": checkpoint["id"],
+            }
+        }
+
+    def put_writes(
+        self,
+        config: RunnableConfig,
+        writes: Sequence[Tuple[str, Any]],
+        task_id: str,
+        task_path: str = "",
+    ) -> None:
+        configurable = config["configurable"]
+        thread_id = str(configurable["thread_id"])
+        checkpoint_ns = configurable.get("checkpoint_ns", "")
+        checkpoint_id = configurable["checkpoint_id"]
+        verb = "INSERT OR REPLACE" if all(w[0] in WRITES_IDX_MAP for w in writes) else "INSERT OR IGNORE"
+        rows = [
+            (
+                thread_id,
+                checkpoint_ns,
+                checkpoint_id,
+                task_id,
+                WRITES_IDX_MAP.get(channel, idx),
+                channel,
+                self._encode_row(value),
+                task_path,
+            )
+            for idx, (channel, value) in enumerate(writes)
+        ]
+        with self._lock:
+            try:
+                self._conn.executemany(
+                    f"{verb} INTO checkpoint_writes "
+                    "(thread_id, checkpoint_ns, checkpoint_id, task_id, idx, channel, value, task_path) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                    rows,
+                )
+                self._conn.commit()
+            except Exception:
+                self._conn.rollback()
+                raise
+
+    def delete_thread(self, thread_id: str) -> None:
+        with self._lock:
+            cur = self._conn.cursor()
+            hashes = [
+                row[0]
+                for row in cur.execute(
+                    "SELECT DISTINCT blob_hash FROM checkpoint_channels WHERE thread_id = ?",
+                    (str(thread_id),),
+                ).fetchall()
+            ]
+            for table in ("checkpoints", "checkpoint_channels", "checkpoint_writes"):
+                cur.execute(f"DELETE FROM {table} WHERE thread_id = ?", (str(thread_id),))
+            self._gc_blobs(cur, hashes)
+            self._conn.commit()
+        if self.legacy is not None:
+            try:
+                self.legacy.delete_thread(thread_id)
+            except Exception as exc:
+                logger.debug(f"Legacy checkpointer delete_thread failed: {exc}")
+
+    # ------------------------------------------------------------------
+    # Pruning
+    # ------------------------------------------------------------------
+
+    def _prune(self, cur: sqlite3.Cursor, thread_id: str, checkpoint_ns: str) -> None:
+        stale = [
+            row[0]
+            for row in cur.execute(
+                "SELECT checkpoint_id FROM checkpoints WHERE thread_id = ? AND checkpoint_ns = ? "
+                "ORDER BY checkpoint_id DESC LIMIT -1 OFFSET ?",
+                (thread_id, checkpoint_ns, self.keep_last),
+            ).fetchall()
+        ]
+        if not stale:
+            return
+        for checkpoint_id in stale:
+            cur.execute(
+                "DELETE FROM checkpoints WHERE thread_id = ? AND checkpoint_ns = ? AND checkpoint_id = ?",
+                (thread_id, checkpoint_ns, checkpoint_id),
+            )
+            cur.execute(
+                "DELETE FROM checkpoint_writes WHERE thread_id = ? AND checkpoint_ns = ? AND checkpoint_id = ?",
+                (thread_id, checkpoint_ns, checkpoint_id),
+            )
+        self._pruned += len(stale)
+
+        # Channel versions still referenced by a surviving checkpoint
+        referenced: Set[Tuple[str, str]] = set()
+        for (checkpoint_blob,) in cur.execute(
+            "SELECT checkpoint FROM checkpoints WHERE thread_id = ? AND checkpoint_ns = ?",
+            (thread_id, checkpoint_ns),
+        ).fetchall():
+            versions = self._decode_row(checkpoint_blob).get("channel_versions") or {}
+            referenced.update((channel, str(version)) for channel, version in versions.items())
+        unreferenced = [
+            (channel, version, blob_hash)
+            for channel, version, blob_hash in cur.execute(
+                "SELECT channel, version, blob_hash FROM checkpoint_channels "
+                "WHERE thread_id = ? AND checkpoint_ns = ?",
+                (thread_id, checkpoint_ns),
+            ).fetchall()
+            if (channel, version) not in referenced
+        ]
+        cur.executemany(
+            "DELETE FROM checkpoint_channels "
+            "WHERE thread_id = ? AND checkpoint_ns = ? AND channel = ? AND version = ?",
+            [(thread_id, checkpoint_ns, channel, version) for channel, version, _ in unreferenced],
+        )
+        self._gc_blobs(cur, (blob_hash for _, _, blob_hash in unreferenced))
+
+    @staticmethod
+    def _gc_blobs(cur: sqlite3.Cursor, hashes: Iterable[Optional[str]]) -> None:
+        """Delete the given blobs unless a channel row (of any thread) still points at them."""
+        candidates = sorted({h for h in hashes if h})
+        for start in range(0, len(candidates), 500):  # stay under SQLite's bound-parameter limit
+            chunk = candidates[start:start + 500]
+            cur.execute(
+                f"DELETE FROM checkpoint_blobs WHERE hash IN ({','.join('?' * len(chunk))}) "
+                "AND NOT EXISTS (SELECT 1 FROM checkpoint_channels WHERE blob_hash = checkpoint_blobs.hash)",
+                chunk,
+            )
+
+    # ------------------------------------------------------------------
+    # Async API (SQLite work off the event loop)
+    # ------------------------------------------------------------------
+
+    async def aget_tuple(self, config: RunnableConfig) -> Optional[CheckpointTuple]:
+        return await asyncio.to_thread(self.get_tuple, config)
+
+    async def alist(
+        self,
+        config: Optional[RunnableConfig],
+        *,
+        filter: Optional[Dict[str, Any]] = None,
+        before: Optional[RunnableConfig] = None,
+        limit: Optional[int] = None,
+    ) -> AsyncIterator[CheckpointTuple]:
+        items = await asyncio.to_thread(
+            lambda: list(self.list(config, filter=filter, before=before, limit=limit))
+        )
+        for item in items:
+            yield item
+
+    async def aput(
+        self,
+        config: RunnableConfig,
+        checkpoint: Checkpoint,
+        metadata: CheckpointMetadata,
+        new_versions: ChannelVersions,
+    ) -> RunnableConfig:
+        return await asyncio.to_thread(self.put, config, checkpoint, metadata, new_versions)
+
+    async def aput_writes(
+        self,
+        config: RunnableConfig,
+        writes: Sequence[Tuple[str, Any]],
+        task_id: str,
+        task_path: str = "",
+    ) -> None:
+        await asyncio.to_thread(self.put_writes, config, writes, task_id, task_path)
+
+    async def adelete_thread(self, thread_id: str) -> None:
+        await asyncio.to_thread(self.delete_thread, thread_id)
+
+    def get_next_version(self, current: Optional[str], channel: None) -> str:
+        if current is None:
+            current_v = 0
+        elif isinstance(current, int):
+            current_v = current
+        else:
+            current_v = int(str(current).split(".")[0])
+        return f"{current_v + 1:032}.{random.random():016}"
+
+    # ------------------------------------------------------------------
+    # Introspection
+    # ------------------------------------------------------------------
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            checkpoints = self._conn.execute("SELECT COUNT(*) FROM checkpoints").fetchone()[0]
+            blobs, stored = self._conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(LENGTH(data)), 0) FROM checkpoint_blobs"
+            ).fetchone()
+        return {
+            "db_path": self.db_path,
+            "checkpoints": checkpoints,
+            "blobs": blobs,
+            "blob_bytes": stored,
+            "raw_bytes_written": self._raw_bytes,
+            "stored_bytes_written": self._stored_bytes,
+            "blobs_written": self._blobs_written,
+            "blobs_deduped": self._blobs_deduped,
+            "checkpoints_pruned": self._pruned,
+            "keep_last": self.keep_last,
+            "legacy_fallback": self.legacy is not None,
+            "legacy_reads": self._legacy_reads,
+            "codec": "zstd" if _zstd is not None else "zlib",
+        }
+
+    def close(self) -> None:
+        with self._lock:
+            try:
+                self._conn.close()
+            except Exception as exc:  # pragma: no cover
+                logger.debug(f"DeltaSqliteCheckpointer close failed: {exc}")
@@ -0,0 +1,539 @@
+"""
+Registro compartilhado de context caches do Gemini.
+
+get_or_create_context_cache guardava os caches num dict local por job_id e
+procurava caches existentes listando ``client.caches.list(page_size=50)``
+pelo display_name (que incluía o job_id). Dois jobs sobre o mesmo processo
+criavam dois caches no provedor, e outro worker não enxergava nenhum.
+
+Agora os caches são registrados por hash do conteúdo + modelo:
+
+- Backend SQLite (padrão, compartilhado pelos workers da máquina) ou Redis
+  (GEMINI_CACHE_REGISTRY_BACKEND=redis, compartilhado entre máquinas).
+- Cada job que usa um cache registra uma referência; release(job_id) remove
+  as referências do job.
+- Reuso estende o TTL no provedor quando o restante não cobre o job.
+- Uma varredura em background (no máximo a cada
+  GEMINI_CACHE_SWEEP_INTERVAL_SECONDS) apaga do provedor os caches
+  expirados e os sem referências ociosos há GEMINI_CACHE_IDLE_SECONDS.
+  Referências de jobs que morreram sem liberar expiram após
+  GEMINI_CACHE_REF_MAX_AGE_SECONDS.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+from loguru import logger
+
+GEMINI_CACHE_REGISTRY_BACKEND = os.getenv("GEMINI_CACHE_REGISTRY_BACKEND", "sqlite").strip().lower()
+GEMINI_CACHE_IDLE_SECONDS = float(os.getenv("GEMINI_CACHE_IDLE_SECONDS", "900"))
+GEMINI_CACHE_SWEEP_INTERVAL_SECONDS = float(os.getenv("GEMINI_CACHE_SWEEP_INTERVAL_SECONDS", "300"))
+GEMINI_CACHE_REF_MAX_AGE_SECONDS = float(os.getenv("GEMINI_CACHE_REF_MAX_AGE_SECONDS", str(6 * 3600)))
+# Reuse only caches with at least this much TTL left (otherwise extend or recreate)
+GEMINI_CACHE_MIN_REMAINING_SECONDS = float(os.getenv("GEMINI_CACHE_MIN_REMAINING_SECONDS", "120"))
+
+
+def context_cache_key(model_name: str, content: str) -> str:
+    return hashlib.sha256(f"{model_name}\0{content}".encode("utf-8")).hexdigest()
+
+
+@dataclass
+class CacheEntry:
+    key: str
+    cache_name: str
+    model: str
+    display_name: str
+    expires_at: float
+    created_at: float
+    last_used_at: float
+    refs: int = 0
+
+
+@dataclass(frozen=True)
+class CachedContextHandle:
+    """What generate calls need from a cache: its provider-side ``name``."""
+
+    name: str
+    model: str
+    display_name: str = ""
+    expires_at: float = 0.0
+
+
+# =============================================================================
+# Stores
+# =============================================================================
+
+
+class SqliteCacheStore:
+    """Registry rows in a small SQLite file (WAL), shared by local workers."""
+
+    def __init__(self, db_path: str):
+        self.db_path = db_path
+        if db_path != ":memory:":
+            Path(db_path).parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False, timeout=10)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS gemini_context_caches (
+                key TEXT PRIMARY KEY,
+                cache_name TEXT NOT NULL,
+                model TEXT NOT NULL,
+                display_name TEXT NOT NULL,
+                expires_at REAL NOT NULL,
+                created_at REAL NOT NULL,
+                last_used_at REAL NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS gemini_context_cache_refs (
+                key TEXT NOT NULL,
+                job_id TEXT NOT NULL,
+                acquired_at REAL NOT NULL,
+                PRIMARY KEY (key, job_id)
+            );
+            CREATE INDEX IF NOT EXISTS idx_gemini_cache_refs_job ON gemini_context_cache_refs (job_id);
+            """
+        )
+        self._conn.commit()
+
+    def _row_to_entry(self, row) -> CacheEntry:
+        key = row[0]
+        refs = self._conn.execute(
+            "SELECT COUNT(*) FROM gemini_context_cache_refs WHERE key = ?", (key,)
+        ).fetchone()[0]
+        return CacheEntry(*row, refs=refs)
+
+    def get(self, key: str) -> Optional[CacheEntry]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT key, cache_name, model, display_name, expires_at, created_at, last_used_at "
+                "FROM gemini_context_caches WHERE key = ?",
+                (key,),
+            ).fetchone()
+            return self._row_to_entry(row) if row else None
+
+    def register(self, entry: CacheEntry) -> CacheEntry:
+        """Insert unless another worker registered the key first; returns the stored entry."""
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR IGNORE INTO gemini_context_caches "
+                "(key, cache_name, model, display_name, expires_at, created_at, last_used_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (entry.key, entry.cache_name, entry.model, entry.display_name,
+                 entry.expires_at, entry.created_at, entry.last_used_at),
+            )
+            self._conn.commit()
+            row = self._conn.execute(
+                "SELECT key, cache_name, model, display_name, expires_at, created_at, last_used_at "
+                "FROM gemini_context_caches WHERE key = ?",
+                (entry.key,),
+            ).fetchone()
+            return self._row_to_entry(row)
+
+    def touch(self, key: str, expires_at: float, now: float) -> None:
+        with self._lock:
+            self._conn.execute(
+                "UPDATE gemini_context_caches SET expires_at = MAX(expires_at, ?), last_used_at = ? WHERE key = ?",
+                (expires_at, now, key),
+            )
+            self._conn.commit()
+
+    def add_ref(self, key: str, job_id: str, now: float) -> None:
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO gemini_context_cache_refs (key, job_id, acquired_at) VALUES (?, ?, ?)",
+                (key, job_id, now),
+            )
+            self._conn.commit()
+
+    def release(self, job_id: str, now: float) -> List[str]:
+        with self._lock:
+            keys = [r[0] for r in self._conn.execute(
+                "SELECT key FROM gemini_context_cache_refs WHERE job_id = ?", (job_id,)
+            ).fetchall()]
+            self._conn.execute("DELETE FROM gemini_context_cache_refs WHERE job_id = ?", (job_id,))
+            if keys:
+                self._conn.executemany(
+                    "UPDATE gemini_context_caches SET last_used_at = ? WHERE key = ?",
+                    [(now, key) for key in keys],
+                )
+            self._conn.commit()
+            return keys
+
+    def sweep_candidates(self, now: float, idle_seconds: float, ref_max_age: float) -> List[CacheEntry]:
+        with self._lock:
+            self._conn.execute(
+                "DELETE FROM gemini_context_cache_refs WHERE acquired_at < ?", (now - ref_max_age,)
+            )
+            self._conn.commit()
+            rows = self._conn.execute(
+                "SELECT key, cache_name, model, display_name, expires_at, created_at, last_used_at "
+                "FROM gemini_context_caches c WHERE expires_at <= ? OR ("
+                "  last_used_at < ? AND NOT EXISTS ("
+                "    SELECT 1 FROM gemini_context_cache_refs r WHERE r.key = c.key))",
+                (now, now - idle_seconds),
+            ).fetchall()
+            return [self._row_to_entry(row) for row in rows]
+
+    def claim_for_sweep(self, entry: CacheEntry, now: float, idle_seconds: float) -> bool:
+        """Deletes the row only if it is still expired or idle without refs (one statement)."""
+        with self._lock:
+            cur = self._conn.execute(
+                "DELETE FROM gemini_context_caches WHERE key = ? AND cache_name = ? AND ("
+                "  expires_at <= ? OR (last_used_at < ? AND NOT EXISTS ("
+                "    SELECT 1 FROM gemini_context_cache_refs r WHERE r.key = gemini_context_caches.key)))",
+                (entry.key, entry.cache_name, now, now - idle_seconds),
+            )
+            claimed = cur.rowcount == 1
+            if claimed:
+                self._conn.execute("DELETE FROM gemini_context_cache_refs WHERE key = ?", (entry.key,))
+            self._conn.commit()
+            return claimed
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM gemini_context_caches WHERE key = ?", (key,))
+            self._conn.execute("DELETE FROM gemini_context_cache_refs WHERE key = ?", (key,))
+            self._conn.commit()
+
+    def count(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM gemini_context_caches").fetchone()[0]
+
+
+class RedisCacheStore:
+    """Same registry in Redis: one hash per entry, one hash of job refs per entry."""
+
+    PREFIX = "iudex:gemini_ctx_cache"
+
+    def __init__(self, client):
+        self._redis = client
+
+    def _entry_key(self, key: str) -> str:
+        return f"{self.PREFIX}:entry:{key}"
+
+    def _refs_key(self, key: str) -> str:
+        return f"{self.PREFIX}:refs:{key}"
+
+    def _job_key(self, job_id: str) -> str:
+        return f"{self.PREFIX}:job:{job_id}"
+
+    def _index_key(self) -> str:
+        return f"{self.PREFIX}:index"
+
+    def _decode(self, key: str, raw: Optional[Any]) -> Optional[CacheEntry]:
+        if not raw:
+            return None
+        data = json.loads(raw)
+        data["refs"] = int(self._redis.hlen(self._refs_key(key)) or 0)
+        return CacheEntry(**data)
+
+    def get(self, key: str) -> Optional[CacheEntry]:
+        return self._decode(key, self._redis.get(self._entry_key(key)))
+
+    def register(self, entry: CacheEntry) -> CacheEntry:
+        payload = asdict(entry)
+        payload.pop("refs", None)
+        self._redis.set(self._entry_key(entry.key), json.dumps(payload), nx=True)
+        self._redis.sadd(self._index_key(), entry.key)
+        return self.get(entry.key) or entry
+
+    def touch(self, key: str, expires_at: float, now: float) -> None:
+        entry = self.get(key)
+        if entry is None:
+            return
+        entry.expires_at = max(entry.expires_at, expires_at)
+        entry.last_used_at = now
+        payload = asdict(entry)
+        payload.pop("refs", None)
+        self._redis.set(self._entry_key(key), json.dumps(payload))
+
+    def add_ref(self, key: str, job_id: str, now: float) -> None:
+        self._redis.hset(self._refs_key(key), job_id, now)
+        self._redis.sadd(self._job_key(job_id), key)
+
+    def release(self, job_id: str, now: float) -> List[str]:
+        keys = [k.decode() if isinstance(k, bytes) else k for k in self._redis.smembers(self._job_key(job_id))]
+        for key in keys:
+            self._redis.hdel(self._refs_key(key), job_id)
+            self.touch(key, 0.0, now)
+        self._redis.delete(self._job_key(job_id))
+        return keys
+
+    def sweep_candidates(self, now: float, idle_seconds: float, ref_max_age: float) -> List[CacheEntry]:
+        candidates: List[CacheEntry] = []
+        for raw_key in self._redis.smembers(self._index_key()):
+            key = raw_key.decode() if isinstance(raw_key, bytes) else raw_key
+            for job_id, acquired_at in (self._redis.hgetall(self._refs_key(key)) or {}).items():
+                if float(acquired_at) < now - ref_max_age:
+                    self._redis.hdel(self._refs_key(key), job_id)
+            entry = self.get(key)
+            if entry is None:
+                self._redis.srem(self._index_key(), key)
+                continue
+            if entry.expires_at <= now or (entry.refs == 0 and entry.last_used_at < now - idle_seconds):
+                candidates.append(entry)
+        return candidates
+
+    def claim_for_sweep(self, entry: CacheEntry, now: float, idle_seconds: float) -> bool:
+        """WATCH/MULTI: deletes the entry only if nobody referenced or touched it meanwhile."""
+        from redis.exceptions import WatchError
+
+        entry_key, refs_key = self._entry_key(entry.key), self._refs_key(entry.key)
+        with self._redis.pipeline() as pipe:
+            try:
+                pipe.watch(entry_key, refs_key)
+                raw = pipe.get(entry_key)
+                if not raw:
+                    return False
+                data = json.loads(raw)
+                refs = int(pipe.hlen(refs_key) or 0)
+                idle = refs == 0 and data["last_used_at"] < now - idle_seconds
+                if data["cache_name"] != entry.cache_name or not (data["expires_at"] <= now or idle):
+                    return False
+                pipe.multi()
+                pipe.delete(entry_key, refs_key)
+                pipe.srem(self._index_key(), entry.key)
+                pipe.execute()
+                return True
+            except WatchError:
+                return False
+
+    def delete(self, key: str) -> None:
+        self._redis.delete(self._entry_key(key), self._refs_key(key))
+        self._redis.srem(self._index_key(), key)
+
+    def count(self) -> int:
+        return int(self._redis.scard(self._index_key()) or 0)
+
+
+# =============================================================================
+# Registry
+# =============================================================================
+
+
+def _is_not_found(exc: Exception) -> bool:
+    code = getattr(exc, "code", None) or getattr(exc, "status_code", None)
+    return code == 404 or "not found" in str(exc).lower() or "404" in str(exc)
+
+
+class ContextCacheRegistry:
+    """Content-addressed, reference-counted Gemini context caches."""
+
+    def __init__(self, store, *, idle_seconds: float = GEMINI_CACHE_IDLE_SECONDS,
+                 sweep_interval: float = GEMINI_CACHE_SWEEP_INTERVAL_SECONDS,
+                 ref_max_age: float = GEMINI_CACHE_REF_MAX_AGE_SECONDS):
+        self.store = store
+        self.idle_seconds = idle_seconds
+        self.sweep_interval = sweep_interval
+        self.ref_max_age = ref_max_age
+        self._create_locks: Dict[str, threading.Lock] = {}
+        self._locks_guard = threading.Lock()
+        self._last_sweep = time.time()
+        self._sweeping = False
+        self._sweep_guard = threading.Lock()
+        self.hits = 0
+        self.created = 0
+        self.extended = 0
+        self.swept = 0
+
+    def _create_lock(self, key: str) -> threading.Lock:
+        with self._locks_guard:
+            return self._create_locks.setdefault(key, threading.Lock())
+
+    @staticmethod
+    def _handle(entry: CacheEntry) -> CachedContextHandle:
+        return CachedContextHandle(
+            name=entry.cache_name, model=entry.model,
+            display_name=entry.display_name, expires_at=entry.expires_at,
+        )
+
+    def _extend(self, client, entry: CacheEntry, ttl_seconds: int, now: float) -> Optional[CacheEntry]:
+        """Pushes the provider TTL to now + ttl; None if the cache is gone."""
+        try:
+            from google.genai import types
+
+            client.caches.update(
+                name=entry.cache_name,
+                config=types.UpdateCachedContentConfig(ttl=f"{int(ttl_seconds)}s"),
+            )
+        except Exception as exc:
+            if _is_not_found(exc):
+                self.store.delete(entry.key)
+                return None
+            logger.debug(f"Gemini cache TTL extension failed ({entry.cache_name}): {exc}")
+            return entry if entry.expires_at - now > GEMINI_CACHE_MIN_REMAINING_SECONDS else None
+        self.extended += 1
+        entry.expires_at = now + ttl_seconds
+        return entry
+
+    def _reuse(self, client, entry: Optional[CacheEntry], job_id: str, ttl_seconds: int) -> Optional[CachedContextHandle]:
+        if entry is None:
+            return None
+        now = time.time()
+        if entry.expires_at - now < ttl_seconds:
+            entry = self._extend(client, entry, ttl_seconds, now)
+            if entry is None:
+                return None
+        self.store.touch(entry.key, entry.expires_at, now)
+        self.store.add_ref(entry.key, job_id, now)
+        self.hits += 1
+        return self._handle(entry)
+
+    def acquire(
+        self,
+        client,
+        job_id: str,
+        content: str,
+        model_name: str,
+        ttl_seconds: int,
+        create: Callable[[str], Any],
+    ) -> Optional[CachedContextHandle]:
+        """
+        Returns a handle to a cache holding ``content`` for ``model_name``,
+        creating it with ``create(display_name)`` only if no live cache exists.
+        """
+        key = context_cache_key(model_name, content)
+        handle = self._reuse(client, self.store.get(key), job_id, ttl_seconds)
+        if handle is not None:
+            logger.info(f"♻️ Context cache compartilhado reutilizado: {handle.name}")
+            self.maybe_sweep(client)
+            return handle
+
+        with self._create_lock(key):
+            handle = self._reuse(client, self.store.get(key), job_id, ttl_seconds)
+            if handle is not None:
+                return handle
+            display_name = f"iudex_ctx_{key[:16]}"
+            cache = create(display_name)
+            if cache is None or not getattr(cache, "name", None):
+                return None
+            now = time.time()
+            stored = self.store.register(CacheEntry(
+                key=key, cache_name=cache.name, model=model_name, display_name=display_name,
+                expires_at=now + ttl_seconds, created_at=now, last_used_at=now,
+            ))
+            if stored.cache_name != cache.name:
+                # Another worker registered the same content first: keep theirs
+                self._delete_provider_cache(client, cache.name)
+            else:
+                self.created += 1
+            self.store.add_ref(key, job_id, now)
+        self.maybe_sweep(client)
+        return self._handle(stored)
+
+    def release(self, job_id: str, client=None) -> List[str]:
+        keys = self.store.release(job_id, time.time())
+        if client is not None:
+            self.maybe_sweep(client)
+        return keys
+
+    @staticmethod
+    def _delete_provider_cache(client, name: str) -> None:
+        try:
+            client.caches.delete(name=name)
+            logger.info(f"🗑️ Cache deletado: {name}")
+        except Exception as exc:
+            if not _is_not_found(exc):
+                logger.debug(f"Gemini cache delete failed ({name}): {exc}")
+
+    def sweep(self, client) -> int:
+        """Deletes expired and idle unreferenced caches; returns how many."""
+        removed = 0
+        for entry in self.store.sweep_candidates(time.time(), self.idle_seconds, self.ref_max_age):
+            # A job may have re-acquired the cache since it was listed: the row is
+            # deleted (and the provider cache after it) only if it is still unused.
+            now = time.time()
+            if not self.store.claim_for_sweep(entry, now, self.idle_seconds):
+                continue
+            if entry.expires_at > now:
+                self._delete_provider_cache(client, entry.cache_name)
+            removed += 1
+        self.swept += removed
+        return removed
+
+    def maybe_sweep(self, client) -> None:
+        now = time.time()
+        if client is None:
+            return
+        with self._sweep_guard:
+            if self._sweeping or now - self._last_sweep < self.sweep_interval:
+                return
+            self._last_sweep = now
+            self._sweeping = True
+
+        def _run():
+            try:
+                self.sweep(client)
+            except Exception as exc:
+                logger.debug(f"Gemini cache sweep failed: {exc}")
+            finally:
+                self._sweeping = False
+
+        threading.Thread(target=_run, name="gemini-cache-sweep", daemon=True).start()
+
+    def stats(self) -> Dict[str, Any]:
+        try:
+            entries = self.store.count()
+        except Exception:
+            entries = None
+        return {
+            "backend": type(self.store).__name__,
+            "entries": entries,
+            "hits": self.hits,
+            "created": self.created,
+            "extended": self.extended,
+            "swept": self.swept,
+        }
+
+
+def _default_store():
+    if GEMINI_CACHE_REGISTRY_BACKEND == "redis":
+        try:
+            import redis
+
+            client = redis.Redis.from_url(os.getenv("REDIS_URL", "redis://localhost:6379/0"), socket_timeout=1)
+            client.ping()
+            return RedisCacheStore(client)
+        except Exception as exc:
+            logger.warning(f"Gemini cache registry: Redis indisponível ({exc}), usando SQLite")
+    if GEMINI_CACHE_REGISTRY_BACKEND == "memory":
+        return SqliteCacheStore(":memory:")
+    db_path = os.getenv("GEMINI_CACHE_REGISTRY_DB")
+    if not db_path:
+        try:
+            from app.services.job_manager import job_manager
+
+            db_path = str(Path(job_manager.db_path).with_name("gemini_context_caches.db"))
+        except Exception:
+            db_path = "gemini_context_caches.db"
+    return SqliteCacheStore(db_path)
+
+
+# Singleton
+_registry: Optional[ContextCacheRegistry] = None
+_registry_lock = threading.Lock()
+
+
+def get_context_cache_registry() -> ContextCacheRegistry:
+    global _registry
+    if _registry is None:
+        with _registry_lock:
+            if _registry is None:
+                _registry = ContextCacheRegistry(_default_store())
+    return _registry
+
+
+def reset_context_cache_registry() -> None:
+    """Reset singleton (for testing)."""
+    global _registry
+    _registry = None
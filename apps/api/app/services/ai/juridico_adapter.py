@@ -17,13 +17,46 @@ from app.services.ai.model_registry import get_api_model_name
 IUDEX_ROOT = Path(__file__).parent.parent.parent.parent.parent.parent  # apps/api/app/services/ai → root
 sys.path.insert(0, str(IUDEX_ROOT))
 
-try:
-    from juridico_gemini import generate_document_programmatic, LegalDrafter, PROMPT_MAP
-    JURIDICO_AVAILABLE = True
+# juridico_gemini importa o rag_module da raiz (sentence-transformers/torch):
+# vários segundos no startup da API. Aqui só verificamos se o módulo existe;
+# o import real acontece no primeiro uso (ou no warm-up em background).
+import importlib.util
+
+from app.core.lazy import lazy_subsystem
+
+generate_document_programmatic = None
+LegalDrafter = None
+PROMPT_MAP: Dict[str, Any] = {}
+JURIDICO_AVAILABLE = importlib.util.find_spec("juridico_gemini") is not None
+if not JURIDICO_AVAILABLE:
+    logger.warning("⚠️ juridico_gemini não disponível: módulo não encontrado")
+
+
+def _import_juridico_gemini() -> bool:
+    global generate_document_programmatic, LegalDrafter, PROMPT_MAP
+    import juridico_gemini
+
+    generate_document_programmatic = juridico_gemini.generate_document_programmatic
+    LegalDrafter = juridico_gemini.LegalDrafter
+    PROMPT_MAP = juridico_gemini.PROMPT_MAP
     logger.info(f"✅ juridico_gemini importado de {IUDEX_ROOT}")
-except ImportError as e:
-    logger.warning(f"⚠️ juridico_gemini não disponível: {e}")
-    JURIDICO_AVAILABLE = False
+    return True
+
+
+_juridico = lazy_subsystem("juridico_gemini", _import_juridico_gemini, "Motor juridico_gemini.py (RAG local)")
+
+
+def _ensure_juridico() -> bool:
+    """Importa juridico_gemini no primeiro uso; False se indisponível."""
+    global JURIDICO_AVAILABLE
+    if not JURIDICO_AVAILABLE:
+        return False
+    try:
+        return _juridico.get()
+    except ImportError as e:
+        logger.warning(f"⚠️ juridico_gemini não disponível: {e}")
+        JURIDICO_AVAILABLE = False
+        return False
 
 
 class JuridicoGeminiAdapter:
@@ -117,7 +150,7 @@ class JuridicoGeminiAdapter:
                 - outline: List[str]
         """
         
-        if not JURIDICO_AVAILABLE:
+        if not _ensure_juridico():
             raise RuntimeError("juridico_gemini não está disponível")
 
         # Normalizar modelos (aceitar ids canônicos)
@@ -187,7 +220,7 @@ class JuridicoGeminiAdapter:
         """
         Interage com o chat jurídico via juridico_gemini.py.
         """
-        if not JURIDICO_AVAILABLE:
+        if not _ensure_juridico():
             raise RuntimeError("juridico_gemini não está disponível")
             
         try:
@@ -217,7 +250,7 @@ class JuridicoGeminiAdapter:
     
     def get_available_modes(self) -> List[str]:
         """Retorna lista de tipos de documento suportados"""
-        if JURIDICO_AVAILABLE:
+        if _ensure_juridico():
             return list(PROMPT_MAP.keys())
         return []
     
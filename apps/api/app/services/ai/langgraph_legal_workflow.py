@@ -76,6 +76,7 @@ from app.services.ai.perplexity_config import (
     normalize_float,
 )
 from app.services.rag.config import get_rag_config
+from app.core.lazy import lazy_subsystem
 from app.services.job_manager import job_manager
 from app.services.api_call_tracker import record_api_call, billing_context
 from app.services.ai.audit_service import AuditService
@@ -3025,11 +3026,7 @@ def _apply_budget_soft_caps(state: "DocumentState", *, node: str) -> "DocumentSt
     if approved <= 0:
         return state
 
-    counters = job_manager.get_api_counters(str(job_id))
-    try:
-        spent = int((counters or {}).get("points_total") or 0)
-    except Exception:
-        spent = 0
+    spent = job_manager.get_api_points_total(str(job_id)) or 0
     remaining = approved - spent
 
     low_threshold = max(10, int(approved * 0.10))
@@ -4945,22 +4942,52 @@ Redija a seção "{title}" para um documento do tipo {mode}, defendendo a tese:
                 review=_default_review_block(),
             ), str(e)
 
-    # Process each section
-    section_tasks = []
-    # Note: For parallel execution, the "previous_sections" for each section 
-    # will only contain the FACTUAL context of the outline, since concurrent 
-    # drafts won't have the final text of their predecessors yet.
-    # This is a trade-off for speed (latency).
-    for i, title in enumerate(outline):
-        prev_factual = []
-        if i > 0:
-            prev_factual = [f"### {outline[j]}\n(Ponto anterior no sumário)" for j in range(max(0, i-3), i)]
-        
-        section_tasks.append(process_single_section(i, title, prev_factual))
+    # Process sections as a DAG: body sections are drafted concurrently (capped
+    # by SECTION_MAX_CONCURRENCY; provider limits come from the RateGovernor),
+    # closing sections (pedidos, conclusão...) wait for the body and receive
+    # its final text. Independent sections only see the outline titles of
+    # their predecessors, since those drafts are still in flight.
+    from app.services.ai.section_scheduler import build_section_dependencies, run_section_dag
+
+    section_dependencies = build_section_dependencies(outline)
+
+    async def draft_section(i, dep_results):
+        title = outline[i]
+        if dep_results:
+            prev_sections_for_this_sec = [
+                f"### {dep_results[j][0].get('section_title') or outline[j]}\n"
+                f"{(dep_results[j][0].get('merged_content') or '')[:1500]}"
+                for j in sorted(dep_results)
+            ]
+        else:
+            prev_sections_for_this_sec = [
+                f"### {outline[j]}\n(Ponto anterior no sumário)" for j in range(max(0, i - 3), i)
+            ]
+        return await process_single_section(i, title, prev_sections_for_this_sec)
+
+    def stream_section_in_order(i, res):
+        if not stream_tokens:
+            return
+        record = res[0]
+        _emit_section_stream(
+            state,
+            section_title=record.get("section_title") or outline[i],
+            section_text=record.get("merged_content") or "",
+            mode=mode,
+            reset=i == 0,
+            chunk_size=stream_chunk_chars,
+        )
 
-    # Parallel Execute
-    logger.info(f"🚀 Iniciando processamento paralelo de {len(section_tasks)} seções...")
-    all_results = await asyncio.gather(*section_tasks)
+    logger.info(
+        f"🚀 Iniciando processamento paralelo de {len(outline)} seções "
+        f"({sum(1 for d in section_dependencies if d)} dependentes)..."
+    )
+    all_results = await run_section_dag(
+        len(outline),
+        section_dependencies,
+        draft_section,
+        on_ready_in_order=stream_section_in_order,
+    )
     
     for res_tuple, div_text in all_results:
         processed_sections.append(res_tuple)
@@ -4970,18 +4997,6 @@ Redija a seção "{title}" para um documento do tipo {mode}, defendendo a tese:
 
     processed_sections = _ensure_review_schema(processed_sections)
 
-    # Post-process streaming events in order for UI (optional, since UI usually handles async)
-    if stream_tokens:
-        for res_tuple in processed_sections:
-            _emit_section_stream(
-                state,
-                section_title=res_tuple["section_title"],
-                section_text=res_tuple["merged_content"] or "",
-                mode=mode,
-                reset=res_tuple == processed_sections[0],
-                chunk_size=stream_chunk_chars,
-            )
-
     # Assemble full document
     full_doc = f"# {mode}\n\n"
     for section in processed_sections:
@@ -7714,42 +7729,126 @@ def finalize_hil_router(state: DocumentState) -> Literal["proposal_debate", "__e
 workflow.add_conditional_edges("finalize_hil", finalize_hil_router)
 workflow.add_edge("proposal_debate", "finalize_hil")  # Loop back to HIL after proposal debate
 
-# Checkpointer — priority: Neo4j > SQLite > Memory
-if _Neo4jSaver is not None:
+def _run_setup_coroutine(coro) -> None:
+    """Runs an async setup() to completion, even when called from inside a running loop."""
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        asyncio.run(coro)
+        return
+    import concurrent.futures
+
+    with concurrent.futures.ThreadPoolExecutor(max_workers=1) as executor:
+        executor.submit(asyncio.run, coro).result()
+
+
+def _legacy_sqlite_saver():
+    """SqliteSaver over jobs.db when it still holds checkpoints from before the delta store."""
+    if SqliteSaver is None or not os.path.exists(job_manager.db_path):
+        return None
     try:
-        from app.services.rag.core.neo4j_mvp import Neo4jMVPConfig
-        _neo4j_cfg = Neo4jMVPConfig.from_env()
+        conn = sqlite3.connect(job_manager.db_path, check_same_thread=False)
+        has_rows = conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'checkpoints'"
+        ).fetchone() and conn.execute("SELECT 1 FROM checkpoints LIMIT 1").fetchone()
+        if not has_rows:
+            conn.close()
+            return None
+        return SqliteSaver(conn)
+    except Exception as _e:
+        logger.warning("Legacy SqliteSaver unavailable for checkpoint fallback: %s", _e)
+        return None
+
+
+def _build_checkpointer():
+    """Checkpointer — priority: Neo4j > delta SQLite store > SqliteSaver > Memory.
+
+    LANGGRAPH_CHECKPOINTER=sqlite|memory forces the legacy savers.
+    """
+    if _Neo4jSaver is not None:
         try:
-            checkpointer = _Neo4jSaver.from_conn_string(
-                _neo4j_cfg.uri,
-                auth=(_neo4j_cfg.user, _neo4j_cfg.password),
-                database=_neo4j_cfg.database,
-            )
-        except TypeError:
-            # Backward-compatible signature used by older releases.
-            checkpointer = _Neo4jSaver.from_conn_string(
-                _neo4j_cfg.uri,
-                _neo4j_cfg.user,
-                _neo4j_cfg.password,
+            from app.services.rag.core.neo4j_mvp import Neo4jMVPConfig
+            _neo4j_cfg = Neo4jMVPConfig.from_env()
+            try:
+                saver = _Neo4jSaver.from_conn_string(
+                    _neo4j_cfg.uri,
+                    auth=(_neo4j_cfg.user, _neo4j_cfg.password),
+                    database=_neo4j_cfg.database,
+                )
+            except TypeError:
+                # Backward-compatible signature used by older releases.
+                saver = _Neo4jSaver.from_conn_string(
+                    _neo4j_cfg.uri,
+                    _neo4j_cfg.user,
+                    _neo4j_cfg.password,
+                )
+            if hasattr(saver, "setup"):
+                setup_result = saver.setup()
+                if inspect.isawaitable(setup_result):
+                    _run_setup_coroutine(setup_result)
+            logger.info("LangGraph checkpointer: Neo4jSaver (%s)", _neo4j_cfg.uri)
+            return saver
+        except Exception as _e:
+            logger.warning("Neo4jSaver init failed, falling back to SQLite: %s", _e)
+
+    backend = os.environ.get("LANGGRAPH_CHECKPOINTER", "").strip().lower()
+    if backend not in ("sqlite", "memory"):
+        try:
+            from app.services.ai.checkpoint_store import DeltaSqliteCheckpointer
+
+            saver = DeltaSqliteCheckpointer(legacy=_legacy_sqlite_saver())
+            logger.info(
+                "LangGraph checkpointer: DeltaSqliteCheckpointer (%s, legacy fallback=%s)",
+                saver.db_path,
+                saver.legacy is not None,
             )
-        if hasattr(checkpointer, "setup"):
-            setup_result = checkpointer.setup()
-            if inspect.isawaitable(setup_result):
-                asyncio.run(setup_result)
-        logger.info("LangGraph checkpointer: Neo4jSaver (%s)", _neo4j_cfg.uri)
-    except Exception as _e:
-        logger.warning("Neo4jSaver init failed, falling back to SQLite: %s", _e)
-        _Neo4jSaver = None  # type: ignore[assignment]
-
-if _Neo4jSaver is None and SqliteSaver is not None:
-    conn = sqlite3.connect(job_manager.db_path, check_same_thread=False)
-    checkpointer = SqliteSaver(conn)
-    logger.info("LangGraph checkpointer: SqliteSaver")
-elif _Neo4jSaver is None:
-    checkpointer = MemorySaver()
+            return saver
+        except Exception as _e:
+            logger.warning("DeltaSqliteCheckpointer init failed, falling back to SqliteSaver: %s", _e)
+
+    if SqliteSaver is not None and backend != "memory":
+        conn = sqlite3.connect(job_manager.db_path, check_same_thread=False)
+        logger.info("LangGraph checkpointer: SqliteSaver")
+        return SqliteSaver(conn)
     logger.warning("LangGraph checkpointer: MemorySaver (SqliteSaver indisponível no ambiente)")
+    return MemorySaver()
+
+
+def _compile_legal_workflow():
+    """Builds the checkpointer and compiles the graph (once, on first use)."""
+    global checkpointer, legal_workflow_app
+    checkpointer = _build_checkpointer()
+    legal_workflow_app = workflow.compile(checkpointer=checkpointer)
+    return legal_workflow_app
+
+
+# Compiling the graph and opening the checkpointer (SQLite file, or a Neo4j
+# round-trip) used to happen at import time, on every API worker start. They
+# are now deferred to the first get_legal_workflow_app() call — or to the
+# background warm-up in the application lifespan.
+_legal_workflow = lazy_subsystem(
+    "legal_workflow_app",
+    _compile_legal_workflow,
+    "LangGraph legal workflow graph + checkpointer",
+)
+
+
+def get_legal_workflow_app():
+    """Compiled legal workflow graph (compiled lazily, thread-safe)."""
+    app = globals().get("legal_workflow_app")
+    if app is not None:
+        return app
+    return _legal_workflow.get()
+
 
-legal_workflow_app = workflow.compile(checkpointer=checkpointer)
+def __getattr__(name: str):
+    # Keeps `from langgraph_legal_workflow import legal_workflow_app` working.
+    if name == "legal_workflow_app":
+        return get_legal_workflow_app()
+    if name == "checkpointer":
+        get_legal_workflow_app()
+        return globals()["checkpointer"]
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 
 # ---------------------------------------------------------------------------
@@ -7783,5 +7882,5 @@ async def run_workflow_async(initial_state: Dict[str, Any]) -> Dict[str, Any]:
         metadata=trace_metadata,
         tags=["langgraph", "legal-workflow"],
     ):
-        final_state = await legal_workflow_app.ainvoke(initial_state, config=config)
+        final_state = await get_legal_workflow_app().ainvoke(initial_state, config=config)
     return final_state
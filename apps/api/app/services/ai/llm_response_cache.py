@@ -0,0 +1,334 @@
+"""
+LLM response cache.
+
+Bounded cache for deterministic LLM calls (critiques, classification, query
+expansion, quality patches). Entries are keyed by provider, model, generation
+params and a hash of the full prompt, expire after a TTL and are evicted LRU
+once the entry/byte budget is exceeded.
+
+An optional second tier survives restarts and can be shared across workers:
+- "disk": SQLite file (LLM_RESPONSE_CACHE_PATH)
+- "redis": sync Redis client on REDIS_URL
+
+Tiers return the value together with its absolute expiry, so an L2 hit is
+promoted to L1 with the TTL it has left, not a fresh one. Async callers use
+``aget``/``aset``, which run the L2 round trip in a worker thread.
+
+Caching is opt-in per call site (``cache=True`` on the call_* helpers in
+agent_clients; QualityService patch calls go through ``_call_patch_llm``);
+LLM_RESPONSE_CACHE_ENABLED=false disables it globally.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+from loguru import logger
+
+
+LLM_RESPONSE_CACHE_ENABLED = os.getenv("LLM_RESPONSE_CACHE_ENABLED", "true").lower() == "true"
+LLM_RESPONSE_CACHE_TTL_SECONDS = int(os.getenv("LLM_RESPONSE_CACHE_TTL_SECONDS", "3600"))
+LLM_RESPONSE_CACHE_MAX_ENTRIES = int(os.getenv("LLM_RESPONSE_CACHE_MAX_ENTRIES", "2000"))
+LLM_RESPONSE_CACHE_MAX_BYTES = int(os.getenv("LLM_RESPONSE_CACHE_MAX_BYTES", str(64 * 1024 * 1024)))
+LLM_RESPONSE_CACHE_BACKEND = os.getenv("LLM_RESPONSE_CACHE_BACKEND", "memory").lower()
+LLM_RESPONSE_CACHE_PATH = os.getenv("LLM_RESPONSE_CACHE_PATH", "./data/llm_response_cache.sqlite")
+LLM_RESPONSE_CACHE_DISK_MAX_ENTRIES = int(os.getenv("LLM_RESPONSE_CACHE_DISK_MAX_ENTRIES", "50000"))
+
+
+def make_cache_key(provider: str, model: str, prompt: str, **params: Any) -> str:
+    """Stable key over (provider, model, params, sha256(prompt))."""
+    payload = json.dumps(
+        {
+            "provider": provider,
+            "model": model,
+            "params": params,
+            "prompt": hashlib.sha256(prompt.encode("utf-8", errors="ignore")).hexdigest(),
+        },
+        sort_keys=True,
+        ensure_ascii=False,
+        default=str,
+    )
+    return "llm:" + hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class _SQLiteTier:
+    """Persistent tier: one SQLite table with expiry, pruned to a max size."""
+
+    def __init__(self, path: str, max_entries: int):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._max_entries = max_entries
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS llm_cache ("
+            " key TEXT PRIMARY KEY, value TEXT NOT NULL, expires_at REAL NOT NULL)"
+        )
+        self._conn.commit()
+        self._writes = 0
+
+    def get(self, key: str) -> Optional[Tuple[str, float]]:
+        """(value, expires_at epoch seconds), or None."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, expires_at FROM llm_cache WHERE key = ?", (key,)
+            ).fetchone()
+        if row is None or row[1] <= time.time():
+            return None
+        return row[0], row[1]
+
+    def set(self, key: str, value: str, ttl: int) -> None:
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO llm_cache (key, value, expires_at) VALUES (?, ?, ?)",
+                (key, value, time.time() + ttl),
+            )
+            self._writes += 1
+            if self._writes % 100 == 0:
+                self._prune()
+            self._conn.commit()
+
+    def _prune(self) -> None:
+        self._conn.execute("DELETE FROM llm_cache WHERE expires_at <= ?", (time.time(),))
+        self._conn.execute(
+            "DELETE FROM llm_cache WHERE key IN ("
+            " SELECT key FROM llm_cache ORDER BY expires_at DESC LIMIT -1 OFFSET ?)",
+            (self._max_entries,),
+        )
+
+    def clear(self) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM llm_cache")
+            self._conn.commit()
+
+
+class _RedisTier:
+    """Shared tier on Redis (sync client, usable from sync and async callers)."""
+
+    def __init__(self, url: str):
+        import redis  # redis-py is already a dependency (app.core.redis)
+
+        self._client = redis.Redis.from_url(url, decode_responses=True, socket_timeout=0.5)
+
+    def get(self, key: str) -> Optional[Tuple[str, float]]:
+        """(value, expires_at epoch seconds), or None."""
+        value, pttl = self._client.pipeline().get(key).pttl(key).execute()
+        if value is None or pttl is None or pttl <= 0:
+            return None
+        return value, time.time() + pttl / 1000.0
+
+    def set(self, key: str, value: str, ttl: int) -> None:
+        self._client.setex(key, ttl, value)
+
+    def clear(self) -> None:
+        for key in self._client.scan_iter(match="llm:*"):
+            self._client.delete(key)
+
+
+class LLMResponseCache:
+    """Thread-safe TTL + LRU cache for LLM text responses, with optional L2 tier."""
+
+    def __init__(
+        self,
+        ttl_seconds: int = LLM_RESPONSE_CACHE_TTL_SECONDS,
+        max_entries: int = LLM_RESPONSE_CACHE_MAX_ENTRIES,
+        max_bytes: int = LLM_RESPONSE_CACHE_MAX_BYTES,
+        l2: Optional[Any] = None,
+    ):
+        self._ttl = ttl_seconds
+        self._max_entries = max_entries
+        self._max_bytes = max_bytes
+        self._l2 = l2
+        self._lock = threading.Lock()
+        self._store: "OrderedDict[str, Tuple[float, str]]" = OrderedDict()
+        self._bytes = 0
+        self._hits = 0
+        self._l2_hits = 0
+        self._misses = 0
+        self._evictions = 0
+
+    # ------------------------------------------------------------------
+    # Public API
+    # ------------------------------------------------------------------
+
+    def get(self, key: str) -> Optional[str]:
+        value = self._get_l1(key)
+        if value is not None:
+            return value
+        if self._l2 is None:
+            return self._count_miss()
+        return self._promote(key, self._get_l2(key))
+
+    async def aget(self, key: str) -> Optional[str]:
+        """Like ``get``, with the L2 lookup off the event loop."""
+        value = self._get_l1(key)
+        if value is not None:
+            return value
+        if self._l2 is None:
+            return self._count_miss()
+        return self._promote(key, await asyncio.to_thread(self._get_l2, key))
+
+    def set(self, key: str, value: str, ttl: Optional[int] = None) -> None:
+        if not isinstance(value, str) or not value:
+            return
+        ttl = ttl or self._ttl
+        with self._lock:
+            self._put(key, value, ttl)
+        if self._l2 is not None:
+            self._set_l2(key, value, ttl)
+
+    async def aset(self, key: str, value: str, ttl: Optional[int] = None) -> None:
+        """Like ``set``, with the L2 write off the event loop."""
+        if not isinstance(value, str) or not value:
+            return
+        ttl = ttl or self._ttl
+        with self._lock:
+            self._put(key, value, ttl)
+        if self._l2 is not None:
+            await asyncio.to_thread(self._set_l2, key, value, ttl)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._store.clear()
+            self._bytes = 0
+            self._hits = self._l2_hits = self._misses = self._evictions = 0
+        if self._l2 is not None:
+            try:
+                self._l2.clear()
+            except Exception as e:
+                logger.warning(f"LLMResponseCache: L2 clear failed: {e}")
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            hits = self._hits + self._l2_hits
+            total = hits + self._misses
+            return {
+                "size": len(self._store),
+                "bytes": self._bytes,
+                "max_entries": self._max_entries,
+                "max_bytes": self._max_bytes,
+                "ttl_seconds": self._ttl,
+                "backend": type(self._l2).__name__.strip("_") if self._l2 else "memory",
+                "hits": hits,
+                "l2_hits": self._l2_hits,
+                "misses": self._misses,
+                "evictions": self._evictions,
+                "hit_rate": round(hits / total, 3) if total > 0 else 0.0,
+            }
+
+    # ------------------------------------------------------------------
+    # Tiers
+    # ------------------------------------------------------------------
+
+    def _get_l1(self, key: str) -> Optional[str]:
+        now = time.monotonic()
+        with self._lock:
+            entry = self._store.get(key)
+            if entry is not None:
+                if entry[0] > now:
+                    self._store.move_to_end(key)
+                    self._hits += 1
+                    return entry[1]
+                self._remove(key)
+        return None
+
+    def _get_l2(self, key: str) -> Optional[Tuple[str, float]]:
+        try:
+            return self._l2.get(key)
+        except Exception as e:
+            logger.warning(f"LLMResponseCache: L2 get failed: {e}")
+            return None
+
+    def _set_l2(self, key: str, value: str, ttl: float) -> None:
+        try:
+            self._l2.set(key, value, ttl)
+        except Exception as e:
+            logger.warning(f"LLMResponseCache: L2 set failed: {e}")
+
+    def _promote(self, key: str, found: Optional[Tuple[str, float]]) -> Optional[str]:
+        """Copies an L2 hit into L1 for the TTL it has left."""
+        remaining = found[1] - time.time() if found is not None else 0.0
+        if remaining <= 0:
+            return self._count_miss()
+        with self._lock:
+            self._l2_hits += 1
+            self._put(key, found[0], remaining)
+        return found[0]
+
+    def _count_miss(self) -> None:
+        with self._lock:
+            self._misses += 1
+        return None
+
+    # ------------------------------------------------------------------
+    # Internal (caller holds the lock)
+    # ------------------------------------------------------------------
+
+    def _put(self, key: str, value: str, ttl: float) -> None:
+        if key in self._store:
+            self._remove(key)
+        size = len(value)
+        if size > self._max_bytes:
+            return
+        self._store[key] = (time.monotonic() + ttl, value)
+        self._bytes += size
+        while len(self._store) > self._max_entries or self._bytes > self._max_bytes:
+            oldest = next(iter(self._store))
+            self._remove(oldest)
+            self._evictions += 1
+
+    def _remove(self, key: str) -> None:
+        _, value = self._store.pop(key)
+        self._bytes -= len(value)
+
+
+# ---------------------------------------------------------------------------
+# Singleton
+# ---------------------------------------------------------------------------
+
+_instance: Optional[LLMResponseCache] = None
+_instance_lock = threading.Lock()
+
+
+def build_l2_tier(backend: str, path: str, max_entries: int) -> Optional[Any]:
+    """Persistent tier for ``backend`` ("disk" | "redis"), or None for memory only."""
+    try:
+        if backend == "disk":
+            return _SQLiteTier(path, max_entries)
+        if backend == "redis":
+            return _RedisTier(os.getenv("REDIS_URL", "redis://localhost:6379/0"))
+    except Exception as e:
+        logger.warning(f"LLMResponseCache: {backend} tier unavailable, memory only: {e}")
+    return None
+
+
+def _build_l2() -> Optional[Any]:
+    return build_l2_tier(LLM_RESPONSE_CACHE_BACKEND, LLM_RESPONSE_CACHE_PATH, LLM_RESPONSE_CACHE_DISK_MAX_ENTRIES)
+
+
+def get_llm_response_cache() -> Optional[LLMResponseCache]:
+    """Shared cache, or None when disabled via LLM_RESPONSE_CACHE_ENABLED."""
+    global _instance
+    if not LLM_RESPONSE_CACHE_ENABLED:
+        return None
+    if _instance is None:
+        with _instance_lock:
+            if _instance is None:
+                _instance = LLMResponseCache(l2=_build_l2())
+    return _instance
+
+
+def reset_llm_response_cache() -> None:
+    """Reset singleton (for testing)."""
+    global _instance
+    _instance = None
@@ -53,7 +53,8 @@ async def _rewrite_query_with_memory(
             prompt,
             model=get_api_model_name(state.get("judge_model") or "gpt-5.2"),
             temperature=0.1,
-            max_tokens=200
+            max_tokens=200,
+            cache=True,
         )
         
         if rewritten and len(rewritten) > 5:
@@ -0,0 +1,624 @@
+"""
+Provider rate governor.
+
+Paces LLM calls per provider/model without sleeping under a shared lock:
+- RPM/TPM token buckets hand out *reservations*: the bucket is debited under
+  its lock and the caller waits for its own slot outside of it (time.sleep in
+  sync code, asyncio.sleep in async code), so concurrent callers queue fairly
+  instead of serializing behind one sleeper.
+- An adaptive concurrency limit per provider (AIMD): halved on 429 /
+  RESOURCE_EXHAUSTED, with the provider paused for the Retry-After interval,
+  and grown back by +1/limit on every success.
+- Optional Redis-backed buckets (LLM_RATE_GOVERNOR_BACKEND=redis) so several
+  workers sharing the same API keys share one budget. Redis errors fall back
+  to the local bucket.
+
+Limits come from the environment (0 = unlimited):
+    {PROVIDER}_RPM, {PROVIDER}_TPM, {PROVIDER}_MAX_CONCURRENCY
+where PROVIDER is the provider name in upper case with "-" -> "_"
+(e.g. VERTEX_ANTHROPIC_RPM), and LLM_RATE_LIMITS may override per model:
+    {"anthropic:claude-sonnet-4-5": {"rpm": 50, "tpm": 40000}}
+
+The module also keeps pooled keep-alive httpx clients per provider, shared by
+the SDK clients built in agent_clients. Async clients (and the async SDK
+clients holding them) are kept per running event loop: an httpx.AsyncClient
+binds its connections to the loop that first used it, and the app also runs
+coroutines on short-lived loops (asyncio.run in worker threads).
+"""
+
+from __future__ import annotations
+
+import asyncio
+import contextvars
+import json
+import os
+import threading
+import time
+import weakref
+from collections import deque
+from contextlib import asynccontextmanager, contextmanager
+from typing import Any, Callable, Deque, Dict, FrozenSet, Iterator, AsyncIterator, Optional, Tuple
+
+from loguru import logger
+
+
+LLM_RATE_GOVERNOR_ENABLED = os.getenv("LLM_RATE_GOVERNOR_ENABLED", "true").lower() == "true"
+LLM_RATE_GOVERNOR_BACKEND = os.getenv("LLM_RATE_GOVERNOR_BACKEND", "memory").lower()
+LLM_MAX_CONCURRENCY = int(os.getenv("LLM_MAX_CONCURRENCY", "32"))
+LLM_RATE_LIMIT_COOLDOWN_SECONDS = float(os.getenv("LLM_RATE_LIMIT_COOLDOWN_SECONDS", "2"))
+LLM_RATE_LIMIT_MAX_COOLDOWN_SECONDS = float(os.getenv("LLM_RATE_LIMIT_MAX_COOLDOWN_SECONDS", "60"))
+LLM_HTTP_MAX_CONNECTIONS = int(os.getenv("LLM_HTTP_MAX_CONNECTIONS", "64"))
+LLM_HTTP_MAX_KEEPALIVE = int(os.getenv("LLM_HTTP_MAX_KEEPALIVE", "32"))
+LLM_HTTP_KEEPALIVE_EXPIRY = float(os.getenv("LLM_HTTP_KEEPALIVE_EXPIRY", "60"))
+
+# Upper bound for a single wait before re-checking state (guards against
+# missed wake-ups and lets limit changes take effect promptly).
+_MAX_WAIT_SLICE = 1.0
+
+
+def is_rate_limit_error(exc: BaseException) -> bool:
+    """True for HTTP 429 / quota / RESOURCE_EXHAUSTED errors from any provider SDK."""
+    status_code = getattr(exc, "status_code", None) or getattr(exc, "code", None)
+    if status_code == 429:
+        return True
+    message = str(exc).lower()
+    return (
+        "429" in message
+        or "resource_exhausted" in message
+        or "quota" in message
+        or "rate limit" in message
+        or "rate_limit" in message
+    )
+
+
+def retry_after_seconds(exc: BaseException) -> Optional[float]:
+    """Retry-After hint carried by the exception (headers or attribute), if any."""
+    value = getattr(exc, "retry_after", None)
+    if value is None:
+        response = getattr(exc, "response", None)
+        headers = getattr(response, "headers", None)
+        if headers is not None:
+            try:
+                ms = headers.get("retry-after-ms")
+                if ms is not None:
+                    return max(0.0, float(ms) / 1000.0)
+                value = headers.get("retry-after")
+            except Exception:
+                value = None
+    if value is None:
+        return None
+    try:
+        return max(0.0, float(value))
+    except (TypeError, ValueError):
+        return None  # HTTP-date form: fall back to the default cooldown
+
+
+# =============================================================================
+# Token buckets
+# =============================================================================
+
+class TokenBucket:
+    """
+    Local reservation bucket: ``reserve`` debits immediately (possibly into
+    debt) and returns how long the caller must wait before using its share.
+    """
+
+    def __init__(self, rate_per_minute: float, capacity: Optional[float] = None):
+        self.rate = rate_per_minute / 60.0
+        self.capacity = capacity if capacity is not None else float(rate_per_minute)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def reserve(self, amount: float = 1.0) -> float:
+        amount = min(amount, self.capacity)
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self._tokens -= amount
+            if self._tokens >= 0:
+                return 0.0
+            return -self._tokens / self.rate
+
+
+_REDIS_BUCKET_LUA = """
+local t = redis.call('TIME')
+local now = tonumber(t[1]) + tonumber(t[2]) / 1000000
+local rate = tonumber(ARGV[1])
+local capacity = tonumber(ARGV[2])
+local amount = tonumber(ARGV[3])
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(state[1]) or capacity
+local ts = tonumber(state[2]) or now
+tokens = math.min(capacity, tokens + (now - ts) * rate) - amount
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'ts', tostring(now))
+redis.call('EXPIRE', KEYS[1], math.ceil(capacity / rate) + 60)
+if tokens >= 0 then return '0' end
+return tostring(-tokens / rate)
+"""
+
+
+class RedisTokenBucket(TokenBucket):
+    """Same reservation semantics, with state shared through Redis (server clock)."""
+
+    def __init__(self, client: Any, key: str, rate_per_minute: float, capacity: Optional[float] = None):
+        super().__init__(rate_per_minute, capacity)
+        self._key = key
+        self._script = client.register_script(_REDIS_BUCKET_LUA)
+
+    def reserve(self, amount: float = 1.0) -> float:
+        amount = min(amount, self.capacity)
+        try:
+            return float(self._script(keys=[self._key], args=[self.rate, self.capacity, amount]))
+        except Exception as e:
+            logger.warning(f"RateGovernor: Redis bucket {self._key} unavailable, using local: {e}")
+            return super().reserve(amount)
+
+
+# =============================================================================
+# Adaptive concurrency
+# =============================================================================
+
+class AdaptiveConcurrencyLimiter:
+    """
+    AIMD concurrency gate usable from threads and event loops alike.
+
+    Waiters never hold the lock while waiting; every release/limit change
+    wakes all registered waiters, which then re-check under the lock.
+    """
+
+    def __init__(self, max_limit: int, min_limit: int = 1):
+        self.max_limit = max(1, max_limit)
+        self.min_limit = max(1, min(min_limit, self.max_limit))
+        self._limit = float(self.max_limit)
+        self._in_flight = 0
+        self._cooldown_until = 0.0
+        self._lock = threading.Lock()
+        self._waiters: Deque[Callable[[], None]] = deque()
+        self.rate_limited = 0
+
+    @property
+    def limit(self) -> int:
+        return max(self.min_limit, int(self._limit))
+
+    @property
+    def in_flight(self) -> int:
+        return self._in_flight
+
+    def _try_acquire(self) -> Optional[float]:
+        """Caller holds the lock. None = slot taken, else seconds to wait (0 = until release)."""
+        now = time.monotonic()
+        if now < self._cooldown_until:
+            return self._cooldown_until - now
+        if self._in_flight < self.limit:
+            self._in_flight += 1
+            return None
+        return 0.0
+
+    def _wake_all(self) -> None:
+        with self._lock:
+            waiters = list(self._waiters)
+            self._waiters.clear()
+        for wake in waiters:
+            try:
+                wake()
+            except RuntimeError:
+                pass  # event loop already closed
+
+    def acquire(self) -> float:
+        """Block the current thread until a slot is free; returns seconds waited."""
+        started = time.monotonic()
+        while True:
+            with self._lock:
+                wait = self._try_acquire()
+                if wait is None:
+                    return time.monotonic() - started
+                event = threading.Event()
+                self._waiters.append(event.set)
+            event.wait(min(wait or _MAX_WAIT_SLICE, _MAX_WAIT_SLICE))
+
+    async def acquire_async(self) -> float:
+        """Await a free slot without blocking the event loop; returns seconds waited."""
+        loop = asyncio.get_running_loop()
+        started = time.monotonic()
+        while True:
+            with self._lock:
+                wait = self._try_acquire()
+                if wait is None:
+                    return time.monotonic() - started
+                future = loop.create_future()
+                self._waiters.append(lambda f=future: loop.call_soon_threadsafe(_resolve, f))
+            try:
+                await asyncio.wait_for(future, timeout=min(wait or _MAX_WAIT_SLICE, _MAX_WAIT_SLICE))
+            except asyncio.TimeoutError:
+                pass
+
+    def release(self, success: bool = True) -> None:
+        with self._lock:
+            self._in_flight = max(0, self._in_flight - 1)
+            if success and self._limit < self.max_limit:
+                self._limit = min(float(self.max_limit), self._limit + 1.0 / self._limit)
+        self._wake_all()
+
+    def on_rate_limited(self, retry_after: Optional[float]) -> None:
+        """Multiplicative decrease plus a provider-wide pause for Retry-After."""
+        cooldown = retry_after if retry_after is not None else LLM_RATE_LIMIT_COOLDOWN_SECONDS
+        cooldown = min(cooldown, LLM_RATE_LIMIT_MAX_COOLDOWN_SECONDS)
+        with self._lock:
+            self.rate_limited += 1
+            self._limit = max(float(self.min_limit), self._limit / 2.0)
+            self._cooldown_until = max(self._cooldown_until, time.monotonic() + cooldown)
+
+    def cooldown_remaining(self) -> float:
+        return max(0.0, self._cooldown_until - time.monotonic())
+
+
+def _resolve(future: "asyncio.Future[None]") -> None:
+    if not future.done():
+        future.set_result(None)
+
+
+# =============================================================================
+# Governor
+# =============================================================================
+
+# Providers whose slot is already held by the current task/thread. Nested calls
+# (e.g. a stream falling back to call_anthropic_async -> call_anthropic in an
+# executor with a copied context) reuse the outer slot instead of deadlocking.
+_held_providers: contextvars.ContextVar[FrozenSet[str]] = contextvars.ContextVar(
+    "llm_rate_governor_held", default=frozenset()
+)
+
+
+def _env_number(name: str, default: float = 0.0) -> float:
+    try:
+        return float(os.getenv(name, "") or default)
+    except ValueError:
+        return default
+
+
+class RateGovernor:
+    """Per-provider/model pacing shared by every call_*/stream_* entry point."""
+
+    def __init__(self, backend: str = LLM_RATE_GOVERNOR_BACKEND):
+        self._lock = threading.Lock()
+        self._limiters: Dict[str, AdaptiveConcurrencyLimiter] = {}
+        self._buckets: Dict[Tuple[str, str], Tuple[Optional[TokenBucket], Optional[TokenBucket]]] = {}
+        self._waited: Dict[str, float] = {}
+        self._calls: Dict[str, int] = {}
+        self._redis = self._connect_redis() if backend == "redis" else None
+        try:
+            self._model_limits: Dict[str, Dict[str, float]] = json.loads(os.getenv("LLM_RATE_LIMITS", "") or "{}")
+        except ValueError:
+            logger.warning("RateGovernor: LLM_RATE_LIMITS is not valid JSON, ignoring")
+            self._model_limits = {}
+
+    @staticmethod
+    def _connect_redis() -> Optional[Any]:
+        try:
+            import redis
+
+            return redis.Redis.from_url(
+                os.getenv("REDIS_URL", "redis://localhost:6379/0"), socket_timeout=0.5
+            )
+        except Exception as e:
+            logger.warning(f"RateGovernor: Redis backend unavailable, using local buckets: {e}")
+            return None
+
+    # ------------------------------------------------------------------
+    # Limits
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def _env_prefix(provider: str) -> str:
+        return provider.upper().replace("-", "_")
+
+    def limiter(self, provider: str) -> AdaptiveConcurrencyLimiter:
+        limiter = self._limiters.get(provider)
+        if limiter is None:
+            with self._lock:
+                limiter = self._limiters.get(provider)
+                if limiter is None:
+                    max_limit = int(_env_number(
+                        f"{self._env_prefix(provider)}_MAX_CONCURRENCY", LLM_MAX_CONCURRENCY
+                    ))
+                    limiter = AdaptiveConcurrencyLimiter(max_limit or LLM_MAX_CONCURRENCY)
+                    self._limiters[provider] = limiter
+        return limiter
+
+    def _rpm_tpm(self, provider: str, model: str) -> Tuple[float, float]:
+        override = self._model_limits.get(f"{provider}:{model}") or {}
+        prefix = self._env_prefix(provider)
+        rpm = float(override.get("rpm", _env_number(f"{prefix}_RPM")))
+        tpm = float(override.get("tpm", _env_number(f"{prefix}_TPM")))
+        if rpm <= 0 and provider in ("anthropic", "vertex-anthropic"):
+            # Legacy knob: minimum spacing between Claude calls
+            interval = _env_number("CLAUDE_MIN_INTERVAL_SECONDS")
+            if interval > 0:
+                return 60.0 / interval, tpm
+        return rpm, tpm
+
+    def _make_bucket(self, kind: str, provider: str, model: str, per_minute: float) -> Optional[TokenBucket]:
+        if per_minute <= 0:
+            return None
+        # RPM bursts are capped at one request when spacing is tight (< 60 rpm)
+        capacity = max(1.0, min(per_minute, per_minute / 60.0 * 10)) if kind == "rpm" else per_minute
+        if self._redis is not None:
+            key = f"ratelimit:{provider}:{model}:{kind}"
+            return RedisTokenBucket(self._redis, key, per_minute, capacity)
+        return TokenBucket(per_minute, capacity)
+
+    def _buckets_for(self, provider: str, model: str) -> Tuple[Optional[TokenBucket], Optional[TokenBucket]]:
+        key = (provider, model)
+        buckets = self._buckets.get(key)
+        if buckets is None:
+            with self._lock:
+                buckets = self._buckets.get(key)
+                if buckets is None:
+                    rpm, tpm = self._rpm_tpm(provider, model)
+                    buckets = (
+                        self._make_bucket("rpm", provider, model, rpm),
+                        self._make_bucket("tpm", provider, model, tpm),
+                    )
+                    self._buckets[key] = buckets
+        return buckets
+
+    def _reserve(self, provider: str, model: str, tokens: int) -> float:
+        rpm_bucket, tpm_bucket = self._buckets_for(provider, model)
+        wait = rpm_bucket.reserve(1.0) if rpm_bucket else 0.0
+        if tpm_bucket and tokens > 0:
+            wait = max(wait, tpm_bucket.reserve(float(tokens)))
+        return wait
+
+    def _account(self, provider: str, waited: float) -> None:
+        with self._lock:
+            self._calls[provider] = self._calls.get(provider, 0) + 1
+            self._waited[provider] = self._waited.get(provider, 0.0) + waited
+
+    # ------------------------------------------------------------------
+    # Feedback
+    # ------------------------------------------------------------------
+
+    def report_error(self, provider: str, exc: BaseException) -> None:
+        """Feed a provider error back into the limiter (no-op unless it is a 429)."""
+        if is_rate_limit_error(exc):
+            retry_after = retry_after_seconds(exc)
+            self.limiter(provider).on_rate_limited(retry_after)
+            logger.warning(
+                f"RateGovernor: {provider} rate-limited; concurrency -> {self.limiter(provider).limit}"
+                + (f", retry-after {retry_after:.1f}s" if retry_after is not None else "")
+            )
+
+    # ------------------------------------------------------------------
+    # Acquisition
+    # ------------------------------------------------------------------
+
+    @contextmanager
+    def limit(self, provider: str, model: str = "", tokens: int = 0) -> Iterator[None]:
+        """Sync slot: waits for the rate reservation and a concurrency slot."""
+        held = _held_providers.get()
+        if not LLM_RATE_GOVERNOR_ENABLED or provider in held:
+            try:
+                yield
+            except BaseException as exc:
+                self.report_error(provider, exc)
+                raise
+            return
+
+        limiter = self.limiter(provider)
+        waited = self._reserve(provider, model, tokens)
+        if waited > 0:
+            time.sleep(waited)
+        waited += limiter.acquire()
+        self._account(provider, waited)
+        token = _held_providers.set(held | {provider})
+        success = False
+        try:
+            yield
+            success = True
+        except BaseException as exc:
+            self.report_error(provider, exc)
+            raise
+        finally:
+            _held_providers.reset(token)
+            limiter.release(success)
+
+    async def _wait_async(
+        self, provider: str, model: str, tokens: int, limiter: AdaptiveConcurrencyLimiter
+    ) -> float:
+        if self._redis is not None:
+            waited = await asyncio.to_thread(self._reserve, provider, model, tokens)
+        else:
+            waited = self._reserve(provider, model, tokens)
+        if waited > 0:
+            await asyncio.sleep(waited)
+        waited += await limiter.acquire_async()
+        self._account(provider, waited)
+        return waited
+
+    @asynccontextmanager
+    async def alimit(self, provider: str, model: str = "", tokens: int = 0) -> AsyncIterator[None]:
+        """Async slot: same as ``limit`` but never blocks the event loop."""
+        held = _held_providers.get()
+        if not LLM_RATE_GOVERNOR_ENABLED or provider in held:
+            try:
+                yield
+            except BaseException as exc:
+                self.report_error(provider, exc)
+                raise
+            return
+
+        limiter = self.limiter(provider)
+        await self._wait_async(provider, model, tokens, limiter)
+        token = _held_providers.set(held | {provider})
+        success = False
+        try:
+            yield
+            success = True
+        except BaseException as exc:
+            self.report_error(provider, exc)
+            raise
+        finally:
+            _held_providers.reset(token)
+            limiter.release(success)
+
+    async def stream(
+        self, provider: str, model: str, tokens: int, agen: AsyncIterator[Any]
+    ) -> AsyncIterator[Any]:
+        """
+        Hold one slot for the whole lifetime of a streaming generator.
+
+        The slot is only marked as held while the inner generator runs, not
+        while the consumer handles each chunk, so the consumer's own calls
+        are still governed.
+        """
+        held = _held_providers.get()
+        if not LLM_RATE_GOVERNOR_ENABLED or provider in held:
+            async for item in agen:
+                yield item
+            return
+
+        limiter = self.limiter(provider)
+        await self._wait_async(provider, model, tokens, limiter)
+        success = False
+        try:
+            while True:
+                token = _held_providers.set(held | {provider})
+                try:
+                    item = await agen.__anext__()
+                except StopAsyncIteration:
+                    break
+                finally:
+                    _held_providers.reset(token)
+                yield item
+            success = True
+        except BaseException as exc:
+            self.report_error(provider, exc)
+            raise
+        finally:
+            await agen.aclose()
+            limiter.release(success)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            providers = dict(self._limiters)
+            calls = dict(self._calls)
+            waited = dict(self._waited)
+        return {
+            "enabled": LLM_RATE_GOVERNOR_ENABLED,
+            "backend": "redis" if self._redis is not None else "memory",
+            "providers": {
+                name: {
+                    "in_flight": limiter.in_flight,
+                    "concurrency_limit": limiter.limit,
+                    "max_concurrency": limiter.max_limit,
+                    "cooldown_remaining_s": round(limiter.cooldown_remaining(), 2),
+                    "rate_limited": limiter.rate_limited,
+                    "calls": calls.get(name, 0),
+                    "throttled_seconds": round(waited.get(name, 0.0), 3),
+                }
+                for name, limiter in providers.items()
+            },
+        }
+
+
+# =============================================================================
+# Pooled HTTP clients
+# =============================================================================
+
+_http_clients: Dict[str, Any] = {}
+_http_lock = threading.RLock()  # loop_local_client factories may build pooled clients
+# loop -> {key: client}; entries go away with their loop
+_loop_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[str, Any]]" = (
+    weakref.WeakKeyDictionary()
+)
+_no_loop_clients: Dict[str, Any] = {}
+
+
+def _http_limits() -> Any:
+    import httpx
+
+    return httpx.Limits(
+        max_connections=LLM_HTTP_MAX_CONNECTIONS,
+        max_keepalive_connections=LLM_HTTP_MAX_KEEPALIVE,
+        keepalive_expiry=LLM_HTTP_KEEPALIVE_EXPIRY,
+    )
+
+
+def pooled_http_client(provider: str) -> Optional[Any]:
+    """Shared keep-alive httpx.Client for a provider (None if httpx is unavailable)."""
+    client = _http_clients.get(provider)
+    if client is None:
+        with _http_lock:
+            client = _http_clients.get(provider)
+            if client is None:
+                try:
+                    import httpx
+
+                    client = httpx.Client(limits=_http_limits(), follow_redirects=True)
+                except Exception as e:
+                    logger.warning(f"RateGovernor: pooled HTTP client unavailable: {e}")
+                    return None
+                _http_clients[provider] = client
+    return client
+
+
+def loop_local_client(key: str, factory: Callable[[], Any]) -> Any:
+    """
+    ``factory()`` cached per running event loop under ``key``.
+
+    Outside of a running loop a single process-wide instance is kept. A
+    ``None`` result is not cached.
+    """
+    try:
+        loop: Optional[asyncio.AbstractEventLoop] = asyncio.get_running_loop()
+    except RuntimeError:
+        loop = None
+    with _http_lock:
+        clients = _no_loop_clients if loop is None else _loop_clients.setdefault(loop, {})
+        client = clients.get(key)
+        if client is None:
+            client = factory()
+            if client is not None:
+                clients[key] = client
+    return client
+
+
+def _new_async_http_client() -> Optional[Any]:
+    try:
+        import httpx
+
+        return httpx.AsyncClient(limits=_http_limits(), follow_redirects=True)
+    except Exception as e:
+        logger.warning(f"RateGovernor: pooled async HTTP client unavailable: {e}")
+        return None
+
+
+def pooled_async_http_client(provider: str) -> Optional[Any]:
+    """Keep-alive httpx.AsyncClient for a provider on the running loop (None if httpx is unavailable)."""
+    return loop_local_client(f"httpx:{provider}", _new_async_http_client)
+
+
+# =============================================================================
+# Singleton
+# =============================================================================
+
+_instance: Optional[RateGovernor] = None
+_instance_lock = threading.Lock()
+
+
+def get_rate_governor() -> RateGovernor:
+    """Process-wide governor."""
+    global _instance
+    if _instance is None:
+        with _instance_lock:
+            if _instance is None:
+                _instance = RateGovernor()
+    return _instance
+
+
+def reset_rate_governor() -> None:
+    """Reset singleton (for testing)."""
+    global _instance
+    _instance = None
@@ -0,0 +1,126 @@
+"""
+Agendador de redação por seção para o comitê multi-agente.
+
+debate_all_sections_node disparava todas as seções de uma vez com
+asyncio.gather: numa petição de 30 seções isso significa 30 × (drafters +
+críticos + juiz) chamadas simultâneas, e as seções de fechamento (pedidos,
+conclusão) eram redigidas sem ver o mérito já escrito.
+
+O agendador trata o sumário como um DAG:
+
+- Seções independentes rodam em paralelo, limitadas a
+  SECTION_MAX_CONCURRENCY por vez (o RateGovernor continua limitando cada
+  provedor individualmente).
+- Seções de fechamento dependem das seções de mérito anteriores e só começam
+  quando elas terminam, recebendo o texto final delas como contexto.
+- Os resultados voltam na ordem do sumário, e ``on_ready_in_order`` é
+  chamado assim que o prefixo contíguo de seções fica pronto, para que o
+  streaming ao usuário siga a ordem do documento sem esperar o fim.
+
+O tempo total tende ao da cadeia mais lenta (mérito mais lento + fechamento),
+não à soma das seções.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import os
+import re
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Sequence, Set, TypeVar
+
+from loguru import logger
+
+T = TypeVar("T")
+
+SECTION_MAX_CONCURRENCY = int(os.getenv("SECTION_MAX_CONCURRENCY", "6"))
+
+_CLOSING_SECTION_RE = re.compile(
+    r"\b(pedidos?|requerimentos?|conclus[aã]o|considera[cç][oõ]es\s+finais|dispositivo|"
+    r"s[ií]ntese\s+final|encerramento|fecho|valor\s+da\s+causa)\b",
+    re.IGNORECASE,
+)
+
+
+def is_closing_section(title: str) -> bool:
+    return bool(_CLOSING_SECTION_RE.search(title or ""))
+
+
+def build_section_dependencies(outline: Sequence[str]) -> List[List[int]]:
+    """
+    Dependências de cada seção (índices anteriores que precisam estar prontos).
+
+    Seções de fechamento dependem de todas as seções anteriores que não são
+    de fechamento; as demais são independentes.
+    """
+    deps: List[List[int]] = []
+    body: List[int] = []
+    for i, title in enumerate(outline):
+        if is_closing_section(str(title)):
+            deps.append(list(body))
+        else:
+            deps.append([])
+            body.append(i)
+    return deps
+
+
+async def run_section_dag(
+    count: int,
+    dependencies: Sequence[Sequence[int]],
+    worker: Callable[[int, Dict[int, T]], Awaitable[T]],
+    *,
+    max_concurrency: int = SECTION_MAX_CONCURRENCY,
+    on_complete: Optional[Callable[[int, T], None]] = None,
+    on_ready_in_order: Optional[Callable[[int, T], None]] = None,
+) -> List[T]:
+    """
+    Executa ``worker(i, resultados_das_dependencias)`` para cada seção.
+
+    Dependências só podem apontar para índices menores (outras são ignoradas),
+    o que garante um DAG. Se um worker levanta exceção, as demais seções são
+    canceladas e a exceção é propagada.
+    """
+    deps = [sorted({j for j in (dependencies[i] if i < len(dependencies) else []) if 0 <= j < i})
+            for i in range(count)]
+    results: List[Any] = [None] * count
+    done = [asyncio.Event() for _ in range(count)]
+    failed: Set[int] = set()
+    semaphore = asyncio.Semaphore(max(1, max_concurrency))
+    next_in_order = 0
+
+    def _flush_in_order() -> None:
+        nonlocal next_in_order
+        while next_in_order < count and done[next_in_order].is_set() and next_in_order not in failed:
+            if on_ready_in_order is not None:
+                try:
+                    on_ready_in_order(next_in_order, results[next_in_order])
+                except Exception as exc:
+                    logger.warning(f"Section scheduler: on_ready_in_order failed: {exc}")
+            next_in_order += 1
+
+    async def _run(i: int) -> None:
+        for j in deps[i]:
+            await done[j].wait()
+        async with semaphore:
+            try:
+                results[i] = await worker(i, {j: results[j] for j in deps[i] if j not in failed})
+            except BaseException:
+                failed.add(i)
+                done[i].set()
+                raise
+        done[i].set()
+        if on_complete is not None:
+            try:
+                on_complete(i, results[i])
+            except Exception as exc:
+                logger.warning(f"Section scheduler: on_complete failed: {exc}")
+        _flush_in_order()
+
+    tasks = [asyncio.create_task(_run(i)) for i in range(count)]
+    try:
+        await asyncio.gather(*tasks)
+    except BaseException:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        raise
+    return results
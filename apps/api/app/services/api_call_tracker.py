@@ -139,37 +139,12 @@ def get_points_total() -> int:
         return 0
 
 
-async def _persist_api_call(payload: Dict[str, Any]) -> None:
-    try:
-        from app.core.database import AsyncSessionLocal
-        from app.models.api_usage import ApiCallUsage
-    except Exception as exc:
-        logger.warning(f"ApiCallUsage unavailable: {exc}")
-        return
-
-    try:
-        async with AsyncSessionLocal() as session:
-            session.add(ApiCallUsage(**payload))
-            await session.commit()
-    except Exception as exc:
-        logger.warning(f"Failed to persist api call usage: {exc}")
-
-
 def _schedule_persist(payload: Dict[str, Any]) -> None:
-    try:
-        loop = asyncio.get_running_loop()
-    except RuntimeError:
-        loop = None
-
-    if loop and loop.is_running():
-        loop.create_task(_persist_api_call(payload))
-        return
-
-    if _background_loop and _background_loop.is_running():
-        asyncio.run_coroutine_threadsafe(_persist_api_call(payload), _background_loop)
-        return
+    """Hand the row to the buffered writer (bulk inserts from the main loop)."""
+    from app.services.api_usage_writer import get_api_usage_writer
 
-    logger.debug("ApiCallTracker: no event loop available to persist usage.")
+    loop = _background_loop if _background_loop and _background_loop.is_running() else None
+    get_api_usage_writer().enqueue(payload, loop=loop)
 
 
 def record_api_call(
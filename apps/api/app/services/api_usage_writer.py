@@ -0,0 +1,392 @@
+"""
+Buffered writer for ApiCallUsage rows.
+
+record_api_call() used to spawn one task per call, each opening its own
+session to commit a single row. Deep-research jobs make hundreds of calls, so
+that meant hundreds of short transactions competing with user queries for
+pool connections. Rows are now queued in memory and flushed by one background
+task as bulk inserts, every API_USAGE_FLUSH_ROWS rows or API_USAGE_FLUSH_MS
+milliseconds, whichever comes first.
+
+- Backpressure: above API_USAGE_MAX_PENDING queued rows, the overflow is
+  appended to the spill file instead of growing memory.
+- DB down: a batch that fails to insert is appended to the spill file
+  (JSONL) and replayed after the next successful flush.
+- Shutdown: flush_and_stop() drains the queue (or spills what cannot be
+  written) from the application lifespan.
+- Pending points per user are tracked until committed, so quota checks that
+  query ApiCallUsage can add rows that are still buffered. Spilled rows stay
+  counted (seeded from an existing spill file at startup) until their replay
+  commits them.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import os
+import threading
+from collections import deque
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Deque, Dict, List, Optional
+
+from app.core.time_utils import utcnow
+
+logger = logging.getLogger("ApiUsageWriter")
+
+API_USAGE_FLUSH_ROWS = int(os.getenv("API_USAGE_FLUSH_ROWS", "200"))
+API_USAGE_FLUSH_MS = int(os.getenv("API_USAGE_FLUSH_MS", "500"))
+API_USAGE_MAX_PENDING = int(os.getenv("API_USAGE_MAX_PENDING", "20000"))
+
+Sink = Callable[[List[Dict[str, Any]]], Awaitable[None]]
+
+
+def _default_spill_path() -> str:
+    env_path = os.getenv("API_USAGE_SPILL_PATH")
+    if env_path:
+        return env_path
+    try:
+        from app.core.config import settings
+
+        base = Path(settings.LOCAL_STORAGE_PATH)
+    except Exception:
+        base = Path("./storage")
+    return str(base / "api_usage" / "spill.jsonl")
+
+
+async def _insert_usage_rows(rows: List[Dict[str, Any]]) -> None:
+    """Bulk insert (one executemany, one commit) into api_call_usage."""
+    from sqlalchemy import insert
+
+    from app.core.database import AsyncSessionLocal
+    from app.models.api_usage import ApiCallUsage
+
+    async with AsyncSessionLocal() as session:
+        await session.execute(insert(ApiCallUsage), rows)
+        await session.commit()
+
+
+def _row_points(row: Dict[str, Any]) -> int:
+    meta = row.get("meta")
+    if not isinstance(meta, dict):
+        return 0
+    try:
+        return int(meta.get("points") or 0)
+    except (TypeError, ValueError):
+        return 0
+
+
+class ApiUsageWriter:
+    """In-memory queue of ApiCallUsage rows, drained in bulk by a background task."""
+
+    def __init__(
+        self,
+        sink: Optional[Sink] = None,
+        *,
+        flush_rows: int = API_USAGE_FLUSH_ROWS,
+        flush_ms: int = API_USAGE_FLUSH_MS,
+        max_pending: int = API_USAGE_MAX_PENDING,
+        spill_path: Optional[str] = None,
+    ):
+        self._sink = sink or _insert_usage_rows
+        self.flush_rows = max(1, flush_rows)
+        self.flush_interval = max(0.01, flush_ms / 1000.0)
+        self.max_pending = max(self.flush_rows, max_pending)
+        self.spill_path = Path(spill_path or _default_spill_path())
+
+        self._lock = threading.Lock()
+        self._queue: Deque[Dict[str, Any]] = deque()
+        self._pending_points: Dict[str, int] = {}
+        self._spilled_points: Dict[str, int] = {}
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._task: Optional[asyncio.Task] = None
+        self._wake: Optional[asyncio.Event] = None
+        self._flush_lock: Optional[asyncio.Lock] = None
+        self._stopping = False
+
+        self._written = 0
+        self._batches = 0
+        self._spilled = 0
+        self._replayed = 0
+        self._failures = 0
+        self._seed_spilled_points()
+
+    # ------------------------------------------------------------------
+    # Producer side (any thread)
+    # ------------------------------------------------------------------
+
+    def enqueue(self, row: Dict[str, Any], loop: Optional[asyncio.AbstractEventLoop] = None) -> None:
+        """Queue one row; never blocks on the database."""
+        row = dict(row)
+        row.setdefault("created_at", utcnow())
+        overflow: List[Dict[str, Any]] = []
+        with self._lock:
+            self._queue.append(row)
+            self._add_pending(row, 1)
+            while len(self._queue) > self.max_pending:
+                dropped = self._queue.popleft()
+                self._add_pending(dropped, -1)
+                overflow.append(dropped)
+            queued = len(self._queue)
+        if overflow:
+            self._spill(overflow)
+        self._ensure_flusher(loop)
+        if queued >= self.flush_rows:
+            self._notify()
+
+    def pending_points(self, user_id: Optional[str]) -> int:
+        """Points of this user's rows that are queued but not yet committed."""
+        if not user_id:
+            return 0
+        key = str(user_id)
+        with self._lock:
+            return self._pending_points.get(key, 0) + self._spilled_points.get(key, 0)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            queued = len(self._queue)
+        return {
+            "queued": queued,
+            "written": self._written,
+            "batches": self._batches,
+            "spilled": self._spilled,
+            "replayed": self._replayed,
+            "failures": self._failures,
+            "flush_rows": self.flush_rows,
+            "flush_ms": int(self.flush_interval * 1000),
+        }
+
+    def _add_pending(
+        self, row: Dict[str, Any], sign: int, points_by_user: Optional[Dict[str, int]] = None
+    ) -> None:
+        """Caller holds self._lock. Defaults to the queued-rows counter."""
+        counter = self._pending_points if points_by_user is None else points_by_user
+        user_id = row.get("user_id")
+        points = _row_points(row)
+        if not user_id or not points:
+            return
+        key = str(user_id)
+        value = counter.get(key, 0) + sign * points
+        if value > 0:
+            counter[key] = value
+        else:
+            counter.pop(key, None)
+
+    def _seed_spilled_points(self) -> None:
+        """Count rows left in the spill files by a previous process."""
+        for path in (self.spill_path, self.spill_path.with_suffix(".replaying")):
+            try:
+                if path.exists():
+                    for row in _read_spill(path):
+                        self._add_pending(row, 1, self._spilled_points)
+            except Exception as exc:
+                logger.warning(f"ApiUsageWriter: could not read spill file {path}: {exc}")
+
+    # ------------------------------------------------------------------
+    # Background flusher
+    # ------------------------------------------------------------------
+
+    def _ensure_flusher(self, loop: Optional[asyncio.AbstractEventLoop]) -> None:
+        if self._stopping:
+            return
+        task = self._task
+        if task is not None and not task.done() and self._loop is not None and not self._loop.is_closed():
+            return
+        if loop is None or not loop.is_running():
+            try:
+                loop = asyncio.get_running_loop()
+            except RuntimeError:
+                loop = None
+        if loop is None:
+            return  # rows stay queued until a loop shows up (or spill on overflow)
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        if running is loop:
+            self._start(loop)
+        else:
+            loop.call_soon_threadsafe(self._start, loop)
+
+    def _start(self, loop: asyncio.AbstractEventLoop) -> None:
+        """Runs on `loop`; idempotent."""
+        if self._task is not None and not self._task.done() and self._loop is loop:
+            return
+        self._loop = loop
+        self._wake = asyncio.Event()
+        self._flush_lock = asyncio.Lock()
+        self._task = loop.create_task(self._run())
+
+    def _notify(self) -> None:
+        loop, wake = self._loop, self._wake
+        if loop is None or wake is None or loop.is_closed():
+            return
+        try:
+            loop.call_soon_threadsafe(wake.set)
+        except RuntimeError:
+            pass
+
+    async def _run(self) -> None:
+        wake = self._wake
+        while not self._stopping:
+            try:
+                await asyncio.wait_for(wake.wait(), timeout=self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            wake.clear()
+            try:
+                await self.flush()
+            except Exception as exc:  # pragma: no cover - flush() handles its own errors
+                logger.warning(f"ApiUsageWriter: flush loop error: {exc}")
+
+    async def flush(self) -> int:
+        """Write everything queued now; returns the number of rows committed."""
+        lock = self._flush_lock or asyncio.Lock()
+        async with lock:
+            written = 0
+            while True:
+                with self._lock:
+                    if not self._queue:
+                        break
+                    batch = [
+                        self._queue.popleft()
+                        for _ in range(min(self.flush_rows, len(self._queue)))
+                    ]
+                try:
+                    await self._sink(batch)
+                except Exception as exc:
+                    self._failures += 1
+                    logger.warning(f"ApiUsageWriter: bulk insert of {len(batch)} rows failed, spilling: {exc}")
+                    with self._lock:
+                        for row in batch:
+                            self._add_pending(row, -1)
+                    await asyncio.to_thread(self._spill, batch)
+                    return written
+                with self._lock:
+                    for row in batch:
+                        self._add_pending(row, -1)
+                written += len(batch)
+                self._written += len(batch)
+                self._batches += 1
+            if written and self.spill_path.exists():
+                await self._replay_spill()
+            return written
+
+    async def flush_and_stop(self) -> None:
+        """Final drain for application shutdown."""
+        self._stopping = True
+        if self._wake is not None:
+            self._wake.set()
+        task = self._task
+        if task is not None and not task.done():
+            try:
+                await asyncio.wait_for(task, timeout=self.flush_interval + 5)
+            except (asyncio.TimeoutError, asyncio.CancelledError):
+                task.cancel()
+            except Exception:
+                pass
+        await self.flush()
+        with self._lock:
+            leftover = list(self._queue)
+            self._queue.clear()
+            self._pending_points.clear()
+        if leftover:
+            self._spill(leftover)
+
+    # ------------------------------------------------------------------
+    # Spill file
+    # ------------------------------------------------------------------
+
+    def _spill(self, rows: List[Dict[str, Any]], *, count_points: bool = True) -> None:
+        """Append rows to the spill file; their points stay pending until replayed."""
+        try:
+            self.spill_path.parent.mkdir(parents=True, exist_ok=True)
+            with self.spill_path.open("a", encoding="utf-8") as fh:
+                for row in rows:
+                    fh.write(json.dumps(row, ensure_ascii=False, default=_json_default) + "\n")
+            self._spilled += len(rows)
+        except Exception as exc:
+            logger.error(f"ApiUsageWriter: could not spill {len(rows)} usage rows: {exc}")
+            if not count_points:
+                with self._lock:
+                    for row in rows:
+                        self._add_pending(row, -1, self._spilled_points)
+            return
+        if count_points:
+            with self._lock:
+                for row in rows:
+                    self._add_pending(row, 1, self._spilled_points)
+
+    async def _replay_spill(self) -> None:
+        replaying = self.spill_path.with_suffix(".replaying")
+        try:
+            if not replaying.exists():
+                self.spill_path.replace(replaying)
+            rows = await asyncio.to_thread(_read_spill, replaying)
+        except Exception as exc:
+            logger.warning(f"ApiUsageWriter: could not read spill file: {exc}")
+            return
+        for start in range(0, len(rows), self.flush_rows):
+            batch = rows[start:start + self.flush_rows]
+            try:
+                await self._sink(batch)
+            except Exception as exc:
+                self._failures += 1
+                logger.warning(f"ApiUsageWriter: spill replay failed, will retry: {exc}")
+                # Already counted in _spilled_points
+                await asyncio.to_thread(lambda: self._spill(rows[start:], count_points=False))
+                break
+            self._replayed += len(batch)
+            with self._lock:
+                for row in batch:
+                    self._add_pending(row, -1, self._spilled_points)
+        try:
+            replaying.unlink()
+        except FileNotFoundError:
+            pass
+
+
+def _json_default(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return {"__datetime__": value.isoformat()}
+    return str(value)
+
+
+def _read_spill(path: Path) -> List[Dict[str, Any]]:
+    rows: List[Dict[str, Any]] = []
+    with path.open("r", encoding="utf-8") as fh:
+        for line in fh:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                row = json.loads(line)
+            except ValueError:
+                continue
+            created_at = row.get("created_at")
+            if isinstance(created_at, dict) and "__datetime__" in created_at:
+                row["created_at"] = datetime.fromisoformat(created_at["__datetime__"])
+            rows.append(row)
+    return rows
+
+
+# Singleton
+_writer: Optional[ApiUsageWriter] = None
+_writer_lock = threading.Lock()
+
+
+def get_api_usage_writer() -> ApiUsageWriter:
+    global _writer
+    if _writer is None:
+        with _writer_lock:
+            if _writer is None:
+                _writer = ApiUsageWriter()
+    return _writer
+
+
+def reset_api_usage_writer() -> None:
+    """Reset singleton (for testing)."""
+    global _writer
+    _writer = None
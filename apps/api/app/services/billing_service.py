@@ -604,6 +604,12 @@ async def get_points_used_for_period(
             total += int(value)
         except (TypeError, ValueError):
             continue
+    # Rows still buffered by the usage writer are not visible to the query yet
+    try:
+        from app.services.api_usage_writer import get_api_usage_writer
+        total += get_api_usage_writer().pending_points(user_id)
+    except Exception:
+        pass
     return max(0, int(total))
 
 
@@ -254,6 +254,7 @@ Retorne JSON com:
             "Voce e um assistente juridico especializado em organizacao de documentos. "
             "Retorne APENAS JSON valido."
         ),
+        cache=True,
     )
 
     try:
@@ -3,12 +3,21 @@ Processador de Documentos com Suporte a Contexto Ilimitado
 Sistema que divide documentos grandes em chunks e processa em paralelo
 """
 
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Iterable, Iterator, Union, Tuple, Callable, Awaitable
 from dataclasses import dataclass
+from collections import deque
+import asyncio
 import hashlib
+import itertools
+import re
 from loguru import logger
 
 from app.core.config import settings
+from app.utils.token_counter import count_tokens, split_by_tokens
+
+# Quebras usadas pelo chunker em streaming (o separador fica no fim da unidade)
+_PARAGRAPH_BREAK = re.compile(r"\n[ \t]*\n")
+_SENTENCE_BREAK = re.compile(r"(?<=[.!?;:])\s+")
 
 
 @dataclass
@@ -22,7 +31,10 @@ class DocumentChunk:
     
     @property
     def token_count(self) -> int:
-        """Estima número de tokens (1 token ≈ 4 caracteres)"""
+        """Tokens do chunk (contagem real se o chunker registrou; senão 1 token ≈ 4 caracteres)"""
+        counted = self.metadata.get("token_count") if self.metadata else None
+        if isinstance(counted, int):
+            return counted
         return len(self.content) // 4
 
 
@@ -57,63 +69,160 @@ class DocumentChunker:
         Divide texto em chunks baseado em tokens
         Mantém overlap para preservar contexto
         """
+        chunks = list(self.iter_token_chunks(text, metadata))
+        logger.info(f"Documento dividido em {len(chunks)} chunks")
+        return chunks
+
+    def iter_token_chunks(
+        self,
+        source: Union[str, Iterable[str]],
+        metadata: Dict[str, Any] = None,
+        *,
+        paged: Optional[bool] = None,
+    ) -> Iterator[DocumentChunk]:
+        """
+        Gera chunks sob demanda a partir de um texto ou de um iterável de
+        páginas/pedaços de texto, com contagem real de tokens.
+
+        O texto é dividido em unidades (parágrafos; frases quando o parágrafo
+        excede chunk_size; fatias de tokens em último caso), cada unidade é
+        tokenizada uma única vez e os chunks são montados por soma de tokens.
+        O overlap reaproveita as últimas unidades do chunk anterior (até
+        `overlap` tokens). Só o chunk corrente e o trecho incompleto da
+        página atual ficam em memória.
+
+        Quando `source` é um iterável, por padrão cada item é uma página
+        (fim de página = quebra de parágrafo) e os chunks recebem
+        page_start/page_end (1-based). Com paged=False os itens são pedaços
+        arbitrários de um stream de texto (ex.: leitura em blocos de arquivo).
+        """
         if metadata is None:
             metadata = {}
-        
-        # Estimar tokens (1 token ≈ 4 caracteres)
-        chars_per_chunk = self.chunk_size * 4
-        chars_overlap = self.overlap * 4
-        
-        chunks: List[DocumentChunk] = []
+        if isinstance(source, str):
+            paged = False
+            pieces: Iterable[str] = (source,)
+        else:
+            paged = True if paged is None else paged
+            pieces = source
+
+        buffer: deque = deque()  # (text, tokens, start_char, page)
+        buffer_tokens = 0
+        fresh_units = 0  # unidades ainda não emitidas (exclui overlap)
         position = 0
+
+        def _emit() -> DocumentChunk:
+            nonlocal buffer_tokens, fresh_units, position
+            units = list(buffer)
+            content = "".join(u[0] for u in units).strip()
+            first, last = units[0], units[-1]
+            chunk_meta = {
+                **metadata,
+                "start_char": first[2],
+                "end_char": last[2] + len(last[0]),
+                "chunk_index": position,
+                "token_count": buffer_tokens,
+            }
+            if paged:
+                chunk_meta["page_start"] = first[3]
+                chunk_meta["page_end"] = last[3]
+            chunk = DocumentChunk(
+                id=self._generate_chunk_id(content, position),
+                content=content,
+                position=position,
+                metadata=chunk_meta,
+            )
+            position += 1
+
+            # Overlap: manter o maior sufixo de unidades que cabe em `overlap`
+            carried = 0
+            keep = 0
+            for unit in reversed(units):
+                if carried + unit[1] > self.overlap or keep + 1 >= len(units):
+                    break
+                carried += unit[1]
+                keep += 1
+            while len(buffer) > keep:
+                buffer.popleft()
+            buffer_tokens = carried
+            fresh_units = 0
+            return chunk
+
+        def _push(units: Iterable[Tuple[str, int, int, int]]) -> Iterator[DocumentChunk]:
+            nonlocal buffer_tokens, fresh_units
+            for unit in units:
+                if not unit[0].strip():
+                    continue
+                if fresh_units and buffer_tokens + unit[1] > self.chunk_size:
+                    yield _emit()
+                    # Sem espaço para overlap + unidade: descarta o overlap
+                    while buffer and buffer_tokens + unit[1] > self.chunk_size:
+                        buffer_tokens -= buffer.popleft()[1]
+                buffer.append(unit)
+                buffer_tokens += unit[1]
+                fresh_units += 1
+
+        offset = 0  # posição (chars) do início de `pending` no texto completo
+        pending = ""
+        pending_page = 1
+        # Limite do trecho sem quebra de parágrafo retido entre pedaços do stream
+        max_pending = max(self.chunk_size * 16, 4096)
+
+        for piece_number, piece in enumerate(pieces, start=1):
+            if not piece:
+                continue
+            if paged:
+                piece += "\n\n"
+            if not pending:
+                pending_page = piece_number
+            pending += piece
+            cut = 0
+            for match in _PARAGRAPH_BREAK.finditer(pending):
+                cut = match.end()
+            if len(pending) - cut > max_pending:
+                cut = len(pending)
+            if cut == 0:
+                continue
+            complete, pending = pending[:cut], pending[cut:]
+            yield from _push(self._split_units(complete, offset, pending_page))
+            offset += cut
+            pending_page = piece_number
+
+        if pending:
+            yield from _push(self._split_units(pending, offset, pending_page))
+        if fresh_units:
+            yield _emit()
+
+    def _split_units(
+        self, text: str, offset: int, page: int,
+    ) -> Iterator[Tuple[str, int, int, int]]:
+        """Divide texto em unidades (parágrafo → frase → tokens) com contagem de tokens."""
+        for para, para_start in self._split_keep(text, _PARAGRAPH_BREAK):
+            tokens = count_tokens(para)
+            if tokens <= self.chunk_size:
+                yield para, tokens, offset + para_start, page
+                continue
+            for sent, sent_start in self._split_keep(para, _SENTENCE_BREAK):
+                sent_tokens = count_tokens(sent)
+                if sent_tokens <= self.chunk_size:
+                    yield sent, sent_tokens, offset + para_start + sent_start, page
+                    continue
+                piece_start = offset + para_start + sent_start
+                for piece in split_by_tokens(sent, self.chunk_size):
+                    yield piece, count_tokens(piece), piece_start, page
+                    piece_start += len(piece)
+
+    @staticmethod
+    def _split_keep(text: str, pattern: "re.Pattern[str]") -> Iterator[Tuple[str, int]]:
+        """Divide mantendo o separador no fim de cada parte; retorna (parte, início)."""
         start = 0
-        
-        while start < len(text):
-            # Calcular fim do chunk
-            end = start + chars_per_chunk
-            
-            # Se não é o último chunk, tentar quebrar em parágrafo ou frase
-            if end < len(text):
-                # Procurar quebra de parágrafo
-                paragraph_break = text.rfind('\n\n', start + chars_per_chunk - 500, end + 500)
-                if paragraph_break > start:
-                    end = paragraph_break
-                else:
-                    # Procurar quebra de frase
-                    sentence_break = text.rfind('. ', start + chars_per_chunk - 200, end + 200)
-                    if sentence_break > start:
-                        end = sentence_break + 1
-            
-            # Extrair chunk
-            chunk_text = text[start:end].strip()
-            
-            if chunk_text:
-                chunk_id = self._generate_chunk_id(chunk_text, position)
-                
-                chunks.append(DocumentChunk(
-                    id=chunk_id,
-                    content=chunk_text,
-                    position=position,
-                    metadata={
-                        **metadata,
-                        "start_char": start,
-                        "end_char": end,
-                        "chunk_index": position,
-                    }
-                ))
-                
-                position += 1
-            
-            # Próximo chunk com overlap
-            start = end - chars_overlap if end < len(text) else end
-            
-            # Evitar loop infinito
-            if start >= len(text):
-                break
-        
-        logger.info(f"Documento dividido em {len(chunks)} chunks")
-        return chunks
-    
+        for match in pattern.finditer(text):
+            end = match.end()
+            if end > start:
+                yield text[start:end], start
+                start = end
+        if start < len(text):
+            yield text[start:], start
+
     def chunk_by_pages(
         self,
         pages: List[str],
@@ -259,15 +368,25 @@ class UnlimitedContextProcessor:
     1. Map-Reduce: Processa chunks em paralelo e consolida
     2. Hierarchical: Cria resumos hierárquicos
     3. Rolling: Mantém janela deslizante de contexto
+
+    Os chunks são consumidos em streaming (DocumentChunker.iter_token_chunks)
+    com no máximo `max_concurrency` chamadas de IA em voo, então o documento
+    nunca é materializado como lista de chunks.
     """
     
-    def __init__(self):
+    def __init__(
+        self,
+        max_concurrency: int = 8,
+        map_fn: Optional[Callable[[DocumentChunk, str], Awaitable[Dict[str, Any]]]] = None,
+    ):
         self.chunker = DocumentChunker()
+        self.max_concurrency = max(1, max_concurrency)
+        self._map_fn = map_fn
         logger.info("UnlimitedContextProcessor inicializado")
     
     async def process_large_document(
         self,
-        text: str,
+        text: Union[str, Iterable[str]],
         task: str,
         strategy: str = "map-reduce",
         metadata: Dict[str, Any] = None
@@ -276,12 +395,13 @@ class UnlimitedContextProcessor:
         Processa documento grande com estratégia escolhida
         
         Args:
-            text: Texto completo do documento
+            text: Texto completo do documento, ou iterável de páginas
             task: Tarefa a realizar (resumir, analisar, etc)
             strategy: "map-reduce", "hierarchical", ou "rolling"
             metadata: Metadados adicionais
         """
-        logger.info(f"Processando documento grande - Estratégia: {strategy}, Tamanho: {len(text)} chars")
+        size = f"{len(text)} chars" if isinstance(text, str) else "stream de páginas"
+        logger.info(f"Processando documento grande - Estratégia: {strategy}, Tamanho: {size}")
         
         if strategy == "map-reduce":
             return await self._process_map_reduce(text, task, metadata)
@@ -291,10 +411,61 @@ class UnlimitedContextProcessor:
             return await self._process_rolling(text, task, metadata)
         else:
             raise ValueError(f"Estratégia desconhecida: {strategy}")
+
+    async def _map_chunk(self, chunk: DocumentChunk, task: str) -> Dict[str, Any]:
+        """MAP de um chunk (usa map_fn quando configurado)."""
+        if self._map_fn is not None:
+            result = await self._map_fn(chunk, task)
+            return {"chunk_id": chunk.id, "position": chunk.position, **result}
+        # Aqui chamaria o agente IA para processar o chunk
+        # result = await ai_agent.process(chunk.content, task)
+        return {
+            "chunk_id": chunk.id,
+            "position": chunk.position,
+            "summary": f"[Resumo do chunk {chunk.position}]",  # Placeholder
+        }
+
+    async def _map_stream(
+        self,
+        chunks: Iterable[DocumentChunk],
+        task: str,
+        stats: Dict[str, int],
+    ) -> List[Dict[str, Any]]:
+        """
+        Aplica _map_chunk sobre um stream de chunks com no máximo
+        max_concurrency chamadas em voo. O próximo chunk só é gerado quando
+        há vaga, então a memória fica limitada à janela em voo.
+        Resultados retornam ordenados por posição.
+        """
+        results: List[Dict[str, Any]] = []
+        in_flight: set = set()
+
+        try:
+            for chunk in chunks:
+                stats["chunks"] = stats.get("chunks", 0) + 1
+                stats["tokens"] = stats.get("tokens", 0) + chunk.token_count
+                stats["chars"] = stats.get("chars", 0) + len(chunk.content)
+                if len(in_flight) >= self.max_concurrency:
+                    done, in_flight = await asyncio.wait(in_flight, return_when=asyncio.FIRST_COMPLETED)
+                    results.extend(t.result() for t in done)
+                in_flight.add(asyncio.ensure_future(self._map_chunk(chunk, task)))
+
+            while in_flight:
+                done, in_flight = await asyncio.wait(in_flight, return_when=asyncio.FIRST_COMPLETED)
+                results.extend(t.result() for t in done)
+        finally:
+            # Falha (ou cancelamento) de um chunk: cancela os que ainda estão em voo
+            for t in in_flight:
+                t.cancel()
+            if in_flight:
+                await asyncio.gather(*in_flight, return_exceptions=True)
+
+        results.sort(key=lambda r: r["position"])
+        return results
     
     async def _process_map_reduce(
         self,
-        text: str,
+        text: Union[str, Iterable[str]],
         task: str,
         metadata: Dict[str, Any] = None
     ) -> Dict[str, Any]:
@@ -304,41 +475,31 @@ class UnlimitedContextProcessor:
         """
         logger.info("Executando estratégia Map-Reduce")
         
-        # 1. Dividir em chunks
-        chunks = self.chunker.chunk_by_tokens(text, metadata)
-        
-        # 2. MAP: Processar cada chunk (em paralelo)
-        # TODO: Implementar processamento paralelo com asyncio.gather
-        chunk_results = []
-        for chunk in chunks:
-            # Aqui chamaria o agente IA para processar o chunk
-            # result = await ai_agent.process(chunk.content, task)
-            result = {
-                "chunk_id": chunk.id,
-                "position": chunk.position,
-                "summary": f"[Resumo do chunk {chunk.position}]",  # Placeholder
-            }
-            chunk_results.append(result)
+        # 1-2. Dividir em chunks (streaming) e MAP com concorrência limitada
+        stats: Dict[str, int] = {}
+        chunk_results = await self._map_stream(
+            self.chunker.iter_token_chunks(text, metadata), task, stats
+        )
         
         # 3. REDUCE: Consolidar resultados
         # TODO: Chamar IA para consolidar todos os resumos
         final_result = {
             "strategy": "map-reduce",
-            "total_chunks": len(chunks),
+            "total_chunks": stats.get("chunks", 0),
             "chunk_results": chunk_results,
             "consolidated": "[Resultado consolidado de todos os chunks]",  # Placeholder
             "metadata": {
-                "original_size": len(text),
-                "total_tokens": sum(c.token_count for c in chunks),
+                "original_size": len(text) if isinstance(text, str) else stats.get("chars", 0),
+                "total_tokens": stats.get("tokens", 0),
             }
         }
         
-        logger.info(f"Map-Reduce concluído - {len(chunks)} chunks processados")
+        logger.info(f"Map-Reduce concluído - {stats.get('chunks', 0)} chunks processados")
         return final_result
     
     async def _process_hierarchical(
         self,
-        text: str,
+        text: Union[str, Iterable[str]],
         task: str,
         metadata: Dict[str, Any] = None
     ) -> Dict[str, Any]:
@@ -349,28 +510,37 @@ class UnlimitedContextProcessor:
         logger.info("Executando estratégia Hierarchical")
         
         levels = []
-        current_text = text
+        current: Union[str, Iterable[str]] = text
         level = 0
+        original_size = 0
         
         # Continuar até conseguir processar em um único chunk
-        while len(current_text) > self.chunker.chunk_size * 4:
-            logger.info(f"Nível {level}: {len(current_text)} chars")
-            
-            # Dividir em chunks
-            chunks = self.chunker.chunk_by_tokens(current_text, metadata)
+        while True:
+            stream = self.chunker.iter_token_chunks(current, metadata)
+            head = []
+            for chunk in stream:
+                head.append(chunk)
+                if len(head) > 1:
+                    break
+            if level == 0:
+                original_size = len(text) if isinstance(text, str) else sum(len(c.content) for c in head)
+            if len(head) <= 1:
+                break
+
+            logger.info(f"Nível {level}: processando em streaming")
             
-            # Resumir cada chunk
-            summaries = []
-            for chunk in chunks:
-                # TODO: Chamar IA para resumir
-                summary = f"[Resumo do chunk {chunk.position}]"  # Placeholder
-                summaries.append(summary)
+            # Resumir cada chunk (concorrência limitada)
+            stats: Dict[str, int] = {}
+            results = await self._map_stream(itertools.chain(head, stream), task, stats)
+            summaries = [r.get("summary", "") for r in results]
+            if level == 0 and not isinstance(text, str):
+                original_size = stats.get("chars", 0)
             
             # Consolidar resumos deste nível
-            current_text = "\n\n".join(summaries)
+            current = "\n\n".join(summaries)
             levels.append({
                 "level": level,
-                "num_chunks": len(chunks),
+                "num_chunks": stats.get("chunks", 0),
                 "summaries": summaries,
             })
             
@@ -390,7 +560,7 @@ class UnlimitedContextProcessor:
             "levels": levels,
             "final_analysis": final_analysis,
             "metadata": {
-                "original_size": len(text),
+                "original_size": original_size,
             }
         }
         
@@ -399,7 +569,7 @@ class UnlimitedContextProcessor:
     
     async def _process_rolling(
         self,
-        text: str,
+        text: Union[str, Iterable[str]],
         task: str,
         metadata: Dict[str, Any] = None
     ) -> Dict[str, Any]:
@@ -409,14 +579,16 @@ class UnlimitedContextProcessor:
         """
         logger.info("Executando estratégia Rolling Window")
         
-        chunks = self.chunker.chunk_by_tokens(text, metadata)
-        
         results = []
-        context_window = []
         window_size = 3  # Manter últimos 3 chunks no contexto
+        context_window: deque = deque(maxlen=window_size)
+        total_tokens = 0
+        total_chars = 0
         
-        for i, chunk in enumerate(chunks):
-            logger.info(f"Processando chunk {i+1}/{len(chunks)} com contexto")
+        for i, chunk in enumerate(self.chunker.iter_token_chunks(text, metadata)):
+            logger.info(f"Processando chunk {i+1} com contexto")
+            total_tokens += chunk.token_count
+            total_chars += len(chunk.content)
             
             # Montar contexto (chunks anteriores)
             context = "\n\n".join([c.content for c in context_window])
@@ -433,23 +605,21 @@ class UnlimitedContextProcessor:
             
             # Atualizar janela de contexto
             context_window.append(chunk)
-            if len(context_window) > window_size:
-                context_window.pop(0)
         
         # Consolidar resultados mantendo a narrativa
         final_result = {
             "strategy": "rolling",
-            "total_chunks": len(chunks),
+            "total_chunks": len(results),
             "window_size": window_size,
             "results": results,
             "consolidated": "[Resultado consolidado mantendo narrativa]",  # Placeholder
             "metadata": {
-                "original_size": len(text),
-                "total_tokens": sum(c.token_count for c in chunks),
+                "original_size": len(text) if isinstance(text, str) else total_chars,
+                "total_tokens": total_tokens,
             }
         }
         
-        logger.info(f"Rolling Window concluído - {len(chunks)} chunks processados")
+        logger.info(f"Rolling Window concluído - {len(results)} chunks processados")
         return final_result
 
 
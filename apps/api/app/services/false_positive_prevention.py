@@ -11,8 +11,11 @@ from typing import Dict, Any, List, Optional, Tuple
 from dataclasses import dataclass, field
 from enum import Enum
 from difflib import SequenceMatcher, get_close_matches
+from functools import lru_cache
 from loguru import logger
 
+from app.services.fuzzy_anchor import cached_anchor_index
+
 
 class ConfidenceLevel(str, Enum):
     """Confidence levels for HIL detections."""
@@ -889,20 +892,8 @@ class FalsePositivePrevention:
         return list(set(keywords))
 
     def _extract_legal_references(self, text: str) -> List[str]:
-        """Extracts legal references from text."""
-        refs = []
-
-        patterns = [
-            r'[Ll]ei\s*(?:n[º°]?\s*)?([\d.]+(?:/\d+)?)',
-            r'[Aa]rt(?:igo)?\.?\s*(\d+)',
-            r'[Ss]úmula\s*(?:[Vv]inculante\s*)?\s*(\d+)',
-        ]
-
-        for pattern in patterns:
-            matches = re.findall(pattern, text)
-            refs.extend(matches)
-
-        return list(set(refs))
+        """Extracts legal references from text (cached per text: raw is reused by every issue)."""
+        return list(_extract_legal_references_cached(text))
 
     def _reference_exists_in_text(
         self,
@@ -998,28 +989,11 @@ class FalsePositivePrevention:
         if needle in haystack:
             return True, needle
 
-        # Normalize for comparison
-        needle_norm = re.sub(r'\s+', ' ', needle.lower().strip())
-
-        # Sliding window search
-        needle_len = len(needle_norm)
-        haystack_norm = re.sub(r'\s+', ' ', haystack.lower())
-
-        best_match = ""
-        best_ratio = 0.0
-
-        # Check in windows
-        for i in range(0, len(haystack_norm) - needle_len + 1, needle_len // 4):
-            window = haystack_norm[i:i + needle_len + 20]  # Slightly larger window
-            ratio = SequenceMatcher(None, needle_norm, window[:len(needle_norm)]).ratio()
-
-            if ratio > best_ratio:
-                best_ratio = ratio
-                # Get original text (not normalized)
-                best_match = haystack[i:i + needle_len + 20][:len(needle)]
-
-        if best_ratio >= threshold:
-            return True, best_match
+        # Indexed fuzzy search (index is built once per haystack)
+        index = cached_anchor_index(haystack)
+        match = index.find(needle, threshold)
+        if match:
+            return True, index.text(match)
 
         return False, ""
 
@@ -1070,5 +1044,22 @@ class FalsePositivePrevention:
             return ConfidenceLevel.VERY_LOW
 
 
+@lru_cache(maxsize=16)
+def _extract_legal_references_cached(text: str) -> Tuple[str, ...]:
+    refs = []
+
+    patterns = [
+        r'[Ll]ei\s*(?:n[º°]?\s*)?([\d.]+(?:/\d+)?)',
+        r'[Aa]rt(?:igo)?\.?\s*(\d+)',
+        r'[Ss]úmula\s*(?:[Vv]inculante\s*)?\s*(\d+)',
+    ]
+
+    for pattern in patterns:
+        matches = re.findall(pattern, text)
+        refs.extend(matches)
+
+    return tuple(set(refs))
+
+
 # Singleton instance with default thresholds
 false_positive_prevention = FalsePositivePrevention()
@@ -12,13 +12,35 @@ Este módulo resolve isso através de matching fuzzy baseado em:
 1. Extração de dígitos (ignora formatação)
 2. Padrões regex flexíveis para cada tipo de referência
 3. Validação cruzada RAW vs Formatado
+
+Para textos longos, as buscas usam um ReferenceIndex construído uma única vez
+por texto: todas as sequências numéricas são indexadas por dígitos, e cada
+consulta só verifica o contexto (palavra-chave, limites) das posições
+candidatas, em vez de rodar uma dúzia de regex sobre o texto inteiro.
 """
 import re
 import logging
+from collections import defaultdict
+from functools import lru_cache
 from typing import List, Optional, Tuple, Dict, Any
 
 logger = logging.getLogger(__name__)
 
+# Textos a partir deste tamanho são consultados via ReferenceIndex
+INDEX_MIN_CHARS = 20_000
+# Referências com mais dígitos que isso caem no caminho regex
+_MAX_INDEXED_DIGITS = 24
+# Quanto texto antes do número é examinado em busca da palavra-chave
+_PREFIX_LOOKBEHIND_CHARS = 80
+
+# Sequência de dígitos com os mesmos separadores aceitos por build_fuzzy_pattern
+_DIGIT_RUN_RE = re.compile(r'\d(?:[\s./-]*\d)*')
+_DIGIT_GROUP_RE = re.compile(r'\d+')
+
+
+def _is_word_char(ch: str) -> bool:
+    return ch.isalnum() or ch == "_"
+
 
 class FidelityMatcher:
     """Verifica presença de referências legais com tolerância a formatação."""
@@ -136,7 +158,15 @@ class FidelityMatcher:
         """
         if not reference or not text:
             return False, None
-        
+
+        if len(text) >= INDEX_MIN_CHARS:
+            spans = cls.reference_index(text).search(reference, ref_type)
+            if spans is not None:
+                if spans:
+                    start, end = spans[0]
+                    return True, text[start:end]
+                return False, None
+
         digits = cls.extract_digits(reference)
         if not digits:
             # Se não tem dígitos, tenta match exato
@@ -184,6 +214,19 @@ class FidelityMatcher:
         
         return False, None
     
+    @classmethod
+    def reference_index(cls, text: str) -> "ReferenceIndex":
+        """Índice de referências do texto (construído uma vez e reaproveitado)."""
+        return _cached_reference_index(text)
+
+    @classmethod
+    def _compiled_patterns(cls, ref_type: str) -> List[Tuple["re.Pattern[str]", "re.Pattern[str]", bool]]:
+        """
+        Divide os PATTERNS do tipo em (prefixo, sufixo, aceita_separadores),
+        compilados uma vez, para verificar o contexto de uma posição do índice.
+        """
+        return _compiled_type_patterns(ref_type)
+
     @classmethod
     def validate_issue(
         cls, 
@@ -461,61 +504,61 @@ class FidelityMatcher:
             
             patterns = formatted_patterns
         
-        # Extrai snippets do RAW
-        for pattern in patterns:
-            try:
-                for match in re.finditer(pattern, raw_text, flags=re.IGNORECASE):
-                    if len(result["raw_snippets"]) >= max_snippets:
-                        break
-                    
-                    start, end = match.span()
-                    snippet_start = max(0, start - window_chars)
-                    snippet_end = min(len(raw_text), end + window_chars)
-                    snippet = raw_text[snippet_start:snippet_end].strip()
-                    
-                    # Evita duplicatas
-                    if snippet not in [s["snippet"] for s in result["raw_snippets"]]:
-                        result["raw_snippets"].append({
-                            "snippet": snippet,
-                            "match": match.group(0),
-                            "start": start,
-                            "end": end,
-                        })
-                        result["found_in_raw"] = True
-                
-                if result["raw_snippets"]:
-                    break  # Encontrou com este padrão, não precisa tentar outros
-            except re.error:
-                continue
-        
-        # Extrai snippets do formatado
-        for pattern in patterns:
-            try:
-                for match in re.finditer(pattern, formatted_text, flags=re.IGNORECASE):
-                    if len(result["formatted_snippets"]) >= max_snippets:
-                        break
-                    
-                    start, end = match.span()
-                    snippet_start = max(0, start - window_chars)
-                    snippet_end = min(len(formatted_text), end + window_chars)
-                    snippet = formatted_text[snippet_start:snippet_end].strip()
-                    
-                    # Evita duplicatas
-                    if snippet not in [s["snippet"] for s in result["formatted_snippets"]]:
-                        result["formatted_snippets"].append({
-                            "snippet": snippet,
-                            "match": match.group(0),
-                            "start": start,
-                            "end": end,
-                        })
-                        result["found_in_formatted"] = True
-                
-                if result["formatted_snippets"]:
-                    break
-            except re.error:
-                continue
+        for key, text in (("raw", raw_text), ("formatted", formatted_text)):
+            snippets = cls._collect_snippets(
+                reference, text or "", ref_type, patterns, window_chars, max_snippets
+            )
+            result[f"{key}_snippets"] = snippets
+            result[f"found_in_{key}"] = bool(snippets)
         
         return result
+
+    @classmethod
+    def _collect_snippets(
+        cls,
+        reference: str,
+        text: str,
+        ref_type: str,
+        patterns: List[str],
+        window_chars: int,
+        max_snippets: int,
+    ) -> List[Dict[str, Any]]:
+        """Snippets do primeiro padrão que casa no texto (índice ou regex)."""
+        spans: Optional[List[Tuple[int, int]]] = None
+        if len(text) >= INDEX_MIN_CHARS:
+            spans = cls.reference_index(text).search(
+                reference, ref_type, literal_bounded=False, max_matches=None
+            )
+
+        if spans is None:
+            spans = []
+            for pattern in patterns:
+                try:
+                    spans = [m.span() for m in re.finditer(pattern, text, flags=re.IGNORECASE)]
+                except re.error:
+                    continue
+                if spans:
+                    break  # Encontrou com este padrão, não precisa tentar outros
+
+        snippets: List[Dict[str, Any]] = []
+        seen = set()
+        for start, end in spans:
+            if len(snippets) >= max_snippets:
+                break
+            snippet_start = max(0, start - window_chars)
+            snippet_end = min(len(text), end + window_chars)
+            snippet = text[snippet_start:snippet_end].strip()
+
+            # Evita duplicatas
+            if snippet not in seen:
+                seen.add(snippet)
+                snippets.append({
+                    "snippet": snippet,
+                    "match": text[start:end],
+                    "start": start,
+                    "end": end,
+                })
+        return snippets
     
     @classmethod
     def enrich_issue_with_evidence(
@@ -583,6 +626,137 @@ class FidelityMatcher:
         return issue
 
 
+class ReferenceIndex:
+    """
+    Índice de sequências numéricas de um texto.
+
+    Cada sequência de dígitos (com separadores ".", "/", "-" ou espaço) é
+    registrada sob todas as chaves de dígitos que os padrões de
+    FidelityMatcher conseguiriam casar nela, com a posição no texto. Uma
+    consulta vira um lookup por dígitos seguido de checagens locais de
+    palavra-chave e limites de palavra, preservando a ordem de prioridade dos
+    padrões de exists_in_text.
+    """
+
+    def __init__(self, text: str):
+        self.text = text
+        spans: Dict[str, List[Tuple[int, int]]] = defaultdict(list)
+        for run in _DIGIT_RUN_RE.finditer(text):
+            groups = [m.span() for m in _DIGIT_GROUP_RE.finditer(text, run.start(), run.end())]
+            for i, (group_start, _) in enumerate(groups):
+                key = ""
+                for start, end in groups[i:]:
+                    key += text[start:end]
+                    if len(key) > _MAX_INDEXED_DIGITS:
+                        break
+                    spans[key].append((group_start, end))
+        self._spans = dict(spans)
+
+    def _is_boundary(self, pos: int) -> bool:
+        """Equivalente a \\b na posição pos."""
+        text = self.text
+        before = pos > 0 and _is_word_char(text[pos - 1])
+        after = pos < len(text) and _is_word_char(text[pos])
+        return before != after
+
+    def search(
+        self,
+        reference: str,
+        ref_type: str = "auto",
+        literal_bounded: bool = True,
+        max_matches: Optional[int] = 1,
+    ) -> Optional[List[Tuple[int, int]]]:
+        """
+        Posições (start, end) do primeiro padrão que casa, na mesma ordem de
+        prioridade de exists_in_text. Retorna None quando a referência não pode
+        ser respondida pelo índice (sem dígitos, muito longa, etc.) e o
+        chamador deve usar o caminho regex.
+        """
+        digits = FidelityMatcher.extract_digits(reference)
+        if not digits or len(digits) > _MAX_INDEXED_DIGITS:
+            return None
+
+        first_digit = re.search(r'\d', reference).start()
+        last_digit = len(reference) - re.search(r'\d', reference[::-1]).start()
+        if not _DIGIT_RUN_RE.fullmatch(reference, first_digit, last_digit):
+            return None  # literal com texto entre os números: regex
+
+        candidates = self._spans.get(digits)
+        if not candidates:
+            return []
+
+        limit = max_matches if max_matches is not None else len(candidates)
+        text = self.text
+
+        if ref_type == "auto":
+            ref_type = FidelityMatcher.detect_reference_type(reference)
+
+        # 1. Padrões do tipo (palavra-chave + número)
+        for prefix_re, suffix_re, fuzzy in FidelityMatcher._compiled_patterns(ref_type):
+            found: List[Tuple[int, int]] = []
+            for start, end in candidates:
+                if not fuzzy and end - start != len(digits):
+                    continue
+                suffix = suffix_re.match(text, end)
+                if suffix is None:
+                    continue
+                prefix = prefix_re.search(text, max(0, start - _PREFIX_LOOKBEHIND_CHARS), start)
+                if prefix is None:
+                    continue
+                found.append((prefix.start(), suffix.end()))
+                if len(found) >= limit:
+                    break
+            if found:
+                return found
+
+        # 2. Referência literal
+        ref_lower = reference.lower()
+        found = []
+        for start, _ in candidates:
+            literal_start = start - first_digit
+            literal_end = literal_start + len(reference)
+            if literal_start < 0 or text[literal_start:literal_end].lower() != ref_lower:
+                continue
+            if literal_bounded and not (
+                self._is_boundary(literal_start) and self._is_boundary(literal_end)
+            ):
+                continue
+            found.append((literal_start, literal_end))
+            if len(found) >= limit:
+                break
+        if found:
+            return found
+
+        # 3. Só os dígitos (exatos, depois com separadores)
+        bounded = [
+            (start, end) for start, end in candidates
+            if self._is_boundary(start) and self._is_boundary(end)
+        ]
+        exact = [(start, end) for start, end in bounded if end - start == len(digits)]
+        return (exact or bounded)[:limit]
+
+
+@lru_cache(maxsize=4)
+def _cached_reference_index(text: str) -> ReferenceIndex:
+    return ReferenceIndex(text)
+
+
+@lru_cache(maxsize=None)
+def _compiled_type_patterns(ref_type: str) -> List[Tuple["re.Pattern[str]", "re.Pattern[str]", bool]]:
+    compiled = []
+    for template in FidelityMatcher.PATTERNS.get(ref_type, []):
+        for placeholder, fuzzy in (("{digits}", False), ("{fuzzy_digits}", True)):
+            if placeholder in template:
+                prefix, suffix = template.split(placeholder, 1)
+                compiled.append((
+                    re.compile(rf'(?:{prefix})\Z', re.IGNORECASE),
+                    re.compile(suffix, re.IGNORECASE),
+                    fuzzy,
+                ))
+                break
+    return compiled
+
+
 def validate_issues_batch(
     issues: List[Dict[str, Any]],
     raw_text: str,
@@ -0,0 +1,225 @@
+"""
+Fuzzy Anchor Index
+
+Approximate-substring search over long documents (apostilas, transcrições).
+
+Instead of sliding a SequenceMatcher window across the whole haystack for
+every needle, the haystack is normalized and indexed by word once. Each
+needle votes for candidate regions through the words it shares with the
+document (rare words weigh more), and only the top few regions are verified
+with rapidfuzz's partial_ratio_alignment. Matches are reported in the
+coordinates of the ORIGINAL haystack, so callers can slice or replace text
+directly.
+"""
+
+import bisect
+import math
+import re
+from collections import defaultdict
+from dataclasses import dataclass
+from difflib import SequenceMatcher
+from functools import lru_cache
+from typing import Dict, Iterable, List, Optional, Tuple
+
+try:
+    from rapidfuzz import fuzz as _rf_fuzz
+except ImportError:  # pragma: no cover - rapidfuzz is in requirements.txt
+    _rf_fuzz = None
+
+
+_WORD_RE = re.compile(r"\w+")
+_SPACE_RE = re.compile(r"\s+")
+
+
+def normalize_for_match(text: str) -> str:
+    """Lowercase and collapse whitespace (same normalization used for needles)."""
+    return _SPACE_RE.sub(" ", text.lower().strip())
+
+
+@dataclass(frozen=True)
+class AnchorMatch:
+    """A fuzzy match located in the original haystack."""
+    start: int
+    end: int
+    score: float  # 0.0 - 1.0
+
+
+class FuzzyAnchorIndex:
+    """
+    Word index over a haystack for fast approximate-substring lookups.
+
+    Build once per document version and reuse it for every issue/fix that
+    has to be anchored in that document.
+    """
+
+    def __init__(
+        self,
+        haystack: str,
+        top_k: int = 5,
+        max_common_ratio: float = 0.02,
+    ):
+        self.haystack = haystack
+        self.top_k = top_k
+
+        lowered = haystack.lower()
+        if len(lowered) != len(haystack):
+            # A few code points expand on lower() (e.g. "İ"); keep offsets 1:1
+            lowered = "".join(ch if len(ch.lower()) != 1 else ch.lower() for ch in haystack)
+
+        # Normalized text (whitespace runs -> single space) plus breakpoints
+        # mapping normalized offsets back to the original string.
+        parts: List[str] = []
+        self._norm_starts: List[int] = [0]
+        self._orig_starts: List[int] = [0]
+        norm_pos = 0
+        prev = 0
+        for m in _SPACE_RE.finditer(lowered):
+            segment = lowered[prev:m.start()]
+            parts.append(segment)
+            parts.append(" ")
+            norm_pos += len(segment)
+            self._norm_starts.append(norm_pos)
+            self._orig_starts.append(m.start())
+            norm_pos += 1
+            self._norm_starts.append(norm_pos)
+            self._orig_starts.append(m.end())
+            prev = m.end()
+        parts.append(lowered[prev:])
+        self.norm = "".join(parts)
+
+        self._word_starts: List[int] = []
+        self._word_ends: List[int] = []
+        postings: Dict[str, List[int]] = defaultdict(list)
+        for i, m in enumerate(_WORD_RE.finditer(self.norm)):
+            self._word_starts.append(m.start())
+            self._word_ends.append(m.end())
+            postings[m.group()].append(i)
+        self._postings = dict(postings)
+
+        n_words = len(self._word_starts)
+        self._max_df = max(50, int(n_words * max_common_ratio))
+        self._n_words = n_words
+
+    # ------------------------------------------------------------------
+    # Offsets
+    # ------------------------------------------------------------------
+
+    def to_original(self, norm_offset: int) -> int:
+        """Map an offset in the normalized text to the original haystack."""
+        k = bisect.bisect_right(self._norm_starts, norm_offset) - 1
+        base_norm = self._norm_starts[k]
+        base_orig = self._orig_starts[k]
+        if k % 2 == 1:
+            # Inside a collapsed whitespace run: it has length 1 in `norm`
+            return base_orig
+        return base_orig + (norm_offset - base_norm)
+
+    # ------------------------------------------------------------------
+    # Search
+    # ------------------------------------------------------------------
+
+    def _candidate_regions(self, needle_words: List[str]) -> List[Tuple[int, int]]:
+        """Rank word-aligned regions of the haystack by shared (weighted) words."""
+        n = len(needle_words)
+        bucket = max(2, n // 4)
+        votes: Dict[int, float] = defaultdict(float)
+
+        usable = [
+            (j, w) for j, w in enumerate(needle_words)
+            if 0 < len(self._postings.get(w, ())) <= self._max_df
+        ]
+        if not usable:
+            usable = [(j, w) for j, w in enumerate(needle_words) if w in self._postings]
+
+        for j, word in usable:
+            positions = self._postings[word]
+            weight = math.log1p(self._n_words / len(positions))
+            for p in positions:
+                votes[(p - j) // bucket] += weight
+
+        if not votes:
+            return []
+
+        # Smooth over neighbouring diagonals to tolerate insertions/deletions
+        smoothed = {
+            b: votes.get(b - 1, 0.0) + v + votes.get(b + 1, 0.0) for b, v in votes.items()
+        }
+        best = sorted(smoothed, key=smoothed.__getitem__, reverse=True)
+
+        slack = bucket + max(2, n // 4)
+        regions: List[Tuple[int, int]] = []
+        for b in best:
+            first = max(0, b * bucket - slack)
+            last = min(self._n_words - 1, b * bucket + n + slack)
+            if first > last:
+                continue
+            if any(first <= r_last and last >= r_first for r_first, r_last in regions):
+                continue
+            regions.append((first, last))
+            if len(regions) >= self.top_k:
+                break
+        return [(self._word_starts[a], self._word_ends[b]) for a, b in regions]
+
+    @staticmethod
+    def _align(needle: str, region: str) -> Tuple[float, int, int]:
+        """Best alignment of needle inside region -> (score 0..1, start, end)."""
+        if _rf_fuzz is not None:
+            res = _rf_fuzz.partial_ratio_alignment(needle, region)
+            return res.score / 100.0, res.dest_start, res.dest_end
+
+        size = len(needle)
+        best = (0.0, 0, 0)
+        step = max(1, size // 8)
+        for i in range(0, max(1, len(region) - size + 1), step):
+            ratio = SequenceMatcher(None, needle, region[i:i + size]).ratio()
+            if ratio > best[0]:
+                best = (ratio, i, min(len(region), i + size))
+        return best
+
+    def find(self, needle: str, threshold: float = 0.80) -> Optional[AnchorMatch]:
+        """Locate `needle` approximately; None when no region reaches `threshold`."""
+        needle_norm = normalize_for_match(needle or "")
+        if not needle_norm or not self.norm:
+            return None
+
+        exact = self.norm.find(needle_norm)
+        if exact >= 0:
+            end = exact + len(needle_norm)
+            return AnchorMatch(self.to_original(exact), self.to_original(end), 1.0)
+
+        needle_words = _WORD_RE.findall(needle_norm)
+        if needle_words:
+            regions = self._candidate_regions(needle_words)
+        else:
+            regions = [(0, len(self.norm))]
+
+        best: Optional[Tuple[float, int, int]] = None
+        for start, end in regions:
+            score, a, b = self._align(needle_norm, self.norm[start:end])
+            if best is None or score > best[0]:
+                best = (score, start + a, start + b)
+
+        if best is None or best[0] < threshold or best[2] <= best[1]:
+            return None
+        score, start, end = best
+        return AnchorMatch(self.to_original(start), self.to_original(end), score)
+
+    def find_many(
+        self, needles: Iterable[str], threshold: float = 0.80
+    ) -> Dict[str, Optional[AnchorMatch]]:
+        """Resolve several needles against the same index in one pass."""
+        results: Dict[str, Optional[AnchorMatch]] = {}
+        for needle in needles:
+            if needle not in results:
+                results[needle] = self.find(needle, threshold)
+        return results
+
+    def text(self, match: AnchorMatch) -> str:
+        """Original haystack text covered by `match`."""
+        return self.haystack[match.start:match.end]
+
+
+@lru_cache(maxsize=4)
+def cached_anchor_index(haystack: str) -> FuzzyAnchorIndex:
+    """Shared index for documents queried by many validators in a row."""
+    return FuzzyAnchorIndex(haystack)
@@ -466,6 +466,14 @@ class JobManager:
             if not payload:
                 return {}
             return deepcopy(payload)
+
+    def get_api_points_total(self, job_id: str) -> Optional[int]:
+        """Points spent so far by the job, without copying the whole counters dict."""
+        if not job_id:
+            return None
+        with self._event_lock:
+            payload = self._api_counters.get(job_id)
+            return int(payload["points_total"]) if payload else None
     
     # ------------------------------------------------------------------
     # Centralised SQLite connection — WAL + busy_timeout avoid lock
@@ -171,6 +171,7 @@ class OutlookAddinService:
             prompt=prompt,
             model=get_api_model_name("gemini-3-flash"),
             system_instruction=system_prompt,
+            cache=True,
         )
 
         try:
@@ -16,11 +16,15 @@ Integração com a página /minuta:
 from __future__ import annotations
 
 import asyncio
+import hashlib
+import inspect
 import json
 import logging
+import os
 import uuid
+import zlib
 from datetime import datetime, timezone
-from typing import Any, Dict, List, Optional, Tuple
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple, Union
 
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
@@ -50,6 +54,7 @@ from app.services.ai.agent_clients import (
     call_vertex_gemini_async,
     call_anthropic_async,
 )
+from app.services.ai.llm_response_cache import LLMResponseCache, build_l2_tier
 
 logger = logging.getLogger("PlaybookService")
 
@@ -82,6 +87,25 @@ CLASSIFICATION_WEIGHTS: Dict[str, float] = {
     "not_found": 0.6,  # cláusula ausente é risco moderado
 }
 
+# Extração de cláusulas em blocos definidos pelo conteúdo (ver _split_contract_chunks)
+PLAYBOOK_EXTRACTION_CHUNK_CHARS = int(os.getenv("PLAYBOOK_EXTRACTION_CHUNK_CHARS", "30000"))
+
+# Cache por (versão da regra, hash do texto da cláusula): numa nova rodada de
+# negociação só as cláusulas alteradas voltam para a IA.
+PLAYBOOK_CLAUSE_CACHE_ENABLED = os.getenv("PLAYBOOK_CLAUSE_CACHE_ENABLED", "true").lower() == "true"
+PLAYBOOK_CLAUSE_CACHE_TTL_SECONDS = int(os.getenv("PLAYBOOK_CLAUSE_CACHE_TTL_SECONDS", str(30 * 24 * 3600)))
+PLAYBOOK_CLAUSE_CACHE_BACKEND = os.getenv("PLAYBOOK_CLAUSE_CACHE_BACKEND", "disk").lower()
+PLAYBOOK_CLAUSE_CACHE_PATH = os.getenv("PLAYBOOK_CLAUSE_CACHE_PATH", "./data/playbook_clause_cache.sqlite")
+PLAYBOOK_CLAUSE_CACHE_MAX_ENTRIES = int(os.getenv("PLAYBOOK_CLAUSE_CACHE_MAX_ENTRIES", "100000"))
+
+# Explicação usada quando a IA não devolve JSON válido (resultado não vai para o cache)
+INCONCLUSIVE_EXPLANATION = "Análise automática inconclusiva — revisão manual recomendada."
+
+# Callback de progresso: recebe um dict de evento; pode ser síncrono ou assíncrono
+ProgressCallback = Callable[[Dict[str, Any]], Union[None, Awaitable[None]]]
+
+_clause_cache: Optional[LLMResponseCache] = None
+
 
 # ---------------------------------------------------------------------------
 # Helpers
@@ -130,6 +154,133 @@ def _calculate_risk_score(clauses: List[ClauseAnalysisResult]) -> float:
     return round(min((total_weight / max_weight) * 100, 100.0), 1)
 
 
+def get_playbook_clause_cache() -> Optional[LLMResponseCache]:
+    """Cache compartilhado de extração/análise de cláusulas, ou None se desabilitado."""
+    global _clause_cache
+    if not PLAYBOOK_CLAUSE_CACHE_ENABLED:
+        return None
+    if _clause_cache is None:
+        _clause_cache = LLMResponseCache(
+            ttl_seconds=PLAYBOOK_CLAUSE_CACHE_TTL_SECONDS,
+            l2=build_l2_tier(
+                PLAYBOOK_CLAUSE_CACHE_BACKEND,
+                PLAYBOOK_CLAUSE_CACHE_PATH,
+                PLAYBOOK_CLAUSE_CACHE_MAX_ENTRIES,
+            ),
+        )
+    return _clause_cache
+
+
+def reset_playbook_clause_cache() -> None:
+    """Reset do singleton (para testes)."""
+    global _clause_cache
+    _clause_cache = None
+
+
+def _sha256(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8", errors="ignore")).hexdigest()
+
+
+def _rule_fingerprint(rule: PlaybookRule) -> str:
+    """
+    Versão da regra: hash dos campos que entram nos prompts de análise/redline.
+
+    Editar a regra (posições, severidade, notas...) invalida o cache dela;
+    renomear o playbook ou reordenar regras não.
+    """
+    payload = {
+        "clause_type": rule.clause_type,
+        "rule_name": rule.rule_name,
+        "description": rule.description,
+        "preferred_position": rule.preferred_position,
+        "fallback_positions": rule.fallback_positions or [],
+        "rejected_positions": rule.rejected_positions or [],
+        "action_on_reject": rule.action_on_reject,
+        "severity": rule.severity,
+        "guidance_notes": rule.guidance_notes,
+    }
+    return _sha256(json.dumps(payload, sort_keys=True, ensure_ascii=False, default=str))
+
+
+def _clause_cache_key(rule: PlaybookRule, party_perspective: str, clause_text: str) -> str:
+    payload = json.dumps(
+        {
+            "rule": _rule_fingerprint(rule),
+            "perspective": party_perspective,
+            "clause": _sha256(clause_text),
+            "models": [DEFAULT_ANALYSIS_MODEL, DEFAULT_GENERATION_MODEL],
+            "prompts": [_sha256(CLAUSE_ANALYSIS_PROMPT), _sha256(REDLINE_GENERATION_PROMPT)],
+        },
+        sort_keys=True,
+    )
+    return "playbook:clause:" + _sha256(payload)
+
+
+def _extraction_cache_key(chunk: str) -> str:
+    payload = json.dumps(
+        {
+            "chunk": _sha256(chunk),
+            "model": DEFAULT_ANALYSIS_MODEL,
+            "prompt": _sha256(CLAUSE_EXTRACTION_PROMPT),
+        },
+        sort_keys=True,
+    )
+    return "playbook:extract:" + _sha256(payload)
+
+
+def _split_contract_chunks(
+    text: str, max_chars: int = PLAYBOOK_EXTRACTION_CHUNK_CHARS
+) -> List[str]:
+    """
+    Divide o contrato em blocos com fronteiras definidas pelo conteúdo.
+
+    Um bloco fecha depois de uma linha cujo CRC32 é múltiplo de 8, desde que
+    já tenha max_chars/2, ou antes de ultrapassar max_chars. Como a fronteira
+    depende só das linhas próximas, editar uma cláusula altera apenas o bloco
+    dela (e no máximo o seguinte) e os demais continuam com o mesmo hash no
+    cache de extração. Contratos até max_chars formam um único bloco.
+    """
+    if len(text) <= max_chars:
+        return [text]
+
+    min_chars = max_chars // 2
+    chunks: List[str] = []
+    current: List[str] = []
+    size = 0
+
+    def _flush() -> None:
+        nonlocal current, size
+        if current:
+            chunks.append("".join(current))
+        current, size = [], 0
+
+    for line in text.splitlines(keepends=True):
+        while len(line) > max_chars:
+            _flush()
+            chunks.append(line[:max_chars])
+            line = line[max_chars:]
+        if size + len(line) > max_chars:
+            _flush()
+        current.append(line)
+        size += len(line)
+        stripped = line.strip()
+        if size >= min_chars and stripped and zlib.crc32(stripped.encode("utf-8")) % 8 == 0:
+            _flush()
+    _flush()
+    return chunks
+
+
+async def _emit_progress(on_progress: Optional[ProgressCallback], event: Dict[str, Any]) -> None:
+    if on_progress is None:
+        return
+    try:
+        outcome = on_progress(event)
+        if inspect.isawaitable(outcome):
+            await outcome
+    except Exception as e:
+        logger.warning("Callback de progresso do playbook falhou: %s", e)
+
+
 async def _call_ai(
     prompt: str,
     system_instruction: Optional[str] = None,
@@ -199,6 +350,7 @@ class PlaybookService:
         user_id: str,
         db: AsyncSession,
         contract_text_override: Optional[str] = None,
+        on_progress: Optional[ProgressCallback] = None,
     ) -> PlaybookAnalysisResult:
         """
         Analisa um contrato contra as regras de um playbook.
@@ -206,11 +358,12 @@ class PlaybookService:
         Fluxo:
         1. Carrega o playbook e suas regras
         2. Carrega/extrai o texto do contrato (do documento)
-        3. Extrai cláusulas do contrato via IA
-        4. Para cada regra, analisa a cláusula correspondente
-        5. Gera redline para cláusulas não-conformes
-        6. Calcula risk score e gera resumo executivo
-        7. Retorna resultado estruturado
+        3. Extrai cláusulas do contrato via IA (blocos em paralelo, com cache)
+        4. Para cada regra, analisa a cláusula correspondente e, se
+           não-conforme, gera o redline na mesma tarefa (com cache por
+           versão da regra + hash da cláusula)
+        5. Calcula risk score e gera resumo executivo
+        6. Retorna resultado estruturado
 
         Args:
             document_id: ID do documento de contrato
@@ -218,6 +371,8 @@ class PlaybookService:
             user_id: ID do usuário solicitante
             db: Sessão assíncrona do banco
             contract_text_override: Texto do contrato (opcional, sobrescreve o extraído)
+            on_progress: Callback opcional (sync ou async) chamado com eventos
+                ``clauses_extracted``, ``rule_started`` e ``rule_done``
 
         Returns:
             PlaybookAnalysisResult com análise completa
@@ -248,25 +403,15 @@ class PlaybookService:
                 "Certifique-se de que o documento foi processado."
             )
 
-        # 3. Extrair cláusulas do contrato
-        extracted_clauses = await self._extract_clauses(contract_text)
-        logger.info("Extraídas %d cláusulas do contrato", len(extracted_clauses))
-
-        # 4. Analisar cada regra contra o contrato
-        clause_results = await self._analyze_all_rules(
+        # 3-4. Extrair cláusulas, analisar regras e gerar redlines
+        clause_results = await self.run_rule_pipeline(
             rules=rules,
-            extracted_clauses=extracted_clauses,
             contract_text=contract_text,
             party_perspective=getattr(playbook, "party_perspective", "neutro") or "neutro",
+            on_progress=on_progress,
         )
 
-        # 5. Gerar redlines para cláusulas não-conformes
-        clause_results = await self._generate_redlines_for_non_compliant(
-            clause_results=clause_results,
-            rules_by_id={r.id: r for r in rules},
-        )
-
-        # 6. Calcular métricas
+        # 5. Calcular métricas
         compliant_count = sum(
             1 for c in clause_results
             if c.classification == ClauseClassification.COMPLIANT
@@ -285,7 +430,7 @@ class PlaybookService:
         )
         risk_score = _calculate_risk_score(clause_results)
 
-        # 7. Gerar resumo executivo
+        # 6. Gerar resumo executivo
         summary = await self._generate_summary(
             playbook_name=playbook.name,
             total_rules=len(rules),
@@ -408,7 +553,7 @@ class PlaybookService:
             location=None,
             classification=ClauseClassification.NEEDS_REVIEW,
             severity=AnalysisSeverity(rule.severity),
-            explanation="Análise automática inconclusiva — revisão manual recomendada.",
+            explanation=INCONCLUSIVE_EXPLANATION,
             suggested_redline=None,
             comment=None,
             confidence=0.3,
@@ -1351,158 +1496,224 @@ class PlaybookService:
 
         return doc.extracted_text or doc.content
 
-    async def _extract_clauses(
-        self, contract_text: str
-    ) -> List[Dict[str, str]]:
-        """
-        Extrai cláusulas do contrato via IA.
-
-        Returns:
-            Lista de dicts com keys: clause_type, title, location, text
-        """
-        prompt = CLAUSE_EXTRACTION_PROMPT.format(contract_text=contract_text[:30000])
-
-        response = await _call_ai(
-            prompt=prompt,
-            system_instruction="Extraia cláusulas do contrato. Responda em JSON válido.",
-            model=DEFAULT_ANALYSIS_MODEL,
-            max_tokens=8000,
-            temperature=0.1,
-        )
-
-        parsed = _safe_json_parse(response) if response else None
-
-        if parsed and isinstance(parsed, list):
-            return [c for c in parsed if isinstance(c, dict) and c.get("text")]
-
-        logger.warning("Falha na extração de cláusulas, usando fallback")
-        return []
-
-    async def _analyze_all_rules(
+    async def run_rule_pipeline(
         self,
         rules: List[PlaybookRule],
-        extracted_clauses: List[Dict[str, str]],
         contract_text: str,
         party_perspective: str = "neutro",
+        on_progress: Optional[ProgressCallback] = None,
     ) -> List[ClauseAnalysisResult]:
         """
-        Analisa todas as regras contra as cláusulas extraídas.
-        Usa semáforo para limitar concorrência.
+        Extrai as cláusulas e aplica todas as regras, na ordem das regras.
+
+        Cada regra roda como uma tarefa própria: análise e, se não-conforme,
+        redline em seguida, sem esperar as demais regras terminarem a análise.
+        A concorrência de análises e de redlines é limitada, cada uma, por
+        MAX_CONCURRENT_ANALYSES.
+        Resultados de regras já avaliadas sobre o mesmo texto de cláusula vêm
+        do cache sem chamar a IA.
         """
+        extracted_clauses = await self._extract_clauses(contract_text, on_progress=on_progress)
+        logger.info("Extraídas %d cláusulas do contrato", len(extracted_clauses))
+
         # Criar mapa de tipo -> cláusulas
         clause_map: Dict[str, List[Dict[str, str]]] = {}
         for clause in extracted_clauses:
             ctype = clause.get("clause_type", "").lower()
-            if ctype not in clause_map:
-                clause_map[ctype] = []
-            clause_map[ctype].append(clause)
+            clause_map.setdefault(ctype, []).append(clause)
 
+        cache = get_playbook_clause_cache()
         contract_context = contract_text[:2000]
-        semaphore = asyncio.Semaphore(MAX_CONCURRENT_ANALYSES)
-
-        async def _analyze_one(rule: PlaybookRule) -> ClauseAnalysisResult:
-            async with semaphore:
-                # Encontrar cláusula correspondente
+        # Semáforos separados: redlines não ficam na fila atrás das análises pendentes
+        analysis_semaphore = asyncio.Semaphore(MAX_CONCURRENT_ANALYSES)
+        redline_semaphore = asyncio.Semaphore(MAX_CONCURRENT_ANALYSES)
+        total = len(rules)
+        completed = 0
+        cache_hits = 0
+
+        async def _process(rule: PlaybookRule) -> ClauseAnalysisResult:
+            nonlocal completed, cache_hits
+            cached = False
+            try:
                 matching_clauses = clause_map.get(rule.clause_type.lower(), [])
-
                 if not matching_clauses:
-                    # Cláusula não encontrada no contrato
-                    return ClauseAnalysisResult(
-                        rule_id=rule.id,
-                        rule_name=rule.rule_name,
-                        clause_type=rule.clause_type,
-                        found_in_contract=False,
-                        original_text=None,
-                        location=None,
-                        classification=ClauseClassification.NOT_FOUND,
-                        severity=AnalysisSeverity(rule.severity),
-                        explanation=(
-                            f"Cláusula do tipo '{rule.clause_type}' não foi encontrada "
-                            f"no contrato. Verifique se o contrato aborda este tema."
-                        ),
-                        suggested_redline=None,
-                        confidence=0.8,
-                    )
-
-                # Combinar texto de todas as cláusulas do mesmo tipo
-                combined_text = "\n\n".join(
-                    c.get("text", "") for c in matching_clauses
+                    result = self._not_found_result(rule)
+                else:
+                    # Combinar texto de todas as cláusulas do mesmo tipo
+                    combined_text = "\n\n".join(c.get("text", "") for c in matching_clauses)
+                    location = matching_clauses[0].get("location", "Não identificada")
+                    key = _clause_cache_key(rule, party_perspective, combined_text)
+                    hit = await cache.aget(key) if cache is not None else None
+                    if hit is not None:
+                        result = ClauseAnalysisResult.model_validate_json(hit)
+                        result.rule_id = rule.id
+                        cached = True
+                        cache_hits += 1
+                    else:
+                        await _emit_progress(on_progress, {
+                            "event": "rule_started",
+                            "rule_id": rule.id,
+                            "rule_name": rule.rule_name,
+                        })
+                        result = await self._analyze_and_redline(
+                            rule, combined_text, contract_context, party_perspective,
+                            analysis_semaphore, redline_semaphore,
+                        )
+                        if cache is not None and self._is_cacheable(result):
+                            await cache.aset(key, result.model_dump_json())
+                    # Atualizar location com o que foi extraído
+                    result.location = location
+            except Exception as e:
+                logger.error("Erro ao analisar regra %s: %s", rule.rule_name, e)
+                result = ClauseAnalysisResult(
+                    rule_id=rule.id,
+                    rule_name=rule.rule_name,
+                    clause_type=rule.clause_type,
+                    found_in_contract=False,
+                    original_text=None,
+                    location=None,
+                    classification=ClauseClassification.NEEDS_REVIEW,
+                    severity=AnalysisSeverity(rule.severity),
+                    explanation=f"Erro na análise automática: {str(e)}",
+                    suggested_redline=None,
+                    confidence=0.0,
                 )
-                location = matching_clauses[0].get("location", "Não identificada")
 
-                result = await self.analyze_clause(
-                    clause_text=combined_text,
-                    rule=rule,
-                    contract_context=contract_context,
-                    party_perspective=party_perspective,
-                )
-                # Atualizar location com o que foi extraído
-                result.location = location
-                return result
+            completed += 1
+            await _emit_progress(on_progress, {
+                "event": "rule_done",
+                "rule_id": rule.id,
+                "rule_name": rule.rule_name,
+                "classification": result.classification.value,
+                "has_redline": bool(result.suggested_redline),
+                "cached": cached,
+                "completed": completed,
+                "total": total,
+            })
+            return result
 
-        # Executar análises em paralelo com limite de concorrência
-        tasks = [_analyze_one(rule) for rule in rules]
-        results = await asyncio.gather(*tasks, return_exceptions=True)
-
-        clause_results: List[ClauseAnalysisResult] = []
-        for idx, res in enumerate(results):
-            if isinstance(res, Exception):
-                logger.error("Erro ao analisar regra %s: %s", rules[idx].rule_name, res)
-                clause_results.append(
-                    ClauseAnalysisResult(
-                        rule_id=rules[idx].id,
-                        rule_name=rules[idx].rule_name,
-                        clause_type=rules[idx].clause_type,
-                        found_in_contract=False,
-                        original_text=None,
-                        location=None,
-                        classification=ClauseClassification.NEEDS_REVIEW,
-                        severity=AnalysisSeverity(rules[idx].severity),
-                        explanation=f"Erro na análise automática: {str(res)}",
-                        suggested_redline=None,
-                        confidence=0.0,
-                    )
+        clause_results = list(await asyncio.gather(*(_process(rule) for rule in rules)))
+        if cache_hits:
+            logger.info("Playbook: %d/%d regras reaproveitadas do cache de cláusulas", cache_hits, total)
+        return clause_results
+
+    async def _analyze_and_redline(
+        self,
+        rule: PlaybookRule,
+        clause_text: str,
+        contract_context: str,
+        party_perspective: str,
+        analysis_semaphore: asyncio.Semaphore,
+        redline_semaphore: asyncio.Semaphore,
+    ) -> ClauseAnalysisResult:
+        """Analisa a cláusula e, se não-conforme, gera o redline logo em seguida."""
+        async with analysis_semaphore:
+            result = await self.analyze_clause(
+                clause_text=clause_text,
+                rule=rule,
+                contract_context=contract_context,
+                party_perspective=party_perspective,
+            )
+
+        # Só gera redline se a ação for redline ou suggest
+        if (
+            result.classification == ClauseClassification.NON_COMPLIANT
+            and result.original_text
+            and rule.action_on_reject in ("redline", "suggest")
+        ):
+            async with redline_semaphore:
+                result.suggested_redline = await self.generate_redline(
+                    original_clause=result.original_text,
+                    rule=rule,
+                    analysis=result,
                 )
-            else:
-                clause_results.append(res)
+        return result
 
-        return clause_results
+    @staticmethod
+    def _is_cacheable(result: ClauseAnalysisResult) -> bool:
+        """Falhas da IA (JSON inválido, redline caindo no texto original) não vão para o cache."""
+        if result.explanation == INCONCLUSIVE_EXPLANATION:
+            return False
+        if result.suggested_redline is not None and result.suggested_redline == result.original_text:
+            return False
+        return True
+
+    @staticmethod
+    def _not_found_result(rule: PlaybookRule) -> ClauseAnalysisResult:
+        return ClauseAnalysisResult(
+            rule_id=rule.id,
+            rule_name=rule.rule_name,
+            clause_type=rule.clause_type,
+            found_in_contract=False,
+            original_text=None,
+            location=None,
+            classification=ClauseClassification.NOT_FOUND,
+            severity=AnalysisSeverity(rule.severity),
+            explanation=(
+                f"Cláusula do tipo '{rule.clause_type}' não foi encontrada "
+                f"no contrato. Verifique se o contrato aborda este tema."
+            ),
+            suggested_redline=None,
+            confidence=0.8,
+        )
 
-    async def _generate_redlines_for_non_compliant(
+    async def _extract_clauses(
         self,
-        clause_results: List[ClauseAnalysisResult],
-        rules_by_id: Dict[str, PlaybookRule],
-    ) -> List[ClauseAnalysisResult]:
-        """Gera redlines para cláusulas não-conformes."""
-        semaphore = asyncio.Semaphore(MAX_CONCURRENT_ANALYSES)
+        contract_text: str,
+        on_progress: Optional[ProgressCallback] = None,
+    ) -> List[Dict[str, str]]:
+        """
+        Extrai cláusulas do contrato via IA.
 
-        async def _gen_redline(result: ClauseAnalysisResult) -> ClauseAnalysisResult:
-            if (
-                result.classification != ClauseClassification.NON_COMPLIANT
-                or not result.original_text
-            ):
-                return result
+        O texto é dividido em blocos (_split_contract_chunks) extraídos em
+        paralelo; blocos já vistos vêm do cache.
 
-            rule = rules_by_id.get(result.rule_id)
-            if not rule:
-                return result
+        Returns:
+            Lista de dicts com keys: clause_type, title, location, text
+        """
+        chunks = _split_contract_chunks(contract_text)
+        cache = get_playbook_clause_cache()
+        semaphore = asyncio.Semaphore(MAX_CONCURRENT_ANALYSES)
+        cached_chunks = 0
 
-            # Só gera redline se a ação for redline ou suggest
-            if rule.action_on_reject not in ("redline", "suggest"):
-                return result
+        async def _extract_chunk(chunk: str) -> List[Dict[str, str]]:
+            nonlocal cached_chunks
+            key = _extraction_cache_key(chunk)
+            hit = await cache.aget(key) if cache is not None else None
+            if hit is not None:
+                cached_chunks += 1
+                return json.loads(hit)
 
+            prompt = CLAUSE_EXTRACTION_PROMPT.format(contract_text=chunk)
             async with semaphore:
-                redline = await self.generate_redline(
-                    original_clause=result.original_text,
-                    rule=rule,
-                    analysis=result,
+                response = await _call_ai(
+                    prompt=prompt,
+                    system_instruction="Extraia cláusulas do contrato. Responda em JSON válido.",
+                    model=DEFAULT_ANALYSIS_MODEL,
+                    max_tokens=8000,
+                    temperature=0.1,
                 )
-                result.suggested_redline = redline
-
-            return result
 
-        tasks = [_gen_redline(r) for r in clause_results]
-        return await asyncio.gather(*tasks)
+            parsed = _safe_json_parse(response) if response else None
+            if parsed is None or not isinstance(parsed, list):
+                logger.warning("Falha na extração de cláusulas, usando fallback")
+                return []
+
+            clauses = [c for c in parsed if isinstance(c, dict) and c.get("text")]
+            if cache is not None:
+                await cache.aset(key, json.dumps(clauses, ensure_ascii=False))
+            return clauses
+
+        per_chunk = await asyncio.gather(*(_extract_chunk(c) for c in chunks))
+        extracted = [clause for clauses in per_chunk for clause in clauses]
+
+        await _emit_progress(on_progress, {
+            "event": "clauses_extracted",
+            "chunks": len(chunks),
+            "cached_chunks": cached_chunks,
+            "clauses": len(extracted),
+        })
+        return extracted
 
     async def _generate_summary(
         self,
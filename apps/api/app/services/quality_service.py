@@ -20,6 +20,7 @@ from enum import Enum
 from loguru import logger
 from app.services.api_call_tracker import record_api_call
 from app.services.mlx_loader import load_vomo_class
+from app.services.fuzzy_anchor import AnchorMatch, FuzzyAnchorIndex, cached_anchor_index
 from app.services.false_positive_prevention import (
     FalsePositivePrevention,
     ValidationThresholds,
@@ -1203,7 +1204,6 @@ class QualityService:
 
         # Determine provider
         model = (model_selection or "gemini-2.0-flash").strip().lower()
-        use_openai = model.startswith("gpt")
 
         mode_norm = (mode or "").strip().upper()
 
@@ -1231,9 +1231,7 @@ class QualityService:
         )
 
         async def _call_llm(prompt: str) -> Optional[str]:
-            if use_openai:
-                return await self._call_openai(prompt, model)
-            return await self._call_gemini(prompt, model)
+            return await self._call_patch_llm(prompt, model)
 
         def _strip_code_fences(value: str) -> str:
             if not isinstance(value, str):
@@ -1640,15 +1638,12 @@ Retorne o texto formatado corrigido COMPLETO, preservando a formatacao Markdown.
             return {"segments": segments, "fixes": [], "error": None}
 
         model = (model_selection or "gemini-2.0-flash").strip().lower()
-        use_openai = model.startswith("gpt")
         mode_norm = (mode or "AUDIENCIA").strip().upper()
 
         speaker_map = {str(sp.get("speaker_id")): sp for sp in (speakers or []) if isinstance(sp, dict)}
 
         async def _call_llm(prompt: str) -> str:
-            if use_openai:
-                return await self._call_openai(prompt, model=model)
-            return await self._call_gemini(prompt, model=model)
+            return await self._call_patch_llm(prompt, model)
 
         def _safe_text(value: Any) -> str:
             return str(value or "").strip()
@@ -1779,6 +1774,25 @@ Evidencia (se houver):
         error_message = "; ".join([e for e in errors if e]) or None
         return {"segments": updated_segments, "fixes": fixes, "error": error_message}
     
+    async def _call_patch_llm(self, prompt: str, model: str) -> Optional[str]:
+        """Patch call through the shared LLM response cache (same prompt and model, same patch)."""
+        from app.services.ai.llm_response_cache import get_llm_response_cache, make_cache_key
+
+        use_openai = model.startswith("gpt")
+        cache = get_llm_response_cache()
+        key = make_cache_key("openai" if use_openai else "vertex-gemini", model, prompt, purpose="quality_patch") if cache else None
+        if key:
+            hit = await cache.aget(key)
+            if hit is not None:
+                return hit
+        if use_openai:
+            response = await self._call_openai(prompt, model)
+        else:
+            response = await self._call_gemini(prompt, model)
+        if key and response:
+            await cache.aset(key, response)
+        return response
+
     async def _call_gemini(self, prompt: str, model: str = "gemini-2.0-flash") -> Optional[str]:
         """Direct Gemini API call using google-genai client."""
         try:
@@ -2148,10 +2162,7 @@ Retorne APENAS um JSON válido no formato:
 
         try:
             model = model_selection or "gemini-2.0-flash"
-            if model.startswith("gpt"):
-                response = await self._call_openai(prompt, model)
-            else:
-                response = await self._call_gemini(prompt, model)
+            response = await self._call_patch_llm(prompt, model)
 
             if not response:
                 return {"new_text": "", "evidence": evidence, "confidence": "low", "validated": False}
@@ -2347,6 +2358,35 @@ Retorne APENAS um JSON válido no formato:
 
             # 2. Apply semantic fixes (patches) with validation
             skipped_fixes = []
+
+            # Resolve every fuzzy anchor/old_text against one index of the
+            # document, instead of re-scanning it for each fix. The matches are
+            # kept as offsets and shifted as patches are applied.
+            fuzzy_anchors = set()
+            fuzzy_old_texts = set()
+            for fix in semantic_fixes:
+                patch = fix.get("patch") or {}
+                if fix.get("action") == "INSERT":
+                    anchor = patch.get("anchor_text", "")
+                    if anchor and anchor not in current_content:
+                        fuzzy_anchors.add(anchor)
+                elif fix.get("action") == "REPLACE":
+                    old_text = patch.get("old_text", "")
+                    if old_text and old_text not in current_content:
+                        fuzzy_old_texts.add(old_text)
+            resolved_anchors: Dict[str, Optional[AnchorMatch]] = {}
+            resolved_old_texts: Dict[str, Optional[AnchorMatch]] = {}
+            if fuzzy_anchors or fuzzy_old_texts:
+                index = FuzzyAnchorIndex(current_content)
+                resolved_anchors = index.find_many(fuzzy_anchors, 0.80)
+                resolved_old_texts = index.find_many(fuzzy_old_texts, 0.85)
+
+            def _edit(pos: int, removed: int, inserted: str) -> None:
+                nonlocal current_content
+                current_content = current_content[:pos] + inserted + current_content[pos + removed:]
+                for resolved in (resolved_anchors, resolved_old_texts):
+                    self._shift_matches(resolved, pos, removed, len(inserted))
+
             for fix in semantic_fixes:
                 patch = fix.get("patch") or {}
                 fix_type = fix.get("type")
@@ -2368,34 +2408,27 @@ Retorne APENAS um JSON válido no formato:
 
                     # Try exact match first
                     if anchor and anchor in current_content:
-                        insert_pos = current_content.find(anchor) + len(anchor)
-                        current_content = (
-                            current_content[:insert_pos]
-                            + "\n\n"
-                            + new_text
-                            + current_content[insert_pos:]
-                        )
+                        _edit(current_content.find(anchor) + len(anchor), 0, "\n\n" + new_text)
                         fixes_applied.append(f"INSERT: {fix.get('description', '')[:50]}...")
                         semantic_applied += 1
                     elif anchor:
-                        # Try fuzzy anchor matching
-                        fuzzy_pos = self._fuzzy_find_position(anchor, current_content)
+                        # Try fuzzy anchor matching (offsets from the shared index)
+                        if anchor in resolved_anchors:
+                            matched_anchor = resolved_anchors[anchor]
+                            fuzzy_pos = matched_anchor.end if matched_anchor else -1
+                        else:
+                            fuzzy_pos = self._fuzzy_find_position(anchor, current_content)
                         if fuzzy_pos >= 0:
-                            current_content = (
-                                current_content[:fuzzy_pos]
-                                + "\n\n"
-                                + new_text
-                                + current_content[fuzzy_pos:]
-                            )
+                            _edit(fuzzy_pos, 0, "\n\n" + new_text)
                             fixes_applied.append(f"INSERT (fuzzy anchor): {fix.get('description', '')[:50]}...")
                             semantic_applied += 1
                         elif new_text:
                             # Last resort: append
-                            current_content = current_content + "\n\n" + new_text
+                            _edit(len(current_content), 0, "\n\n" + new_text)
                             fixes_applied.append(f"INSERT (appended): {fix.get('description', '')[:50]}...")
                             semantic_applied += 1
                     elif new_text:
-                        current_content = current_content + "\n\n" + new_text
+                        _edit(len(current_content), 0, "\n\n" + new_text)
                         fixes_applied.append(f"INSERT (appended): {fix.get('description', '')[:50]}...")
                         semantic_applied += 1
 
@@ -2414,14 +2447,17 @@ Retorne APENAS um JSON válido no formato:
                             continue
 
                     if old_text in current_content:
-                        current_content = current_content.replace(old_text, new_text, 1)
+                        _edit(current_content.find(old_text), len(old_text), new_text)
                         fixes_applied.append(f"REPLACE: {fix.get('description', '')[:50]}...")
                         semantic_applied += 1
                     else:
                         # Try fuzzy match for old_text
-                        fuzzy_match = self._fuzzy_find_text(old_text, current_content)
+                        if old_text in resolved_old_texts:
+                            fuzzy_match = resolved_old_texts[old_text]
+                        else:
+                            fuzzy_match = self._fuzzy_find_match(old_text, current_content)
                         if fuzzy_match:
-                            current_content = current_content.replace(fuzzy_match, new_text, 1)
+                            _edit(fuzzy_match.start, fuzzy_match.end - fuzzy_match.start, new_text)
                             fixes_applied.append(f"REPLACE (fuzzy): {fix.get('description', '')[:50]}...")
                             semantic_applied += 1
                         else:
@@ -2462,6 +2498,24 @@ Retorne APENAS um JSON válido no formato:
                 "error": str(e),
             }
 
+    @staticmethod
+    def _shift_matches(
+        matches: Dict[str, Optional[AnchorMatch]], pos: int, removed: int, inserted: int
+    ) -> None:
+        """
+        Keeps resolved matches in step with an edit at ``pos`` (``removed`` chars
+        replaced by ``inserted``). Matches overlapping the edited span are
+        forgotten, so the caller resolves them again against the new content.
+        """
+        delta = inserted - removed
+        for needle, match in list(matches.items()):
+            if match is None or match.end <= pos:
+                continue
+            if match.start >= pos + removed:
+                matches[needle] = AnchorMatch(match.start + delta, match.end + delta, match.score)
+            else:
+                del matches[needle]
+
     def _fuzzy_find_position(self, needle: str, haystack: str, threshold: float = 0.80) -> int:
         """
         Finds the position to insert after a fuzzy-matched anchor.
@@ -2470,63 +2524,18 @@ Retorne APENAS um JSON válido no formato:
         if not needle or not haystack:
             return -1
 
-        from difflib import SequenceMatcher
-
-        needle_norm = re.sub(r'\s+', ' ', needle.lower().strip())
-        haystack_norm = re.sub(r'\s+', ' ', haystack.lower())
-        needle_len = len(needle_norm)
-
-        best_pos = -1
-        best_ratio = 0.0
-
-        # Sliding window search
-        step = max(1, needle_len // 4)
-        for i in range(0, len(haystack_norm) - needle_len + 1, step):
-            window = haystack_norm[i:i + needle_len]
-            ratio = SequenceMatcher(None, needle_norm, window).ratio()
-
-            if ratio > best_ratio:
-                best_ratio = ratio
-                best_pos = i + needle_len
-
-        if best_ratio >= threshold:
-            return best_pos
+        match = cached_anchor_index(haystack).find(needle, threshold)
+        return match.end if match else -1
 
-        return -1
-
-    def _fuzzy_find_text(self, needle: str, haystack: str, threshold: float = 0.85) -> Optional[str]:
+    def _fuzzy_find_match(self, needle: str, haystack: str, threshold: float = 0.85) -> Optional[AnchorMatch]:
         """
         Finds text in haystack with fuzzy matching.
-        Returns the matched text or None.
+        Returns the match offsets or None.
         """
         if not needle or not haystack:
             return None
 
-        from difflib import SequenceMatcher
-
-        needle_norm = re.sub(r'\s+', ' ', needle.lower().strip())
-        needle_len = len(needle_norm)
-
-        best_match = None
-        best_ratio = 0.0
-
-        # Sliding window
-        step = max(1, needle_len // 4)
-        for i in range(0, len(haystack) - needle_len + 1, step):
-            # Get window in original case
-            window_original = haystack[i:i + needle_len + 20][:needle_len]
-            window_norm = re.sub(r'\s+', ' ', window_original.lower().strip())
-
-            ratio = SequenceMatcher(None, needle_norm, window_norm).ratio()
-
-            if ratio > best_ratio:
-                best_ratio = ratio
-                best_match = window_original
-
-        if best_ratio >= threshold:
-            return best_match
-
-        return None
+        return cached_anchor_index(haystack).find(needle, threshold)
 
     # =========================================================================
     # HEARING/MEETING QUALITY METHODS
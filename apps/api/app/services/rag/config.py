@@ -238,6 +238,13 @@ class RAGConfig:
     trace_export_otel: bool = False
     trace_export_langsmith: bool = False
 
+    # Request profiling (opt-in): profile 1-in-N searches and/or keep the
+    # breakdown of searches slower than the threshold (0 disables each).
+    profile_sample_every: int = 0
+    profile_slow_ms: float = 0.0
+    profile_track_allocations: bool = False  # tracemalloc on sampled requests
+    profile_max_entries: int = 100
+
     # ==========================================================================
     # RRF Fusion
     # ==========================================================================
@@ -298,6 +305,20 @@ class RAGConfig:
     graph_search_timeout_seconds: float = 0.5
     min_sources_required: int = 1
 
+    # Latency-aware retrieval (see core/latency_policy.py). The static timeouts
+    # above stay the upper bound; all three behaviours are opt-in.
+    adaptive_timeouts_enabled: bool = False  # timeout = rolling p95 * multiplier
+    adaptive_timeout_percentile: float = 95.0
+    adaptive_timeout_multiplier: float = 2.0
+    adaptive_timeout_min_seconds: float = 0.1
+    adaptive_timeout_min_samples: int = 50
+    hedge_requests_enabled: bool = False  # duplicate lexical/vector calls past the hedge percentile
+    hedge_percentile: float = 90.0
+    hedge_min_delay_ms: float = 10.0
+    hedge_max_ratio: float = 0.1  # at most ~10% extra backend calls
+    partial_fusion_enabled: bool = False  # fuse without a late graph source
+    partial_fusion_grace_ms: float = 50.0
+
     # ==========================================================================
     # Warm-Start
     # ==========================================================================
@@ -473,6 +494,10 @@ class RAGConfig:
             trace_persist_db=_env_bool("RAG_TRACE_PERSIST_DB", False),
             trace_export_otel=_env_bool("RAG_TRACE_EXPORT_OTEL", False),
             trace_export_langsmith=_env_bool("RAG_TRACE_EXPORT_LANGSMITH", False),
+            profile_sample_every=_env_int("RAG_PROFILE_SAMPLE_EVERY", 0),
+            profile_slow_ms=_env_float("RAG_PROFILE_SLOW_MS", 0.0),
+            profile_track_allocations=_env_bool("RAG_PROFILE_TRACK_ALLOCATIONS", False),
+            profile_max_entries=_env_int("RAG_PROFILE_MAX_ENTRIES", 100),
 
             # RRF
             rrf_k=_env_int("RAG_RRF_K", 60),
@@ -507,6 +532,19 @@ class RAGConfig:
             graph_search_timeout_seconds=_env_float("RAG_GRAPH_SEARCH_TIMEOUT", 0.5),
             min_sources_required=_env_int("RAG_MIN_SOURCES", 1),
 
+            # Latency-aware retrieval
+            adaptive_timeouts_enabled=_env_bool("RAG_ADAPTIVE_TIMEOUTS", False),
+            adaptive_timeout_percentile=_env_float("RAG_ADAPTIVE_TIMEOUT_PERCENTILE", 95.0),
+            adaptive_timeout_multiplier=_env_float("RAG_ADAPTIVE_TIMEOUT_MULTIPLIER", 2.0),
+            adaptive_timeout_min_seconds=_env_float("RAG_ADAPTIVE_TIMEOUT_MIN_SECONDS", 0.1),
+            adaptive_timeout_min_samples=_env_int("RAG_ADAPTIVE_TIMEOUT_MIN_SAMPLES", 50),
+            hedge_requests_enabled=_env_bool("RAG_HEDGE_REQUESTS", False),
+            hedge_percentile=_env_float("RAG_HEDGE_PERCENTILE", 90.0),
+            hedge_min_delay_ms=_env_float("RAG_HEDGE_MIN_DELAY_MS", 10.0),
+            hedge_max_ratio=_env_float("RAG_HEDGE_MAX_RATIO", 0.1),
+            partial_fusion_enabled=_env_bool("RAG_PARTIAL_FUSION", False),
+            partial_fusion_grace_ms=_env_float("RAG_PARTIAL_FUSION_GRACE_MS", 50.0),
+
             # Warm-start
             warmup_on_startup=_env_bool("RAG_WARMUP_ON_STARTUP", True),
 
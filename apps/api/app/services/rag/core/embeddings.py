@@ -26,10 +26,20 @@ from app.services.rag.config import get_rag_config
 
 logger = logging.getLogger(__name__)
 
-try:
-    from sentence_transformers import SentenceTransformer  # type: ignore
-except Exception:
-    SentenceTransformer = None  # type: ignore
+# sentence-transformers pulls in torch/transformers (several seconds); it is
+# only imported when the local provider is actually selected.
+SentenceTransformer = None  # type: ignore
+
+
+def _sentence_transformer_cls():
+    global SentenceTransformer
+    if SentenceTransformer is None:
+        try:
+            from sentence_transformers import SentenceTransformer as _cls  # type: ignore
+        except Exception:
+            return None
+        SentenceTransformer = _cls
+    return SentenceTransformer
 
 
 @dataclass
@@ -330,7 +340,8 @@ class EmbeddingsService:
                 raise ValueError("RAG_EMBEDDINGS_PROVIDER=openai requires OPENAI_API_KEY")
             self._client = OpenAI(api_key=api_key)
         elif self._provider == "local":
-            if SentenceTransformer is None:
+            sentence_transformer_cls = _sentence_transformer_cls()
+            if sentence_transformer_cls is None:
                 raise ImportError(
                     "SentenceTransformer not available. Install: pip install sentence-transformers"
                 )
@@ -340,7 +351,7 @@ class EmbeddingsService:
                 or self._model
                 or "sentence-transformers/paraphrase-multilingual-mpnet-base-v2"
             )
-            self._local_model = SentenceTransformer(str(local_model_name))
+            self._local_model = sentence_transformer_cls(str(local_model_name))
             try:
                 local_dim = int(self._local_model.get_sentence_embedding_dimension())
             except Exception:
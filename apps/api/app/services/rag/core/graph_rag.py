@@ -13,6 +13,7 @@ Uses NetworkX for graph storage with JSON persistence.
 
 from __future__ import annotations
 
+import bisect
 import hashlib
 import json
 import logging
@@ -34,6 +35,8 @@ from typing import (
     Union,
 )
 
+import numpy as np
+
 try:
     import networkx as nx
 except ImportError:
@@ -644,6 +647,238 @@ class LegalPack:
         return seeds
 
 
+# =============================================================================
+# READ SNAPSHOT (lock-free queries)
+# =============================================================================
+
+
+_RESOLVE_CACHE_MAX_ENTRIES = 256
+_RESOLVE_CACHE_MAX_TEXT_CHARS = 4_000
+
+
+class _GraphSnapshot:
+    """
+    Immutable read view of a LegalKnowledgeGraph.
+
+    Built from the NetworkX graph under the write lock and never mutated
+    afterwards, so any number of readers can use it concurrently without
+    locking. Writers simply drop the current snapshot; the next reader
+    rebuilds it.
+
+    Layout:
+    - node_ids / index: dense int ids for every node
+    - indptr / nbr / rel / outgoing: CSR adjacency holding, for each node,
+      its outgoing edges followed by its incoming edges (the same order
+      traverse() used to visit them on the DiGraph)
+    - names / name_starts: lowercased entity names joined into a single
+      string, so substring lookups run in C via str.find
+    """
+
+    __slots__ = (
+        "node_ids",
+        "index",
+        "node_data",
+        "relations",
+        "indptr",
+        "nbr",
+        "rel",
+        "outgoing",
+        "names",
+        "name_starts",
+        "resolved",
+    )
+
+    def __init__(self, graph: nx.DiGraph):
+        self.node_ids: Tuple[str, ...] = tuple(graph.nodes)
+        self.index: Dict[str, int] = {nid: i for i, nid in enumerate(self.node_ids)}
+        self.node_data: Tuple[Dict[str, Any], ...] = tuple(
+            dict(data) for _, data in graph.nodes(data=True)
+        )
+
+        relations: List[Any] = []
+        rel_ids: Dict[Any, int] = {}
+
+        def rel_id(data: Dict[str, Any]) -> int:
+            relation = data.get("relation")
+            rid = rel_ids.get(relation)
+            if rid is None:
+                rid = rel_ids[relation] = len(relations)
+                relations.append(relation)
+            return rid
+
+        indptr = np.zeros(len(self.node_ids) + 1, dtype=np.int64)
+        nbr: List[int] = []
+        rel: List[int] = []
+        outgoing: List[bool] = []
+        index = self.index
+        for i, nid in enumerate(self.node_ids):
+            for _, target, data in graph.out_edges(nid, data=True):
+                nbr.append(index[target])
+                rel.append(rel_id(data))
+                outgoing.append(True)
+            for source, _, data in graph.in_edges(nid, data=True):
+                nbr.append(index[source])
+                rel.append(rel_id(data))
+                outgoing.append(False)
+            indptr[i + 1] = len(nbr)
+
+        self.relations: Tuple[Any, ...] = tuple(relations)
+        self.indptr = indptr
+        self.nbr = np.asarray(nbr, dtype=np.int64)
+        self.rel = np.asarray(rel, dtype=np.int64)
+        self.outgoing = np.asarray(outgoing, dtype=bool)
+
+        starts: List[int] = []
+        parts: List[str] = []
+        offset = 0
+        for data in self.node_data:
+            name = str(data.get("name") or "").lower()
+            starts.append(offset + 1)
+            parts.append(name)
+            offset += len(name) + 1
+        self.names = "\x00" + "\x00".join(parts)
+        self.name_starts = starts
+        self.resolved: Dict[str, Tuple[str, ...]] = {}
+
+    def __contains__(self, node_id: object) -> bool:
+        return node_id in self.index
+
+    def entity(self, node_id: str) -> Optional[Dict[str, Any]]:
+        i = self.index.get(node_id)
+        return dict(self.node_data[i]) if i is not None else None
+
+    def find_by_name(self, needle: str) -> List[str]:
+        """Node ids whose lowercased name contains ``needle`` (node order)."""
+        needle = needle.lower()
+        if not needle:
+            return list(self.node_ids)
+        names, starts = self.names, self.name_starts
+        results: List[str] = []
+        pos = names.find(needle)
+        while pos != -1:
+            i = bisect.bisect_right(starts, pos) - 1
+            results.append(self.node_ids[i])
+            if i + 1 >= len(starts):
+                break
+            pos = names.find(needle, starts[i + 1])
+        return results
+
+    def _gather(self, frontier: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Return (owner, edge_position) for every adjacency entry of ``frontier``."""
+        begins = self.indptr[frontier]
+        lengths = self.indptr[frontier + 1] - begins
+        total = int(lengths.sum())
+        if total == 0:
+            empty = np.empty(0, dtype=np.int64)
+            return empty, empty
+        shift = np.repeat(begins - (np.cumsum(lengths) - lengths), lengths)
+        return np.repeat(frontier, lengths), shift + np.arange(total, dtype=np.int64)
+
+    @staticmethod
+    def _first_seen(values: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Unique values in first-occurrence order, with their first positions."""
+        uniq, first = np.unique(values, return_index=True)
+        order = np.argsort(first, kind="stable")
+        return uniq[order], first[order]
+
+    def traverse(
+        self,
+        start_node_id: str,
+        hops: int,
+        allowed: Optional[Set[str]],
+        max_nodes: int,
+    ) -> Dict[str, Any]:
+        start = self.index.get(start_node_id)
+        if start is None:
+            return {"nodes": [], "edges": [], "center": start_node_id}
+
+        visited = np.zeros(len(self.node_ids), dtype=bool)
+        visited[start] = True
+        order: List[int] = [start]
+        frontier = np.array([start], dtype=np.int64)
+        edge_blocks: List[Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]] = []
+        allowed_mask = (
+            np.array([r in allowed for r in self.relations], dtype=bool)
+            if allowed is not None
+            else None
+        )
+
+        for _ in range(hops):
+            if len(order) >= max_nodes or frontier.size == 0:
+                break
+
+            owner, pos = self._gather(frontier)
+            rel = self.rel[pos]
+            if allowed_mask is not None and pos.size:
+                keep = allowed_mask[rel]
+                owner, pos, rel = owner[keep], pos[keep], rel[keep]
+            other = self.nbr[pos]
+            edge_blocks.append((owner, other, self.outgoing[pos], rel))
+
+            fresh = other[~visited[other]]
+            if fresh.size:
+                fresh, _ = self._first_seen(fresh)
+                fresh = fresh[: max(0, max_nodes - len(order))]
+                visited[fresh] = True
+                order.extend(fresh.tolist())
+            frontier = fresh
+
+        node_ids, relations = self.node_ids, self.relations
+        edges: List[Dict[str, Any]] = []
+        for owner, other, out, rel in edge_blocks:
+            for o, n, is_out, r in zip(
+                owner.tolist(), other.tolist(), out.tolist(), rel.tolist()
+            ):
+                source, target = (o, n) if is_out else (n, o)
+                edges.append(
+                    {
+                        "source": node_ids[source],
+                        "target": node_ids[target],
+                        "relation": relations[r],
+                    }
+                )
+
+        nodes = []
+        for i in order:
+            node_data = dict(self.node_data[i])
+            node_data["node_id"] = node_ids[i]
+            nodes.append(node_data)
+
+        return {"nodes": nodes, "edges": edges, "center": start_node_id}
+
+    def shortest_path(
+        self, source_id: str, target_id: str, max_hops: int
+    ) -> Optional[List[str]]:
+        source = self.index.get(source_id)
+        target = self.index.get(target_id)
+        if source is None or target is None:
+            return None
+        if source == target:
+            return [source_id]
+
+        parent = np.full(len(self.node_ids), -1, dtype=np.int64)
+        parent[source] = source
+        frontier = np.array([source], dtype=np.int64)
+
+        for _ in range(max_hops):
+            owner, pos = self._gather(frontier)
+            keep = self.outgoing[pos]
+            owner, other = owner[keep], self.nbr[pos[keep]]
+            unseen = parent[other] < 0
+            owner, other = owner[unseen], other[unseen]
+            if other.size == 0:
+                return None
+            frontier, first = self._first_seen(other)
+            parent[frontier] = owner[first]
+            if parent[target] >= 0:
+                path = [target]
+                while path[-1] != source:
+                    path.append(int(parent[path[-1]]))
+                return [self.node_ids[i] for i in reversed(path)]
+
+        return None
+
+
 # =============================================================================
 # KNOWLEDGE GRAPH (Core)
 # =============================================================================
@@ -695,6 +930,8 @@ class LegalKnowledgeGraph:
         self.graph = nx.DiGraph()
         self._entity_index: Dict[str, Entity] = {}
         self._lock = threading.RLock()
+        # Read snapshot for queries; dropped on every write, rebuilt lazily
+        self._snapshot: Optional[_GraphSnapshot] = None
 
         # Load existing graph if present
         if os.path.exists(self.persist_path):
@@ -744,6 +981,7 @@ class LegalKnowledgeGraph:
                 **entity.metadata,
             )
             self._entity_index[node_id] = entity
+            self._snapshot = None
 
         return node_id
 
@@ -771,6 +1009,9 @@ class LegalKnowledgeGraph:
         Returns:
             List of matching node_ids
         """
+        if name_contains and entity_type is None and not metadata_filters:
+            return self._read_snapshot().find_by_name(name_contains)
+
         results: List[str] = []
 
         with self._lock:
@@ -805,6 +1046,7 @@ class LegalKnowledgeGraph:
             if node_id in self.graph.nodes:
                 self.graph.remove_node(node_id)
                 self._entity_index.pop(node_id, None)
+                self._snapshot = None
                 return True
         return False
 
@@ -842,6 +1084,7 @@ class LegalKnowledgeGraph:
                 created_at=datetime.now().isoformat(),
                 **(metadata or {}),
             )
+            self._snapshot = None
 
         return True
 
@@ -918,72 +1161,12 @@ class LegalKnowledgeGraph:
         hops = hops or config.graph_hops
         max_nodes = max_nodes or config.graph_max_nodes
 
-        with self._lock:
-            if start_node_id not in self.graph.nodes:
-                return {"nodes": [], "edges": [], "center": start_node_id}
-
-            # BFS to find all nodes within N hops
-            visited: Set[str] = {start_node_id}
-            frontier: Set[str] = {start_node_id}
-            all_edges: List[Dict[str, Any]] = []
-
-            allowed = (
-                {_normalize_graph_type(r) for r in relation_filter}
-                if relation_filter
-                else None
-            )
-
-            for _ in range(hops):
-                if len(visited) >= max_nodes:
-                    break
-
-                next_frontier: Set[str] = set()
-
-                for current in frontier:
-                    # Outgoing edges
-                    for _, target, data in self.graph.out_edges(current, data=True):
-                        if allowed is not None and data.get("relation") not in allowed:
-                            continue
-
-                        if target not in visited and len(visited) < max_nodes:
-                            next_frontier.add(target)
-                            visited.add(target)
-
-                        all_edges.append(
-                            {
-                                "source": current,
-                                "target": target,
-                                "relation": data.get("relation"),
-                            }
-                        )
-
-                    # Incoming edges
-                    for source, _, data in self.graph.in_edges(current, data=True):
-                        if allowed is not None and data.get("relation") not in allowed:
-                            continue
-
-                        if source not in visited and len(visited) < max_nodes:
-                            next_frontier.add(source)
-                            visited.add(source)
-
-                        all_edges.append(
-                            {
-                                "source": source,
-                                "target": current,
-                                "relation": data.get("relation"),
-                            }
-                        )
-
-                frontier = next_frontier
-
-            # Collect node data
-            nodes = []
-            for nid in visited:
-                node_data = dict(self.graph.nodes[nid])
-                node_data["node_id"] = nid
-                nodes.append(node_data)
-
-        return {"nodes": nodes, "edges": all_edges, "center": start_node_id}
+        allowed = (
+            {_normalize_graph_type(r) for r in relation_filter}
+            if relation_filter
+            else None
+        )
+        return self._read_snapshot().traverse(start_node_id, hops, allowed, max_nodes)
 
     # Alias for compatibility
     query_related = traverse
@@ -1000,34 +1183,47 @@ class LegalKnowledgeGraph:
         Useful for answering questions like:
         "How is Lei X related to Sumula Y?"
         """
-        with self._lock:
-            try:
-                path = nx.shortest_path(
-                    self.graph, source_id, target_id, weight=None
-                )
-                if len(path) > max_hops + 1:
-                    return None
-                return path
-            except (nx.NetworkXNoPath, nx.NodeNotFound):
-                return None
+        return self._read_snapshot().shortest_path(source_id, target_id, max_hops)
 
     def resolve_query_entities(self, text: str) -> List[str]:
         """Find entities mentioned in query text."""
-        matches: Set[str] = set()
-
-        with self._lock:
-            seeds = self.pack.extract_candidates(text) if self.pack else []
-            for seed in seeds:
-                node_id, name = self._seed_to_node_id(seed)
-                if node_id and node_id in self.graph.nodes:
-                    matches.add(node_id)
-                    continue
-                if name:
-                    for candidate in self.find_entities(name_contains=name):
-                        matches.add(candidate)
-
+        snapshot = self._read_snapshot()
+        cached = snapshot.resolved.get(text)
+        if cached is not None:
+            return list(cached)
+
+        seeds = self.pack.extract_candidates(text) if self.pack else []
+        matches = self._match_seeds(snapshot, seeds)
+
+        if len(text) <= _RESOLVE_CACHE_MAX_TEXT_CHARS:
+            if len(snapshot.resolved) >= _RESOLVE_CACHE_MAX_ENTRIES:
+                snapshot.resolved.clear()
+            snapshot.resolved[text] = tuple(matches)
         return list(matches)
 
+    def _read_snapshot(self) -> _GraphSnapshot:
+        """Return the current read snapshot, rebuilding it after writes."""
+        snapshot = self._snapshot
+        if snapshot is None:
+            with self._lock:
+                snapshot = self._snapshot
+                if snapshot is None:
+                    snapshot = _GraphSnapshot(self.graph)
+                    self._snapshot = snapshot
+        return snapshot
+
+    def _match_seeds(self, snapshot: _GraphSnapshot, seeds: Iterable[Any]) -> Set[str]:
+        """Resolve extracted seeds to node_ids (exact id first, then by name)."""
+        matches: Set[str] = set()
+        for seed in seeds:
+            node_id, name = self._seed_to_node_id(seed)
+            if node_id and node_id in snapshot:
+                matches.add(node_id)
+                continue
+            if name:
+                matches.update(snapshot.find_by_name(name))
+        return matches
+
     def _seed_to_node_id(
         self, seed: Union[str, Tuple[Union[str, Enum], str, str, Dict[str, Any]]]
     ) -> Tuple[Optional[str], Optional[str]]:
@@ -1066,6 +1262,8 @@ class LegalKnowledgeGraph:
             token_budget = _get_default_token_budget()
 
         char_budget = token_budget * CHARS_PER_TOKEN_ESTIMATE
+        hops = hops or get_rag_config().graph_hops
+        snapshot = self._read_snapshot()
         context_parts: List[str] = ["### CONTEXTO DO GRAFO DE CONHECIMENTO:\n"]
         current_chars = len(context_parts[0])
 
@@ -1073,8 +1271,8 @@ class LegalKnowledgeGraph:
             if current_chars >= char_budget:
                 break
 
-            subgraph = self.traverse(entity_id, hops=hops, max_nodes=20)
-            entity_data = self.get_entity(entity_id)
+            subgraph = snapshot.traverse(entity_id, hops, None, 20)
+            entity_data = snapshot.entity(entity_id)
 
             if not entity_data:
                 continue
@@ -1090,7 +1288,7 @@ class LegalKnowledgeGraph:
                 other_id = (
                     edge["target"] if edge["source"] == entity_id else edge["source"]
                 )
-                other_data = self.get_entity(other_id)
+                other_data = snapshot.entity(other_id)
                 if other_data:
                     relations_by_type[rel_type].append(
                         other_data.get("name", other_id)
@@ -1145,6 +1343,7 @@ class LegalKnowledgeGraph:
         Returns:
             Context string to append to prompt
         """
+        snapshot = self._read_snapshot()
         extracted_entities: Set[str] = set()
 
         for chunk in chunks:
@@ -1156,14 +1355,7 @@ class LegalKnowledgeGraph:
                 if chunk_text and self.pack:
                     seeds = self.pack.extract_candidates(chunk_text)
 
-            for seed in seeds:
-                node_id, name = self._seed_to_node_id(seed)
-                if node_id and node_id in self.graph.nodes:
-                    extracted_entities.add(node_id)
-                    continue
-                if name:
-                    for candidate in self.find_entities(name_contains=name):
-                        extracted_entities.add(candidate)
+            extracted_entities |= self._match_seeds(snapshot, seeds)
 
         return self.get_context(extracted_entities, hops, token_budget)
 
@@ -1283,6 +1475,8 @@ class LegalKnowledgeGraph:
                     target = edge.pop("target")
                     self.graph.add_edge(source, target, **edge)
 
+                self._snapshot = None
+
         except Exception as e:
             logger.error(f"GraphRAG: Failed to load graph: {e}")
 
@@ -0,0 +1,200 @@
+"""
+Latency-aware execution policy for RAGPipeline retrieval stages.
+
+Three opt-in behaviours, all driven by the rolling per-stage histograms of
+``LatencyCollector`` (stage keys are PipelineStage values: ``lexical_search``
+for OpenSearch, ``lexical_preflight`` for its small pre-enhancement probe,
+``vector_search`` for Qdrant, ``graph_search`` for Neo4j):
+
+- Adaptive timeouts: ``min(static, max(floor, p95 * multiplier))`` once the
+  stage has ``min_samples`` observations in the window; the static per-database
+  timeout stays the upper bound. Timeouts are fed back into the collector as
+  censored samples so a degraded backend raises its own p95 instead of being
+  hidden by survivorship.
+- Hedged requests: when a lexical/vector call is still running after the
+  stage's rolling hedge percentile (p90 by default), a duplicate is issued and
+  the first to finish wins; the other is cancelled. Hedges are capped at
+  ``hedge_max_ratio`` of eligible calls so a slow backend is not doubled.
+- Partial fusion: a late source is given a short grace period once the other
+  sources have results, then dropped so fusion proceeds without it.
+
+Decisions are recorded on the trace by the pipeline (``trace.data["latency"]``).
+"""
+
+from __future__ import annotations
+
+import asyncio
+import threading
+import time
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple, TypeVar
+
+T = TypeVar("T")
+
+
+class LatencyPolicy:
+    """Derives per-stage timeouts and hedge delays from rolling latencies."""
+
+    def __init__(
+        self,
+        *,
+        adaptive_timeouts: bool = False,
+        timeout_percentile: float = 95.0,
+        timeout_multiplier: float = 2.0,
+        min_timeout_seconds: float = 0.1,
+        min_samples: int = 50,
+        hedge_requests: bool = False,
+        hedge_percentile: float = 90.0,
+        hedge_min_delay_ms: float = 10.0,
+        hedge_max_ratio: float = 0.1,
+        partial_fusion: bool = False,
+        partial_fusion_grace_ms: float = 50.0,
+        window: str = "5m",
+        refresh_seconds: float = 1.0,
+        collector: Optional[Any] = None,
+    ):
+        self.adaptive_timeouts = adaptive_timeouts
+        self.timeout_percentile = timeout_percentile
+        self.timeout_multiplier = timeout_multiplier
+        self.min_timeout_seconds = min_timeout_seconds
+        self.min_samples = max(1, int(min_samples))
+        self.hedge_requests = hedge_requests
+        self.hedge_percentile = hedge_percentile
+        self.hedge_min_delay_ms = hedge_min_delay_ms
+        self.hedge_max_ratio = max(0.0, hedge_max_ratio)
+        self.partial_fusion = partial_fusion
+        self.partial_fusion_grace_seconds = max(0.0, partial_fusion_grace_ms) / 1000.0
+        self.window = window
+        self.refresh_seconds = refresh_seconds
+        self._collector = collector
+        self._lock = threading.Lock()
+        self._snapshots: Dict[str, Tuple[float, Any]] = {}
+        self._eligible_calls = 0
+        self._hedges = 0
+
+    @classmethod
+    def from_config(cls, cfg: Any) -> "LatencyPolicy":
+        return cls(
+            adaptive_timeouts=cfg.adaptive_timeouts_enabled,
+            timeout_percentile=cfg.adaptive_timeout_percentile,
+            timeout_multiplier=cfg.adaptive_timeout_multiplier,
+            min_timeout_seconds=cfg.adaptive_timeout_min_seconds,
+            min_samples=cfg.adaptive_timeout_min_samples,
+            hedge_requests=cfg.hedge_requests_enabled,
+            hedge_percentile=cfg.hedge_percentile,
+            hedge_min_delay_ms=cfg.hedge_min_delay_ms,
+            hedge_max_ratio=cfg.hedge_max_ratio,
+            partial_fusion=cfg.partial_fusion_enabled,
+            partial_fusion_grace_ms=cfg.partial_fusion_grace_ms,
+        )
+
+    @property
+    def collector(self) -> Any:
+        if self._collector is None:
+            from app.services.rag.core.metrics import get_latency_collector
+            return get_latency_collector()
+        return self._collector
+
+    # ------------------------------------------------------------------
+    # Rolling percentiles
+    # ------------------------------------------------------------------
+
+    def rolling_ms(self, stage: str, p: float) -> Optional[float]:
+        """p-th percentile of ``stage`` in the window, or None with too few samples."""
+        now = time.monotonic()
+        with self._lock:
+            cached = self._snapshots.get(stage)
+        if cached is None or cached[0] <= now:
+            # Snapshot outside the lock; concurrent refreshes are idempotent
+            cached = (now + self.refresh_seconds, self.collector.snapshot(stage, self.window))
+            with self._lock:
+                self._snapshots[stage] = cached
+        snap = cached[1]
+        if snap.count < self.min_samples:
+            return None
+        return snap.percentile(p)
+
+    def timeout_for(self, stage: str, static_seconds: float) -> float:
+        if not self.adaptive_timeouts:
+            return static_seconds
+        p_ms = self.rolling_ms(stage, self.timeout_percentile)
+        if p_ms is None:
+            return static_seconds
+        adaptive = max(self.min_timeout_seconds, p_ms * self.timeout_multiplier / 1000.0)
+        return min(static_seconds, adaptive)
+
+    def record_timeout(self, stage: str, timeout_seconds: float) -> None:
+        """Feed a timed-out call back as a censored sample (only when adapting)."""
+        if self.adaptive_timeouts:
+            self.collector.record(stage, timeout_seconds * 1000.0)
+
+    # ------------------------------------------------------------------
+    # Hedging
+    # ------------------------------------------------------------------
+
+    def hedge_delay(self, stage: str, timeout_seconds: float) -> Optional[float]:
+        """Seconds to wait before hedging, or None when this call is not hedged."""
+        if not self.hedge_requests:
+            return None
+        p_ms = self.rolling_ms(stage, self.hedge_percentile)
+        if p_ms is None:
+            return None
+        delay = max(p_ms, self.hedge_min_delay_ms) / 1000.0
+        if delay >= timeout_seconds:
+            return None
+        with self._lock:
+            self._eligible_calls += 1
+        return delay
+
+    def try_acquire_hedge(self) -> bool:
+        """Budget check when a hedge is about to be issued (burst of one)."""
+        with self._lock:
+            if self.hedge_max_ratio <= 0 or self._hedges >= self.hedge_max_ratio * self._eligible_calls + 1:
+                return False
+            self._hedges += 1
+            return True
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "adaptive_timeouts": self.adaptive_timeouts,
+                "hedge_requests": self.hedge_requests,
+                "partial_fusion": self.partial_fusion,
+                "hedge_eligible_calls": self._eligible_calls,
+                "hedges_issued": self._hedges,
+            }
+
+
+async def hedged_call(
+    attempt: Callable[[int], Awaitable[T]],
+    delay: Optional[float],
+    allow_hedge: Optional[Callable[[], bool]] = None,
+) -> Tuple[T, int]:
+    """
+    Run ``attempt(0)``; if it is still pending after ``delay`` seconds and
+    ``allow_hedge()`` agrees, also run ``attempt(1)``. Returns the first
+    successful result and the index of the attempt that produced it. A failure
+    of one attempt waits for the other; the loser (and both attempts, if the
+    caller is cancelled) is cancelled.
+    """
+    primary = asyncio.ensure_future(attempt(0))
+    tasks = [primary]
+    try:
+        if delay is None:
+            return await primary, 0
+        done, _ = await asyncio.wait({primary}, timeout=delay)
+        if done or (allow_hedge is not None and not allow_hedge()):
+            return await primary, 0
+        tasks.append(asyncio.ensure_future(attempt(1)))
+        pending = set(tasks)
+        first_error: Optional[BaseException] = None
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in sorted(done, key=tasks.index):
+                if task.exception() is None:
+                    return task.result(), tasks.index(task)
+                first_error = first_error or task.exception()
+        raise first_error  # type: ignore[misc]
+    finally:
+        for task in tasks:
+            if not task.done():
+                task.cancel()
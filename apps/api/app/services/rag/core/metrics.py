@@ -1,96 +1,318 @@
 """
 Latency metrics collector for the RAG pipeline.
 
-Provides percentile tracking (P50/P95/P99) per pipeline stage
-using a fixed-size sliding window.
+Provides percentile tracking (P50/P95/P99) per pipeline stage over rolling
+time windows (1m/5m/1h) plus the collector lifetime ("all").
+
+Samples go into HDR-style log-linear histograms: 64 sub-buckets per power of
+two between ~1us and ~4.6h (values in ms), i.e. at most ~0.8% relative error
+with bounded memory per stage, and O(1) recording. Each window keeps a ring
+of 12 slots (1m -> 5s slots, 5m -> 25s, 1h -> 5min) plus a running aggregate:
+a sample increments its current slot and the aggregate, and a slot is
+subtracted from the aggregate when it ages out. Each stage has its own lock,
+so concurrent stages never contend.
+
+Snapshots (``HistogramSnapshot``) are plain bucket-count maps and can be
+merged across workers (``merge_snapshots``) before computing percentiles.
 """
 
 from __future__ import annotations
 
-import bisect
 import math
 import threading
-from collections import deque
-from typing import Deque, Dict, List, Optional
+import time
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+# Histogram layout (values in milliseconds)
+_SUB_BUCKETS = 64
+_MIN_EXP = -10  # values <= 2**-10 ms (~1us) share bucket 0
+_MAX_EXP = 24  # values >= 2**24 ms (~4.6h) share the last bucket
+_MAX_INDEX = (_MAX_EXP - _MIN_EXP + 1) * _SUB_BUCKETS - 1
+
+DEFAULT_WINDOWS: Dict[str, float] = {"1m": 60.0, "5m": 300.0, "1h": 3600.0}
+DEFAULT_WINDOW = "5m"
+LIFETIME_WINDOW = "all"
+_SLOTS_PER_WINDOW = 12
+
+
+def _bucket_index(value: float) -> int:
+    if value <= 0:
+        return 0
+    mantissa, exp = math.frexp(value)  # value = mantissa * 2**exp, 0.5 <= mantissa < 1
+    if exp <= _MIN_EXP:
+        return 0
+    if exp > _MAX_EXP:
+        return _MAX_INDEX
+    return (exp - _MIN_EXP) * _SUB_BUCKETS + int((mantissa - 0.5) * 2 * _SUB_BUCKETS)
+
+
+def _bucket_value(index: int) -> float:
+    """Midpoint of a bucket."""
+    exp, sub = divmod(index, _SUB_BUCKETS)
+    exp += _MIN_EXP
+    return math.ldexp(0.5 + (sub + 0.5) / (2 * _SUB_BUCKETS), exp)
+
+
+class HistogramSnapshot:
+    """Mergeable point-in-time copy of a latency histogram."""
+
+    __slots__ = ("counts", "count", "total", "min", "max")
+
+    def __init__(
+        self,
+        counts: Optional[Dict[int, int]] = None,
+        count: int = 0,
+        total: float = 0.0,
+        min: float = math.inf,
+        max: float = -math.inf,
+    ):
+        self.counts = counts if counts is not None else {}
+        self.count = count
+        self.total = total
+        self.min = min
+        self.max = max
+
+    def merge(self, other: "HistogramSnapshot") -> "HistogramSnapshot":
+        """Add ``other`` into this snapshot (in place) and return self."""
+        for idx, n in other.counts.items():
+            self.counts[idx] = self.counts.get(idx, 0) + n
+        self.count += other.count
+        self.total += other.total
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        return self
+
+    def percentile(self, p: float) -> float:
+        if self.count <= 0:
+            return 0.0
+        if p <= 0:
+            return self.min
+        if p >= 100:
+            return self.max
+        rank = max(1, math.ceil((p / 100.0) * self.count))
+        seen = 0
+        for idx in sorted(self.counts):
+            seen += self.counts[idx]
+            if seen >= rank:
+                return min(max(_bucket_value(idx), self.min), self.max)
+        return self.max
+
+    @property
+    def mean(self) -> float:
+        return self.total / self.count if self.count else 0.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "counts": {str(k): v for k, v in self.counts.items()},
+            "count": self.count,
+            "sum": self.total,
+            "min": self.min if self.count else None,
+            "max": self.max if self.count else None,
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "HistogramSnapshot":
+        count = int(data.get("count", 0))
+        return cls(
+            counts={int(k): int(v) for k, v in (data.get("counts") or {}).items()},
+            count=count,
+            total=float(data.get("sum", 0.0)),
+            min=float(data["min"]) if count and data.get("min") is not None else math.inf,
+            max=float(data["max"]) if count and data.get("max") is not None else -math.inf,
+        )
+
+
+class _Slot:
+    __slots__ = ("epoch", "counts", "count", "total", "min", "max")
+
+    def __init__(self) -> None:
+        self.epoch = -1
+        self.counts: Dict[int, int] = {}
+        self.count = 0
+        self.total = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+
+    def add(self, idx: int, value: float) -> None:
+        self.counts[idx] = self.counts.get(idx, 0) + 1
+        self.count += 1
+        self.total += value
+        if value < self.min:
+            self.min = value
+        if value > self.max:
+            self.max = value
+
+
+class _RollingWindow:
+    """Ring of slots + running aggregate for one window length."""
+
+    __slots__ = ("slot_seconds", "slots", "agg")
+
+    def __init__(self, seconds: float):
+        self.slot_seconds = seconds / _SLOTS_PER_WINDOW
+        self.slots = [_Slot() for _ in range(_SLOTS_PER_WINDOW)]
+        self.agg = _Slot()
+
+    def _retire(self, slot: _Slot) -> None:
+        agg = self.agg
+        for idx, n in slot.counts.items():
+            left = agg.counts[idx] - n
+            if left:
+                agg.counts[idx] = left
+            else:
+                del agg.counts[idx]
+        agg.count -= slot.count
+        agg.total -= slot.total
+        slot.counts = {}
+        slot.count = 0
+        slot.total = 0.0
+        slot.min = math.inf
+        slot.max = -math.inf
+
+    def add(self, idx: int, value: float, now: float) -> None:
+        epoch = int(now // self.slot_seconds)
+        slot = self.slots[epoch % _SLOTS_PER_WINDOW]
+        if slot.epoch != epoch:
+            if slot.count:
+                self._retire(slot)
+            slot.epoch = epoch
+        slot.add(idx, value)
+        agg = self.agg
+        agg.counts[idx] = agg.counts.get(idx, 0) + 1
+        agg.count += 1
+        agg.total += value
+
+    def snapshot(self, now: float) -> HistogramSnapshot:
+        oldest = int(now // self.slot_seconds) - _SLOTS_PER_WINDOW + 1
+        lo, hi = math.inf, -math.inf
+        for slot in self.slots:
+            if not slot.count:
+                continue
+            if slot.epoch < oldest:
+                self._retire(slot)
+                continue
+            lo = min(lo, slot.min)
+            hi = max(hi, slot.max)
+        agg = self.agg
+        return HistogramSnapshot(dict(agg.counts), agg.count, agg.total, lo, hi)
+
+
+class _StageHistograms:
+    """All windows of one stage, guarded by the stage's own lock."""
+
+    __slots__ = ("lock", "windows", "lifetime")
+
+    def __init__(self, windows: Dict[str, float]):
+        self.lock = threading.Lock()
+        self.windows = {name: _RollingWindow(seconds) for name, seconds in windows.items()}
+        self.lifetime = _Slot()
+
+    def add(self, value: float, now: float) -> None:
+        idx = _bucket_index(value)
+        with self.lock:
+            self.lifetime.add(idx, value)
+            for window in self.windows.values():
+                window.add(idx, value, now)
+
+    def snapshot(self, window: str, now: float) -> HistogramSnapshot:
+        with self.lock:
+            if window == LIFETIME_WINDOW:
+                s = self.lifetime
+                return HistogramSnapshot(dict(s.counts), s.count, s.total, s.min, s.max)
+            rolling = self.windows.get(window)
+            if rolling is None:
+                raise ValueError(f"Unknown latency window: {window}")
+            return rolling.snapshot(now)
 
 
 class LatencyCollector:
     """Collects latency measurements and computes percentiles."""
 
-    def __init__(self, window_size: int = 1000):
-        self._lock = threading.Lock()
-        self._window = window_size
-        # For each stage we keep:
-        # - a FIFO of the last N observations (for sliding-window semantics)
-        # - a sorted list of the same observations (for fast percentile reads)
-        self._fifo: Dict[str, Deque[float]] = {}
-        self._sorted: Dict[str, List[float]] = {}
+    def __init__(
+        self,
+        windows: Optional[Dict[str, float]] = None,
+        default_window: str = DEFAULT_WINDOW,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self._lock = threading.Lock()  # guards stage creation only
+        self._windows = dict(windows if windows is not None else DEFAULT_WINDOWS)
+        self.default_window = default_window
+        self._clock = clock
+        self._stages: Dict[str, _StageHistograms] = {}
 
-    def record(self, stage: str, duration_ms: float) -> None:
-        with self._lock:
-            if stage not in self._fifo:
-                self._fifo[stage] = deque()
-                self._sorted[stage] = []
+    @property
+    def windows(self) -> List[str]:
+        return list(self._windows) + [LIFETIME_WINDOW]
 
-            fifo = self._fifo[stage]
-            sorted_list = self._sorted[stage]
+    def _stage(self, stage: str) -> _StageHistograms:
+        hist = self._stages.get(stage)
+        if hist is None:
+            with self._lock:
+                hist = self._stages.get(stage)
+                if hist is None:
+                    hist = self._stages[stage] = _StageHistograms(self._windows)
+        return hist
 
-            fifo.append(duration_ms)
-            bisect.insort(sorted_list, duration_ms)
+    def record(self, stage: str, duration_ms: float) -> None:
+        self._stage(stage).add(float(duration_ms), self._clock())
 
-            if len(fifo) > self._window:
-                oldest = fifo.popleft()
-                idx = bisect.bisect_left(sorted_list, oldest)
-                if 0 <= idx < len(sorted_list):
-                    sorted_list.pop(idx)
+    def snapshot(self, stage: str, window: Optional[str] = None) -> HistogramSnapshot:
+        """Histogram of ``stage`` over ``window`` (empty if the stage is unknown)."""
+        hist = self._stages.get(stage)
+        if hist is None:
+            return HistogramSnapshot()
+        return hist.snapshot(window or self.default_window, self._clock())
 
-    def percentile(self, stage: str, p: float) -> float:
+    def percentile(self, stage: str, p: float, window: Optional[str] = None) -> float:
         """Return the p-th percentile (0-100) for a stage."""
-        with self._lock:
-            durations = self._sorted.get(stage, [])
-            if not durations:
-                return 0.0
-
-            if p <= 0:
-                return durations[0]
-            if p >= 100:
-                return durations[-1]
+        return self.snapshot(stage, window).percentile(p)
 
-            n = len(durations)
-            idx = math.ceil((p / 100.0) * n) - 1
-            return durations[min(max(idx, 0), n - 1)]
+    def summary(self, window: Optional[str] = None) -> Dict[str, Dict[str, float]]:
+        with self._lock:
+            stages = list(self._stages)
+        return {stage: _summarize(self.snapshot(stage, window)) for stage in stages}
 
-    def summary(self) -> Dict[str, Dict[str, float]]:
+    def export(self) -> Dict[str, Dict[str, Dict[str, Any]]]:
+        """Serializable snapshots of every stage and window (for cross-worker merge)."""
         with self._lock:
-            result = {}
-            for stage, durations in self._sorted.items():
-                n = len(durations)
-                if not n:
-                    result[stage] = {
-                        "p50": 0.0,
-                        "p95": 0.0,
-                        "p99": 0.0,
-                        "count": 0,
-                        "avg": 0.0,
-                    }
-                    continue
-
-                def _idx(frac: float) -> int:
-                    return min(max(math.ceil(frac * n) - 1, 0), n - 1)
-
-                result[stage] = {
-                    "p50": durations[_idx(0.50)],
-                    "p95": durations[_idx(0.95)],
-                    "p99": durations[_idx(0.99)],
-                    "count": n,
-                    "avg": round(sum(durations) / n, 2),
-                }
-            return result
+            stages = list(self._stages)
+        return {
+            stage: {w: self.snapshot(stage, w).to_dict() for w in self.windows}
+            for stage in stages
+        }
 
     def reset(self) -> None:
         with self._lock:
-            self._fifo.clear()
-            self._sorted.clear()
+            self._stages.clear()
+
+
+def _summarize(snap: HistogramSnapshot) -> Dict[str, float]:
+    return {
+        "p50": round(snap.percentile(50), 3),
+        "p95": round(snap.percentile(95), 3),
+        "p99": round(snap.percentile(99), 3),
+        "count": snap.count,
+        "avg": round(snap.mean, 2),
+    }
+
+
+def merge_snapshots(
+    exports: Iterable[Dict[str, Dict[str, Dict[str, Any]]]],
+    window: str = DEFAULT_WINDOW,
+) -> Dict[str, Dict[str, float]]:
+    """Merge ``LatencyCollector.export()`` payloads and summarize one window."""
+    merged: Dict[str, HistogramSnapshot] = {}
+    for export in exports:
+        for stage, windows in export.items():
+            data = windows.get(window)
+            if data is None:
+                continue
+            snap = HistogramSnapshot.from_dict(data)
+            if stage in merged:
+                merged[stage].merge(snap)
+            else:
+                merged[stage] = snap
+    return {stage: _summarize(snap) for stage, snap in merged.items()}
 
 
 # ---------------------------------------------------------------------------
@@ -105,3 +327,43 @@ def get_latency_collector() -> LatencyCollector:
     if _collector is None:
         _collector = LatencyCollector()
     return _collector
+
+
+# ---------------------------------------------------------------------------
+# Prometheus export (see app/core/metrics_registry.py)
+# ---------------------------------------------------------------------------
+
+
+def record_search_metrics(trace: Any, outcome: str) -> None:
+    """Export a finished search (stages, total, budget usage) to the registry."""
+    from app.core.metrics_registry import get_metrics_registry
+
+    registry = get_metrics_registry()
+    registry.counter(
+        "iudex_rag_searches_total", "RAGPipeline.search calls by outcome", ("outcome",)
+    ).inc(outcome=outcome)
+    if trace is None:
+        return
+    stage_hist = registry.histogram(
+        "iudex_rag_stage_duration_seconds", "RAG pipeline stage duration", ("stage",)
+    )
+    for s in trace.stages:
+        if not s.skipped and s.duration_ms > 0:
+            stage_hist.observe(s.duration_ms / 1000.0, stage=s.stage.value)
+    if trace.total_duration_ms > 0:
+        registry.histogram(
+            "iudex_rag_search_duration_seconds", "RAGPipeline.search end-to-end duration", ("outcome",)
+        ).observe(trace.total_duration_ms / 1000.0, outcome=outcome)
+
+    usage = trace.budget_usage
+    if usage:
+        registry.counter(
+            "iudex_rag_budget_tokens_total", "Tokens charged to RAG request budgets (BudgetTracker)"
+        ).inc(usage.get("tokens_used", 0))
+        registry.counter(
+            "iudex_rag_budget_llm_calls_total", "LLM calls charged to RAG request budgets (BudgetTracker)"
+        ).inc(usage.get("llm_calls_made", 0))
+        if usage.get("is_exceeded"):
+            registry.counter(
+                "iudex_rag_budget_exceeded_total", "RAG requests that exceeded their budget"
+            ).inc()
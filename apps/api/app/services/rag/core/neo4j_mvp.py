@@ -56,13 +56,15 @@ Usage:
 from __future__ import annotations
 
 import asyncio
+import bisect
 import hashlib
 import json
 import logging
 import os
 import re
 import threading
-from dataclasses import dataclass, field
+from collections import OrderedDict
+from dataclasses import dataclass, field, replace
 from datetime import datetime
 from enum import Enum
 from typing import (
@@ -141,6 +143,28 @@ class CompoundCitation:
         }
 
 
+@dataclass(frozen=True)
+class CitationScan:
+    """
+    Result of one citation scan (entities, compounds, remissions) over one text.
+
+    Shared through the scan memo, so the tuples must not be mutated; the
+    ``copy_*`` helpers return per-caller lists.
+    """
+    entities: Tuple[Dict[str, Any], ...]
+    compound_citations: Tuple[CompoundCitation, ...]
+    remissions: Tuple[Dict[str, Any], ...]
+
+    def copy_entities(self) -> List[Dict[str, Any]]:
+        return [{**e, "metadata": dict(e["metadata"])} for e in self.entities]
+
+    def copy_compound_citations(self) -> List[CompoundCitation]:
+        return [replace(c) for c in self.compound_citations]
+
+    def copy_remissions(self) -> List[Dict[str, Any]]:
+        return [dict(r) for r in self.remissions]
+
+
 # =============================================================================
 # ENV PARSING (matches app.services.rag.config._env_bool)
 # =============================================================================
@@ -404,6 +428,72 @@ class LegalEntityExtractor:
         ),
     }
 
+    # Literal anchors probed on the lowercased text before running a family's
+    # regex: a family is scanned only when one of its anchors occurs. Families
+    # without a selective literal always run: leis ("mp"/"lc" occur inside
+    # common words), decisões, tribunais, processos, CPF/CNPJ and datas.
+    FAMILY_ANCHORS: Dict[EntityType, Tuple[str, ...]] = {
+        EntityType.ARTIGO: ("art",),
+        EntityType.SUMULA: ("mula",),
+        EntityType.TESE: ("tese",),
+        EntityType.TEMA: ("tema",),
+        EntityType.OAB: ("oab",),
+        EntityType.VALOR_MONETARIO: ("r$",),
+    }
+
+    @classmethod
+    def _present_families(cls, text: str) -> Set[EntityType]:
+        """Return the entity families whose regex can possibly match ``text``."""
+        lowered = text.lower()
+        return {
+            etype
+            for etype in cls.PATTERNS
+            if etype not in cls.FAMILY_ANCHORS
+            or any(anchor in lowered for anchor in cls.FAMILY_ANCHORS[etype])
+        }
+
+    @classmethod
+    def _iter_family(
+        cls, etype: EntityType, text: str, families: Set[EntityType],
+    ) -> Iterable[re.Match]:
+        if etype not in families:
+            return ()
+        return cls.PATTERNS[etype].finditer(text)
+
+    @classmethod
+    def scan(cls, text: str, *, include_factual: bool = False) -> "CitationScan":
+        """
+        Extract entities, compound citations and remissions in one call
+        (memoized per text).
+
+        Each family still runs its own regex; the anchor prefilter skips the
+        families whose literal anchor is absent, and texts without "art" skip
+        the article, compound and remission regexes. Article matches are
+        shared between entity and remission extraction.
+        The returned object is shared between callers and must be treated as
+        read-only; ``extract``/``extract_remissions``/``extract_compound_citations``
+        /``extract_all`` return private copies.
+        """
+        text = text or ""
+        if len(text) > _CITATION_SCAN_MAX_CACHED_CHARS:
+            return cls._scan_uncached(text, include_factual)
+        return _cached_citation_scan(text, include_factual)
+
+    @classmethod
+    def _scan_uncached(cls, text: str, include_factual: bool) -> "CitationScan":
+        families = cls._present_families(text)
+        if EntityType.ARTIGO not in families:
+            entities = cls._extract_entities(text, families, [], include_factual)
+            return CitationScan(entities=tuple(entities), compound_citations=(), remissions=())
+
+        art_matches = list(cls.PATTERNS[EntityType.ARTIGO].finditer(text))
+        entities = cls._extract_entities(text, families, art_matches, include_factual)
+        return CitationScan(
+            entities=tuple(entities),
+            compound_citations=tuple(cls._extract_compound_uncached(text)),
+            remissions=tuple(cls._extract_remissions_uncached(text, art_matches)),
+        )
+
     @classmethod
     def extract(cls, text: str, *, include_factual: bool = False) -> List[Dict[str, Any]]:
         """
@@ -416,11 +506,21 @@ class LegalEntityExtractor:
         Returns:
             List of entity dicts with: entity_type, entity_id, name, metadata
         """
+        return cls.scan(text, include_factual=include_factual).copy_entities()
+
+    @classmethod
+    def _extract_entities(
+        cls,
+        text: str,
+        families: Set[EntityType],
+        art_matches: List[re.Match],
+        include_factual: bool,
+    ) -> List[Dict[str, Any]]:
         entities: List[Dict[str, Any]] = []
         seen: Set[str] = set()
 
         # Lei/Decreto
-        for match in cls.PATTERNS[EntityType.LEI].finditer(text):
+        for match in cls._iter_family(EntityType.LEI, text, families):
             numero = match.group(1).replace(".", "")
             ano = match.group(2) or ""
             # Normalize 2-digit year to 4-digit
@@ -443,7 +543,7 @@ class LegalEntityExtractor:
                 })
 
         # Artigo
-        for match in cls.PATTERNS[EntityType.ARTIGO].finditer(text):
+        for match in art_matches:
             artigo = match.group(1)
             paragrafo = match.group(2) or ""
             inciso = match.group(3) or ""
@@ -468,7 +568,7 @@ class LegalEntityExtractor:
                 })
 
         # Súmula
-        for match in cls.PATTERNS[EntityType.SUMULA].finditer(text):
+        for match in cls._iter_family(EntityType.SUMULA, text, families):
             numero = match.group(1)
             tribunal = (match.group(2) or "STJ").upper()
             entity_id = f"sumula_{tribunal}_{numero}"
@@ -483,7 +583,7 @@ class LegalEntityExtractor:
                 })
 
         # Decisão
-        for match in cls.PATTERNS[EntityType.DECISAO].finditer(text):
+        for match in cls._iter_family(EntityType.DECISAO, text, families):
             tipo = (match.group(1) or "").upper()
             numero_raw = match.group(2) or ""
             numero = re.sub(r"[^\d]", "", numero_raw) or numero_raw.replace("/", "_").replace("-", "_")
@@ -499,7 +599,7 @@ class LegalEntityExtractor:
                 })
 
         # Tese
-        for match in cls.PATTERNS[EntityType.TESE].finditer(text):
+        for match in cls._iter_family(EntityType.TESE, text, families):
             numero = match.group(1)
             entity_id = f"tese_{numero}"
             if entity_id not in seen:
@@ -513,7 +613,7 @@ class LegalEntityExtractor:
                 })
 
         # Processo (CNJ)
-        for match in cls.PATTERNS[EntityType.PROCESSO].finditer(text):
+        for match in cls._iter_family(EntityType.PROCESSO, text, families):
             numero_cnj = match.group(1)
             entity_id = f"proc_{numero_cnj.replace('.', '_').replace('-', '_')}"
             if entity_id not in seen:
@@ -527,7 +627,7 @@ class LegalEntityExtractor:
                 })
 
         # Tribunal
-        for match in cls.PATTERNS[EntityType.TRIBUNAL].finditer(text):
+        for match in cls._iter_family(EntityType.TRIBUNAL, text, families):
             tribunal = match.group(1).upper()
             entity_id = f"tribunal_{tribunal}"
             if entity_id not in seen:
@@ -541,7 +641,7 @@ class LegalEntityExtractor:
                 })
 
         # Tema
-        for match in cls.PATTERNS[EntityType.TEMA].finditer(text):
+        for match in cls._iter_family(EntityType.TEMA, text, families):
             numero = match.group(1)
             tribunal = (match.group(2) or "STF").upper()
             entity_id = f"tema_{tribunal}_{numero}"
@@ -556,7 +656,7 @@ class LegalEntityExtractor:
                 })
 
         # OAB
-        for match in cls.PATTERNS[EntityType.OAB].finditer(text):
+        for match in cls._iter_family(EntityType.OAB, text, families):
             uf = match.group(1).upper()
             numero = match.group(2).replace(".", "")
             entity_id = f"oab_{uf}_{numero}"
@@ -571,17 +671,23 @@ class LegalEntityExtractor:
                 })
 
         if include_factual:
-            cls._extract_factual(text, entities, seen)
+            cls._extract_factual(text, entities, seen, families)
 
         return entities
 
     @classmethod
     def _extract_factual(
-        cls, text: str, entities: List[Dict[str, Any]], seen: Set[str],
+        cls,
+        text: str,
+        entities: List[Dict[str, Any]],
+        seen: Set[str],
+        families: Optional[Set[EntityType]] = None,
     ) -> None:
         """Extract factual entities (CPF, CNPJ, dates, monetary values)."""
+        if families is None:
+            families = cls._present_families(text)
         # CPF (with check-digit validation)
-        for match in cls.PATTERNS[EntityType.CPF].finditer(text):
+        for match in cls._iter_family(EntityType.CPF, text, families):
             cpf = match.group(1)
             if not _validate_cpf(cpf):
                 continue
@@ -598,7 +704,7 @@ class LegalEntityExtractor:
                 })
 
         # CNPJ (with check-digit validation)
-        for match in cls.PATTERNS[EntityType.CNPJ].finditer(text):
+        for match in cls._iter_family(EntityType.CNPJ, text, families):
             cnpj = match.group(1)
             if not _validate_cnpj(cnpj):
                 continue
@@ -615,7 +721,7 @@ class LegalEntityExtractor:
                 })
 
         # Datas (DD/MM/YYYY)
-        for match in cls.PATTERNS[EntityType.DATA_JURIDICA].finditer(text):
+        for match in cls._iter_family(EntityType.DATA_JURIDICA, text, families):
             dia = match.group(1).zfill(2)
             mes = match.group(2).zfill(2)
             ano = match.group(3)
@@ -635,7 +741,7 @@ class LegalEntityExtractor:
                 })
 
         # Valores monetários (R$ X.XXX,XX)
-        for match in cls.PATTERNS[EntityType.VALOR_MONETARIO].finditer(text):
+        for match in cls._iter_family(EntityType.VALOR_MONETARIO, text, families):
             valor_raw = match.group(1)
             # Normalize: remove dots, replace comma with dot for numeric form
             valor_norm = valor_raw.replace(".", "").replace(",", ".")
@@ -698,45 +804,43 @@ class LegalEntityExtractor:
             List of remission dicts with: source_context, target_article,
             remission_type, position
         """
-        remissions: List[Dict[str, Any]] = []
+        return cls.scan(text).copy_remissions()
+
+    REMISSION_TYPES = [
+        "combinado_com",
+        "nos_termos_de",
+        "aplica_se",
+        "remete_a",
+        "por_forca_de",
+    ]
 
-        # First, extract all entities to identify potential sources
-        entities = cls.extract(text)
-        entity_positions = []
+    # Implicit remissions (articles mentioned in sequence):
+    # "arts. X e Y" or "arts. X, Y e Z"
+    SEQUENCE_PATTERN = re.compile(
+        r"(?:arts?\.?|artigos?)\s*(\d+)\s*(?:,\s*(\d+))*\s*(?:e|,)\s*(\d+)",
+        re.IGNORECASE,
+    )
 
-        # Find positions of all articles in text
-        for match in cls.PATTERNS[EntityType.ARTIGO].finditer(text):
-            artigo = match.group(1)
-            entity_positions.append({
-                "artigo": artigo,
-                "start": match.start(),
-                "end": match.end(),
-                "match": match.group(0),
-            })
+    @classmethod
+    def _extract_remissions_uncached(
+        cls, text: str, art_matches: List[re.Match],
+    ) -> List[Dict[str, Any]]:
+        remissions: List[Dict[str, Any]] = []
 
-        # Find remission patterns
-        remission_types = [
-            "combinado_com",
-            "nos_termos_de",
-            "aplica_se",
-            "remete_a",
-            "por_forca_de",
-        ]
+        # Article matches come from finditer, so their end offsets are sorted
+        # and the nearest preceding article is found by bisection.
+        art_ends = [m.end() for m in art_matches]
 
-        for pattern, rem_type in zip(cls.REMISSION_PATTERNS, remission_types):
+        for pattern, rem_type in zip(cls.REMISSION_PATTERNS, cls.REMISSION_TYPES):
             for match in pattern.finditer(text):
                 target_article = match.group(1)
                 position = match.start()
 
-                # Find the nearest preceding article as potential source
+                # Nearest preceding article (max 200 chars) as potential source
                 source_article = None
-                min_distance = float("inf")
-                for ep in entity_positions:
-                    if ep["end"] < position:
-                        distance = position - ep["end"]
-                        if distance < min_distance and distance < 200:  # Max 200 chars
-                            min_distance = distance
-                            source_article = ep["artigo"]
+                idx = bisect.bisect_left(art_ends, position) - 1
+                if idx >= 0 and position - art_ends[idx] < 200:
+                    source_article = art_matches[idx].group(1)
 
                 remissions.append({
                     "source_article": source_article,
@@ -746,13 +850,7 @@ class LegalEntityExtractor:
                     "position": position,
                 })
 
-        # Also detect implicit remissions (articles mentioned in sequence)
-        # Pattern: "arts. X e Y" or "arts. X, Y e Z"
-        sequence_pattern = re.compile(
-            r"(?:arts?\.?|artigos?)\s*(\d+)\s*(?:,\s*(\d+))*\s*(?:e|,)\s*(\d+)",
-            re.IGNORECASE,
-        )
-        for match in sequence_pattern.finditer(text):
+        for match in cls.SEQUENCE_PATTERN.finditer(text):
             articles = [g for g in match.groups() if g]
             if len(articles) >= 2:
                 # Create remissions between sequential articles
@@ -775,9 +873,10 @@ class LegalEntityExtractor:
         Returns:
             Dict with 'entities' and 'remissions' lists
         """
+        scan = cls.scan(text)
         return {
-            "entities": cls.extract(text),
-            "remissions": cls.extract_remissions(text),
+            "entities": scan.copy_entities(),
+            "remissions": scan.copy_remissions(),
         }
 
     # =========================================================================
@@ -1038,7 +1137,11 @@ class LegalEntityExtractor:
         Retorna lista de CompoundCitation com todos os componentes estruturados.
         Mantém compatibilidade com extract() simples — este método é complementar.
         """
-        if not text or not text.strip():
+        return cls.scan(text).copy_compound_citations()
+
+    @classmethod
+    def _extract_compound_uncached(cls, text: str) -> List[CompoundCitation]:
+        if not text.strip():
             return []
 
         citations: List[CompoundCitation] = []
@@ -1074,13 +1177,41 @@ class LegalEntityExtractor:
         Returns:
             Dict com 'entities', 'compound_citations' e 'remissions'.
         """
+        scan = cls.scan(text, include_factual=include_factual)
         return {
-            "entities": cls.extract(text, include_factual=include_factual),
-            "compound_citations": cls.extract_compound_citations(text),
-            "remissions": cls.extract_remissions(text),
+            "entities": scan.copy_entities(),
+            "compound_citations": scan.copy_compound_citations(),
+            "remissions": scan.copy_remissions(),
         }
 
 
+# Texts longer than this (whole documents rather than chunks) are scanned
+# without memoization.
+_CITATION_SCAN_MAX_CACHED_CHARS = 200_000
+_CITATION_SCAN_CACHE_SIZE = int(os.getenv("LEGAL_CITATION_SCAN_CACHE_SIZE", "4096"))
+
+# LRU keyed by a digest of the text, so the cache holds only the (small)
+# scans and never pins the scanned strings themselves.
+_citation_scan_cache: "OrderedDict[Tuple[bytes, bool], CitationScan]" = OrderedDict()
+_citation_scan_lock = threading.Lock()
+
+
+def _cached_citation_scan(text: str, include_factual: bool) -> CitationScan:
+    digest = hashlib.blake2b(text.encode("utf-8", "surrogatepass"), digest_size=16).digest()
+    key = (digest, include_factual)
+    with _citation_scan_lock:
+        scan = _citation_scan_cache.get(key)
+        if scan is not None:
+            _citation_scan_cache.move_to_end(key)
+            return scan
+    scan = LegalEntityExtractor._scan_uncached(text, include_factual)
+    with _citation_scan_lock:
+        _citation_scan_cache[key] = scan
+        while len(_citation_scan_cache) > _CITATION_SCAN_CACHE_SIZE:
+            _citation_scan_cache.popitem(last=False)
+    return scan
+
+
 # =============================================================================
 # FACT EXTRACTOR (Deterministic, no LLM)
 # =============================================================================
@@ -0,0 +1,278 @@
+"""
+Opt-in per-request profiler for RAGPipeline.search.
+
+Two triggers, both disabled by default:
+- ``profile_sample_every=N``: every N-th search gets a full profile
+  (per-stage wall/CPU, result list sizes and, when
+  ``profile_track_allocations`` is on, tracemalloc deltas).
+- ``profile_slow_ms=T``: every search carries a light profile (wall/CPU and
+  sizes only) that is kept when the search took at least T ms.
+
+Kept profiles are attached to the PipelineTrace (``trace.data["profile"]``),
+emitted as a ``SLOW_QUERY_PROFILED`` trace event and stored in a bounded
+in-memory store that backs the admin "slowest recent queries" endpoint.
+
+CPU time is process-wide (``time.process_time``) over each stage window, and
+tracemalloc is global: overlapping stages and concurrent requests share both.
+"""
+
+from __future__ import annotations
+
+import itertools
+import threading
+import time
+import tracemalloc
+from collections import deque
+from typing import Any, Deque, Dict, Iterable, List, Optional
+
+from loguru import logger
+
+
+class RequestProfile:
+    """Profile data collected for a single search request."""
+
+    def __init__(self, trace_id: str, query: str, *, sampled: bool, track_allocations: bool):
+        self.trace_id = trace_id
+        self.query = query
+        self.sampled = sampled
+        self.track_allocations = track_allocations
+        self.started_at = time.time()
+        self._wall_start = time.perf_counter()
+        self._cpu_start = time.process_time()
+        self._open: Dict[int, tuple] = {}
+        self.stages: List[Dict[str, Any]] = []
+        self.result_sizes: Dict[str, Dict[str, int]] = {}
+        self.top_allocations: List[Dict[str, Any]] = []
+        self.allocation_count_delta = 0
+        self.allocated_bytes_delta = 0
+        self._snapshot_start: Optional[tracemalloc.Snapshot] = None
+        if track_allocations and tracemalloc.is_tracing():
+            self._snapshot_start = tracemalloc.take_snapshot()
+
+    def stage_started(self, stage_trace: Any) -> None:
+        traced = tracemalloc.get_traced_memory()[0] if self.track_allocations and tracemalloc.is_tracing() else 0
+        self._open[id(stage_trace)] = (time.process_time(), traced)
+
+    def stage_ended(self, stage_trace: Any) -> None:
+        opened = self._open.pop(id(stage_trace), None)
+        if opened is None:
+            return
+        cpu_start, traced_start = opened
+        entry: Dict[str, Any] = {
+            "stage": stage_trace.stage.value,
+            "wall_ms": round(stage_trace.duration_ms, 2),
+            "cpu_ms": round((time.process_time() - cpu_start) * 1000, 2),
+            "input_count": stage_trace.input_count,
+            "output_count": stage_trace.output_count,
+        }
+        if stage_trace.error:
+            entry["error"] = stage_trace.error
+        if self.track_allocations and tracemalloc.is_tracing():
+            entry["traced_bytes_delta"] = tracemalloc.get_traced_memory()[0] - traced_start
+        self.stages.append(entry)
+
+    def record_results(self, name: str, items: Optional[Iterable[Any]]) -> None:
+        """Record count and approximate text size of an intermediate result list."""
+        items = list(items or [])
+        chars = 0
+        for item in items:
+            if isinstance(item, dict):
+                chars += len(str(item.get("text") or item.get("content") or ""))
+        self.result_sizes[name] = {"count": len(items), "text_chars": chars}
+
+    def _finish_allocations(self, top_n: int) -> None:
+        if self._snapshot_start is None or not tracemalloc.is_tracing():
+            return
+        snapshot = tracemalloc.take_snapshot()
+        filters = [tracemalloc.Filter(False, tracemalloc.__file__)]
+        diff = snapshot.filter_traces(filters).compare_to(self._snapshot_start.filter_traces(filters), "lineno")
+        self.allocation_count_delta = sum(d.count_diff for d in diff)
+        self.allocated_bytes_delta = sum(d.size_diff for d in diff)
+        ranked = sorted(diff, key=lambda d: d.size_diff, reverse=True)[:top_n]
+        self.top_allocations = [
+            {
+                "location": f"{d.traceback[0].filename}:{d.traceback[0].lineno}",
+                "size_diff_bytes": d.size_diff,
+                "count_diff": d.count_diff,
+            }
+            for d in ranked
+            if d.size_diff > 0
+        ]
+        self._snapshot_start = None
+
+    def finish(self, total_ms: float, top_allocations: int = 10) -> Dict[str, Any]:
+        self._finish_allocations(top_allocations)
+        wall_ms = (time.perf_counter() - self._wall_start) * 1000
+        return {
+            "trace_id": self.trace_id,
+            "query": self.query[:200],
+            "started_at": self.started_at,
+            "total_ms": round(total_ms or wall_ms, 2),
+            "cpu_ms": round((time.process_time() - self._cpu_start) * 1000, 2),
+            "sampled": self.sampled,
+            "stages": self.stages,
+            "result_sizes": self.result_sizes,
+            "allocations": {
+                "tracked": self.track_allocations,
+                "count_delta": self.allocation_count_delta,
+                "bytes_delta": self.allocated_bytes_delta,
+                "top": self.top_allocations,
+            },
+        }
+
+
+class RequestProfiler:
+    """Decides which requests are profiled and keeps the recent profiles."""
+
+    def __init__(
+        self,
+        sample_every: int = 0,
+        slow_ms: float = 0.0,
+        track_allocations: bool = False,
+        max_entries: int = 100,
+        top_allocations: int = 10,
+    ):
+        self.sample_every = max(0, int(sample_every))
+        self.slow_ms = max(0.0, float(slow_ms))
+        self.track_allocations = bool(track_allocations)
+        self.top_allocations = top_allocations
+        self._counter = itertools.count(1)
+        self._lock = threading.Lock()
+        self._profiles: Deque[Dict[str, Any]] = deque(maxlen=max(1, int(max_entries)))
+        self._tracemalloc_users = 0
+        self._started_tracemalloc = False
+
+    @property
+    def enabled(self) -> bool:
+        return self.sample_every > 0 or self.slow_ms > 0
+
+    # ------------------------------------------------------------------
+    # Request lifecycle
+    # ------------------------------------------------------------------
+
+    def begin(self, trace: Any) -> Optional[RequestProfile]:
+        """Attach a profile to ``trace`` if this request should be profiled."""
+        if not self.enabled:
+            return None
+        sampled = self.sample_every > 0 and next(self._counter) % self.sample_every == 0
+        if not sampled and self.slow_ms <= 0:
+            return None
+        track = sampled and self.track_allocations
+        if track:
+            self._acquire_tracemalloc()
+        profile = RequestProfile(
+            trace.trace_id, trace.original_query, sampled=sampled, track_allocations=track
+        )
+        trace.profile = profile
+        return profile
+
+    def finish(self, trace: Any) -> Optional[Dict[str, Any]]:
+        """Finalize the profile; keep/export it when sampled or slow."""
+        profile: Optional[RequestProfile] = getattr(trace, "profile", None)
+        if profile is None:
+            return None
+        trace.profile = None
+        try:
+            total_ms = trace.total_duration_ms or (time.time() - trace.started_at) * 1000
+            slow = self.slow_ms > 0 and total_ms >= self.slow_ms
+            if not (profile.sampled or slow):
+                return None
+            data = profile.finish(total_ms, top_allocations=self.top_allocations)
+            data["reason"] = "slow" if slow else "sampled"
+        finally:
+            if profile.track_allocations:
+                self._release_tracemalloc()
+
+        trace.add_data("profile", data)
+        with self._lock:
+            self._profiles.append(data)
+        self._export(data)
+        return data
+
+    # ------------------------------------------------------------------
+    # Queries
+    # ------------------------------------------------------------------
+
+    def slowest(self, limit: int = 20) -> List[Dict[str, Any]]:
+        with self._lock:
+            profiles = list(self._profiles)
+        return sorted(profiles, key=lambda p: p["total_ms"], reverse=True)[:limit]
+
+    def recent(self, limit: int = 20) -> List[Dict[str, Any]]:
+        with self._lock:
+            return list(self._profiles)[-limit:][::-1]
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            kept = len(self._profiles)
+        return {
+            "enabled": self.enabled,
+            "sample_every": self.sample_every,
+            "slow_ms": self.slow_ms,
+            "track_allocations": self.track_allocations,
+            "kept": kept,
+        }
+
+    def clear(self) -> None:
+        with self._lock:
+            self._profiles.clear()
+
+    # ------------------------------------------------------------------
+    # Internals
+    # ------------------------------------------------------------------
+
+    def _acquire_tracemalloc(self) -> None:
+        with self._lock:
+            self._tracemalloc_users += 1
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+                self._started_tracemalloc = True
+
+    def _release_tracemalloc(self) -> None:
+        with self._lock:
+            self._tracemalloc_users = max(0, self._tracemalloc_users - 1)
+            if self._tracemalloc_users == 0 and self._started_tracemalloc:
+                tracemalloc.stop()
+                self._started_tracemalloc = False
+
+    @staticmethod
+    def _export(data: Dict[str, Any]) -> None:
+        try:
+            from app.services.rag.utils.trace import TraceEventType, trace_event
+
+            trace_event(
+                TraceEventType.SLOW_QUERY_PROFILED,
+                request_id=data["trace_id"],
+                query_original=data["query"],
+                latency_ms=data["total_ms"],
+                metadata={"profile": data},
+            )
+        except Exception as e:  # exporting is best-effort
+            logger.debug(f"Profile export failed: {e}")
+
+
+# ---------------------------------------------------------------------------
+# Singleton
+# ---------------------------------------------------------------------------
+
+_profiler: Optional[RequestProfiler] = None
+
+
+def get_request_profiler() -> RequestProfiler:
+    global _profiler
+    if _profiler is None:
+        from app.services.rag.config import get_rag_config
+        cfg = get_rag_config()
+        _profiler = RequestProfiler(
+            sample_every=cfg.profile_sample_every,
+            slow_ms=cfg.profile_slow_ms,
+            track_allocations=cfg.profile_track_allocations,
+            max_entries=cfg.profile_max_entries,
+        )
+    return _profiler
+
+
+def reset_request_profiler() -> None:
+    """Reset singleton (for testing)."""
+    global _profiler
+    _profiler = None
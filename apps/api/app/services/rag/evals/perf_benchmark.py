@@ -0,0 +1,489 @@
+"""
+Offline latency/throughput benchmark for `RAGPipeline.search`.
+
+Runs the real pipeline stages (query enhancement, lexical/vector/graph
+retrieval orchestration, RRF merge, CRAG gate, rerank, compression, graph
+enrichment) against deterministic in-process stand-ins for OpenSearch, Qdrant,
+Neo4j, the embeddings provider, the reranker and the query-expansion LLM.
+
+Each stand-in sleeps for a latency drawn from a fixed log-normal distribution
+(p50/p95 per service, optionally growing with corpus size) and returns results
+from a synthetic corpus that is generated on demand, so 10M-chunk corpora cost
+no memory. Draws are seeded per (service, request, call), so two runs with the
+same config see the same latency sequence regardless of task interleaving.
+
+Reports per-stage p50/p95/p99 (via `LatencyCollector`), throughput at a given
+concurrency and process memory, and can be saved/compared as JSON baselines:
+
+    report = await run_benchmark(BenchmarkConfig(scenarios=[BenchmarkScenario(100_000, 8)]))
+    save_report(report, "baseline.json")
+    regressions = compare_reports(report, load_report("baseline.json"))
+"""
+
+from __future__ import annotations
+
+import asyncio
+import contextvars
+import dataclasses
+import json
+import math
+import os
+import random
+import resource
+import sys
+import time
+import tracemalloc
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Sequence
+
+REPORT_VERSION = 1
+
+# Request sequence number of the current benchmark request (propagates into
+# asyncio.to_thread), used to seed the latency draws of every simulated call.
+_request_seq: contextvars.ContextVar[int] = contextvars.ContextVar("rag_bench_request_seq", default=0)
+
+DEFAULT_QUERIES: List[str] = [
+    "responsabilidade civil do Estado por omissão",
+    "prescrição intercorrente na execução fiscal",
+    "dano moral por negativação indevida STJ",
+    "Lei 8.666/1993 art. 37",
+    "Súmula 331 do TST terceirização",
+    "art. 5 da Constituição Federal direito de resposta",
+    "requisitos da tutela de urgência no CPC",
+    "desconsideração da personalidade jurídica inversa",
+]
+
+_VOCAB = (
+    "contrato cláusula multa prazo prescrição decadência recurso apelação sentença acórdão "
+    "tribunal relator voto ementa responsabilidade civil dano moral material indenização "
+    "execução fiscal penhora embargos tutela urgência liminar mandado segurança habeas "
+    "corpus competência jurisdição processo réu autor petição inicial contestação prova "
+    "perícia laudo testemunha audiência conciliação lei artigo parágrafo inciso súmula"
+).split()
+
+
+# =============================================================================
+# Latency model
+# =============================================================================
+
+
+@dataclass(frozen=True)
+class LatencyProfile:
+    """Log-normal latency distribution of a simulated dependency."""
+
+    p50_ms: float
+    p95_ms: float
+    per_item_ms: float = 0.0  # extra cost per item (candidate, query) in the call
+    corpus_log_factor: float = 0.0  # relative p50 growth per decade of corpus above 10k chunks
+
+    def sample(self, rng: random.Random, *, corpus_size: int = 0, items: int = 0) -> float:
+        sigma = math.log(self.p95_ms / self.p50_ms) / 1.645 if self.p95_ms > self.p50_ms > 0 else 0.0
+        median = self.p50_ms
+        if self.corpus_log_factor and corpus_size > 10_000:
+            median *= 1.0 + self.corpus_log_factor * math.log10(corpus_size / 10_000)
+        base = median * math.exp(sigma * rng.gauss(0.0, 1.0)) if median > 0 else 0.0
+        return base + self.per_item_ms * items
+
+
+def default_profiles() -> Dict[str, LatencyProfile]:
+    """Latency profiles roughly matching the local Docker stack."""
+    return {
+        "opensearch": LatencyProfile(p50_ms=18.0, p95_ms=45.0, corpus_log_factor=0.35),
+        "qdrant": LatencyProfile(p50_ms=12.0, p95_ms=30.0, corpus_log_factor=0.25),
+        "neo4j": LatencyProfile(p50_ms=15.0, p95_ms=40.0, corpus_log_factor=0.2),
+        "embeddings": LatencyProfile(p50_ms=25.0, p95_ms=60.0, per_item_ms=3.0),
+        "reranker": LatencyProfile(p50_ms=8.0, p95_ms=20.0, per_item_ms=1.5),
+        "llm": LatencyProfile(p50_ms=450.0, p95_ms=1200.0),
+    }
+
+
+# =============================================================================
+# Synthetic corpus
+# =============================================================================
+
+
+class SyntheticCorpus:
+    """Deterministic corpus of `size` chunks, generated on demand."""
+
+    CHUNKS_PER_DOC = 8
+
+    def __init__(self, size: int, *, seed: int = 0, words_per_chunk: int = 80):
+        if size <= 0:
+            raise ValueError("corpus size must be positive")
+        self.size = int(size)
+        self.seed = seed
+        self.words_per_chunk = words_per_chunk
+
+    def chunk(self, idx: int, *, score: float = 0.0) -> Dict[str, Any]:
+        rng = random.Random(f"{self.seed}:chunk:{idx}")
+        doc_idx, chunk_index = divmod(idx, self.CHUNKS_PER_DOC)
+        text = " ".join(rng.choice(_VOCAB) for _ in range(self.words_per_chunk)).capitalize() + "."
+        return {
+            "chunk_uid": f"chunk-{idx}",
+            "id": f"chunk-{idx}",
+            "text": text,
+            "score": score,
+            "doc_id": f"doc-{doc_idx}",
+            "metadata": {
+                "doc_id": f"doc-{doc_idx}",
+                "chunk_index": chunk_index,
+                "total_chunks": self.CHUNKS_PER_DOC,
+                "source_type": "juris" if doc_idx % 3 else "lei",
+            },
+        }
+
+    def ranked_ids(self, key: str, k: int, *, source: str) -> List[int]:
+        """Top-k chunk ids for a query; different sources share part of the ranking."""
+        k = max(0, min(int(k), self.size))
+        pool = random.Random(f"{self.seed}:pool:{key}").sample(range(self.size), min(self.size, 2 * k))
+        random.Random(f"{self.seed}:{source}:{key}").shuffle(pool)
+        return pool[:k]
+
+
+# =============================================================================
+# Simulated dependencies
+# =============================================================================
+
+
+class _SimulatedService:
+    def __init__(self, name: str, profile: LatencyProfile, corpus: SyntheticCorpus, *, seed: int, time_scale: float):
+        self.name = name
+        self.profile = profile
+        self.corpus = corpus
+        self.seed = seed
+        self.time_scale = time_scale
+        self.calls = 0
+
+    def _delay_s(self, key: str, items: int = 0) -> float:
+        self.calls += 1
+        rng = random.Random(f"{self.seed}:{self.name}:{_request_seq.get()}:{key}")
+        ms = self.profile.sample(rng, corpus_size=self.corpus.size, items=items)
+        return max(0.0, ms * self.time_scale / 1000.0)
+
+    def _block(self, key: str, items: int = 0) -> None:
+        delay = self._delay_s(key, items)
+        if delay:
+            time.sleep(delay)
+
+    async def _wait(self, key: str, items: int = 0) -> None:
+        delay = self._delay_s(key, items)
+        if delay:
+            await asyncio.sleep(delay)
+
+    def _hits(self, key: str, k: int, *, source: str, top_score: float) -> List[Dict[str, Any]]:
+        ids = self.corpus.ranked_ids(key, k, source=source)
+        n = max(1, len(ids))
+        return [self.corpus.chunk(i, score=round(top_score * (1.0 - rank / (2.0 * n)), 4)) for rank, i in enumerate(ids)]
+
+
+class SimulatedOpenSearch(_SimulatedService):
+    def search_lexical(self, query: str, indices: Sequence[str] = (), top_k: int = 10, **_: Any) -> List[Dict[str, Any]]:
+        self._block(query)
+        return self._hits(query, top_k, source="lexical", top_score=0.62)
+
+
+class SimulatedEmbeddings(_SimulatedService):
+    def __init__(self, *args: Any, dimensions: int = 64, **kwargs: Any):
+        super().__init__(*args, **kwargs)
+        self.dimensions = dimensions
+
+    def _vector(self, text: str) -> List[float]:
+        rng = random.Random(f"{self.seed}:emb:{text}")
+        return [rng.uniform(-1.0, 1.0) for _ in range(self.dimensions)]
+
+    def embed_queries(self, queries: Sequence[str], use_cache: bool = True) -> List[List[float]]:
+        self._block("|".join(queries), items=len(queries))
+        return [self._vector(q) for q in queries]
+
+    def embed_query(self, query: str) -> List[float]:
+        return self.embed_queries([query])[0]
+
+
+class SimulatedQdrant(_SimulatedService):
+    async def search_multi_collection_async(
+        self,
+        collection_types: Sequence[str],
+        query_vector: Sequence[float],
+        top_k: int = 10,
+        **_: Any,
+    ) -> Dict[str, List[Dict[str, Any]]]:
+        key = ",".join(f"{v:.5f}" for v in list(query_vector)[:4])
+        await self._wait(key, items=0)
+        out: Dict[str, List[Dict[str, Any]]] = {}
+        for coll in collection_types:
+            out[coll] = self._hits(f"{key}:{coll}", max(1, int(top_k) // max(1, len(collection_types))), source="vector", top_score=0.82)
+        return out
+
+
+class SimulatedNeo4j(_SimulatedService):
+    def health_check(self) -> bool:
+        return True
+
+    async def query_chunks_by_entities_async(self, entity_ids: Sequence[str], limit: int = 20, **_: Any) -> List[Dict[str, Any]]:
+        key = ",".join(entity_ids)
+        await self._wait(key)
+        hits = self._hits(key, limit, source="graph", top_score=0.55)
+        return [
+            {
+                "chunk_uid": h["chunk_uid"],
+                "text_preview": h["text"][:300],
+                "doc_hash": h["doc_id"],
+                "doc_title": h["doc_id"],
+                "matched_entities": list(entity_ids),
+                "score": h["score"],
+            }
+            for h in hits
+        ]
+
+    async def find_paths_async(self, entity_ids: Sequence[str], limit: int = 15, **_: Any) -> List[Dict[str, Any]]:
+        await self._wait(f"paths:{','.join(entity_ids)}")
+        return [
+            {
+                "path_names": [eid, "Lei 8.666/1993"],
+                "path_ids": [eid, "lei_8666_1993"],
+                "path_relations": ["CITA"],
+                "path_length": 1,
+            }
+            for eid in list(entity_ids)[:limit]
+        ]
+
+    async def find_cooccurrence_async(self, entity_ids: Sequence[str], **_: Any) -> List[Dict[str, Any]]:
+        await self._wait(f"cooccur:{','.join(entity_ids)}")
+        return []
+
+
+class SimulatedReranker(_SimulatedService):
+    def rerank(self, query: str, results: List[Dict[str, Any]], top_k: Optional[int] = None) -> List[Dict[str, Any]]:
+        self._block(query, items=len(results))
+        rng = random.Random(f"{self.seed}:rerank:{query}")
+        scored = []
+        for item in results:
+            item = dict(item)
+            item["rerank_score"] = round(float(item.get("final_score") or item.get("score") or 0.0) + rng.uniform(0, 0.1), 4)
+            scored.append(item)
+        scored.sort(key=lambda r: r["rerank_score"], reverse=True)
+        return scored[: top_k or len(scored)]
+
+
+class SimulatedQueryExpander(_SimulatedService):
+    async def generate_query_variants(self, query: str, count: int = 3, budget_tracker: Any = None) -> List[str]:
+        await self._wait(f"multiquery:{query}")
+        return [query] + [f"{query} (variação {i})" for i in range(1, max(1, int(count)))]
+
+    async def generate_hypothetical_document(self, query: str, budget_tracker: Any = None) -> str:
+        await self._wait(f"hyde:{query}")
+        return f"Documento hipotético sobre {query}. " + self.corpus.chunk(len(query) % self.corpus.size)["text"]
+
+
+class SimulatedGraph:
+    """In-process NetworkX graph stand-in (no persisted state)."""
+
+    def get_related(self, entities: Sequence[str], hops: int = 1, max_nodes: int = 50) -> Dict[str, Any]:
+        return {}
+
+
+# =============================================================================
+# Scenarios and reports
+# =============================================================================
+
+
+@dataclass
+class BenchmarkScenario:
+    corpus_size: int
+    concurrency: int = 1
+    requests: int = 50
+    warmup: int = 5
+
+    @property
+    def name(self) -> str:
+        return f"corpus={self.corpus_size}/concurrency={self.concurrency}"
+
+
+@dataclass
+class BenchmarkConfig:
+    scenarios: List[BenchmarkScenario] = field(
+        default_factory=lambda: [
+            BenchmarkScenario(10_000, 1),
+            BenchmarkScenario(1_000_000, 8),
+            BenchmarkScenario(10_000_000, 16),
+        ]
+    )
+    queries: List[str] = field(default_factory=lambda: list(DEFAULT_QUERIES))
+    profiles: Dict[str, LatencyProfile] = field(default_factory=default_profiles)
+    seed: int = 0
+    time_scale: float = 1.0  # 0 disables sleeping (measures pipeline CPU only)
+    embedding_dimensions: int = 64
+    trace_memory: bool = False  # tracemalloc peak (slows the run noticeably)
+    pipeline_overrides: Dict[str, Any] = field(default_factory=dict)  # RAGConfig fields
+
+    def to_dict(self) -> Dict[str, Any]:
+        data = dataclasses.asdict(self)
+        data["profiles"] = {k: dataclasses.asdict(v) for k, v in self.profiles.items()}
+        return data
+
+
+def _rss_mb() -> float:
+    try:
+        with open("/proc/self/statm", "r", encoding="utf-8") as f:
+            pages = int(f.read().split()[1])
+        return round(pages * os.sysconf("SC_PAGE_SIZE") / 1e6, 2)
+    except Exception:
+        return 0.0
+
+
+def _peak_rss_mb() -> float:
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports KiB, macOS bytes
+    return round(peak / 1e6 if sys.platform == "darwin" else peak / 1e3, 2)
+
+
+def build_pipeline(corpus: SyntheticCorpus, config: BenchmarkConfig):
+    """RAGPipeline wired to simulated dependencies (result cache disabled)."""
+    from app.services.rag.config import RAGConfig
+    from app.services.rag.pipeline.rag_pipeline import RAGPipeline, RAGPipelineConfig
+
+    overrides = {"enable_result_cache": False, "enable_cograg": False}
+    overrides.update(config.pipeline_overrides)
+    base = dataclasses.replace(RAGConfig.from_env(), **overrides)
+
+    def svc(cls, name, **kwargs):
+        return cls(name, config.profiles[name], corpus, seed=config.seed, time_scale=config.time_scale, **kwargs)
+
+    services = {
+        "opensearch": svc(SimulatedOpenSearch, "opensearch"),
+        "qdrant": svc(SimulatedQdrant, "qdrant"),
+        "embeddings": svc(SimulatedEmbeddings, "embeddings", dimensions=config.embedding_dimensions),
+        "reranker": svc(SimulatedReranker, "reranker"),
+        "neo4j": svc(SimulatedNeo4j, "neo4j"),
+        "query_expander": svc(SimulatedQueryExpander, "llm"),
+    }
+    pipeline = RAGPipeline(
+        config=RAGPipelineConfig.from_rag_config(base),
+        graph=SimulatedGraph(),
+        **services,
+    )
+    return pipeline, services
+
+
+async def run_scenario(scenario: BenchmarkScenario, config: BenchmarkConfig) -> Dict[str, Any]:
+    """Run one scenario and return its report section."""
+    from app.services.rag.core.metrics import LatencyCollector
+
+    corpus = SyntheticCorpus(scenario.corpus_size, seed=config.seed)
+    pipeline, services = build_pipeline(corpus, config)
+    queries = config.queries or DEFAULT_QUERIES
+    total = scenario.warmup + scenario.requests
+    collector = LatencyCollector()
+    errors = 0
+    semaphore = asyncio.Semaphore(max(1, scenario.concurrency))
+
+    async def one(seq: int) -> None:
+        nonlocal errors
+        async with semaphore:
+            _request_seq.set(seq)
+            t0 = time.perf_counter()
+            try:
+                result = await pipeline.search(queries[seq % len(queries)], tenant_id="bench", scope="global")
+            except Exception:
+                errors += 1
+                return
+            elapsed_ms = (time.perf_counter() - t0) * 1000.0
+            if seq < scenario.warmup:
+                return
+            collector.record("total", elapsed_ms)
+            for stage in getattr(result.trace, "stages", None) or []:
+                if not stage.skipped and stage.duration_ms > 0:
+                    collector.record(stage.stage.value, stage.duration_ms)
+            if result.trace is not None and result.trace.errors:
+                errors += 1
+
+    if config.trace_memory:
+        tracemalloc.start()
+    rss_before = _rss_mb()
+    # Warmup runs first (sequentially), then the measured window at full concurrency
+    for seq in range(scenario.warmup):
+        await one(seq)
+    t_start = time.perf_counter()
+    await asyncio.gather(*(one(seq) for seq in range(scenario.warmup, total)))
+    wall = time.perf_counter() - t_start
+    memory = {"rss_mb_before": rss_before, "rss_mb_after": _rss_mb(), "rss_mb_peak": _peak_rss_mb()}
+    if config.trace_memory:
+        memory["tracemalloc_peak_mb"] = round(tracemalloc.get_traced_memory()[1] / 1e6, 2)
+        tracemalloc.stop()
+
+    return {
+        "corpus_size": scenario.corpus_size,
+        "concurrency": scenario.concurrency,
+        "requests": scenario.requests,
+        "errors": errors,
+        "wall_seconds": round(wall, 4),
+        "throughput_rps": round(scenario.requests / wall, 3) if wall > 0 else 0.0,
+        "latency_ms": {
+            stage: {k: round(float(v), 3) for k, v in stats.items()}
+            for stage, stats in collector.summary(window="all").items()
+        },
+        "service_calls": {name: s.calls for name, s in services.items()},
+        "memory": memory,
+    }
+
+
+async def run_benchmark(config: Optional[BenchmarkConfig] = None) -> Dict[str, Any]:
+    config = config or BenchmarkConfig()
+    scenarios: Dict[str, Any] = {}
+    for scenario in config.scenarios:
+        scenarios[scenario.name] = await run_scenario(scenario, config)
+    return {
+        "version": REPORT_VERSION,
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "git_rev": os.getenv("GIT_COMMIT") or os.getenv("GITHUB_SHA") or "",
+        "python": sys.version.split()[0],
+        "config": config.to_dict(),
+        "scenarios": scenarios,
+    }
+
+
+def save_report(report: Dict[str, Any], path: str) -> None:
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2, ensure_ascii=False, sort_keys=True)
+
+
+def load_report(path: str) -> Dict[str, Any]:
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def compare_reports(
+    current: Dict[str, Any],
+    baseline: Dict[str, Any],
+    *,
+    tolerance: float = 0.15,
+    min_delta_ms: float = 2.0,
+    percentiles: Sequence[str] = ("p50", "p95", "p99"),
+) -> List[Dict[str, Any]]:
+    """
+    List regressions of `current` against `baseline`.
+
+    A latency regression is a percentile that grew by more than `tolerance`
+    (relative) and `min_delta_ms` (absolute); throughput regresses when it drops
+    by more than `tolerance`. Only scenarios/stages present in both are compared.
+    """
+    regressions: List[Dict[str, Any]] = []
+    base_scenarios = baseline.get("scenarios") or {}
+    for name, cur in (current.get("scenarios") or {}).items():
+        base = base_scenarios.get(name)
+        if not base:
+            continue
+        cur_tp, base_tp = float(cur.get("throughput_rps") or 0.0), float(base.get("throughput_rps") or 0.0)
+        if base_tp > 0 and cur_tp < base_tp * (1.0 - tolerance):
+            regressions.append({"scenario": name, "metric": "throughput_rps", "baseline": base_tp, "current": cur_tp})
+        base_lat = base.get("latency_ms") or {}
+        for stage, stats in (cur.get("latency_ms") or {}).items():
+            if stage not in base_lat:
+                continue
+            for p in percentiles:
+                b, c = float(base_lat[stage].get(p) or 0.0), float(stats.get(p) or 0.0)
+                if c > b * (1.0 + tolerance) and c - b > min_delta_ms:
+                    regressions.append({"scenario": name, "metric": f"{stage}.{p}", "baseline": b, "current": c})
+    return regressions
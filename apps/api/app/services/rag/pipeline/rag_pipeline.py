@@ -44,6 +44,7 @@ from enum import Enum
 from typing import Any, Dict, List, Optional, Set, Tuple
 
 from app.services.rag.config import RAGConfig, get_rag_config
+from app.services.rag.core.latency_policy import LatencyPolicy, hedged_call
 
 # Import core components
 # These may not all exist yet - imports are designed for forward compatibility
@@ -251,6 +252,7 @@ class PipelineStage(str, Enum):
     """Enumeration of all pipeline stages for tracing."""
     QUERY_ENHANCEMENT = "query_enhancement"
     LEXICAL_SEARCH = "lexical_search"
+    LEXICAL_PREFLIGHT = "lexical_preflight"  # small top-k probe before query enhancement
     VECTOR_SEARCH = "vector_search"
     VISUAL_SEARCH = "visual_search"  # ColPali visual retrieval
     GRAPH_SEARCH = "graph_search"  # Neo4j graph-based chunk retrieval
@@ -372,6 +374,9 @@ class StageTrace:
     skipped: bool = False
     skip_reason: Optional[str] = None
 
+    # Request profile (set only on profiled requests)
+    profile: Optional[Any] = field(default=None, repr=False, compare=False)
+
     def complete(self, output_count: int = 0, data: Optional[Dict[str, Any]] = None) -> None:
         """Mark stage as complete."""
         self.ended_at = time.time()
@@ -379,12 +384,16 @@ class StageTrace:
         self.output_count = output_count
         if data:
             self.data.update(data)
+        if self.profile is not None:
+            self.profile.stage_ended(self)
 
     def fail(self, error: str) -> None:
         """Mark stage as failed."""
         self.ended_at = time.time()
         self.duration_ms = (self.ended_at - self.started_at) * 1000
         self.error = error
+        if self.profile is not None:
+            self.profile.stage_ended(self)
 
     def skip(self, reason: str) -> None:
         """Mark stage as skipped."""
@@ -481,6 +490,9 @@ class PipelineTrace:
     # Arbitrary metadata (e.g., cache hits, feature flags)
     data: Dict[str, Any] = field(default_factory=dict)
 
+    # Request profile (see core/request_profiler.py); None when not profiled
+    profile: Optional[Any] = field(default=None, repr=False, compare=False)
+
     def add_data(self, key: str, value: Any) -> None:
         """Attach arbitrary metadata to the trace."""
         self.data[str(key)] = value
@@ -492,6 +504,9 @@ class PipelineTrace:
             started_at=time.time(),
             input_count=input_count,
         )
+        if self.profile is not None:
+            trace.profile = self.profile
+            self.profile.stage_started(trace)
         self.stages.append(trace)
         return trace
 
@@ -509,6 +524,27 @@ class PipelineTrace:
         """Add a warning message."""
         self.warnings.append(warning)
 
+    def fork(self) -> "PipelineTrace":
+        """Scratch trace for one of several concurrent attempts (hedged calls)."""
+        branch = PipelineTrace(
+            trace_id=self.trace_id,
+            started_at=self.started_at,
+            original_query=self.original_query,
+        )
+        branch.profile = self.profile
+        return branch
+
+    def absorb(self, branch: "PipelineTrace") -> None:
+        """Merge the stages and notes of the winning fork back into this trace."""
+        self.stages.extend(branch.stages)
+        self.errors.extend(branch.errors)
+        self.warnings.extend(branch.warnings)
+        if branch.indices_searched:
+            self.indices_searched = branch.indices_searched
+        if branch.collections_searched:
+            self.collections_searched = branch.collections_searched
+        self.data.update(branch.data)
+
     def get_stage(self, stage: PipelineStage) -> Optional[StageTrace]:
         """Get trace for a specific stage."""
         for s in self.stages:
@@ -802,6 +838,9 @@ class RAGPipeline:
         # Semaphore for parallel search concurrency control (Phase 3)
         self._search_semaphore = asyncio.Semaphore(5)
 
+        # Adaptive timeouts / hedged requests / partial fusion (all opt-in)
+        self._latency_policy = LatencyPolicy.from_config(self._base_config)
+
         logger.info(
             f"RAGPipeline initialized: crag={self.config.crag_enabled}, "
             f"parallel={self.config.parallel_search}, "
@@ -1479,7 +1518,9 @@ class RAGPipeline:
         Returns:
             List of search results
         """
-        stage = trace.start_stage(PipelineStage.LEXICAL_SEARCH, input_count=len(queries))
+        # The preflight has its own stage so its latencies don't skew the main lexical p95
+        stage_kind = PipelineStage.LEXICAL_PREFLIGHT if purpose == "qe_preflight" else PipelineStage.LEXICAL_SEARCH
+        stage = trace.start_stage(stage_kind, input_count=len(queries))
         results: List[Dict[str, Any]] = []
         top_k = int(top_k_override or self.config.max_results_per_source)
 
@@ -4090,11 +4131,26 @@ class RAGPipeline:
             if cached is not None:
                 trace.add_data("cache_hit", True)
                 logger.debug(f"ResultCache HIT for query: {query[:60]}")
+                try:
+                    from app.services.rag.core.metrics import record_search_metrics
+                    record_search_metrics(None, "cached")
+                except Exception:
+                    pass  # metrics are best-effort
                 return cached
         else:
             _result_cache = None
             _cache_key = None
 
+        # Opt-in request profiling (sampled or slow requests)
+        from app.services.rag.core.request_profiler import get_request_profiler
+        request_profiler = get_request_profiler()
+        profile = request_profiler.begin(trace)
+
+        def _profile_sizes(**lists: Optional[List[Any]]) -> None:
+            if profile is not None:
+                for name, items in lists.items():
+                    profile.record_results(name, items)
+
         # Initialize budget tracker for cost control
         budget_tracker: Optional[Any] = None
         if BudgetTracker is not None:
@@ -4162,6 +4218,8 @@ class RAGPipeline:
                     }
                     trace.add_data("cograg_enabled", True)
                     trace.add_data("cograg_metrics", cograg_result.get("metrics", {}))
+                    if profile is not None:
+                        request_profiler.finish(trace)
 
                     # Cache the result
                     if _result_cache is not None and _cache_key:
@@ -4182,14 +4240,88 @@ class RAGPipeline:
 
             cfg = self._base_config
 
+            policy = self._latency_policy
+            latency_decisions: Dict[str, Any] = {"timeouts_s": {}, "hedged": [], "dropped": []}
+            source_stages = {
+                "lexical": PipelineStage.LEXICAL_SEARCH,
+                "lexical_preflight": PipelineStage.LEXICAL_PREFLIGHT,
+                "vector": PipelineStage.VECTOR_SEARCH,
+                "graph": PipelineStage.GRAPH_SEARCH,
+            }
+
             async def _with_timeout(coro, timeout: float, name: str):
                 try:
                     return await asyncio.wait_for(coro, timeout=timeout)
                 except asyncio.TimeoutError:
                     logger.warning(f"{name} timeout ({timeout}s)")
                     trace.add_warning(f"{name} timeout ({timeout}s)")
+                    latency_decisions["dropped"].append(
+                        {"source": name, "reason": "timeout", "timeout_s": round(timeout, 3)}
+                    )
+                    if name in source_stages:
+                        policy.record_timeout(source_stages[name].value, timeout)
                     return []
 
+            async def _retrieve(name: str, run, static_timeout: float, hedge: bool = False):
+                """Run a retrieval stage under the adaptive timeout, hedged when slow."""
+                stage_key = source_stages[name].value
+                timeout = policy.timeout_for(stage_key, static_timeout)
+                if timeout != static_timeout:
+                    latency_decisions["timeouts_s"][name] = round(timeout, 3)
+                delay = policy.hedge_delay(stage_key, timeout) if hedge else None
+                if delay is None:
+                    return await _with_timeout(run(trace), timeout, name)
+
+                hedge_entry: Dict[str, Any] = {"source": name, "delay_ms": round(delay * 1000, 1), "winner": None}
+
+                def _allow_hedge() -> bool:
+                    if not policy.try_acquire_hedge():
+                        return False
+                    latency_decisions["hedged"].append(hedge_entry)
+                    return True
+
+                async def _attempt(i: int):
+                    branch = trace.fork()
+                    return branch, await run(branch)
+
+                async def _hedged():
+                    (branch, found), winner = await hedged_call(_attempt, delay, _allow_hedge)
+                    trace.absorb(branch)
+                    hedge_entry["winner"] = "hedge" if winner else "primary"
+                    return found
+
+                return await _with_timeout(_hedged(), timeout, name)
+
+            async def _collect_late(task, name: str, others_have_results: bool):
+                """Partial fusion: give a late source a grace period, then fuse without it."""
+                if task.done() or not (policy.partial_fusion and others_have_results):
+                    return await task
+                started = time.perf_counter()
+                done, _ = await asyncio.wait({task}, timeout=policy.partial_fusion_grace_seconds)
+                if done:
+                    return task.result()
+                task.cancel()
+                waited_ms = round((time.perf_counter() - started) * 1000, 1)
+                trace.add_warning(f"{name} dropped: late source, fused without it")
+                latency_decisions["dropped"].append({"source": name, "reason": "late", "waited_ms": waited_ms})
+                return []
+
+            def _graph_task():
+                return asyncio.ensure_future(
+                    _retrieve(
+                        "graph",
+                        lambda t: self._stage_graph_search(
+                            query,
+                            tenant_id,
+                            scope,
+                            case_id,
+                            t,
+                            limit=self._base_config.graph_retrieval_limit,
+                        ),
+                        cfg.graph_search_timeout_seconds,
+                    )
+                )
+
             # Stage 1: Query Enhancement (Adaptive-RAG: lexical preflight before LLM)
             effective_enable_hyde = self._base_config.enable_hyde if hyde_enabled is None else bool(hyde_enabled)
             effective_enable_multi = self._base_config.enable_multiquery if multi_query is None else bool(multi_query)
@@ -4207,17 +4339,17 @@ class RAGPipeline:
             elif getattr(cfg, "query_enhancement_preflight", False):
                 preflight_k = int(getattr(cfg, "query_enhancement_preflight_top_k", 6) or 6)
                 preflight_k = max(preflight_k, int(self.config.lexical_min_results_for_skip or 1))
-                preflight = await _with_timeout(
-                    self._stage_lexical_search(
+                preflight = await _retrieve(
+                    "lexical_preflight",
+                    lambda t: self._stage_lexical_search(
                         [query],
                         indices,
                         filters,
-                        trace,
+                        t,
                         top_k_override=preflight_k,
                         purpose="qe_preflight",
                     ),
                     cfg.lexical_timeout_seconds,
-                    "lexical_preflight",
                 )
                 skip_query_enhancement = self._should_skip_query_enhancement(preflight or [], trace)
                 if skip_query_enhancement:
@@ -4230,86 +4362,64 @@ class RAGPipeline:
             graph_results: List[Dict[str, Any]] = []
             skip_vector = False
 
+            def _lexical_main(t):
+                return self._stage_lexical_search([query], indices, filters, t, purpose="main")
+
             async with self._search_semaphore:
-                if is_citation_query or skip_query_enhancement:
-                    # Only lexical (+graph) retrieval. Avoid spending vector/LLM budget.
-                    tasks_cite: List[Any] = [
-                        _with_timeout(
-                            self._stage_lexical_search([query], indices, filters, trace, purpose="main"),
-                            cfg.lexical_timeout_seconds,
-                            "lexical",
-                        ),
-                    ]
-                    if graph_retrieval_enabled:
-                        tasks_cite.append(
-                            _with_timeout(
-                                self._stage_graph_search(
-                                    query,
-                                    tenant_id,
-                                    scope,
-                                    case_id,
-                                    trace,
-                                    limit=self._base_config.graph_retrieval_limit,
-                                ),
-                                cfg.graph_search_timeout_seconds,
-                                "graph",
+                graph_task = _graph_task() if graph_retrieval_enabled else None
+                try:
+                    if is_citation_query or skip_query_enhancement:
+                        # Only lexical (+graph) retrieval. Avoid spending vector/LLM budget.
+                        lexical_results = await _retrieve(
+                            "lexical", _lexical_main, cfg.lexical_timeout_seconds, hedge=True
+                        ) or []
+                        if graph_task is not None:
+                            graph_results = await _collect_late(graph_task, "graph", bool(lexical_results)) or []
+                        skip_vector = True
+                    else:
+                        qe_task = asyncio.create_task(
+                            self._stage_query_enhancement(
+                                query,
+                                trace,
+                                enable_hyde=effective_enable_hyde,
+                                enable_multiquery=effective_enable_multi,
+                                multiquery_max=effective_multi_max,
+                                budget_tracker=budget_tracker,
                             )
                         )
-                    cite_results = await asyncio.gather(*tasks_cite)
-                    lexical_results = cite_results[0] if cite_results and cite_results[0] else []
-                    if len(cite_results) > 1:
-                        graph_results = cite_results[1] if cite_results[1] else []
-                    skip_vector = True
-                else:
-                    qe_task = asyncio.create_task(
-                        self._stage_query_enhancement(
-                            query,
-                            trace,
-                            enable_hyde=effective_enable_hyde,
-                            enable_multiquery=effective_enable_multi,
-                            multiquery_max=effective_multi_max,
-                            budget_tracker=budget_tracker,
-                        )
-                    )
-                    tasks_main: List[Any] = [
-                        _with_timeout(
-                            self._stage_lexical_search([query], indices, filters, trace, purpose="main"),
-                            cfg.lexical_timeout_seconds,
-                            "lexical",
-                        ),
-                    ]
-                    if graph_retrieval_enabled:
-                        tasks_main.append(
-                            _with_timeout(
-                                self._stage_graph_search(
-                                    query,
-                                    tenant_id,
-                                    scope,
-                                    case_id,
-                                    trace,
-                                    limit=self._base_config.graph_retrieval_limit,
-                                ),
-                                cfg.graph_search_timeout_seconds,
-                                "graph",
+                        lexical_results = await _retrieve(
+                            "lexical", _lexical_main, cfg.lexical_timeout_seconds, hedge=True
+                        ) or []
+                        if graph_task is not None and not policy.partial_fusion:
+                            graph_results = await graph_task or []
+
+                        query_sets = await qe_task
+                        vector_queries = query_sets.get("vector_queries", [query]) if isinstance(query_sets, dict) else [query]
+
+                        # If lexical is already sufficient, skip vector to reduce latency/cost.
+                        if self._should_skip_vector_search(lexical_results, trace):
+                            skip_vector = True
+                        else:
+                            vector_results = await _retrieve(
+                                "vector",
+                                lambda t: self._stage_vector_search(vector_queries, collections, filters, t),
+                                cfg.vector_timeout_seconds,
+                                hedge=True,
                             )
-                        )
-                    main_results = await asyncio.gather(*tasks_main)
-                    lexical_results = main_results[0] if main_results and main_results[0] else []
-                    if len(main_results) > 1:
-                        graph_results = main_results[1] if main_results[1] else []
 
-                    query_sets = await qe_task
-                    vector_queries = query_sets.get("vector_queries", [query]) if isinstance(query_sets, dict) else [query]
+                        # With partial fusion the graph search overlapped vector search
+                        if graph_task is not None and policy.partial_fusion:
+                            graph_results = await _collect_late(
+                                graph_task, "graph", bool(lexical_results or vector_results)
+                            ) or []
+                finally:
+                    if graph_task is not None and not graph_task.done():
+                        graph_task.cancel()
 
-                    # If lexical is already sufficient, skip vector to reduce latency/cost.
-                    if self._should_skip_vector_search(lexical_results, trace):
-                        skip_vector = True
-                    else:
-                        vector_results = await _with_timeout(
-                            self._stage_vector_search(vector_queries, collections, filters, trace),
-                            cfg.vector_timeout_seconds,
-                            "vector",
-                        )
+            if any(latency_decisions.values()):
+                trace.add_data("latency", latency_decisions)
+
+            _profile_sizes(lexical=lexical_results, vector=vector_results, graph=graph_results)
 
             # Set search mode based on results
             has_graph = bool(graph_results)
@@ -4381,6 +4491,7 @@ class RAGPipeline:
                 ),
             )
             result.crag_evaluation = crag_eval
+            _profile_sizes(merged=merged_results, crag_filtered=filtered_results)
 
             # Stage 6: Rerank
             reranked_results = await self._stage_rerank(
@@ -4430,6 +4541,12 @@ class RAGPipeline:
 
             # Finalize results
             result.results = compressed_results[:final_top_k]
+            _profile_sizes(
+                reranked=reranked_results,
+                expanded=expanded_results,
+                compressed=compressed_results,
+                final=result.results,
+            )
 
             # Stage 10: Trace
             await self._stage_trace(trace, result)
@@ -4457,15 +4574,20 @@ class RAGPipeline:
                 "is_citation_query": is_citation_query,
             }
 
+            if profile is not None:
+                request_profiler.finish(trace)
+
             # Record latency metrics per stage
             try:
                 from app.services.rag.core.metrics import get_latency_collector
+                from app.services.rag.core.metrics import record_search_metrics
                 collector = get_latency_collector()
                 for s in trace.stages:
                     if not s.skipped and s.duration_ms > 0:
                         collector.record(s.stage.value, s.duration_ms)
                 if trace.total_duration_ms > 0:
                     collector.record("total", trace.total_duration_ms)
+                record_search_metrics(trace, "ok")
             except Exception:
                 pass  # metrics are best-effort
 
@@ -4498,6 +4620,15 @@ class RAGPipeline:
             if budget_tracker is not None:
                 trace.budget_usage = budget_tracker.get_usage_report()
 
+            if profile is not None:
+                request_profiler.finish(trace)
+
+            try:
+                from app.services.rag.core.metrics import record_search_metrics
+                record_search_metrics(trace, "error")
+            except Exception:
+                pass  # metrics are best-effort
+
             result.trace = trace
 
             if not self.config.fail_open:
@@ -4505,6 +4636,12 @@ class RAGPipeline:
 
             return result
 
+        finally:
+            # No-op when already finished above; covers cancellation, which
+            # bypasses the except block and would leak the tracemalloc user.
+            if profile is not None:
+                request_profiler.finish(trace)
+
     async def search_fast(self, query: str, **kwargs) -> PipelineResult:
         """Fast search — lexical + vector + RRF + graph/cograg. No HyDE/CRAG/Compress.
 
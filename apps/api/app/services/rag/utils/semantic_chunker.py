@@ -15,10 +15,11 @@ Features:
 
 from __future__ import annotations
 
+import bisect
 import re
 from dataclasses import dataclass, field
 from enum import Enum
-from typing import Any, Dict, List, Optional, Tuple, Pattern
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple, Pattern
 from loguru import logger
 
 
@@ -1023,22 +1024,41 @@ def chunk_with_pages(
     # Chunk the full document
     chunks = chunk_legal_document(full_text, doc_type, config)
 
-    # Assign page numbers based on text position
-    page_boundaries: List[Tuple[int, int, int]] = []  # (start_pos, end_pos, page_num)
+    _assign_pages(chunks, full_text, pages)
+    return chunks
+
+
+def _assign_pages(
+    chunks: List[SemanticChunk],
+    full_text: str,
+    pages: List[Tuple[int, str]],
+) -> None:
+    """Assign page numbers to chunks based on their position in ``full_text``."""
+    # Page start offsets in full_text (pages joined with "\n\n")
+    page_starts: List[int] = []
+    page_numbers: List[int] = []
+    page_ends: List[int] = []
     current_pos = 0
     for page_num, text in pages:
-        page_boundaries.append((current_pos, current_pos + len(text), page_num))
+        page_starts.append(current_pos)
+        page_ends.append(current_pos + len(text))
+        page_numbers.append(page_num)
         current_pos += len(text) + 2  # +2 for \n\n separator
 
+    # Chunks come out in document order, so search forward from the previous
+    # match instead of rescanning from the start for every chunk.
+    cursor = 0
     for chunk in chunks:
-        chunk_start = full_text.find(chunk.text[:100])  # Find approximate position
-        if chunk_start >= 0:
-            for start, end, page_num in page_boundaries:
-                if start <= chunk_start < end:
-                    chunk.page = page_num
-                    break
-
-    return chunks
+        probe = chunk.text[:100]  # Find approximate position
+        chunk_start = full_text.find(probe, cursor)
+        if chunk_start < 0:
+            chunk_start = full_text.find(probe)
+        if chunk_start < 0:
+            continue
+        cursor = chunk_start
+        idx = bisect.bisect_right(page_starts, chunk_start) - 1
+        if idx >= 0 and chunk_start < page_ends[idx]:
+            chunk.page = page_numbers[idx]
 
 
 def get_chunk_statistics(chunks: List[SemanticChunk]) -> Dict[str, Any]:
@@ -1066,3 +1086,204 @@ def get_chunk_statistics(chunks: List[SemanticChunk]) -> Dict[str, Any]:
         "chunk_types": chunk_types,
         "has_hierarchy": any(c.hierarchy for c in chunks),
     }
+
+
+# =============================================================================
+# BATCH CHUNKING (process pool, streaming)
+# =============================================================================
+
+# Boundaries tried, in order, when a huge document is cut into worker segments.
+_SEGMENT_BOUNDARIES: Tuple[Pattern, ...] = (
+    re.compile(r"\n(?=\s*(?:T[ÍI]TULO|CAP[ÍI]TULO|LIVRO)\s)"),
+    re.compile(r"\n(?=\s*Art\.?\s*\d)"),
+    re.compile(r"\n\s*\n"),
+    re.compile(r"\n"),
+)
+
+
+@dataclass
+class ChunkingJob:
+    """
+    One document to chunk in a batch.
+
+    Provide either ``text`` or ``pages`` (list of (page_number, text) tuples,
+    which keeps page mapping on the resulting chunks).
+    """
+    doc_id: str
+    text: Optional[str] = None
+    pages: Optional[List[Tuple[int, str]]] = None
+    doc_type: str = "auto"
+
+
+def _split_text_segments(text: str, max_chars: int) -> List[str]:
+    """Cut ``text`` into segments of at most ~max_chars at structural boundaries."""
+    if len(text) <= max_chars:
+        return [text]
+
+    segments: List[str] = []
+    start = 0
+    n = len(text)
+    while n - start > max_chars:
+        window_end = start + max_chars
+        # Never cut in the first half of the window so segments stay large
+        min_cut = start + max_chars // 2
+        cut = -1
+        for pattern in _SEGMENT_BOUNDARIES:
+            for match in pattern.finditer(text, min_cut, window_end):
+                cut = match.start() + 1
+            if cut > 0:
+                break
+        if cut <= 0:
+            cut = window_end
+        segments.append(text[start:cut])
+        start = cut
+    segments.append(text[start:])
+    return segments
+
+
+def _split_page_segments(
+    pages: List[Tuple[int, str]], max_chars: int,
+) -> List[List[Tuple[int, str]]]:
+    """Group consecutive pages into segments of at most ~max_chars."""
+    segments: List[List[Tuple[int, str]]] = []
+    current: List[Tuple[int, str]] = []
+    size = 0
+    for page in pages:
+        page_len = len(page[1]) + 2
+        if current and size + page_len > max_chars:
+            segments.append(current)
+            current, size = [], 0
+        current.append(page)
+        size += page_len
+    if current:
+        segments.append(current)
+    return segments
+
+
+def _chunk_segment(
+    text: Optional[str],
+    pages: Optional[List[Tuple[int, str]]],
+    doc_type: str,
+    config: ChunkingConfig,
+) -> List[SemanticChunk]:
+    """Worker entry point (top-level so it pickles into a process pool)."""
+    if pages is not None:
+        return chunk_with_pages(pages, doc_type, config)
+    return chunk_legal_document(text or "", doc_type, config)
+
+
+def _iter_segment_tasks(
+    jobs: Iterable[ChunkingJob],
+    max_segment_chars: int,
+) -> Iterator[Tuple[str, int, int, Optional[str], Optional[List[Tuple[int, str]]], str]]:
+    """
+    Expand jobs lazily into (doc_id, segment_index, segment_count, text, pages, doc_type).
+
+    The document type is detected once on the whole document so every segment
+    of a huge file is routed to the same chunker.
+    """
+    for job in jobs:
+        if job.pages is not None:
+            doc_type = job.doc_type
+            if doc_type == "auto":
+                head = "\n\n".join(t for _, t in job.pages[:20])
+                doc_type = detect_document_type(head).value if head.strip() else "auto"
+            page_segments = _split_page_segments(job.pages, max_segment_chars)
+            for i, seg in enumerate(page_segments):
+                yield job.doc_id, i, len(page_segments), None, seg, doc_type
+        else:
+            text = job.text or ""
+            doc_type = job.doc_type
+            if doc_type == "auto" and len(text) > max_segment_chars:
+                doc_type = detect_document_type(text[:max_segment_chars]).value
+            text_segments = _split_text_segments(text, max_segment_chars)
+            for i, seg in enumerate(text_segments):
+                yield job.doc_id, i, len(text_segments), seg, None, doc_type
+
+
+def chunk_documents_parallel(
+    jobs: Iterable[ChunkingJob],
+    config: Optional[ChunkingConfig] = None,
+    *,
+    max_workers: Optional[int] = None,
+    max_in_flight: Optional[int] = None,
+    max_segment_chars: int = 500_000,
+) -> Iterator[Tuple[str, SemanticChunk]]:
+    """
+    Chunk many documents on a process pool, streaming (doc_id, chunk) pairs.
+
+    Documents larger than ``max_segment_chars`` (full codes, case files with
+    thousands of pages) are split at structural boundaries (Título/Capítulo,
+    Art., blank line) or page groups, so a single file spreads over several
+    workers and no task holds more than one segment. At most
+    ``max_in_flight`` segments are queued at once and ``jobs`` is consumed
+    lazily, which caps memory for arbitrarily large batches.
+
+    Chunks are yielded in input order (documents, then segments). For a
+    segmented document, ``chunk_index`` is renumbered across segments and
+    ``segment_index``/``segment_count`` are added; ``total_chunks`` is only
+    set for unsegmented documents, since the total is unknown while
+    streaming. Structural hierarchy does not carry across segment cuts.
+
+    Args:
+        jobs: Documents to chunk (consumed lazily).
+        config: Chunking configuration shared by all documents.
+        max_workers: Process count (default: CPU count). ``1`` runs inline.
+        max_in_flight: Max queued segments (default: 2 * max_workers).
+        max_segment_chars: Max characters per worker task.
+
+    Yields:
+        (doc_id, SemanticChunk) tuples.
+    """
+    import os
+    from collections import deque
+    from concurrent.futures import ProcessPoolExecutor
+
+    config = config or ChunkingConfig()
+    workers = max_workers or os.cpu_count() or 1
+    tasks = _iter_segment_tasks(jobs, max_segment_chars)
+    next_index: Dict[str, int] = {}
+
+    def _emit(
+        doc_id: str, seg_idx: int, seg_count: int, chunks: List[SemanticChunk],
+    ) -> Iterator[Tuple[str, SemanticChunk]]:
+        if seg_count == 1:
+            for chunk in chunks:
+                yield doc_id, chunk
+            return
+        offset = next_index.get(doc_id, 0)
+        for i, chunk in enumerate(chunks):
+            chunk.metadata["chunk_index"] = offset + i
+            chunk.metadata.pop("total_chunks", None)
+            chunk.metadata["segment_index"] = seg_idx
+            chunk.metadata["segment_count"] = seg_count
+            yield doc_id, chunk
+        if seg_idx == seg_count - 1:
+            next_index.pop(doc_id, None)
+        else:
+            next_index[doc_id] = offset + len(chunks)
+
+    if workers <= 1:
+        for doc_id, seg_idx, seg_count, text, pages, doc_type in tasks:
+            chunks = _chunk_segment(text, pages, doc_type, config)
+            yield from _emit(doc_id, seg_idx, seg_count, chunks)
+        return
+
+    limit = max(1, max_in_flight or workers * 2)
+    pending: deque = deque()
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        try:
+            for doc_id, seg_idx, seg_count, text, pages, doc_type in tasks:
+                future = pool.submit(_chunk_segment, text, pages, doc_type, config)
+                pending.append((doc_id, seg_idx, seg_count, future))
+                # Drain in order once the window is full (backpressure)
+                while len(pending) >= limit:
+                    d, si, sc, fut = pending.popleft()
+                    yield from _emit(d, si, sc, fut.result())
+            while pending:
+                d, si, sc, fut = pending.popleft()
+                yield from _emit(d, si, sc, fut.result())
+        finally:
+            # Consumer stopped early or a worker failed: drop queued work
+            for *_, fut in pending:
+                fut.cancel()
@@ -56,6 +56,8 @@ class TraceEventType(str, Enum):
     PARENT_CHILD_EXPAND = "PARENT_CHILD_EXPAND"
     # Lexical-first gating events
     LEXICAL_FIRST_GATE = "LEXICAL_FIRST_GATE"
+    # Request profiling (sampled or slow searches)
+    SLOW_QUERY_PROFILED = "SLOW_QUERY_PROFILED"
     # Legacy events (for backward compatibility with rag_trace.py)
     HYDE_GENERATE = "HYDE_GENERATE"
     GRAPH_EXPAND = "GRAPH_EXPAND"
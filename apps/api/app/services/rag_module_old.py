@@ -17,22 +17,61 @@ from typing import List, Dict, Optional, Any
 from dataclasses import dataclass, field
 from datetime import datetime
 
-# Third-party imports (optional - RAG features disabled if not available)
-try:
-    import chromadb
-    from chromadb.config import Settings
-    from sentence_transformers import SentenceTransformer, CrossEncoder
-    from rank_bm25 import BM25Okapi
-    RAG_AVAILABLE = True
-except ImportError as e:
-    print(f"⚠️ RAG Module - Dependências faltando: {e}")
+# Third-party imports (optional - RAG features disabled if not available).
+# chromadb/sentence-transformers/rank_bm25 pull in torch and cost several
+# seconds at import time, so only their availability is checked here; the
+# modules are imported by the "rag_module_old.deps" lazy subsystem the first
+# time a RAGManager is built.
+import importlib.util
+
+from app.core.lazy import lazy_subsystem
+
+_MISSING_RAG_DEPS = [
+    name for name in ("chromadb", "sentence_transformers", "rank_bm25")
+    if importlib.util.find_spec(name) is None
+]
+chromadb = None
+Settings = None
+SentenceTransformer = None
+CrossEncoder = None
+BM25Okapi = None
+RAG_AVAILABLE = not _MISSING_RAG_DEPS
+if not RAG_AVAILABLE:
+    print(f"⚠️ RAG Module - Dependências faltando: {', '.join(_MISSING_RAG_DEPS)}")
     print("RAG desabilitado. Instale: pip install chromadb sentence-transformers rank_bm25")
-    chromadb = None
-    Settings = None
-    SentenceTransformer = None
-    CrossEncoder = None
-    BM25Okapi = None
-    RAG_AVAILABLE = False
+
+
+def _import_rag_deps() -> bool:
+    global chromadb, Settings, SentenceTransformer, CrossEncoder, BM25Okapi
+    import chromadb as _chromadb
+    from chromadb.config import Settings as _Settings
+    from sentence_transformers import SentenceTransformer as _SentenceTransformer, CrossEncoder as _CrossEncoder
+    from rank_bm25 import BM25Okapi as _BM25Okapi
+
+    chromadb, Settings = _chromadb, _Settings
+    SentenceTransformer, CrossEncoder = _SentenceTransformer, _CrossEncoder
+    BM25Okapi = _BM25Okapi
+    return True
+
+
+_rag_deps = lazy_subsystem(
+    "rag_module_old.deps",
+    _import_rag_deps,
+    "chromadb + sentence-transformers + rank_bm25 (legacy RAGManager)",
+)
+
+
+def _ensure_rag_deps() -> bool:
+    """Importa as dependências do RAG na primeira utilização; False se falhar."""
+    global RAG_AVAILABLE
+    if not RAG_AVAILABLE:
+        return False
+    try:
+        return _rag_deps.get()
+    except ImportError as e:
+        print(f"⚠️ RAG Module - Dependências faltando: {e}")
+        RAG_AVAILABLE = False
+        return False
 
 # Logging
 logging.basicConfig(level=logging.INFO)
@@ -143,7 +182,7 @@ class RAGManager:
         embedding_model: Optional[str] = None
     ):
         # Check if RAG dependencies are available
-        if not RAG_AVAILABLE:
+        if not _ensure_rag_deps():
             logger.warning("⚠️ RAG desabilitado - dependências não disponíveis")
             self.client = None
             self.embedding_model = None
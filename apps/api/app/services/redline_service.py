@@ -625,24 +625,13 @@ class RedlineService:
                 "summary": "",
             }
 
-        # Extract clauses
-        extracted_clauses = await playbook_svc._extract_clauses(document_content)
-
-        # Analyze all rules
-        clause_results = await playbook_svc._analyze_all_rules(
+        # Extract clauses, analyze all rules and generate redlines for non-compliant
+        clause_results = await playbook_svc.run_rule_pipeline(
             rules=rules,
-            extracted_clauses=extracted_clauses,
             contract_text=document_content,
             party_perspective=getattr(playbook, "party_perspective", "neutro") or "neutro",
         )
 
-        # Generate redlines for non-compliant
-        rules_by_id = {r.id: r for r in rules}
-        clause_results = await playbook_svc._generate_redlines_for_non_compliant(
-            clause_results=clause_results,
-            rules_by_id=rules_by_id,
-        )
-
         # Convert to RedlineItems
         redline_items = self.generate_redlines_from_analysis(clause_results)
 
@@ -98,7 +98,7 @@ class WebRAGService:
         chunks: List[Dict[str, Any]] = []
         for doc in docs:
             raw = doc.get("content") or ""
-            for chunk in self.chunker.chunk_by_tokens(raw, metadata={"url": doc.get("url"), "title": doc.get("title")}):
+            for chunk in self.chunker.iter_token_chunks(raw, metadata={"url": doc.get("url"), "title": doc.get("title")}):
                 text = (chunk.content or "").strip()
                 if len(text) < 120:
                     continue
@@ -3,7 +3,8 @@ Utilitário para cálculo de tokens
 Reutiliza lógica de DocumentChunk
 """
 
-from typing import Optional
+from functools import lru_cache
+from typing import Any, List, Optional
 
 
 def estimate_tokens(text: str) -> int:
@@ -25,6 +26,60 @@ def estimate_tokens(text: str) -> int:
     return max(0, len(text) // 4)
 
 
+@lru_cache(maxsize=4)
+def get_tokenizer(encoding_name: str = "cl100k_base") -> Optional[Any]:
+    """
+    Retorna o encoding tiktoken (carregado uma única vez por processo).
+
+    Retorna None quando tiktoken não está disponível; nesse caso os
+    chamadores usam a estimativa por caracteres.
+    """
+    try:
+        import tiktoken
+
+        return tiktoken.get_encoding(encoding_name)
+    except Exception:
+        return None
+
+
+def count_tokens(text: str) -> int:
+    """
+    Conta tokens com o tokenizer real (cl100k_base) quando disponível.
+
+    Fallback: estimate_tokens (1 token ≈ 4 caracteres).
+    """
+    if not text:
+        return 0
+    encoding = get_tokenizer()
+    if encoding is None:
+        return estimate_tokens(text)
+    return len(encoding.encode(text, disallowed_special=()))
+
+
+def split_by_tokens(text: str, max_tokens: int) -> List[str]:
+    """
+    Divide texto em pedaços de no máximo max_tokens tokens.
+
+    Usado como último recurso quando não há quebra de frase/parágrafo.
+    Os cortes caem em fronteiras de caractere (um token que começa no meio
+    de um caractere multibyte vai para o pedaço do caractere), então os
+    pedaços concatenados reproduzem o texto e os offsets se mantêm exatos.
+    """
+    if not text or max_tokens <= 0:
+        return [text] if text else []
+    encoding = get_tokenizer()
+    if encoding is None:
+        step = max_tokens * 4
+        return [text[i:i + step] for i in range(0, len(text), step)]
+    tokens = encoding.encode(text, disallowed_special=())
+    if len(tokens) <= max_tokens:
+        return [text]
+    decoded, offsets = encoding.decode_with_offsets(tokens)
+    cuts = sorted({offsets[i] for i in range(max_tokens, len(tokens), max_tokens)})
+    bounds = [0] + [c for c in cuts if 0 < c < len(decoded)] + [len(decoded)]
+    return [decoded[a:b] for a, b in zip(bounds, bounds[1:])]
+
+
 def estimate_tokens_from_file_size(file_size_bytes: int) -> int:
     """
     Estima tokens baseado no tamanho do arquivo.
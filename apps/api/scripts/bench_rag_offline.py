@@ -0,0 +1,100 @@
+"""
+Benchmark offline do RAGPipeline.search (sem Docker/chaves externas).
+
+Usa os stand-ins determinísticos de `app.services.rag.evals.perf_benchmark`
+(OpenSearch, Qdrant, Neo4j, embeddings, reranker e LLM simulados com latência
+fixa) e corpora sintéticos de 10k a 10M chunks. Para medir contra a infra real,
+use `bench_rag_latency.py`.
+
+Exemplos:
+    python scripts/bench_rag_offline.py --corpus 10000 1000000 --concurrency 1 8 \\
+        --requests 100 --output bench/rag_perf.json
+    python scripts/bench_rag_offline.py --baseline bench/rag_perf_v1.json  # exit 1 se regrediu
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import logging
+import sys
+from pathlib import Path
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--corpus", type=int, nargs="+", default=[10_000, 1_000_000, 10_000_000])
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 8])
+    parser.add_argument("--requests", type=int, default=100)
+    parser.add_argument("--warmup", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--time-scale", type=float, default=1.0, help="Multiplica as latências simuladas (0 = só CPU).")
+    parser.add_argument("--trace-memory", action="store_true", help="Mede pico via tracemalloc (mais lento).")
+    parser.add_argument("--query-file", default=None, help="Uma query por linha.")
+    parser.add_argument("--output", default=None, help="Salva o relatório JSON (baseline).")
+    parser.add_argument("--baseline", default=None, help="Compara com um relatório anterior.")
+    parser.add_argument("--tolerance", type=float, default=0.15)
+    args = parser.parse_args()
+
+    # Ensure `app.*` imports work when executing from repo root.
+    api_root = Path(__file__).resolve().parents[1]
+    if str(api_root) not in sys.path:
+        sys.path.insert(0, str(api_root))
+    logging.getLogger().setLevel(logging.WARNING)
+    for name in ("RAGPipeline", "ContextCompressor", "CRAGGate"):
+        logging.getLogger(name).setLevel(logging.ERROR)
+
+    from app.services.rag.evals.perf_benchmark import (
+        BenchmarkConfig,
+        BenchmarkScenario,
+        compare_reports,
+        load_report,
+        run_benchmark,
+        save_report,
+    )
+
+    config = BenchmarkConfig(
+        scenarios=[
+            BenchmarkScenario(corpus_size=size, concurrency=conc, requests=args.requests, warmup=args.warmup)
+            for size in args.corpus
+            for conc in args.concurrency
+        ],
+        seed=args.seed,
+        time_scale=args.time_scale,
+        trace_memory=args.trace_memory,
+    )
+    if args.query_file:
+        config.queries = [q.strip() for q in Path(args.query_file).read_text(encoding="utf-8").splitlines() if q.strip()]
+
+    report = asyncio.run(run_benchmark(config))
+
+    for name, sc in report["scenarios"].items():
+        total = sc["latency_ms"].get("total", {})
+        print(
+            f"\n== {name} ==\n"
+            f"throughput={sc['throughput_rps']} req/s errors={sc['errors']} "
+            f"p50={total.get('p50')}ms p95={total.get('p95')}ms p99={total.get('p99')}ms "
+            f"rss_peak={sc['memory']['rss_mb_peak']}MB"
+        )
+        for stage, stats in sorted(sc["latency_ms"].items()):
+            if stage != "total":
+                print(f"- {stage}: p50={stats['p50']}ms p95={stats['p95']}ms p99={stats['p99']}ms n={int(stats['count'])}")
+
+    if args.output:
+        save_report(report, args.output)
+        print(f"\nRelatório salvo em {args.output}")
+
+    if args.baseline:
+        regressions = compare_reports(report, load_report(args.baseline), tolerance=args.tolerance)
+        if regressions:
+            print("\n== Regressões ==")
+            for r in regressions:
+                print(json.dumps(r, ensure_ascii=False))
+            return 1
+        print("\nSem regressões em relação ao baseline.")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,107 @@
+import random
+from collections import Counter
+
+import networkx as nx
+import pytest
+
+from app.services.rag.core.graph_rag import EntityType, LegalKnowledgeGraph, RelationType
+
+
+@pytest.fixture
+def kg(tmp_path):
+    return LegalKnowledgeGraph(persist_path=str(tmp_path / "graph.json"))
+
+
+def _random_graph(kg, n=120, m=400, seed=7):
+    rng = random.Random(seed)
+    ids = [kg.add_entity(EntityType.ARTIGO, f"a{i}", f"Art. {i} da Lei {i % 9}") for i in range(n)]
+    relations = [RelationType.CITA, RelationType.POSSUI, RelationType.INTERPRETA]
+    for _ in range(m):
+        kg.add_relation(rng.choice(ids), rng.choice(ids), rng.choice(relations))
+    return ids
+
+
+def _reference_traverse(graph, start, hops, allowed=None):
+    """Plain BFS over the DiGraph (both directions), without a node cap."""
+    visited, frontier, edges = {start}, {start}, []
+    for _ in range(hops):
+        nxt = set()
+        for cur in frontier:
+            for _, t, d in graph.out_edges(cur, data=True):
+                if allowed and d["relation"] not in allowed:
+                    continue
+                edges.append((cur, t, d["relation"]))
+                if t not in visited:
+                    visited.add(t)
+                    nxt.add(t)
+            for s, _, d in graph.in_edges(cur, data=True):
+                if allowed and d["relation"] not in allowed:
+                    continue
+                edges.append((s, cur, d["relation"]))
+                if s not in visited:
+                    visited.add(s)
+                    nxt.add(s)
+        frontier = nxt
+    return visited, Counter(edges)
+
+
+def test_traverse_matches_reference_bfs(kg):
+    ids = _random_graph(kg)
+    for start in ids[:10]:
+        for allowed in (None, {"cita"}):
+            result = kg.traverse(
+                start, hops=2, relation_filter=list(allowed) if allowed else None, max_nodes=10_000
+            )
+            nodes, edges = _reference_traverse(kg.graph, start, 2, allowed)
+            assert {n["node_id"] for n in result["nodes"]} == nodes
+            assert Counter((e["source"], e["target"], e["relation"]) for e in result["edges"]) == edges
+
+
+def test_traverse_respects_max_nodes(kg):
+    ids = _random_graph(kg)
+    result = kg.traverse(ids[0], hops=3, max_nodes=15)
+    assert len(result["nodes"]) == 15
+    assert result["nodes"][0]["node_id"] == ids[0]
+
+
+def test_find_path_is_shortest_and_directed(kg):
+    ids = _random_graph(kg, m=250)
+    for target in ids[1:30]:
+        path = kg.find_path(ids[0], target, max_hops=4)
+        try:
+            expected = nx.shortest_path_length(kg.graph, ids[0], target)
+        except nx.NetworkXNoPath:
+            expected = None
+        if expected is None or expected > 4:
+            assert path is None
+        else:
+            assert len(path) == expected + 1
+            assert all(kg.graph.has_edge(u, v) for u, v in zip(path, path[1:]))
+    assert kg.find_path(ids[0], "missing:node") is None
+    assert kg.find_path(ids[0], ids[0]) == [ids[0]]
+
+
+def test_writes_invalidate_snapshot(kg):
+    lei = kg.add_entity(EntityType.LEI, "8666", "Lei 8.666/93 - Licitações")
+    art = kg.add_entity(EntityType.ARTIGO, "art_1", "Art. 1º")
+    assert kg.traverse(lei, hops=1)["edges"] == []
+
+    kg.add_relation(lei, art, RelationType.POSSUI)
+    assert [e["target"] for e in kg.traverse(lei, hops=1)["edges"]] == [art]
+    assert kg.find_entities(name_contains="LICITAÇÕES") == [lei]
+
+    kg.remove_entity(art)
+    assert kg.traverse(lei, hops=1)["edges"] == []
+    assert kg.find_path(lei, art) is None
+
+
+def test_resolve_query_entities_uses_snapshot_and_cache(kg):
+    lei = kg.add_entity(EntityType.LEI, "8666_1993", "Lei 8666/1993")
+    text = "Aplica-se a Lei 8666/1993 ao caso, conforme precedente do STJ."
+    first = kg.resolve_query_entities(text)
+    assert first == [lei]
+    assert kg.resolve_query_entities(text) == first
+
+    # A write drops the snapshot together with its resolution cache
+    tribunal = kg.add_entity(EntityType.TRIBUNAL, "tribunal_STJ", "STJ")
+    assert sorted(kg.resolve_query_entities(text)) == sorted([lei, tribunal])
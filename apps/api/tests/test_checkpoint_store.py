@@ -0,0 +1,162 @@
+"""Tests for the delta-compressed LangGraph checkpointer."""
+
+from typing import TypedDict
+
+import pytest
+from langgraph.graph import END, StateGraph
+
+from app.services.ai.checkpoint_store import DeltaSqliteCheckpointer
+
+
+class _State(TypedDict):
+    draft: str
+    context: str
+    step: int
+
+
+def _graph(saver, steps=4):
+    graph = StateGraph(_State)
+
+    def make_node(i):
+        def node(state):
+            return {"draft": state["draft"] + f" section {i}.", "step": state["step"] + 1}
+
+        return node
+
+    names = [f"n{i}" for i in range(steps)]
+    for i, name in enumerate(names):
+        graph.add_node(name, make_node(i))
+    graph.set_entry_point(names[0])
+    for a, b in zip(names, names[1:]):
+        graph.add_edge(a, b)
+    graph.add_edge(names[-1], END)
+    return graph.compile(checkpointer=saver)
+
+
+def _config(thread_id="job-1"):
+    return {"configurable": {"thread_id": thread_id}}
+
+
+@pytest.fixture
+def saver(tmp_path):
+    store = DeltaSqliteCheckpointer(str(tmp_path / "checkpoints.db"), keep_last=0)
+    yield store
+    store.close()
+
+
+def test_roundtrip_and_history(saver):
+    app = _graph(saver)
+    big_context = "jurisprudência " * 5000
+    result = app.invoke({"draft": "", "context": big_context, "step": 0}, _config())
+    assert result["step"] == 4
+
+    state = app.get_state(_config())
+    assert state.values["context"] == big_context
+    assert state.values["draft"].endswith("section 3.")
+
+    history = list(app.get_state_history(_config()))
+    assert len(history) == 6  # input + 4 nodes + start
+    assert [h.values.get("step") for h in history[:2]] == [4, 3]
+
+
+def test_unchanged_channels_are_not_rewritten(saver):
+    app = _graph(saver, steps=6)
+    big_context = "x" * 200_000
+    app.invoke({"draft": "", "context": big_context, "step": 0}, _config())
+
+    rows = saver._conn.execute(
+        "SELECT channel, COUNT(*) FROM checkpoint_channels GROUP BY channel"
+    ).fetchall()
+    per_channel = dict(rows)
+    assert per_channel["context"] == 1  # written once, referenced by every checkpoint
+    assert per_channel["draft"] >= 6
+
+    stats = saver.stats()
+    assert stats["stored_bytes_written"] < stats["raw_bytes_written"] / 10
+
+
+def test_identical_values_are_deduplicated_across_threads(saver):
+    app = _graph(saver, steps=1)
+    shared = "peça modelo " * 2000
+    app.invoke({"draft": "", "context": shared, "step": 0}, _config("a"))
+    app.invoke({"draft": "", "context": shared, "step": 0}, _config("b"))
+
+    assert saver.stats()["blobs_deduped"] >= 1
+    hashes = saver._conn.execute(
+        "SELECT DISTINCT blob_hash FROM checkpoint_channels WHERE channel = 'context'"
+    ).fetchall()
+    assert len(hashes) == 1
+
+
+def test_old_checkpoints_are_pruned(tmp_path):
+    store = DeltaSqliteCheckpointer(str(tmp_path / "cp.db"), keep_last=2)
+    app = _graph(store, steps=5)
+    app.invoke({"draft": "", "context": "c" * 5000, "step": 0}, _config())
+
+    assert store._conn.execute("SELECT COUNT(*) FROM checkpoints").fetchone()[0] == 2
+    assert store.stats()["checkpoints_pruned"] > 0
+    # Only the versions the surviving checkpoints point to are kept
+    assert store._conn.execute(
+        "SELECT COUNT(*) FROM checkpoint_channels WHERE channel = 'draft'"
+    ).fetchone()[0] <= 2
+    assert app.get_state(_config()).values["step"] == 5
+
+    store.delete_thread("job-1")
+    assert store._conn.execute("SELECT COUNT(*) FROM checkpoint_blobs").fetchone()[0] == 0
+    store.close()
+
+
+
+def test_pruning_keeps_blobs_shared_with_other_threads(tmp_path):
+    store = DeltaSqliteCheckpointer(str(tmp_path / "cp.db"), keep_last=1)
+    shared = "peça modelo " * 2000
+    _graph(store, steps=3).invoke({"draft": "", "context": shared, "step": 0}, _config("a"))
+    _graph(store, steps=3).invoke({"draft": "b:", "context": shared, "step": 0}, _config("b"))
+
+    def blob_count():
+        return store._conn.execute("SELECT COUNT(*) FROM checkpoint_blobs").fetchone()[0]
+
+    before = blob_count()
+    store.delete_thread("a")
+    assert 0 < blob_count() < before
+    assert _graph(store).get_state(_config("b")).values["context"] == shared
+    store.delete_thread("b")
+    assert blob_count() == 0
+    store.close()
+
+@pytest.mark.asyncio
+async def test_async_api(saver):
+    app = _graph(saver, steps=3)
+    steps = []
+    async for event in app.astream({"draft": "", "context": "ctx", "step": 0}, _config(), stream_mode="updates"):
+        steps.extend(event.keys())
+    assert steps == ["n0", "n1", "n2"]
+
+    snapshot = await app.aget_state(_config())
+    assert snapshot.values["step"] == 3
+    await app.aupdate_state(_config(), {"draft": "editado"})
+    assert (await app.aget_state(_config())).values["draft"] == "editado"
+
+
+def test_threads_missing_from_store_fall_back_to_legacy_saver(tmp_path):
+    from langgraph.checkpoint.memory import InMemorySaver
+
+    legacy = InMemorySaver()
+    _graph(legacy, steps=2).invoke({"draft": "", "context": "antigo", "step": 0}, _config("old-job"))
+
+    store = DeltaSqliteCheckpointer(str(tmp_path / "cp.db"), keep_last=0, legacy=legacy)
+    app = _graph(store, steps=2)
+    assert app.get_state(_config("old-job")).values["step"] == 2
+    assert len(list(app.get_state_history(_config("old-job")))) == 4
+    assert store.stats()["legacy_reads"] >= 1
+
+    # Once the thread has a checkpoint in the new store, the legacy copy is no longer read
+    app.update_state(_config("old-job"), {"draft": "retomado"})
+    reads = store.stats()["legacy_reads"]
+    assert app.get_state(_config("old-job")).values["draft"] == "retomado"
+    assert store.stats()["legacy_reads"] == reads
+    assert app.get_state(_config("unknown")).values == {}
+
+    store.delete_thread("old-job")
+    assert legacy.get_tuple(_config("old-job")) is None
+    store.close()
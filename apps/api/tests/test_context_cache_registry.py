@@ -0,0 +1,140 @@
+"""Tests for the shared Gemini context cache registry."""
+
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from app.services.ai.context_cache_registry import ContextCacheRegistry, SqliteCacheStore
+
+
+class _NotFound(Exception):
+    code = 404
+
+
+class _FakeCaches:
+    def __init__(self):
+        self.live = {}
+        self.created = 0
+        self.updates = []
+        self.deleted = []
+
+    def create(self, display_name):
+        self.created += 1
+        name = f"cachedContents/{self.created}"
+        self.live[name] = display_name
+        return SimpleNamespace(name=name, display_name=display_name)
+
+    def update(self, name, config):
+        if name not in self.live:
+            raise _NotFound("404 not found")
+        self.updates.append((name, config.ttl))
+
+    def delete(self, name):
+        self.live.pop(name, None)
+        self.deleted.append(name)
+
+
+@pytest.fixture
+def client():
+    return SimpleNamespace(caches=_FakeCaches())
+
+
+@pytest.fixture
+def store(tmp_path):
+    return SqliteCacheStore(str(tmp_path / "registry.db"))
+
+
+def _acquire(registry, client, job_id, content="autos " * 20000, ttl=3600):
+    return registry.acquire(client, job_id, content, "gemini-test", ttl, client.caches.create)
+
+
+def first_key(store):
+    return store._conn.execute("SELECT key FROM gemini_context_caches ORDER BY created_at").fetchone()[0]
+
+
+def test_same_content_shares_one_provider_cache_across_jobs_and_workers(client, store, tmp_path):
+    first = ContextCacheRegistry(store)
+    a = _acquire(first, client, "job-a")
+    b = _acquire(first, client, "job-b")
+    assert a.name == b.name
+    assert client.caches.created == 1
+
+    # A second worker process shares the SQLite file
+    other_worker = ContextCacheRegistry(SqliteCacheStore(str(tmp_path / "registry.db")))
+    c = _acquire(other_worker, client, "job-c")
+    assert c.name == a.name
+    assert client.caches.created == 1
+    assert store.get(first_key(store)).refs == 3
+
+    d = _acquire(first, client, "job-d", content="outro processo " * 10000)
+    assert d.name != a.name
+    assert client.caches.created == 2
+
+
+def test_reuse_extends_ttl_when_remaining_is_short(client, store):
+    registry = ContextCacheRegistry(store)
+    handle = _acquire(registry, client, "job-a", ttl=600)
+    key = first_key(store)
+    store._conn.execute("UPDATE gemini_context_caches SET expires_at = ? WHERE key = ?", (time.time() + 300, key))
+    store._conn.commit()
+
+    again = _acquire(registry, client, "job-b", ttl=3600)
+    assert again.name == handle.name
+    assert client.caches.updates == [(handle.name, "3600s")]
+    assert store.get(key).expires_at > time.time() + 3500
+
+
+def test_cache_deleted_on_provider_side_is_recreated(client, store):
+    registry = ContextCacheRegistry(store)
+    handle = _acquire(registry, client, "job-a", ttl=600)
+    client.caches.live.clear()  # expired/deleted remotely
+    key = first_key(store)
+    store._conn.execute("UPDATE gemini_context_caches SET expires_at = ? WHERE key = ?", (time.time() + 60, key))
+    store._conn.commit()
+
+    fresh = _acquire(registry, client, "job-b", ttl=600)
+    assert fresh.name != handle.name
+    assert client.caches.created == 2
+
+
+def test_sweep_removes_idle_unreferenced_and_stale_refs(client, store):
+    registry = ContextCacheRegistry(store, idle_seconds=0, ref_max_age=3600)
+    shared = _acquire(registry, client, "job-a")
+    _acquire(registry, client, "job-b")
+    registry.release("job-a")
+    assert registry.sweep(client) == 0  # job-b still holds it
+
+    registry.release("job-b")
+    time.sleep(0.01)
+    assert registry.sweep(client) == 1
+    assert client.caches.deleted == [shared.name]
+    assert store.count() == 0
+
+
+def test_refs_from_dead_jobs_expire(client, store):
+    registry = ContextCacheRegistry(store, idle_seconds=0, ref_max_age=0.01)
+    handle = _acquire(registry, client, "job-crashed")
+    time.sleep(0.05)
+    assert registry.sweep(client) == 1
+    assert handle.name in client.caches.deleted
+
+
+def test_sweep_skips_cache_reacquired_after_listing(client, store, monkeypatch):
+    registry = ContextCacheRegistry(store, idle_seconds=0, ref_max_age=3600)
+    handle = _acquire(registry, client, "job-a")
+    registry.release("job-a")
+    time.sleep(0.01)
+
+    listed = store.sweep_candidates
+
+    def list_then_reacquire(*args):
+        candidates = listed(*args)
+        _acquire(registry, client, "job-b")  # another job grabs it before the delete
+        return candidates
+
+    monkeypatch.setattr(store, "sweep_candidates", list_then_reacquire)
+    assert registry.sweep(client) == 0
+    assert client.caches.deleted == []
+    assert store.get(first_key(store)).refs == 1
+    assert handle.name in client.caches.live
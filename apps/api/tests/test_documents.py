@@ -57,6 +57,108 @@ async def test_unlimited_context_processor():
     assert result["strategy"] == "map-reduce"
 
 
+def test_document_chunker_streams_pages_lazily():
+    """Teste de chunking em streaming a partir de um iterador de páginas"""
+    chunker = DocumentChunker(chunk_size=200, overlap=30)
+    consumed = []
+
+    def pages():
+        for i in range(1, 201):
+            consumed.append(i)
+            yield f"Página {i}. " + "Texto jurídico da página com fundamentação. " * 10
+
+    stream = chunker.iter_token_chunks(pages())
+    first = next(stream)
+    assert first.metadata["page_start"] == 1
+    assert len(consumed) < 200  # não materializa o documento inteiro
+
+    rest = list(stream)
+    assert rest[-1].metadata["page_end"] == 200
+    assert all(c.token_count <= 200 for c in [first, *rest])
+    assert [c.position for c in [first, *rest]] == list(range(len(rest) + 1))
+
+
+@pytest.mark.asyncio
+async def test_unlimited_context_processor_bounds_in_flight_calls():
+    """Teste de map-reduce com chamadas de IA limitadas em voo"""
+    import asyncio
+
+    active = 0
+    peak = 0
+
+    async def fake_map(chunk, task):
+        nonlocal active, peak
+        active += 1
+        peak = max(peak, active)
+        await asyncio.sleep(0.001)
+        active -= 1
+        return {"summary": f"ok {chunk.position}"}
+
+    processor = UnlimitedContextProcessor(max_concurrency=3, map_fn=fake_map)
+    processor.chunker = DocumentChunker(chunk_size=50, overlap=0)
+    text = "\n\n".join(f"Parágrafo {i} com algum conteúdo relevante para o teste." for i in range(200))
+
+    result = await processor.process_large_document(text, task="resumir", strategy="map-reduce")
+
+    assert peak == 3
+    positions = [r["position"] for r in result["chunk_results"]]
+    assert positions == sorted(positions)
+    assert result["total_chunks"] == len(positions)
+
+
+@pytest.mark.asyncio
+async def test_unlimited_context_processor_cancels_in_flight_on_failure():
+    """Teste de map-reduce: falha em um chunk cancela as chamadas em voo"""
+    import asyncio
+
+    cancelled = []
+
+    async def fake_map(chunk, task):
+        if chunk.position == 1:
+            raise RuntimeError("falha no chunk 1")
+        try:
+            await asyncio.sleep(5)
+        except asyncio.CancelledError:
+            cancelled.append(chunk.position)
+            raise
+        return {"summary": "ok"}
+
+    processor = UnlimitedContextProcessor(max_concurrency=3, map_fn=fake_map)
+    processor.chunker = DocumentChunker(chunk_size=50, overlap=0)
+    text = "\n\n".join(f"Parágrafo {i} com algum conteúdo relevante para o teste." for i in range(20))
+
+    with pytest.raises(RuntimeError):
+        await processor._map_stream(processor.chunker.iter_token_chunks(text), "resumir", {})
+    assert sorted(cancelled) == [0, 2]
+
+
+def test_split_by_tokens_keeps_char_offsets_at_multibyte_boundaries(monkeypatch):
+    """Teste de corte por tokens: pedaços reproduzem o texto com acentos/emoji"""
+    from app.utils import token_counter
+
+    class ByteEncoding:
+        """Um token por byte UTF-8 (corta caracteres multibyte ao meio)."""
+
+        def encode(self, text, disallowed_special=()):
+            return list(text.encode("utf-8"))
+
+        def decode_with_offsets(self, tokens):
+            offsets, chars = [], 0
+            for b in tokens:
+                continuation = 0x80 <= b < 0xC0
+                offsets.append(max(0, chars - continuation))
+                chars += not continuation
+            return bytes(tokens).decode("utf-8"), offsets
+
+    monkeypatch.setattr(token_counter, "get_tokenizer", lambda *a: ByteEncoding())
+    text = "ação 😀 jurídica — " * 20
+
+    pieces = token_counter.split_by_tokens(text, 7)
+    assert "".join(pieces) == text
+    assert "\ufffd" not in "".join(pieces)
+    assert all(len(p.encode("utf-8")) <= 7 + 3 for p in pieces)
+
+
 def test_input_validator_email():
     """Teste de validação de email"""
     validator = InputValidator()
@@ -226,5 +226,45 @@ class TestRealWorldCases:
         assert exists_fmt is True
 
 
+class TestReferenceIndex:
+    """O índice de referências deve responder igual ao caminho regex."""
+
+    REFERENCES = [
+        "Tema 1.070", "tema 1070", "Art. 345", "art. 5º", "art. 7", "ADPF 1063",
+        "Lei nº 8.666/93", "lei 8666", "LC 123", "SV 13", "Súmula 331",
+        "Decreto 9.412/2018", "RE 635.659", "tema 999", "art. 346", "1070",
+        "Art. 5º e 6º", "(tema 1070)",
+    ]
+
+    @pytest.fixture
+    def long_text(self):
+        fragments = [
+            "Tema 1.070", "artigo 5º", "art. 7, do CPC", "ADPF 1.063", "Lei nº 8.666/93",
+            "LC 123", "SV 13", "súmula 331", "Decreto 9.412/2018", "tema1070",
+            "Recurso Extraordinário 635.659", "Art. 345",
+        ]
+        body = "O servidor público responde pelos danos causados a terceiros. "
+        return "".join(body * 40 + frag + ". " for frag in fragments)
+
+    def test_index_matches_regex_path(self, long_text, monkeypatch):
+        import app.services.fidelity_matcher as fm
+
+        assert len(long_text) >= fm.INDEX_MIN_CHARS
+        types = ["auto", "tema", "lei", "artigo", "sumula", "generico"]
+        indexed = [FidelityMatcher.exists_in_text(r, long_text, t) for r in self.REFERENCES for t in types]
+        snippets = [FidelityMatcher.extract_evidence_snippets(r, long_text, "") for r in self.REFERENCES]
+
+        monkeypatch.setattr(fm, "INDEX_MIN_CHARS", 10**12)
+        assert indexed == [FidelityMatcher.exists_in_text(r, long_text, t) for r in self.REFERENCES for t in types]
+        assert snippets == [FidelityMatcher.extract_evidence_snippets(r, long_text, "") for r in self.REFERENCES]
+
+    def test_index_is_built_once_per_text(self, long_text):
+        first = FidelityMatcher.reference_index(long_text)
+        assert FidelityMatcher.reference_index(long_text) is first
+        # Padrão exato ("tema1070") tem prioridade sobre o com separadores
+        start = long_text.index("tema1070")
+        assert first.search("tema 1070", "tema") == [(start, start + len("tema1070"))]
+
+
 if __name__ == "__main__":
     pytest.main([__file__, "-v"])
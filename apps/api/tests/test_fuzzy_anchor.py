@@ -0,0 +1,116 @@
+"""
+Testes para o índice de âncoras fuzzy (FuzzyAnchorIndex) e sua integração
+com QualityService.apply_unified_hil_fixes.
+"""
+
+import random
+
+import pytest
+
+from app.services.fuzzy_anchor import FuzzyAnchorIndex
+
+
+def _apostila(n_paragraphs: int = 400, seed: int = 3) -> str:
+    rng = random.Random(seed)
+    vocab = (
+        "contrato licitação administração pública princípio legalidade eficiência "
+        "servidor processo recurso tribunal decisão prazo competência norma"
+    ).split()
+    paragraphs = []
+    for i in range(n_paragraphs):
+        words = " ".join(rng.choice(vocab) for _ in range(40))
+        paragraphs.append(f"Parágrafo {i}.  {words.capitalize()}.")
+    return "\n\n".join(paragraphs)
+
+
+def test_find_maps_back_to_original_text():
+    text = _apostila()
+    target = text[text.index("Parágrafo 250."):][:180]
+    # Typos plus whitespace/case noise in the needle
+    needle = target.upper().replace("a", "á", 2).replace(" ", "   ", 3)[:-5] + "xyz"
+
+    index = FuzzyAnchorIndex(text)
+    match = index.find(needle, threshold=0.80)
+
+    assert match is not None
+    assert match.score >= 0.80
+    start = text.index("Parágrafo 250.")
+    assert abs(match.start - start) <= 10
+    assert index.text(match) == text[match.start:match.end]
+
+
+def test_find_returns_none_below_threshold():
+    index = FuzzyAnchorIndex(_apostila(50))
+    assert index.find("texto completamente ausente do documento zzz qqq", 0.85) is None
+
+
+def test_whitespace_runs_map_to_original_offsets():
+    text = "Art. 1º   O servidor\n\n  público   responde."
+    index = FuzzyAnchorIndex(text)
+    match = index.find("servidor público responde")
+    assert match is not None
+    assert text[match.start:match.end] == "servidor\n\n  público   responde"
+
+
+@pytest.mark.asyncio
+async def test_unified_hil_fixes_resolve_fuzzy_targets():
+    from app.services.quality_service import QualityService
+
+    content = _apostila(300)
+    old = content[content.index("Parágrafo 120."):][:150]
+    anchor = content[content.index("Parágrafo 200."):][:120]
+    fixes = [
+        {
+            "id": "f1",
+            "type": "distortion",
+            "action": "REPLACE",
+            "patch": {"old_text": old.replace("e", "é", 2), "new_text": "TRECHO CORRIGIDO", "confidence_score": 0.9},
+        },
+        {
+            "id": "f2",
+            "type": "omission",
+            "action": "INSERT",
+            "patch": {"anchor_text": anchor.upper() + " ...", "new_text": "TRECHO INSERIDO", "confidence_score": 0.9},
+        },
+    ]
+
+    result = await QualityService().apply_unified_hil_fixes(content, None, fixes)
+
+    fixed = result["fixed_content"]
+    assert result["semantic_applied"] == 2
+    assert "TRECHO CORRIGIDO" in fixed and "Parágrafo 120." not in fixed
+    assert fixed.index("Parágrafo 200.") < fixed.index("TRECHO INSERIDO") < fixed.index("Parágrafo 201.")
+
+
+@pytest.mark.asyncio
+async def test_unified_hil_fixes_index_document_once(monkeypatch):
+    from app.services import quality_service as qs
+
+    built = []
+    original_index = qs.FuzzyAnchorIndex
+
+    def counting_index(haystack, *args, **kwargs):
+        built.append(len(haystack))
+        return original_index(haystack, *args, **kwargs)
+
+    monkeypatch.setattr(qs, "FuzzyAnchorIndex", counting_index)
+    content = _apostila(300)
+    fixes = []
+    for n in (40, 120, 200):
+        anchor = content[content.index(f"Parágrafo {n}."):][:120]
+        fixes.append({
+            "id": f"f{n}",
+            "type": "omission",
+            "action": "INSERT",
+            "patch": {"anchor_text": anchor.upper() + " ...", "new_text": f"INSERIDO {n}", "confidence_score": 0.9},
+        })
+
+    service = qs.QualityService()
+    result = await service.apply_unified_hil_fixes(content, None, fixes)
+
+    fixed = result["fixed_content"]
+    assert result["semantic_applied"] == 3
+    assert len(built) == 1
+    for n in (40, 120, 200):
+        assert fixed.index(f"Parágrafo {n}.") < fixed.index(f"INSERIDO {n}") < fixed.index(f"Parágrafo {n + 1}.")
+    assert not hasattr(service, "_anchor_index")
@@ -1,10 +1,10 @@
-"""Tests for LatencyCollector — percentiles, sliding window, thread safety."""
+"""Tests for LatencyCollector — percentiles, rolling time windows, snapshots, thread safety."""
 
 import threading
 
 import pytest
 
-from app.services.rag.core.metrics import LatencyCollector, get_latency_collector
+from app.services.rag.core.metrics import LatencyCollector, get_latency_collector, merge_snapshots
 
 
 @pytest.fixture(autouse=True)
@@ -26,12 +26,62 @@ class TestRecord:
         c = LatencyCollector()
         assert c.percentile("missing", 50) == 0.0
 
-    def test_window_limit(self):
-        c = LatencyCollector(window_size=5)
-        for i in range(10):
-            c.record("s", float(i))
-        summary = c.summary()
-        assert summary["s"]["count"] == 5
+    def test_relative_error_is_bounded(self):
+        c = LatencyCollector()
+        for v in range(1, 10001):
+            c.record("s", v * 0.37)
+        for p in (50, 90, 95, 99):
+            exact = 0.37 * (p / 100 * 10000)
+            assert c.percentile("s", p) == pytest.approx(exact, rel=0.01)
+        assert c.percentile("s", 0) == pytest.approx(0.37)
+        assert c.percentile("s", 100) == pytest.approx(3700.0)
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestWindows:
+    def test_samples_age_out_per_window(self):
+        clock = _Clock()
+        c = LatencyCollector(clock=clock)
+        for _ in range(10):
+            c.record("s", 500.0)
+        clock.now += 120
+        for _ in range(10):
+            c.record("s", 5.0)
+
+        assert c.summary(window="1m")["s"]["count"] == 10
+        assert c.percentile("s", 99, window="1m") == pytest.approx(5.0)
+        assert c.summary(window="5m")["s"]["count"] == 20
+        assert c.percentile("s", 99, window="5m") == pytest.approx(500.0)
+
+        clock.now += 3700
+        assert c.summary(window="1h")["s"]["count"] == 0
+        assert c.percentile("s", 50, window="1h") == 0.0
+        assert c.summary(window="all")["s"]["count"] == 20
+
+    def test_unknown_window(self):
+        c = LatencyCollector()
+        c.record("s", 1.0)
+        with pytest.raises(ValueError):
+            c.percentile("s", 50, window="2m")
+
+    def test_exports_merge_across_workers(self):
+        a, b = LatencyCollector(), LatencyCollector()
+        for v in range(1, 51):
+            a.record("s", float(v))
+        for v in range(51, 101):
+            b.record("s", float(v))
+        merged = merge_snapshots([a.export(), b.export()], window="1m")
+        assert merged["s"]["count"] == 100
+        assert merged["s"]["avg"] == pytest.approx(50.5)
+        assert merged["s"]["p50"] == pytest.approx(50, rel=0.01)
+        assert merged["s"]["p99"] == pytest.approx(99, rel=0.01)
 
 
 class TestSummary:
@@ -0,0 +1,93 @@
+"""Tests for the lazy subsystem registry and the import-time profiler."""
+
+import sys
+import threading
+import time
+
+import pytest
+
+from app.core import import_profiler
+from app.core.lazy import LazySubsystem, lazy_subsystem, subsystems_status, warm_subsystems
+
+
+def test_subsystem_loads_once_under_concurrency():
+    calls = []
+
+    def loader():
+        calls.append(1)
+        time.sleep(0.05)
+        return object()
+
+    subsystem = LazySubsystem("test.once", loader)
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(subsystem.get())) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert len(calls) == 1
+    assert len({id(r) for r in results}) == 1
+    assert subsystem.status()["loaded"] is True
+    assert subsystem.load_seconds >= 0.04
+
+
+def test_failed_load_is_reported_and_retried():
+    attempts = []
+
+    def loader():
+        attempts.append(1)
+        if len(attempts) == 1:
+            raise ImportError("missing dep")
+        return "ok"
+
+    subsystem = LazySubsystem("test.retry", loader)
+    with pytest.raises(ImportError):
+        subsystem.get()
+    assert subsystem.status()["error"] == "ImportError: missing dep"
+    assert subsystem.get() == "ok"
+    assert subsystem.status()["error"] is None
+
+
+def test_registry_is_idempotent_and_warm_swallows_errors():
+    first = lazy_subsystem("test.registry", lambda: 1)
+    assert lazy_subsystem("test.registry", lambda: 2) is first
+
+    def boom():
+        raise RuntimeError("nope")
+
+    lazy_subsystem("test.broken", boom)
+    timings = warm_subsystems(["test.registry", "test.broken", "test.unknown"])
+    assert timings["test.registry"] is not None
+    assert timings["test.broken"] is None
+    assert "test.unknown" not in timings
+    status = subsystems_status()
+    assert status["test.registry"]["loaded"] is True
+    assert status["test.broken"]["error"] == "RuntimeError: nope"
+
+
+def test_import_profiler_records_module_times(tmp_path, monkeypatch):
+    pkg = tmp_path / "lazyprof_pkg"
+    pkg.mkdir()
+    (pkg / "__init__.py").write_text("from . import slow_child\n")
+    (pkg / "slow_child.py").write_text("import time\ntime.sleep(0.05)\n")
+    monkeypatch.syspath_prepend(str(tmp_path))
+    monkeypatch.setattr(import_profiler, "IMPORT_PROFILE_ENABLED", True)
+
+    was_installed = import_profiler._finder in sys.meta_path
+    assert import_profiler.install() is True
+    try:
+        import lazyprof_pkg  # noqa: F401
+    finally:
+        if not was_installed:
+            import_profiler.uninstall()
+        sys.modules.pop("lazyprof_pkg", None)
+        sys.modules.pop("lazyprof_pkg.slow_child", None)
+
+    report = import_profiler.import_profile_report(top=500)
+    cumulative = {row["module"]: row["ms"] for row in report["top_cumulative_ms"]}
+    self_ms = {row["module"]: row["ms"] for row in report["top_self_ms"]}
+    assert cumulative["lazyprof_pkg.slow_child"] >= 45
+    assert cumulative["lazyprof_pkg"] >= cumulative["lazyprof_pkg.slow_child"]
+    # The parent's own body is cheap: the child's sleep is not attributed to it
+    assert self_ms.get("lazyprof_pkg", 0.0) < 40
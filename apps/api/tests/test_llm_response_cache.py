@@ -0,0 +1,161 @@
+"""Tests for LLMResponseCache and the opt-in cache on agent_clients call_* helpers."""
+
+import time
+
+import pytest
+
+from app.services.ai import llm_response_cache as cache_mod
+from app.services.ai.llm_response_cache import (
+    LLMResponseCache,
+    _SQLiteTier,
+    make_cache_key,
+    reset_llm_response_cache,
+)
+
+
+@pytest.fixture(autouse=True)
+def _reset():
+    reset_llm_response_cache()
+    yield
+    reset_llm_response_cache()
+
+
+class TestLLMResponseCache:
+    def test_key_covers_provider_model_params_and_prompt(self):
+        base = make_cache_key("openai", "gpt", "p", temperature=0.3)
+        assert base == make_cache_key("openai", "gpt", "p", temperature=0.3)
+        assert base != make_cache_key("anthropic", "gpt", "p", temperature=0.3)
+        assert base != make_cache_key("openai", "gpt-mini", "p", temperature=0.3)
+        assert base != make_cache_key("openai", "gpt", "p", temperature=0.0)
+        assert base != make_cache_key("openai", "gpt", "p2", temperature=0.3)
+
+    def test_ttl_is_enforced(self):
+        cache = LLMResponseCache(ttl_seconds=60)
+        cache.set("k", "v", ttl=0.01)
+        time.sleep(0.02)
+        assert cache.get("k") is None
+        assert cache.stats()["size"] == 0
+
+    def test_lru_bounds_entries_and_bytes(self):
+        cache = LLMResponseCache(max_entries=2, max_bytes=10)
+        cache.set("a", "1234")
+        cache.set("b", "1234")
+        assert cache.get("a") == "1234"  # "a" becomes most recent
+        cache.set("c", "1234")
+        assert cache.get("b") is None
+        assert cache.get("a") == "1234"
+        cache.set("d", "123456789")
+        stats = cache.stats()
+        assert stats["bytes"] <= 10
+        assert stats["evictions"] >= 2
+
+    def test_disk_tier_survives_restart(self, tmp_path):
+        path = str(tmp_path / "llm.sqlite")
+        LLMResponseCache(l2=_SQLiteTier(path, 100)).set("k", "persisted")
+
+        fresh = LLMResponseCache(l2=_SQLiteTier(path, 100))
+        assert fresh.get("k") == "persisted"
+        stats = fresh.stats()
+        assert stats["l2_hits"] == 1 and stats["hit_rate"] == 1.0
+
+
+    def test_l2_hit_keeps_remaining_ttl_in_l1(self, tmp_path):
+        tier = _SQLiteTier(str(tmp_path / "llm.sqlite"), 100)
+        tier.set("k", "quase expirado", 0.05)
+
+        cache = LLMResponseCache(ttl_seconds=3600, l2=tier)
+        assert cache.get("k") == "quase expirado"
+        time.sleep(0.08)
+        assert cache.get("k") is None  # not kept for the full 3600s
+
+    @pytest.mark.asyncio
+    async def test_async_api_runs_l2_off_the_event_loop(self):
+        import threading
+
+        class _Tier:
+            def __init__(self):
+                self.threads = []
+                self.data = {}
+
+            def get(self, key):
+                self.threads.append(threading.get_ident())
+                return self.data.get(key)
+
+            def set(self, key, value, ttl):
+                self.threads.append(threading.get_ident())
+                self.data[key] = (value, time.time() + ttl)
+
+        tier = _Tier()
+        cache = LLMResponseCache(l2=tier)
+        await cache.aset("k", "v", ttl=60)
+        assert await LLMResponseCache(l2=tier).aget("k") == "v"
+        assert await cache.aget("missing") is None
+        assert tier.threads and threading.get_ident() not in tier.threads
+
+
+class TestOptInCallCache:
+    def test_sync_call_only_cached_when_opted_in(self):
+        from app.services.ai.agent_clients import cacheable_llm_call
+
+        calls = []
+
+        @cacheable_llm_call("openai")
+        def fake_call(client, prompt, model="m", temperature=0.3, timeout=60):
+            calls.append(prompt)
+            return f"resp:{prompt}"
+
+        assert fake_call(None, "p") == "resp:p"
+        assert fake_call(None, "p") == "resp:p"
+        assert len(calls) == 2
+
+        fake_call(None, "p", cache=True)
+        fake_call(None, "p", cache=True, timeout=5)  # timeout does not change the key
+        assert len(calls) == 3
+        fake_call(None, "p", model="other", cache=True)
+        assert len(calls) == 4
+
+    @pytest.mark.asyncio
+    async def test_async_call_does_not_cache_failures(self):
+        from app.services.ai.agent_clients import cacheable_llm_call
+
+        results = [None, "ok"]
+
+        @cacheable_llm_call("anthropic")
+        async def fake_call(client, prompt, model="m"):
+            return results.pop(0)
+
+        assert await fake_call(None, "p", cache=True) is None
+        assert await fake_call(None, "p", cache=True) == "ok"
+        assert await fake_call(None, "p", cache=True) == "ok"
+        assert results == []
+
+    def test_disabled_globally(self, monkeypatch):
+        from app.services.ai.agent_clients import get_cached_critique, set_cached_critique
+
+        monkeypatch.setattr(cache_mod, "LLM_RESPONSE_CACHE_ENABLED", False)
+        set_cached_critique("prompt", "critica", "gpt")
+        assert get_cached_critique("prompt", "gpt") is None
+
+    def test_critique_cache_is_keyed_by_model(self):
+        from app.services.ai.agent_clients import get_cached_critique, set_cached_critique
+
+        set_cached_critique("prompt", "critica", "gpt")
+        assert get_cached_critique("prompt", "gpt") == "critica"
+        assert get_cached_critique("prompt", "claude") is None
+
+    @pytest.mark.asyncio
+    async def test_quality_patch_calls_are_cached_per_model(self, monkeypatch):
+        from app.services.quality_service import QualityService
+
+        service = QualityService()
+        calls = []
+
+        async def fake_gemini(prompt, model="gemini-2.0-flash"):
+            calls.append(model)
+            return f"patch:{prompt}"
+
+        monkeypatch.setattr(service, "_call_gemini", fake_gemini)
+        assert await service._call_patch_llm("fix", "gemini-2.0-flash") == "patch:fix"
+        assert await service._call_patch_llm("fix", "gemini-2.0-flash") == "patch:fix"
+        await service._call_patch_llm("fix", "gemini-3-flash")
+        assert calls == ["gemini-2.0-flash", "gemini-3-flash"]
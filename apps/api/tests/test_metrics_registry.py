@@ -0,0 +1,127 @@
+"""Tests for the Prometheus metrics registry and /metrics exposition."""
+
+import os
+import threading
+
+import pytest
+
+from app.core import metrics_registry as mr
+
+
+def _sample(families, name, suffix="", **labels):
+    for fam in families:
+        if fam.name == name:
+            for s in fam.samples:
+                if s.suffix == suffix and all(s.labels.get(k) == str(v) for k, v in labels.items()):
+                    return s.value
+    return None
+
+
+def test_counter_and_histogram_sum_per_thread_cells():
+    registry = mr.MetricsRegistry()
+    counter = registry.counter("jobs_total", "jobs", ("kind",))
+    hist = registry.histogram("job_seconds", "job time", buckets=(0.1, 1.0))
+
+    def work():
+        for _ in range(1000):
+            counter.inc(kind="a")
+            hist.observe(0.5)
+
+    threads = [threading.Thread(target=work) for _ in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    counter.inc(2, kind="b")
+
+    families = registry.collect()
+    assert _sample(families, "jobs_total", kind="a") == 4000
+    assert _sample(families, "jobs_total", kind="b") == 2
+    assert _sample(families, "job_seconds", "_bucket", le="0.1") == 0
+    assert _sample(families, "job_seconds", "_bucket", le="1.0") == 4000
+    assert _sample(families, "job_seconds", "_bucket", le="+Inf") == 4000
+    assert _sample(families, "job_seconds", "_sum") == pytest.approx(2000.0)
+    # cells of finished threads were folded into the retired accumulator
+    assert len(counter._cells._shards) == 1 and counter.value(kind="a") == 4000
+
+    text = mr.render_families(families)
+    assert "# TYPE jobs_total counter" in text
+    assert 'jobs_total{kind="a"} 4000.0' in text
+    assert 'job_seconds_bucket{le="+Inf"} 4000.0' in text
+
+
+def test_default_collectors_read_existing_singletons(monkeypatch):
+    from app.services.rag.core import metrics as latency_metrics
+    from app.services.rag.core import result_cache
+    from app.services.rag.core.resilience import CircuitBreakerConfig, get_circuit_breaker
+
+    collector = latency_metrics.LatencyCollector()
+    collector.record("rerank", 12.0)
+    monkeypatch.setattr(latency_metrics, "_collector", collector)
+    cache = result_cache.ResultCache(max_size=10, ttl_seconds=60)
+    cache.set("k", "v")
+    cache.get("k")
+    cache.get("missing")
+    monkeypatch.setattr(result_cache, "_instance", cache)
+    get_circuit_breaker("metrics-test", CircuitBreakerConfig())
+
+    registry = mr.MetricsRegistry()
+    mr.register_default_collectors(registry)
+    families = registry.collect()
+
+    assert _sample(families, "iudex_cache_hits_total", cache="rag_result") == 1
+    assert _sample(families, "iudex_cache_misses_total", cache="rag_result") == 1
+    assert _sample(families, "iudex_cache_entries", cache="rag_result") == 1
+    assert _sample(families, "iudex_rag_stage_latency_ms", stage="rerank", quantile="0.95") == 12.0
+    assert _sample(families, "iudex_circuit_breaker_state", breaker="metrics-test", state="closed") == 1.0
+
+
+def test_multiprocess_snapshots_merge_by_type(tmp_path):
+    worker = mr.MetricsRegistry(multiproc_dir=str(tmp_path))
+    worker.counter("reqs_total", "requests").inc(3)
+    worker.histogram("lat_seconds", "latency", buckets=(1.0,)).observe(0.5)
+    worker.gauge("queue", "queue size", multiprocess_mode="all").set(7)
+    families = worker.collect()
+
+    other_pid = 999_999_999  # not a running process
+    snapshots = [(1, families), (other_pid, families)]
+    merged = mr.merge_families(snapshots, live_pid=1)
+
+    assert _sample(merged, "reqs_total") == 6
+    assert _sample(merged, "lat_seconds", "_count") == 2
+    # gauges of dead workers are dropped; "all" adds the pid label
+    assert _sample(merged, "queue", pid=1) == 7
+    assert _sample(merged, "queue", pid=other_pid) is None
+
+    text = worker.render()
+    assert (tmp_path / f"metrics_{os.getpid()}.json").exists()
+    assert "reqs_total 3.0" in text
+    worker.close()
+
+
+def test_rag_search_metrics_and_endpoint(monkeypatch):
+    from fastapi.testclient import TestClient
+
+    from app.main import app
+    from app.services.rag.core.metrics import record_search_metrics
+    from app.services.rag.pipeline.rag_pipeline import PipelineStage, PipelineTrace
+
+    mr.reset_metrics_registry()
+    trace = PipelineTrace(original_query="q")
+    trace.start_stage(PipelineStage.LEXICAL_SEARCH).complete(output_count=3)
+    trace.budget_usage = {"tokens_used": 120, "llm_calls_made": 2, "is_exceeded": False}
+    trace.complete(results_count=3)
+    record_search_metrics(trace, "ok")
+
+    client = TestClient(app)
+    response = client.get("/metrics")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    assert 'iudex_rag_searches_total{outcome="ok"} 1.0' in response.text
+    assert 'iudex_rag_stage_duration_seconds_count{stage="lexical_search"} 1.0' in response.text
+    assert "iudex_rag_budget_tokens_total 120.0" in response.text
+
+    monkeypatch.setattr(mr, "METRICS_TOKEN", "s3cret")
+    assert client.get("/metrics").status_code == 401
+    assert client.get("/metrics", headers={"Authorization": "Bearer s3cret"}).status_code == 200
+    mr.reset_metrics_registry()
@@ -152,6 +152,55 @@ class TestLegalEntityExtractor:
         art_entities = [e for e in entities if e["entity_type"] == "artigo"]
         assert len(art_entities) == 1
 
+    def test_scan_returns_all_families_in_one_pass(self, extractor):
+        """Test that scan() yields entities, compound citations and remissions together."""
+        text = "Art. 186 do CC c/c art. 927 do CC; Súmula 331 do TST"
+        scan = extractor.scan(text)
+        ids = {e["entity_id"] for e in scan.entities}
+        assert {"art_186", "art_927", "sumula_TST_331"} <= ids
+        assert any(c.normalized_id == "cc_art_186" for c in scan.compound_citations)
+        rem = next(r for r in scan.remissions if r["remission_type"] == "combinado_com")
+        assert rem["source_article"] == "186"
+        assert rem["target_article"] == "927"
+
+    def test_scan_is_memoized_and_copies_are_isolated(self, extractor):
+        """Test that repeated extraction reuses the scan and callers get private copies."""
+        text = "Conforme Art. 5º da Lei 8.666/93 e o Tema 1234 do STF"
+        assert extractor.scan(text) is extractor.scan(text)
+
+        first = extractor.extract_all(text)
+        first["entities"][0]["metadata"]["mutated"] = True
+        first["entities"].clear()
+        second = extractor.extract_all(text)
+        assert second["entities"]
+        assert "mutated" not in second["entities"][0]["metadata"]
+
+    def test_scan_cache_is_bounded_and_does_not_pin_texts(self, extractor, monkeypatch):
+        """Test that the scan cache is keyed by digest and evicts beyond its size."""
+        from app.services.rag.core import neo4j_mvp
+
+        monkeypatch.setattr(neo4j_mvp, "_CITATION_SCAN_CACHE_SIZE", 2)
+        monkeypatch.setattr(neo4j_mvp, "_citation_scan_cache", neo4j_mvp.OrderedDict())
+        texts = [f"Art. {n} da Lei 8.666/93" for n in (1, 2, 3)]
+        first = extractor.scan(texts[0])
+        for text in texts[1:]:
+            extractor.scan(text)
+
+        cache = neo4j_mvp._citation_scan_cache
+        assert len(cache) == 2
+        assert all(isinstance(key[0], bytes) for key in cache)
+        assert extractor.scan(texts[0]) is not first  # evicted (LRU)
+        assert extractor.scan(texts[2]) is extractor.scan(texts[2])
+
+    def test_scan_skips_families_without_anchor(self, extractor):
+        """Test that the anchor prefilter drops families that cannot match."""
+        from app.services.rag.core.neo4j_mvp import EntityType
+
+        families = extractor._present_families("Súmula 7 do STJ")
+        assert EntityType.SUMULA in families
+        assert EntityType.ARTIGO not in families
+        assert extractor.extract_remissions("Súmula 7 do STJ") == []
+
 
 class TestNeo4jMVPConfig:
     """Tests for Neo4jMVPConfig."""
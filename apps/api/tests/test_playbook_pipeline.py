@@ -0,0 +1,204 @@
+"""Tests for the pipelined playbook engine and its clause-level cache."""
+
+import asyncio
+import json
+from types import SimpleNamespace
+
+import pytest
+
+from app.schemas.playbook_analysis import ClauseClassification
+from app.services import playbook_service as ps
+from app.services.ai.llm_response_cache import LLMResponseCache
+
+
+def _rule(rule_id, clause_type, action="redline", preferred="Foro de São Paulo"):
+    return SimpleNamespace(
+        id=rule_id,
+        rule_name=f"Regra {clause_type}",
+        clause_type=clause_type,
+        description=None,
+        preferred_position=preferred,
+        fallback_positions=[],
+        rejected_positions=[],
+        action_on_reject=action,
+        severity="high",
+        guidance_notes=None,
+    )
+
+
+class _FakeAI:
+    """Responde extração/análise/redline conforme o prompt e conta as chamadas."""
+
+    def __init__(self, clauses, non_compliant=("multa",), delay=0.0):
+        self.clauses = clauses
+        self.non_compliant = set(non_compliant)
+        self.delay = delay
+        self.calls = {"extract": 0, "analysis": 0, "redline": 0}
+        self.log = []
+
+    async def __call__(self, prompt, system_instruction=None, **kwargs):
+        await asyncio.sleep(self.delay)
+        if system_instruction.startswith("Extraia"):
+            self.calls["extract"] += 1
+            found = [c for c in self.clauses if c["text"] in prompt]
+            return json.dumps(found)
+        if system_instruction.startswith("Você é um redator"):
+            self.calls["redline"] += 1
+            self.log.append("redline")
+            return json.dumps({"suggested_text": "Texto revisado"})
+        self.calls["analysis"] += 1
+        self.log.append("analysis")
+        ctype = next(c["clause_type"] for c in self.clauses if f"Regra {c['clause_type']}" in prompt)
+        classification = "non_compliant" if ctype in self.non_compliant else "compliant"
+        return json.dumps({"classification": classification, "explanation": "ok", "confidence": 0.9})
+
+
+@pytest.fixture(autouse=True)
+def clause_cache(monkeypatch):
+    cache = LLMResponseCache(ttl_seconds=3600)
+    monkeypatch.setattr(ps, "_clause_cache", cache)
+    monkeypatch.setattr(ps, "PLAYBOOK_CLAUSE_CACHE_ENABLED", True)
+    return cache
+
+
+CLAUSES = [
+    {"clause_type": "foro", "title": "Foro", "location": "Cláusula 10", "text": "Fica eleito o foro do Rio de Janeiro."},
+    {"clause_type": "multa", "title": "Multa", "location": "Cláusula 7", "text": "Multa de 50% sobre o valor total."},
+]
+RULES = [_rule("r1", "foro"), _rule("r2", "multa"), _rule("r3", "sla")]
+
+
+def _contract(clauses):
+    return "\n".join(c["text"] for c in clauses)
+
+
+@pytest.mark.asyncio
+async def test_pipeline_analyzes_and_redlines_with_progress(monkeypatch):
+    ai = _FakeAI(CLAUSES)
+    monkeypatch.setattr(ps, "_call_ai", ai)
+    events = []
+
+    results = await ps.PlaybookService().run_rule_pipeline(
+        RULES, _contract(CLAUSES), on_progress=events.append,
+    )
+
+    assert [r.rule_id for r in results] == ["r1", "r2", "r3"]
+    assert [r.classification for r in results] == [
+        ClauseClassification.COMPLIANT,
+        ClauseClassification.NON_COMPLIANT,
+        ClauseClassification.NOT_FOUND,
+    ]
+    assert results[1].suggested_redline == "Texto revisado"
+    assert results[1].location == "Cláusula 7"
+    assert ai.calls == {"extract": 1, "analysis": 2, "redline": 1}
+
+    done = [e for e in events if e["event"] == "rule_done"]
+    assert events[0]["event"] == "clauses_extracted"
+    assert sorted(e["rule_id"] for e in done) == ["r1", "r2", "r3"]
+    assert [e["completed"] for e in done] == [1, 2, 3]
+    assert all(e["total"] == 3 for e in done)
+
+
+@pytest.mark.asyncio
+async def test_rerun_on_revised_contract_only_costs_the_diff(monkeypatch):
+    ai = _FakeAI(CLAUSES)
+    monkeypatch.setattr(ps, "_call_ai", ai)
+    service = ps.PlaybookService()
+    await service.run_rule_pipeline(RULES, _contract(CLAUSES))
+
+    revised = [CLAUSES[0], {**CLAUSES[1], "text": "Multa de 10% sobre o valor total."}]
+    ai2 = _FakeAI(revised)
+    monkeypatch.setattr(ps, "_call_ai", ai2)
+    events = []
+    results = await service.run_rule_pipeline(RULES, _contract(revised), on_progress=events.append)
+
+    # Só a cláusula de multa mudou: uma análise + um redline; foro vem do cache
+    assert ai2.calls["analysis"] == 1
+    assert ai2.calls["redline"] == 1
+    cached = {e["rule_id"]: e["cached"] for e in events if e["event"] == "rule_done"}
+    assert cached == {"r1": True, "r2": False, "r3": False}
+    assert results[0].rule_id == "r1"
+    assert results[0].classification == ClauseClassification.COMPLIANT
+
+    # Editar a regra invalida o cache dela
+    ai3 = _FakeAI(revised)
+    monkeypatch.setattr(ps, "_call_ai", ai3)
+    edited = [_rule("r1", "foro", preferred="Foro de Brasília"), RULES[1], RULES[2]]
+    await service.run_rule_pipeline(edited, _contract(revised))
+    assert ai3.calls["analysis"] == 1
+
+
+@pytest.mark.asyncio
+async def test_redline_starts_before_all_analyses_finish(monkeypatch):
+    clauses = [
+        {"clause_type": f"tipo{i}", "title": "", "location": "", "text": f"Cláusula número {i}."}
+        for i in range(6)
+    ]
+    ai = _FakeAI(clauses, non_compliant={"tipo0"}, delay=0.01)
+    monkeypatch.setattr(ps, "_call_ai", ai)
+    monkeypatch.setattr(ps, "MAX_CONCURRENT_ANALYSES", 1)
+
+    await ps.PlaybookService().run_rule_pipeline(
+        [_rule(f"r{i}", f"tipo{i}") for i in range(6)], _contract(clauses),
+    )
+    assert ai.log.index("redline") < len(ai.log) - 1
+
+
+@pytest.mark.asyncio
+async def test_inconclusive_analysis_is_not_cached(monkeypatch, clause_cache):
+    async def broken_ai(prompt, system_instruction=None, **kwargs):
+        if system_instruction.startswith("Extraia"):
+            return json.dumps(CLAUSES[:1])
+        return "not json"
+
+    monkeypatch.setattr(ps, "_call_ai", broken_ai)
+    results = await ps.PlaybookService().run_rule_pipeline(RULES[:1], CLAUSES[0]["text"])
+    assert results[0].explanation == ps.INCONCLUSIVE_EXPLANATION
+    assert not any(k.startswith("playbook:clause:") for k in clause_cache._store)
+
+
+@pytest.mark.asyncio
+async def test_persistent_cache_tier_is_used_off_the_event_loop(monkeypatch):
+    import threading
+    import time
+
+    class _Tier:
+        def __init__(self):
+            self.data = {}
+            self.threads = set()
+
+        def get(self, key):
+            self.threads.add(threading.get_ident())
+            return self.data.get(key)
+
+        def set(self, key, value, ttl):
+            self.threads.add(threading.get_ident())
+            self.data[key] = (value, time.time() + ttl)
+
+    tier = _Tier()
+    monkeypatch.setattr(ps, "_clause_cache", LLMResponseCache(ttl_seconds=3600, l2=tier))
+    monkeypatch.setattr(ps, "_call_ai", _FakeAI(CLAUSES))
+    await ps.PlaybookService().run_rule_pipeline(RULES, _contract(CLAUSES))
+
+    # Outro worker (L1 vazio) reaproveita tudo pelo tier persistente
+    monkeypatch.setattr(ps, "_clause_cache", LLMResponseCache(ttl_seconds=3600, l2=tier))
+    ai = _FakeAI(CLAUSES)
+    monkeypatch.setattr(ps, "_call_ai", ai)
+    await ps.PlaybookService().run_rule_pipeline(RULES, _contract(CLAUSES))
+
+    assert ai.calls == {"extract": 0, "analysis": 0, "redline": 0}
+    assert tier.threads and threading.get_ident() not in tier.threads
+
+
+def test_content_defined_chunks_are_stable_under_local_edits():
+    paragraphs = [f"Cláusula {i}. " + ("texto contratual padrão " * 20) + "\n" for i in range(400)]
+    text = "".join(paragraphs)
+    chunks = ps._split_contract_chunks(text, max_chars=8000)
+    assert "".join(chunks) == text
+    assert len(chunks) > 3
+    assert all(len(c) <= 8000 for c in chunks)
+
+    edited = text.replace("Cláusula 200. ", "Cláusula 200 (alterada). ")
+    edited_chunks = ps._split_contract_chunks(edited, max_chars=8000)
+    changed = set(edited_chunks) - set(chunks)
+    assert 1 <= len(changed) <= 2
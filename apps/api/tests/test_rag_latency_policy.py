@@ -0,0 +1,103 @@
+"""Tests for adaptive timeouts, hedged requests and partial fusion in RAGPipeline.search."""
+
+import asyncio
+import time
+
+import pytest
+
+from app.services.rag.core.latency_policy import LatencyPolicy, hedged_call
+from app.services.rag.core.metrics import LatencyCollector
+from app.services.rag.evals import perf_benchmark as pb
+
+
+def _collector(**stages_ms):
+    c = LatencyCollector()
+    for stage, ms in stages_ms.items():
+        for _ in range(100):
+            c.record(stage, ms)
+    return c
+
+
+def test_adaptive_timeout_tracks_p95_within_static_cap():
+    policy = LatencyPolicy(adaptive_timeouts=True, collector=_collector(lexical_search=80.0, vector_search=900.0))
+    assert policy.timeout_for("lexical_search", 0.5) == pytest.approx(0.16, rel=0.02)
+    assert policy.timeout_for("vector_search", 1.0) == 1.0  # capped by the static timeout
+    assert policy.timeout_for("graph_search", 0.5) == 0.5  # not enough samples
+    assert LatencyPolicy(collector=policy.collector).timeout_for("lexical_search", 0.5) == 0.5
+    assert policy.timeout_for("lexical_preflight", 0.5) == 0.5  # separate histogram
+
+
+@pytest.mark.asyncio
+async def test_hedged_call_returns_first_finisher_and_cancels_loser():
+    cancelled = []
+
+    async def attempt(i):
+        try:
+            await asyncio.sleep(0.5 if i == 0 else 0.01)
+            return f"attempt-{i}"
+        except asyncio.CancelledError:
+            cancelled.append(i)
+            raise
+
+    t0 = time.perf_counter()
+    result, winner = await hedged_call(attempt, 0.02, lambda: True)
+    assert (result, winner) == ("attempt-1", 1)
+    assert time.perf_counter() - t0 < 0.2
+    await asyncio.sleep(0)
+    assert cancelled == [0]
+
+    result, winner = await hedged_call(attempt, 0.02, lambda: False)  # budget exhausted
+    assert (result, winner) == ("attempt-0", 0)
+
+
+def _pipeline(**overrides):
+    config = pb.BenchmarkConfig(time_scale=0.0, pipeline_overrides=overrides)
+    pipeline, services = pb.build_pipeline(pb.SyntheticCorpus(1000, seed=0), config)
+    return pipeline, services, config.queries[0]
+
+
+@pytest.mark.asyncio
+async def test_search_hedges_slow_lexical_call():
+    pipeline, services, query = _pipeline(hedge_requests_enabled=True)
+    pipeline._latency_policy._collector = _collector(lexical_search=5.0)
+
+    opensearch = services["opensearch"]
+    original = opensearch.search_lexical
+    calls = []
+
+    def slow_first_main_call(*args, **kwargs):
+        calls.append(kwargs.get("top_k"))
+        if len(calls) == 2:  # 1st = preflight, 2nd = primary main lexical call
+            time.sleep(0.3)
+        return original(*args, **kwargs)
+
+    opensearch.search_lexical = slow_first_main_call
+    t0 = time.perf_counter()
+    result = await pipeline.search(query, tenant_id="t", scope="global")
+
+    assert time.perf_counter() - t0 < 0.3
+    latency = result.trace.data["latency"]
+    assert latency["hedged"] == [{"source": "lexical", "delay_ms": 10.0, "winner": "hedge"}]
+    assert result.results
+    stages = [s.stage.value for s in result.trace.stages]
+    assert stages.count("lexical_preflight") == 1
+    assert stages.count("lexical_search") == 1  # the winning attempt only
+
+
+@pytest.mark.asyncio
+async def test_partial_fusion_drops_late_graph_source():
+    pipeline, _, query = _pipeline(partial_fusion_enabled=True, partial_fusion_grace_ms=20.0)
+
+    async def slow_graph(*args, **kwargs):
+        await asyncio.sleep(0.4)
+        return [{"chunk_uid": "late", "text": "late"}]
+
+    pipeline._stage_graph_search = slow_graph
+    t0 = time.perf_counter()
+    result = await pipeline.search(query, tenant_id="t", scope="global")
+
+    assert time.perf_counter() - t0 < 0.4
+    dropped = result.trace.data["latency"]["dropped"]
+    assert [(d["source"], d["reason"]) for d in dropped] == [("graph", "late")]
+    assert result.results and all(r.get("chunk_uid") != "late" for r in result.results)
+    assert any("graph dropped" in w for w in result.trace.warnings)
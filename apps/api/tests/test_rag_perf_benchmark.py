@@ -0,0 +1,67 @@
+"""Tests for the offline RAGPipeline benchmark harness."""
+
+import random
+
+import pytest
+
+from app.services.rag.evals import perf_benchmark as pb
+
+
+def _config(**kwargs):
+    base = dict(
+        scenarios=[pb.BenchmarkScenario(corpus_size=10_000, concurrency=4, requests=12, warmup=2)],
+        time_scale=0.02,
+    )
+    base.update(kwargs)
+    return pb.BenchmarkConfig(**base)
+
+
+def test_latency_profile_matches_configured_percentiles():
+    profile = pb.LatencyProfile(p50_ms=20.0, p95_ms=50.0)
+    rng = random.Random(0)
+    samples = sorted(profile.sample(rng) for _ in range(20000))
+    assert samples[len(samples) // 2] == pytest.approx(20.0, rel=0.05)
+    assert samples[int(len(samples) * 0.95)] == pytest.approx(50.0, rel=0.08)
+
+    grown = pb.LatencyProfile(p50_ms=20.0, p95_ms=20.0, corpus_log_factor=0.5)
+    assert grown.sample(rng, corpus_size=10_000_000) == pytest.approx(20.0 * 2.5)
+
+
+def test_synthetic_corpus_is_deterministic_and_lazy():
+    corpus = pb.SyntheticCorpus(10_000_000, seed=3)
+    assert corpus.chunk(9_999_999) == pb.SyntheticCorpus(10_000_000, seed=3).chunk(9_999_999)
+    lexical = corpus.ranked_ids("prescrição", 20, source="lexical")
+    vector = corpus.ranked_ids("prescrição", 20, source="vector")
+    assert lexical == corpus.ranked_ids("prescrição", 20, source="lexical")
+    assert 0 < len(set(lexical) & set(vector)) < 20
+
+
+@pytest.mark.asyncio
+async def test_benchmark_runs_real_pipeline_stages():
+    report = await pb.run_benchmark(_config())
+    scenario = report["scenarios"]["corpus=10000/concurrency=4"]
+
+    assert scenario["errors"] == 0
+    assert scenario["throughput_rps"] > 0
+    latency = scenario["latency_ms"]
+    assert latency["total"]["count"] == 12
+    assert {"lexical_search", "merge_rrf"} <= set(latency)
+    assert latency["total"]["p50"] <= latency["total"]["p95"] <= latency["total"]["p99"]
+    assert scenario["service_calls"]["opensearch"] > 0
+    assert scenario["memory"]["rss_mb_peak"] > 0
+
+
+@pytest.mark.asyncio
+async def test_baseline_round_trip_and_regression_detection(tmp_path):
+    report = await pb.run_benchmark(_config())
+    path = tmp_path / "baseline.json"
+    pb.save_report(report, str(path))
+    baseline = pb.load_report(str(path))
+    assert pb.compare_reports(report, baseline) == []
+
+    slower = pb.load_report(str(path))
+    name = next(iter(slower["scenarios"]))
+    slower["scenarios"][name]["latency_ms"]["total"]["p95"] *= 3
+    slower["scenarios"][name]["throughput_rps"] /= 2
+    metrics = {r["metric"] for r in pb.compare_reports(slower, baseline)}
+    assert metrics == {"total.p95", "throughput_rps"}
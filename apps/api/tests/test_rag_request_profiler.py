@@ -0,0 +1,104 @@
+"""Tests for the opt-in per-request profiler of RAGPipeline.search."""
+
+import time
+
+import pytest
+
+from app.services.rag.core import request_profiler as rp
+from app.services.rag.evals import perf_benchmark as pb
+from app.services.rag.pipeline.rag_pipeline import PipelineStage, PipelineTrace
+
+
+@pytest.fixture
+def exported(monkeypatch):
+    events = []
+    monkeypatch.setattr(rp.RequestProfiler, "_export", staticmethod(events.append))
+    return events
+
+
+def _install(monkeypatch, **kwargs):
+    profiler = rp.RequestProfiler(**kwargs)
+    monkeypatch.setattr(rp, "_profiler", profiler)
+    return profiler
+
+
+def test_disabled_profiler_attaches_nothing(monkeypatch, exported):
+    profiler = _install(monkeypatch)
+    trace = PipelineTrace(original_query="q")
+    assert profiler.begin(trace) is None and trace.profile is None
+    trace.start_stage(PipelineStage.LEXICAL_SEARCH).complete(output_count=3)
+    assert profiler.finish(trace) is None and exported == []
+
+
+def test_slow_threshold_keeps_only_slow_requests(monkeypatch, exported):
+    profiler = _install(monkeypatch, slow_ms=50)
+
+    fast = PipelineTrace(original_query="rápida")
+    profiler.begin(fast)
+    fast.start_stage(PipelineStage.MERGE_RRF, input_count=4).complete(output_count=2)
+    fast.complete(results_count=2)
+    assert profiler.finish(fast) is None and "profile" not in fast.data
+
+    slow = PipelineTrace(original_query="lenta")
+    profiler.begin(slow)
+    stage = slow.start_stage(PipelineStage.RERANK, input_count=10)
+    time.sleep(0.06)
+    stage.complete(output_count=5)
+    slow.complete(results_count=5)
+    data = profiler.finish(slow)
+
+    assert data["reason"] == "slow" and slow.data["profile"] is data
+    assert data["stages"][0]["stage"] == "rerank" and data["stages"][0]["wall_ms"] >= 50
+    assert data["allocations"]["tracked"] is False
+    assert [e["trace_id"] for e in exported] == [slow.trace_id]
+    assert profiler.slowest() == [data]
+
+
+@pytest.mark.asyncio
+async def test_sampled_search_profiles_stages_sizes_and_allocations(monkeypatch, exported):
+    profiler = _install(monkeypatch, sample_every=2, track_allocations=True)
+    config = pb.BenchmarkConfig(time_scale=0.0)
+    pipeline, _ = pb.build_pipeline(pb.SyntheticCorpus(10_000, seed=0), config)
+
+    results = [await pipeline.search(config.queries[i], tenant_id="t", scope="global") for i in range(4)]
+
+    profiled = [r for r in results if "profile" in r.trace.data]
+    assert len(profiled) == 2 and len(exported) == 2
+    data = profiled[0].trace.data["profile"]
+    assert data["reason"] == "sampled"
+    stage_names = {s["stage"] for s in data["stages"]}
+    assert {"lexical_search", "merge_rrf"} <= stage_names
+    assert all(s["cpu_ms"] >= 0 for s in data["stages"])
+    assert data["result_sizes"]["lexical"]["count"] > 0
+    assert data["result_sizes"]["final"]["count"] == len(profiled[0].results)
+    assert data["allocations"]["tracked"] and data["allocations"]["count_delta"] != 0
+    assert profiled[0].trace.profile is None
+    assert len(profiler.recent(10)) == 2
+
+
+@pytest.mark.asyncio
+async def test_cancelled_search_releases_tracemalloc(monkeypatch, exported):
+    import asyncio
+    import tracemalloc
+
+    profiler = _install(monkeypatch, sample_every=1, track_allocations=True)
+    config = pb.BenchmarkConfig(time_scale=0.0)
+    pipeline, _ = pb.build_pipeline(pb.SyntheticCorpus(1000, seed=0), config)
+    started = asyncio.Event()
+
+    async def hang(*args, **kwargs):
+        started.set()
+        await asyncio.sleep(30)
+
+    monkeypatch.setattr(pipeline, "_ensure_components", lambda: None)
+    monkeypatch.setattr(pipeline, "_stage_graph_search", hang)
+    monkeypatch.setattr(pipeline, "_stage_lexical_search", hang, raising=False)
+    task = asyncio.create_task(pipeline.search(config.queries[0], tenant_id="t", scope="global"))
+    await asyncio.wait_for(started.wait(), 5)
+    assert profiler._tracemalloc_users == 1
+
+    task.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await task
+    assert profiler._tracemalloc_users == 0
+    assert not tracemalloc.is_tracing()
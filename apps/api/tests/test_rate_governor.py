@@ -0,0 +1,167 @@
+"""Tests for the provider RateGovernor (token buckets, adaptive concurrency, streams)."""
+
+import asyncio
+import threading
+
+import pytest
+
+from app.services.ai import rate_governor as governor_mod
+from app.services.ai.rate_governor import (
+    AdaptiveConcurrencyLimiter,
+    RateGovernor,
+    TokenBucket,
+    retry_after_seconds,
+)
+
+
+class _RateLimited(Exception):
+    status_code = 429
+
+    def __init__(self, retry_after=None):
+        super().__init__("429 Too Many Requests")
+        self.response = type("Resp", (), {"headers": {"retry-after": retry_after} if retry_after else {}})()
+
+
+@pytest.fixture
+def governor(monkeypatch):
+    monkeypatch.setenv("TESTPROV_MAX_CONCURRENCY", "2")
+    return RateGovernor(backend="memory")
+
+
+def test_bucket_reservations_queue_callers_without_blocking():
+    bucket = TokenBucket(rate_per_minute=60, capacity=1)
+    waits = [bucket.reserve() for _ in range(3)]
+    assert waits[0] == 0.0
+    assert waits[1] == pytest.approx(1.0, abs=0.05)
+    assert waits[2] == pytest.approx(2.0, abs=0.05)
+
+
+@pytest.mark.asyncio
+async def test_concurrency_is_capped(governor):
+    active = 0
+    peak = 0
+
+    async def work():
+        nonlocal active, peak
+        async with governor.alimit("testprov", "m"):
+            active += 1
+            peak = max(peak, active)
+            await asyncio.sleep(0.02)
+            active -= 1
+
+    await asyncio.gather(*(work() for _ in range(8)))
+    assert peak == 2
+    assert governor.stats()["providers"]["testprov"]["calls"] == 8
+
+
+@pytest.mark.asyncio
+async def test_async_waiter_is_woken_by_thread_release(governor):
+    limiter = governor.limiter("testprov")
+    limiter.acquire()
+    limiter.acquire()
+
+    threading.Timer(0.05, limiter.release).start()
+    waited = await asyncio.wait_for(limiter.acquire_async(), timeout=1.0)
+    assert waited >= 0.04
+    assert limiter.in_flight == 2
+
+
+def test_rate_limit_halves_concurrency_and_honours_retry_after(governor):
+    with pytest.raises(_RateLimited):
+        with governor.limit("testprov", "m"):
+            raise _RateLimited(retry_after="0.2")
+
+    limiter = governor.limiter("testprov")
+    assert limiter.limit == 1
+    assert limiter.rate_limited == 1
+    assert limiter.acquire() >= 0.15
+    limiter.release()
+
+    # Additive increase back to the configured maximum
+    for _ in range(4):
+        limiter.acquire()
+        limiter.release()
+    assert limiter.limit == 2
+
+
+def test_nested_call_reuses_held_slot():
+    gov = RateGovernor(backend="memory")
+    gov._limiters["solo"] = AdaptiveConcurrencyLimiter(1)
+    done = threading.Event()
+
+    def nested():
+        with gov.limit("solo"):
+            with gov.limit("solo"):
+                done.set()
+
+    t = threading.Thread(target=nested, daemon=True)
+    t.start()
+    t.join(timeout=2)
+    assert done.is_set()
+    assert gov.limiter("solo").in_flight == 0
+
+
+@pytest.mark.asyncio
+async def test_stream_holds_slot_until_closed(governor):
+    limiter = governor.limiter("testprov")
+
+    async def chunks():
+        for i in range(3):
+            yield i
+
+    seen = []
+    async for item in governor.stream("testprov", "m", 0, chunks()):
+        seen.append(item)
+        assert limiter.in_flight == 1
+    assert seen == [0, 1, 2]
+    assert limiter.in_flight == 0
+
+    stream = governor.stream("testprov", "m", 0, chunks())
+    assert await stream.__anext__() == 0
+    await stream.aclose()
+    assert limiter.in_flight == 0
+
+
+def test_retry_after_parsing():
+    assert retry_after_seconds(_RateLimited(retry_after="3")) == 3.0
+    assert retry_after_seconds(_RateLimited()) is None
+    exc = _RateLimited()
+    exc.response.headers = {"retry-after-ms": "250"}
+    assert retry_after_seconds(exc) == 0.25
+
+
+def test_disabled_governor_is_passthrough(governor, monkeypatch):
+    monkeypatch.setattr(governor_mod, "LLM_RATE_GOVERNOR_ENABLED", False)
+    with governor.limit("testprov", "m"):
+        pass
+    assert "testprov" not in governor.stats()["providers"]
+
+
+@pytest.mark.asyncio
+async def test_pooled_async_http_client_is_per_event_loop():
+    async def get_twice():
+        return governor_mod.pooled_async_http_client("testprov"), governor_mod.pooled_async_http_client("testprov")
+
+    a1, a2 = await get_twice()
+    assert a1 is a2
+
+    other = {}
+
+    def in_other_thread():
+        # A fresh loop in its own thread; the test's loop stays current on the main thread
+        loop = asyncio.new_event_loop()
+        try:
+            other["client"], _ = loop.run_until_complete(get_twice())
+        finally:
+            loop.close()
+        built = []
+        other["outside"] = governor_mod.loop_local_client("testprov-sdk", lambda: built.append(1) or object())
+        other["again"] = governor_mod.loop_local_client("testprov-sdk", object)
+        other["built"] = built
+
+    worker = threading.Thread(target=in_other_thread)
+    worker.start()
+    worker.join()
+    assert other["client"] is not a1
+    assert other["again"] is other["outside"]
+    assert other["built"] == [1]
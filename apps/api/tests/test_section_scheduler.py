@@ -0,0 +1,94 @@
+"""Tests for the DAG section scheduler used by debate_all_sections_node."""
+
+import asyncio
+
+import pytest
+
+from app.services.ai.section_scheduler import build_section_dependencies, run_section_dag
+
+
+def test_closing_sections_depend_on_body():
+    outline = ["Dos Fatos", "Do Direito", "Da Tutela de Urgência", "Dos Pedidos", "Do Valor da Causa"]
+    deps = build_section_dependencies(outline)
+    assert deps[:3] == [[], [], []]
+    assert deps[3] == [0, 1, 2]
+    assert deps[4] == [0, 1, 2]
+
+
+@pytest.mark.asyncio
+async def test_independent_sections_overlap_under_cap_and_keep_order():
+    active = 0
+    peak = 0
+
+    async def worker(i, deps):
+        nonlocal active, peak
+        active += 1
+        peak = max(peak, active)
+        await asyncio.sleep(0.05 if i % 2 else 0.01)
+        active -= 1
+        return f"s{i}"
+
+    loop = asyncio.get_running_loop()
+    started = loop.time()
+    results = await run_section_dag(8, [[]] * 8, worker, max_concurrency=4)
+    elapsed = loop.time() - started
+
+    assert results == [f"s{i}" for i in range(8)]
+    assert peak == 4
+    assert elapsed < 0.25  # serial would be 0.24s; two waves of 4 take ~0.1s
+
+
+@pytest.mark.asyncio
+async def test_dependent_section_waits_and_sees_results():
+    finished = []
+
+    async def worker(i, deps):
+        if i == 2:
+            assert sorted(deps) == [0, 1]
+            assert sorted(finished) == [0, 1]
+            return "pedidos:" + "+".join(deps[j] for j in sorted(deps))
+        await asyncio.sleep(0.03 if i == 0 else 0.01)
+        finished.append(i)
+        return f"body{i}"
+
+    results = await run_section_dag(3, [[], [], [0, 1]], worker, max_concurrency=4)
+    assert results[2] == "pedidos:body0+body1"
+
+
+@pytest.mark.asyncio
+async def test_ready_in_order_streams_document_prefix():
+    streamed = []
+    completed = []
+
+    async def worker(i, deps):
+        await asyncio.sleep(0.01 * (3 - i))  # finish in reverse order
+        return i
+
+    await run_section_dag(
+        3,
+        [[], [], []],
+        worker,
+        on_complete=lambda i, r: completed.append(i),
+        on_ready_in_order=lambda i, r: streamed.append(i),
+    )
+    assert completed == [2, 1, 0]
+    assert streamed == [0, 1, 2]
+
+
+@pytest.mark.asyncio
+async def test_failure_cancels_remaining_sections():
+    cancelled = asyncio.Event()
+
+    async def worker(i, deps):
+        if i == 0:
+            raise RuntimeError("boom")
+        try:
+            await asyncio.sleep(1)
+        except asyncio.CancelledError:
+            cancelled.set()
+            raise
+        return i
+
+    with pytest.raises(RuntimeError, match="boom"):
+        await run_section_dag(2, [[], []], worker, max_concurrency=2)
+    assert cancelled.is_set()
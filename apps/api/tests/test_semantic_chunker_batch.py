@@ -0,0 +1,63 @@
+from app.services.rag.utils.semantic_chunker import (
+    ChunkingConfig,
+    ChunkingJob,
+    chunk_documents_parallel,
+    chunk_legal_document,
+    chunk_with_pages,
+    _split_text_segments,
+)
+
+
+def _lei(n_articles: int) -> str:
+    return "LEI Nº 1.234, DE 10 DE JANEIRO DE 2020\n\n" + "\n".join(
+        f"Art. {i}º Fica estabelecido o dispositivo número {i} desta lei, "
+        f"com redação suficientemente longa para formar um chunk próprio."
+        for i in range(1, n_articles + 1)
+    )
+
+
+def test_parallel_matches_sequential_for_small_documents():
+    config = ChunkingConfig()
+    texts = {"a": _lei(12), "b": _lei(5)}
+    jobs = [ChunkingJob(doc_id=k, text=v) for k, v in texts.items()]
+
+    out = list(chunk_documents_parallel(jobs, config, max_workers=2))
+
+    expected = [(k, c.text) for k, v in texts.items() for c in chunk_legal_document(v, "auto", config)]
+    assert [(d, c.text) for d, c in out] == expected
+
+
+def test_large_document_is_segmented_and_renumbered():
+    text = _lei(300)
+    segments = _split_text_segments(text, 5_000)
+    assert len(segments) > 1
+    assert "".join(segments) == text
+    # Cuts land on article boundaries
+    assert all(seg.lstrip().startswith("Art.") for seg in segments[1:])
+
+    out = list(chunk_documents_parallel(
+        [ChunkingJob(doc_id="big", text=text)], max_workers=1, max_segment_chars=5_000,
+    ))
+    indices = [c.metadata["chunk_index"] for _, c in out]
+    assert indices == list(range(len(out)))
+    assert all("total_chunks" not in c.metadata for _, c in out)
+    assert "Art. 300" in out[-1][1].text
+
+
+def test_pages_keep_page_mapping_across_segments():
+    pages = [(p, f"Art. {p}º Texto da página {p} com conteúdo relevante e suficiente. " * 3) for p in range(1, 41)]
+    out = list(chunk_documents_parallel(
+        [ChunkingJob(doc_id="doc", pages=pages, doc_type="lei")],
+        max_workers=1,
+        max_segment_chars=2_000,
+    ))
+    assert out
+    for _, chunk in out:
+        assert chunk.page is not None
+        assert f"página {chunk.page} " in chunk.text
+
+
+def test_chunk_with_pages_maps_repeated_text_forward():
+    pages = [(1, "Cabeçalho repetido.\n\nArt. 1º Primeiro."), (2, "Cabeçalho repetido.\n\nArt. 2º Segundo.")]
+    chunks = chunk_with_pages(pages, "lei", ChunkingConfig(min_chunk_chars=1, merge_small_chunks=False))
+    assert chunks[-1].page == 2
@@ -49,17 +49,36 @@ def ingest(
     dir: str = typer.Option(..., "--dir", "-d", help="Directory with PDF/DOCX files"),
     batch_size: int = typer.Option(50, "--batch-size", "-b", help="Files per batch"),
     use_llm: bool = typer.Option(False, "--llm", help="Use LLM for contextual prefixes"),
+    resume: bool = typer.Option(
+        True, "--resume/--no-resume", help="Skip files recorded in the checkpoint file"
+    ),
+    checkpoint: Optional[str] = typer.Option(
+        None, "--checkpoint", help="Checkpoint file (default: settings.ingest_checkpoint_path)"
+    ),
+    concurrency: Optional[int] = typer.Option(
+        None, "--concurrency", "-c", help="Concurrent embedding requests"
+    ),
     verbose: bool = typer.Option(False, "--verbose", "-v"),
 ):
-    """Ingest documents into Neo4j."""
+    """Ingest documents into Neo4j (resumable)."""
     logging.basicConfig(
         level=logging.DEBUG if verbose else logging.INFO,
         format="%(asctime)s %(levelname)s %(name)s: %(message)s",
     )
+    from .config import settings
     from .pipeline import ingest_directory
 
+    if concurrency:
+        settings.embed_concurrency = concurrency
+
     console.print(f"[bold]Ingesting from:[/bold] {dir}")
-    stats = ingest_directory(dir, batch_size=batch_size, use_contextual_llm=use_llm)
+    stats = ingest_directory(
+        dir,
+        batch_size=batch_size,
+        use_contextual_llm=use_llm,
+        resume=resume,
+        checkpoint_path=checkpoint,
+    )
 
     table = Table(title="Ingest Results")
     table.add_column("Metric", style="cyan")
@@ -23,6 +23,16 @@ class Settings(BaseSettings):
     voyage_model: str = "voyage-4-large"
     voyage_dimensions: int = 1024
 
+    # Ingestion embedder
+    embed_batch_size: int = 128
+    embed_batch_tokens: int = 100_000  # Voyage caps voyage-4-large requests at 120K tokens
+    embed_concurrency: int = 4
+    embed_max_retries: int = 5
+    embed_backoff_base: float = 1.0
+    embed_backoff_max: float = 30.0
+    embedding_cache_path: str = ".cache/embeddings.sqlite"
+    ingest_checkpoint_path: str = ".cache/ingest_checkpoint.jsonl"
+
     # LLM for contextual prefix
     google_api_key: str = ""
     contextual_llm_model: str = "gemini-2.5-flash"
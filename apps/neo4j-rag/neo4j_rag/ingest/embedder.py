@@ -1,19 +1,36 @@
 """
 Voyage AI embeddings with voyage-4-large.
 
-Handles batching, rate limiting, and fallback.
+Handles token-aware batching, bounded concurrency, retry with backoff and a
+content-hash cache. Failed batches raise instead of producing zero vectors,
+so nothing degenerate ever reaches the HNSW index.
 """
 
 from __future__ import annotations
 
+import hashlib
 import logging
-from typing import List, Optional
+import random
+import sqlite3
+import threading
+import time
+from array import array
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence
 
 from ..config import settings
 
 logger = logging.getLogger(__name__)
 
 _client = None
+_encoding = None
+_cache: Optional["EmbeddingCache"] = None
+_cache_lock = threading.Lock()
+
+
+class EmbeddingError(RuntimeError):
+    """Raised when a batch still fails after all retries."""
 
 
 def _get_client():
@@ -29,47 +46,263 @@ def _get_client():
     return _client
 
 
+# ─── Token counting & batch packing ───────────────────────────────
+
+def _count_tokens(text: str) -> int:
+    """
+    Approximate Voyage token count.
+
+    Uses tiktoken (cl100k) when available; Voyage's tokenizer is close but
+    not identical, so callers keep a safety margin below the API limit.
+    Falls back to chars/3 (conservative for Portuguese legal text).
+    """
+    global _encoding
+    if _encoding is None:
+        try:
+            import tiktoken
+            _encoding = tiktoken.get_encoding("cl100k_base")
+        except Exception:
+            _encoding = False
+    if _encoding:
+        return len(_encoding.encode(text, disallowed_special=()))
+    return len(text) // 3 + 1
+
+
+def pack_batches(
+    token_counts: Sequence[int],
+    *,
+    max_items: int,
+    max_tokens: int,
+) -> List[List[int]]:
+    """
+    Group text indices into batches bounded by item count and total tokens.
+
+    Order is preserved. A single text larger than max_tokens gets its own
+    batch (the API truncates it server-side).
+    """
+    batches: List[List[int]] = []
+    current: List[int] = []
+    current_tokens = 0
+    for idx, n_tokens in enumerate(token_counts):
+        if current and (
+            len(current) >= max_items or current_tokens + n_tokens > max_tokens
+        ):
+            batches.append(current)
+            current, current_tokens = [], 0
+        current.append(idx)
+        current_tokens += n_tokens
+    if current:
+        batches.append(current)
+    return batches
+
+
+# ─── Content-hash cache ───────────────────────────────────────────
+
+def _cache_key(text: str, model: str, input_type: str) -> str:
+    raw = f"{model}\x00{input_type}\x00{text}"
+    return hashlib.sha256(raw.encode()).hexdigest()
+
+
+class EmbeddingCache:
+    """
+    SQLite-backed embedding cache keyed by sha256(model, input_type, text).
+
+    Vectors are stored as packed float32. Safe to share across threads; the
+    same file lets an interrupted ingest skip every chunk it already paid for.
+    """
+
+    def __init__(self, path: str):
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._lock = threading.Lock()
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS embeddings ("
+                "key TEXT PRIMARY KEY, vector BLOB NOT NULL)"
+            )
+            self._conn.commit()
+
+    def get_many(self, keys: Sequence[str]) -> Dict[str, List[float]]:
+        found: Dict[str, List[float]] = {}
+        unique = list(dict.fromkeys(keys))
+        with self._lock:
+            for i in range(0, len(unique), 500):
+                part = unique[i : i + 500]
+                placeholders = ",".join("?" * len(part))
+                rows = self._conn.execute(
+                    f"SELECT key, vector FROM embeddings WHERE key IN ({placeholders})",
+                    part,
+                ).fetchall()
+                for key, blob in rows:
+                    vec = array("f")
+                    vec.frombytes(blob)
+                    found[key] = vec.tolist()
+        return found
+
+    def put_many(self, items: Dict[str, List[float]]) -> None:
+        if not items:
+            return
+        rows = [(k, array("f", v).tobytes()) for k, v in items.items()]
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO embeddings (key, vector) VALUES (?, ?)", rows
+            )
+            self._conn.commit()
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+def _get_cache() -> Optional[EmbeddingCache]:
+    global _cache
+    if not settings.embedding_cache_path:
+        return None
+    with _cache_lock:
+        if _cache is None:
+            _cache = EmbeddingCache(settings.embedding_cache_path)
+    return _cache
+
+
+# ─── Embedding ────────────────────────────────────────────────────
+
+def _embed_batch_with_retry(
+    client,
+    batch: List[str],
+    *,
+    model: str,
+    input_type: str,
+    max_retries: int,
+) -> List[List[float]]:
+    """Call the Voyage API for one batch, retrying with exponential backoff + jitter."""
+    attempt = 0
+    while True:
+        try:
+            result = client.embed(batch, model=model, input_type=input_type)
+            embeddings = result.embeddings
+            if len(embeddings) != len(batch):
+                raise EmbeddingError(
+                    f"Voyage returned {len(embeddings)} vectors for {len(batch)} texts"
+                )
+            return embeddings
+        except Exception as e:
+            attempt += 1
+            if attempt > max_retries:
+                raise EmbeddingError(
+                    f"Embedding batch of {len(batch)} texts failed after "
+                    f"{max_retries} retries: {e}"
+                ) from e
+            delay = min(settings.embed_backoff_max, settings.embed_backoff_base * 2 ** (attempt - 1))
+            delay *= 0.5 + random.random() / 2
+            logger.warning(
+                "Embedding batch of %d texts failed (attempt %d/%d): %s — retrying in %.1fs",
+                len(batch), attempt, max_retries, e, delay,
+            )
+            time.sleep(delay)
+
+
 def embed_texts(
     texts: List[str],
     *,
     model: Optional[str] = None,
     input_type: str = "document",
-    batch_size: int = 128,
+    batch_size: Optional[int] = None,
+    max_batch_tokens: Optional[int] = None,
+    max_concurrency: Optional[int] = None,
+    use_cache: bool = True,
 ) -> List[List[float]]:
     """
     Generate embeddings for a list of texts using Voyage AI.
 
+    Cached vectors are reused; the remaining texts are packed into batches
+    by item count and token budget and sent concurrently.
+
     Args:
         texts: Texts to embed.
         model: Voyage model name (default: settings.voyage_model).
         input_type: "document" for ingestion, "query" for search.
-        batch_size: Max texts per API call.
+        batch_size: Max texts per API call (default: settings.embed_batch_size).
+        max_batch_tokens: Max tokens per API call (default: settings.embed_batch_tokens).
+        max_concurrency: Max in-flight API calls (default: settings.embed_concurrency).
+        use_cache: Read/write the content-hash cache (if configured).
 
     Returns:
-        List of embedding vectors (1024-dim for voyage-4-large).
+        List of embedding vectors (1024-dim for voyage-4-large), in input order.
+
+    Raises:
+        EmbeddingError: A batch failed after all retries.
     """
+    if not texts:
+        return []
+
     model = model or settings.voyage_model
-    client = _get_client()
-    all_embeddings: List[List[float]] = []
+    batch_size = batch_size or settings.embed_batch_size
+    max_batch_tokens = max_batch_tokens or settings.embed_batch_tokens
+    max_concurrency = max(1, max_concurrency or settings.embed_concurrency)
 
-    for i in range(0, len(texts), batch_size):
-        batch = texts[i : i + batch_size]
-        try:
-            result = client.embed(
-                batch,
+    results: List[Optional[List[float]]] = [None] * len(texts)
+    keys = [_cache_key(t, model, input_type) for t in texts]
+
+    cache = _get_cache() if use_cache else None
+    if cache is not None:
+        cached = cache.get_many(keys)
+        for i, key in enumerate(keys):
+            if key in cached:
+                results[i] = cached[key]
+
+    # Deduplicate pending texts so identical chunks cost one embedding
+    pending: Dict[str, List[int]] = {}
+    for i, key in enumerate(keys):
+        if results[i] is None:
+            pending.setdefault(key, []).append(i)
+
+    if pending:
+        first_indices = [idx[0] for idx in pending.values()]
+        pending_texts = [texts[i] for i in first_indices]
+        batches = pack_batches(
+            [_count_tokens(t) for t in pending_texts],
+            max_items=batch_size,
+            max_tokens=max_batch_tokens,
+        )
+        client = _get_client()
+        logger.debug(
+            "Embedding %d texts (%d cached) in %d batches, concurrency=%d",
+            len(pending_texts), len(texts) - sum(len(v) for v in pending.values()),
+            len(batches), max_concurrency,
+        )
+
+        def _run(batch_indices: List[int]) -> Dict[str, List[float]]:
+            batch_texts = [pending_texts[j] for j in batch_indices]
+            vectors = _embed_batch_with_retry(
+                client,
+                batch_texts,
                 model=model,
                 input_type=input_type,
+                max_retries=settings.embed_max_retries,
             )
-            all_embeddings.extend(result.embeddings)
-        except Exception as e:
-            logger.error(f"Embedding batch {i}-{i+len(batch)} failed: {e}")
-            # Fallback: return zero vectors for failed batch
-            all_embeddings.extend([[0.0] * settings.voyage_dimensions] * len(batch))
+            fresh = {keys[first_indices[j]]: v for j, v in zip(batch_indices, vectors)}
+            if cache is not None:
+                cache.put_many(fresh)
+            return fresh
+
+        if len(batches) == 1 or max_concurrency == 1:
+            outputs = [_run(b) for b in batches]
+        else:
+            with ThreadPoolExecutor(max_workers=min(max_concurrency, len(batches))) as pool:
+                outputs = list(pool.map(_run, batches))
+
+        for fresh in outputs:
+            for key, vec in fresh.items():
+                for i in pending[key]:
+                    results[i] = vec
 
-    return all_embeddings
+    return results  # type: ignore[return-value]
 
 
 def embed_query(text: str, *, model: Optional[str] = None) -> List[float]:
     """Embed a single query text."""
-    results = embed_texts([text], model=model, input_type="query", batch_size=1)
+    results = embed_texts(
+        [text], model=model, input_type="query", batch_size=1, use_cache=False
+    )
     return results[0]
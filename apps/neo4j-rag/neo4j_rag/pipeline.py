@@ -7,16 +7,17 @@ Also handles the ingestion pipeline: parse → chunk → embed → store.
 from __future__ import annotations
 
 import hashlib
+import json
 import logging
 from pathlib import Path
-from typing import List, Optional
+from typing import Dict, List, Optional, Set
 
 from neo4j import GraphDatabase
 
 from .config import settings
 from .ingest.chunker import chunk_document, extract_text_from_file
 from .ingest.contextual import build_context_prefixes
-from .ingest.embedder import embed_query, embed_texts
+from .ingest.embedder import EmbeddingError, embed_query, embed_texts
 from .ingest.graph_builder import GraphBuilder, IngestStats
 from .models import Document, RetrievalResult, SearchResult, SourceType
 from .retrieval.hybrid import hybrid_search
@@ -123,21 +124,79 @@ def _make_doc_id(path: Path) -> str:
     return hashlib.sha256(str(path.resolve()).encode()).hexdigest()[:16]
 
 
+def _file_fingerprint(path: Path) -> str:
+    stat = path.stat()
+    return f"{stat.st_size}:{stat.st_mtime_ns}"
+
+
+class IngestCheckpoint:
+    """
+    Append-only JSONL record of documents already stored in Neo4j.
+
+    Each line holds the doc_id and a size/mtime fingerprint, so a resumed
+    run skips finished files but re-ingests files that changed since. A line
+    torn by an interrupted write is skipped on load and terminated before the
+    next append, so it cannot swallow the entry written after it.
+    """
+
+    def __init__(self, path: str):
+        self.path = Path(path)
+        self._done: Dict[str, str] = {}
+        if self.path.exists():
+            for line in self.path.read_text(encoding="utf-8").splitlines():
+                if not line.strip():
+                    continue
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    # Torn line from an interrupted write
+                    continue
+                if isinstance(entry, dict) and "doc_id" in entry:
+                    self._done[entry["doc_id"]] = entry.get("fingerprint", "")
+
+    def is_done(self, doc_id: str, fingerprint: str) -> bool:
+        return self._done.get(doc_id) == fingerprint
+
+    def mark_done(self, entries: List[Dict[str, str]]) -> None:
+        if not entries:
+            return
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with self.path.open("a+b") as raw:
+            if raw.tell() > 0:
+                raw.seek(-1, 2)
+                if raw.read(1) != b"\n":
+                    raw.write(b"\n")
+        with self.path.open("a", encoding="utf-8") as f:
+            for entry in entries:
+                f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+                self._done[entry["doc_id"]] = entry["fingerprint"]
+
+    def __len__(self) -> int:
+        return len(self._done)
+
+
 def ingest_directory(
     directory: str,
     *,
     batch_size: int = 50,
     use_contextual_llm: bool = False,
+    resume: bool = True,
+    checkpoint_path: Optional[str] = None,
 ) -> IngestStats:
     """
     Ingest all PDF/DOCX files from a directory into Neo4j.
 
-    Steps per document:
+    Steps per batch of files:
     1. Extract text (PyMuPDF/python-docx)
     2. Chunk with legal-aware separators
     3. Generate contextual prefix (regex or LLM)
-    4. Generate embeddings (voyage-4-large)
+    4. Generate embeddings for the whole batch (voyage-4-large, concurrent)
     5. Store in Neo4j (Document, Chunk, Entity nodes + relationships)
+    6. Record stored documents in the checkpoint file
+
+    With resume=True, files already recorded in the checkpoint (and
+    unchanged since) are skipped, so an interrupted run picks up where it
+    stopped. Embeddings computed before the interruption come from the cache.
     """
     dir_path = Path(directory)
     if not dir_path.exists():
@@ -149,6 +208,18 @@ def ingest_directory(
     )
     logger.info(f"Found {len(files)} files in {directory}")
 
+    checkpoint = IngestCheckpoint(checkpoint_path or settings.ingest_checkpoint_path)
+    if resume and len(checkpoint):
+        pending_files = [
+            p for p in files
+            if not checkpoint.is_done(_make_doc_id(p), _file_fingerprint(p))
+        ]
+        logger.info(
+            f"Resuming: {len(files) - len(pending_files)} files already ingested, "
+            f"{len(pending_files)} remaining"
+        )
+        files = pending_files
+
     total_stats = IngestStats()
 
     # Ensure indexes exist before ingesting
@@ -165,7 +236,7 @@ def ingest_directory(
     with GraphBuilder() as builder:
         for i in range(0, len(files), batch_size):
             batch_files = files[i : i + batch_size]
-            batch_docs = []
+            prepared = []
 
             for file_path in batch_files:
                 try:
@@ -198,31 +269,60 @@ def ingest_directory(
                     for chunk, prefix in zip(chunks, prefixes):
                         chunk.contextual_prefix = prefix
 
-                    # Embeddings
-                    embedding_inputs = [
-                        (f"{c.contextual_prefix}\n\n{c.text}" if c.contextual_prefix else c.text)
-                        for c in chunks
-                    ]
-                    embeddings = embed_texts(embedding_inputs)
-                    for chunk, emb in zip(chunks, embeddings):
-                        chunk.embedding = emb
-
-                    batch_docs.append((doc, chunks))
+                    prepared.append((file_path, doc, chunks))
 
                 except Exception as e:
                     total_stats.errors.append(f"{file_path}: {e}")
                     logger.error(f"Failed to process {file_path}: {e}")
 
-            if batch_docs:
-                stats = builder.ingest_batch(batch_docs)
-                total_stats.documents_created += stats.documents_created
-                total_stats.chunks_created += stats.chunks_created
-                total_stats.entities_extracted += stats.entities_extracted
-                total_stats.mentions_created += stats.mentions_created
-                total_stats.next_edges_created += stats.next_edges_created
-                total_stats.pertence_a_created += stats.pertence_a_created
-                total_stats.subdispositivo_de_created += stats.subdispositivo_de_created
-                total_stats.errors.extend(stats.errors)
+            if not prepared:
+                continue
+
+            # Embeddings — one call for the whole batch so requests are packed
+            # by token budget and sent concurrently.
+            embedding_inputs = [
+                (f"{c.contextual_prefix}\n\n{c.text}" if c.contextual_prefix else c.text)
+                for _, _, chunks in prepared
+                for c in chunks
+            ]
+            try:
+                embeddings = embed_texts(embedding_inputs)
+            except EmbeddingError as e:
+                for file_path, _, _ in prepared:
+                    total_stats.errors.append(f"{file_path}: {e}")
+                logger.error(f"Embedding failed for batch {i // batch_size + 1}: {e}")
+                continue
+
+            emb_iter = iter(embeddings)
+            for _, _, chunks in prepared:
+                for chunk in chunks:
+                    chunk.embedding = next(emb_iter)
+
+            batch_docs = [(doc, chunks) for _, doc, chunks in prepared]
+            stats = builder.ingest_batch(batch_docs)
+            total_stats.documents_created += stats.documents_created
+            total_stats.chunks_created += stats.chunks_created
+            total_stats.entities_extracted += stats.entities_extracted
+            total_stats.mentions_created += stats.mentions_created
+            total_stats.next_edges_created += stats.next_edges_created
+            total_stats.pertence_a_created += stats.pertence_a_created
+            total_stats.subdispositivo_de_created += stats.subdispositivo_de_created
+            total_stats.errors.extend(stats.errors)
+
+            # GraphBuilder reports failures as "<doc.path>: <error>"
+            failed: Set[str] = {
+                doc.path for _, doc, _ in prepared
+                if any(err.startswith(f"{doc.path}: ") for err in stats.errors)
+            }
+            checkpoint.mark_done([
+                {
+                    "doc_id": doc.id,
+                    "path": str(file_path),
+                    "fingerprint": _file_fingerprint(file_path),
+                }
+                for file_path, doc, _ in prepared
+                if doc.path not in failed
+            ])
 
             logger.info(
                 f"Batch {i // batch_size + 1}: "
@@ -0,0 +1,101 @@
+"""Tests for the batched, cached ingestion embedder and ingest checkpoint."""
+
+import threading
+
+import pytest
+
+from neo4j_rag.config import settings
+from neo4j_rag.ingest import embedder
+from neo4j_rag.ingest.embedder import EmbeddingCache, EmbeddingError, embed_texts, pack_batches
+from neo4j_rag.pipeline import IngestCheckpoint
+
+
+class _Result:
+    def __init__(self, embeddings):
+        self.embeddings = embeddings
+
+
+class FakeVoyage:
+    """Deterministic stand-in: vector = [len(text), call_index]."""
+
+    def __init__(self, fail_times=0):
+        self.calls = []
+        self.fail_times = fail_times
+        self._lock = threading.Lock()
+
+    def embed(self, batch, model, input_type):
+        with self._lock:
+            self.calls.append(list(batch))
+            if self.fail_times > 0:
+                self.fail_times -= 1
+                raise ConnectionError("429 Too Many Requests")
+        return _Result([[float(len(t)), 1.0] for t in batch])
+
+
+@pytest.fixture
+def fake_client(monkeypatch, tmp_path):
+    client = FakeVoyage()
+    monkeypatch.setattr(embedder, "_get_client", lambda: client)
+    monkeypatch.setattr(embedder, "_cache", None)
+    monkeypatch.setattr(embedder.time, "sleep", lambda _s: None)
+    monkeypatch.setattr(settings, "embedding_cache_path", str(tmp_path / "emb.sqlite"))
+    return client
+
+
+def test_pack_batches_respects_items_and_tokens():
+    assert pack_batches([10, 10, 10, 10], max_items=2, max_tokens=100) == [[0, 1], [2, 3]]
+    assert pack_batches([60, 50, 30, 200], max_items=10, max_tokens=100) == [[0], [1, 2], [3]]
+
+
+def test_embed_preserves_order_across_concurrent_batches(fake_client):
+    texts = ["a" * n for n in range(1, 41)]
+    vectors = embed_texts(texts, batch_size=3, max_concurrency=4)
+    assert [v[0] for v in vectors] == [float(n) for n in range(1, 41)]
+    assert len(fake_client.calls) == 14
+
+
+def test_embed_retries_then_succeeds(fake_client):
+    fake_client.fail_times = 2
+    vectors = embed_texts(["x", "yy"])
+    assert vectors == [[1.0, 1.0], [2.0, 1.0]]
+    assert len(fake_client.calls) == 3
+
+
+def test_embed_raises_instead_of_zero_vectors(fake_client, monkeypatch):
+    monkeypatch.setattr(settings, "embed_max_retries", 1)
+    fake_client.fail_times = 10
+    with pytest.raises(EmbeddingError):
+        embed_texts(["x"])
+
+
+def test_cache_and_dedup_skip_api_calls(fake_client):
+    embed_texts(["same", "same", "other"])
+    assert fake_client.calls == [["same", "other"]]
+    embed_texts(["same", "other", "new"])
+    assert fake_client.calls[-1] == ["new"]
+
+
+def test_cache_roundtrip(tmp_path):
+    cache = EmbeddingCache(str(tmp_path / "c.sqlite"))
+    cache.put_many({"k": [0.5, -1.25]})
+    assert cache.get_many(["k", "missing"]) == {"k": [0.5, -1.25]}
+    cache.close()
+
+
+def test_checkpoint_resume(tmp_path):
+    path = tmp_path / "ckpt.jsonl"
+    ckpt = IngestCheckpoint(str(path))
+    ckpt.mark_done([{"doc_id": "d1", "path": "/a.pdf", "fingerprint": "10:1"}])
+    with path.open("a") as f:
+        f.write('{"doc_id": "d2", "fing')  # torn write from a killed run
+
+    reloaded = IngestCheckpoint(str(path))
+    assert reloaded.is_done("d1", "10:1")
+    assert not reloaded.is_done("d1", "11:2")  # file changed since
+    assert not reloaded.is_done("d2", "")
+
+    # Entries appended after the torn line survive the next resume
+    reloaded.mark_done([{"doc_id": "d3", "path": "/c.pdf", "fingerprint": "30:3"}])
+    again = IngestCheckpoint(str(path))
+    assert again.is_done("d1", "10:1") and again.is_done("d3", "30:3")
+    assert len(again) == 2
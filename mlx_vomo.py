@@ -35,6 +35,7 @@ import threading
 import random
 from collections import deque
 from time import sleep # Added for RateLimiter fallback if needed
+from near_duplicates import CharProfile, RatioIndex, ShingleIndex, normalize_text as _normalize_dedup_text, ratio_at_least
 import logging
 
 # Carrega .env no início do módulo para garantir variáveis disponíveis
@@ -353,6 +354,133 @@ class RateLimiter:
 # Instância global
 rate_limiter = RateLimiter(max_requests_per_minute=60)
 
+
+# ==================== PIPELINED CHUNK SCHEDULER (v2.48) ====================
+def _is_rate_limit_error(exc) -> bool:
+    msg = str(exc)
+    return "429" in msg or "RESOURCE_EXHAUSTED" in msg or "rate limit" in msg.lower()
+
+
+class AdaptiveChunkWindow:
+    """Número de chunks em voo, ajustado por AIMD.
+
+    - Sucesso com latência normal: +1 a cada janela completa de sucessos
+    - Latência > slow_factor × média móvel: -1
+    - Rate limit (429/RESOURCE_EXHAUSTED): cai pela metade
+    """
+    def __init__(self, max_size, min_size=1, initial=None, slow_factor=2.0):
+        self.max_size = max(1, int(max_size))
+        self.min_size = max(1, min(int(min_size), self.max_size))
+        self.size = max(self.min_size, min(int(initial or self.max_size), self.max_size))
+        self.slow_factor = slow_factor
+        self.latency_ewma = None
+        self._successes = 0
+
+    def on_success(self, latency):
+        if self.latency_ewma is None:
+            self.latency_ewma = latency
+            return
+        if latency > self.slow_factor * self.latency_ewma:
+            if self.size > self.min_size:
+                self.size -= 1
+            self._successes = 0
+        else:
+            self._successes += 1
+            if self._successes >= self.size and self.size < self.max_size:
+                self.size += 1
+                self._successes = 0
+        self.latency_ewma = 0.3 * latency + 0.7 * self.latency_ewma
+
+    def on_rate_limit(self):
+        self.size = max(self.min_size, self.size // 2)
+        self._successes = 0
+
+
+async def run_pipelined_chunks(
+    start,
+    end,
+    worker,
+    on_commit,
+    window,
+    initial_context=None,
+    max_rate_limit_retries=3,
+    backoff_base=2.0,
+):
+    """Formata os chunks [start, end) com uma janela deslizante de tarefas em voo.
+
+    Ao contrário das ondas de gather, um chunk lento não segura os demais: assim
+    que uma tarefa termina, o próximo chunk é disparado. Os resultados são
+    entregues a ``on_commit(idx, result)`` estritamente em ordem (para o
+    stitching e o checkpoint). ``worker(idx, prev_result)`` recebe o resultado
+    bruto do chunk anterior quando ele já terminou (ou ``initial_context`` para o
+    primeiro), senão None.
+
+    Erros de rate limit reduzem a janela e reenfileiram o chunk com backoff;
+    qualquer outro erro cancela as tarefas em voo e é propagado.
+    """
+    loop = asyncio.get_running_loop()
+    pending = deque((idx, 0.0) for idx in range(start, end))
+    in_flight = {}
+    ready = {}
+    raw = {}
+    attempts = {}
+    next_commit = start
+    # Limita quanto o agendador pode se adiantar ao próximo commit (memória)
+    max_lookahead = window.max_size * 4
+
+    async def _run(idx, delay, ctx):
+        if delay > 0:
+            await asyncio.sleep(delay)
+        return await worker(idx, ctx)
+
+    try:
+        while pending or in_flight:
+            while (
+                pending
+                and len(in_flight) < window.size
+                and pending[0][0] < next_commit + max_lookahead
+            ):
+                idx, delay = pending.popleft()
+                ctx = initial_context if idx == start else raw.get(idx - 1)
+                task = asyncio.create_task(_run(idx, delay, ctx))
+                in_flight[task] = (idx, loop.time() + delay)
+
+            done, _ = await asyncio.wait(in_flight, return_when=asyncio.FIRST_COMPLETED)
+            retry = []
+            for task in sorted(done, key=lambda t: in_flight[t][0]):
+                idx, started = in_flight.pop(task)
+                exc = task.exception()
+                if exc is not None:
+                    if _is_rate_limit_error(exc) and attempts.get(idx, 0) < max_rate_limit_retries:
+                        attempts[idx] = attempts.get(idx, 0) + 1
+                        window.on_rate_limit()
+                        delay = backoff_base * (2 ** (attempts[idx] - 1)) + random.uniform(0, 0.5)
+                        print(
+                            f"{Fore.YELLOW}⏳ Rate limit no segmento {idx+1}: janela -> {window.size}, "
+                            f"nova tentativa em {delay:.1f}s ({attempts[idx]}/{max_rate_limit_retries})"
+                        )
+                        retry.append((idx, delay))
+                        continue
+                    raise exc
+                window.on_success(loop.time() - started)
+                raw[idx] = ready[idx] = task.result()
+            # Retentativas voltam à frente da fila, em ordem
+            for item in reversed(retry):
+                pending.appendleft(item)
+
+            while next_commit in ready:
+                result = ready.pop(next_commit)
+                outcome = on_commit(next_commit, result)
+                if asyncio.iscoroutine(outcome):
+                    await outcome
+                raw.pop(next_commit - 1, None)
+                next_commit += 1
+    finally:
+        for task in in_flight:
+            task.cancel()
+        if in_flight:
+            await asyncio.gather(*in_flight, return_exceptions=True)
+
 def remover_overlap_duplicado(resultados, mode="APOSTILA"):
     """Remove duplicação causada pelo overlap entre chunks usando detecção ROBUSTA de conteúdo
     
@@ -366,39 +494,43 @@ def remover_overlap_duplicado(resultados, mode="APOSTILA"):
         return resultados[0] if resultados else ""
     
     import re
-    from difflib import SequenceMatcher
     
     # === FUNÇÕES AUXILIARES DA ESTRATÉGIA ROBUSTA (Portadas de clean_redundancy.py) ===
-    
-    def normalize_text(text):
-        if not text: return ""
-        text = re.sub(r'[#*-]', ' ', text)
-        text = re.sub(r'[^\w\s]', '', text)
-        return ' '.join(text.lower().split())
+    # v2.48: textos normalizados e perfis de caracteres (near_duplicates.CharProfile)
+    # calculados uma vez por seção/parágrafo; quick_ratio sai em O(alfabeto) e os
+    # parágrafos anteriores são filtrados por faixa de tamanho (RatioIndex).
+
+    normalize_text = _normalize_dedup_text
 
-    def calculate_similarity(text1, text2):
+    def calculate_similarity(prof1, prof2):
+        text1, text2 = prof1.text, prof2.text
         if not text1 or not text2:
             return 0.0
         if len(text1) < 50:
             return 1.0 if text1 in text2 or text2 in text1 else 0.0
-        return SequenceMatcher(None, text1, text2).quick_ratio()
+        return prof1.quick_ratio(prof2)
 
     def extract_unique_paragraphs(sec_curr_content, sec_prev_content):
         if not sec_curr_content: return []
         unique = []
-        paras_curr = sec_curr_content.split('\n\n')
         paras_prev_norm = [normalize_text(p) for p in sec_prev_content.split('\n\n')]
+        paras_prev_norm = [pp for pp in paras_prev_norm if pp]
+        prev_index = RatioIndex(enumerate(paras_prev_norm))
+        prev_joined = '\n'.join(paras_prev_norm)
         
-        for p in paras_curr:
+        for p in sec_curr_content.split('\n\n'):
             p_clean = p.strip()
             if not p_clean or len(p_clean) < 20: continue
             
             p_norm = normalize_text(p_clean)
-            is_present = False
-            for pp_norm in paras_prev_norm:
-                if calculate_similarity(p_norm, pp_norm) > 0.85:
-                    is_present = True
-                    break
+            if not p_norm:
+                unique.append(p_clean)
+                continue
+            if len(p_norm) < 50:
+                # Curto: containment em qualquer sentido
+                is_present = p_norm in prev_joined or any(pp in p_norm for pp in paras_prev_norm)
+            else:
+                is_present = bool(prev_index.quick_matches(p_norm, 0.85))
             
             if not is_present:
                 unique.append(p_clean)
@@ -454,10 +586,23 @@ def remover_overlap_duplicado(resultados, mode="APOSTILA"):
     # 2. Detecção e Remoção
     indices_to_remove = set()
     MAX_WINDOW = 20 # Olha até 20 seções para trás (cobre overlaps grandes)
+
+    def _profiles(sec):
+        # Recalculado quando o conteúdo da seção recebe parágrafos mesclados
+        cached = sec.get('_profiles')
+        if cached is None or cached[0] is not sec['content']:
+            cached = (
+                sec['content'],
+                CharProfile(normalize_text(sec['title_clean'])),
+                CharProfile(normalize_text(sec['content'])),
+            )
+            sec['_profiles'] = cached
+        return cached[1], cached[2]
     
     for i in range(len(sections)):
         if i in indices_to_remove: continue
         sec_curr = sections[i]
+        title_curr, content_curr = _profiles(sec_curr)
         
         # Janela deslizante
         start_check = max(0, i - MAX_WINDOW)
@@ -467,8 +612,9 @@ def remover_overlap_duplicado(resultados, mode="APOSTILA"):
             
             if sec_curr['level'] != sec_prev['level']: continue
             
-            sim_title = calculate_similarity(normalize_text(sec_curr['title_clean']), normalize_text(sec_prev['title_clean']))
-            sim_content = calculate_similarity(normalize_text(sec_curr['content']), normalize_text(sec_prev['content']))
+            title_prev, content_prev = _profiles(sec_prev)
+            sim_title = calculate_similarity(title_curr, title_prev)
+            sim_content = calculate_similarity(content_curr, content_prev)
             
             is_duplicate = False
             
@@ -1297,13 +1443,24 @@ def _extract_style_context(text: str, max_chars: int = 2500) -> str:
         candidate = text[-max_chars:] if len(text) > max_chars else text
     return candidate
 
+def _normalizar_titulo(t):
+    return re.sub(r'[^a-z0-9 ]', '', t.lower())
+
+
+def _chave_palavras_titulo(t):
+    """v2.48: Palavras com mais de 3 letras do título normalizado.
+
+    titulos_sao_similares exige que nenhuma palavra longa fique de fora da
+    interseção, então títulos similares sempre têm a mesma chave — serve de
+    bucket exato para evitar comparar todos os pares.
+    """
+    return frozenset(w for w in _normalizar_titulo(t).split() if len(w) > 3)
+
+
 def titulos_sao_similares(t1, t2, threshold=0.90):
     """Verifica se dois títulos são semanticamente iguais (fuzzy matching)."""
-    def normalizar(t):
-        return re.sub(r'[^a-z0-9 ]', '', t.lower())
-    
-    nt1 = normalizar(t1)
-    nt2 = normalizar(t2)
+    nt1 = _normalizar_titulo(t1)
+    nt2 = _normalizar_titulo(t2)
     
     if not nt1 or not nt2: return False
     
@@ -1348,7 +1505,9 @@ def detectar_secoes_duplicadas(texto):
     print("Magnifying glass tilt left Detectando seções duplicadas (fuzzy)...")
     
     linhas = texto.split('\n')
-    titulos_vistos = []
+    # v2.48: títulos vistos agrupados por _chave_palavras_titulo (ordem de inserção
+    # preservada dentro do bucket) em vez de comparar com todos os anteriores
+    titulos_vistos = {}
     secoes_duplicadas = []
     
     for i, linha in enumerate(linhas):
@@ -1360,9 +1519,10 @@ def detectar_secoes_duplicadas(texto):
             titulo_normalizado = re.sub(r'[📋📊🗂]', '', titulo_normalizado).strip()
             # Remove "(Continuação)" para comparação
             titulo_para_comparar = re.sub(r'\s*\(Continuação\)\s*$', '', titulo_normalizado, flags=re.IGNORECASE).strip()
+            bucket = titulos_vistos.setdefault(_chave_palavras_titulo(titulo_para_comparar), [])
             
             duplicado = False
-            for t_visto, linha_visto in titulos_vistos:
+            for t_visto, linha_visto in bucket:
                 if titulos_sao_similares(titulo_para_comparar, t_visto):
                     print(f"Warning Duplicado (fuzzy): '{linha_strip[:50]}...' ≈ '{t_visto[:50]}...'")
                     secoes_duplicadas.append({
@@ -1374,7 +1534,7 @@ def detectar_secoes_duplicadas(texto):
                     break
             
             if not duplicado:
-                titulos_vistos.append((titulo_para_comparar, i))
+                bucket.append((titulo_para_comparar, i))
     
     if secoes_duplicadas:
         print(f"Cross mark {len(secoes_duplicadas)} seções duplicadas detectadas!")
@@ -1390,8 +1550,6 @@ def remover_secoes_duplicadas(texto, mode="APOSTILA"):
     - FIDELIDADE: 0.70 (mais conservador)
     - APOSTILA: 0.60 (mais agressivo)
     """
-    from difflib import SequenceMatcher
-    
     # Limiares adaptativos por camada de deduplicação
     # Seções duplicadas: mais cuidado, professor pode repetir propositalmente
     LIMIAR_SECOES = 0.70 if mode == "FIDELIDADE" else 0.60
@@ -1478,7 +1636,9 @@ def remover_secoes_duplicadas(texto, mode="APOSTILA"):
             sim = 0.0
             print(f"   ℹ️  Original curto ({len_ref}c), duplicado substancial ({len_dup}c) - mantendo novo conteúdo")
         else:
-            sim = SequenceMatcher(None, texto_referencia, text_dup).ratio()
+            # v2.48: cascata tamanho → quick_ratio → ratio; o ratio O(n²) só é
+            # calculado quando os limites superiores passam do limiar
+            _, sim = ratio_at_least(texto_referencia, text_dup, LIMIAR_SECOES)
             
         print(f"   Similaridade: {sim:.1%} | Linha {idx_dup} | '{titulo_key[:40]}...'")
 
@@ -1509,7 +1669,7 @@ def remover_secoes_duplicadas(texto, mode="APOSTILA"):
     return '\n'.join(linhas_limpas)
 
 
-def remover_paragrafos_duplicados(texto: str, min_chars: int = 80) -> str:
+def remover_paragrafos_duplicados(texto: str, min_chars: int = 80, near_dup_threshold: Optional[float] = None) -> str:
     """
     v2.17: Remove parágrafos duplicados dentro do documento.
     
@@ -1519,10 +1679,14 @@ def remover_paragrafos_duplicados(texto: str, min_chars: int = 80) -> str:
     - Mantém apenas a primeira ocorrência de cada bloco normalizado.
     - Ignora blocos muito curtos (< min_chars) para não afetar listas.
     - Preserva tabelas e headers intactos.
+    - v2.48: Opcionalmente remove quase-duplicatas (Jaccard de shingles via
+      MinHash/LSH >= near_dup_threshold), sem comparar todos os pares.
     
     Args:
         texto: Texto markdown completo
         min_chars: Tamanho mínimo do parágrafo para considerar na deduplicação
+        near_dup_threshold: Limiar de quase-duplicata (0 desliga). Padrão:
+            IUDEX_PARAGRAPH_NEAR_DUP_THRESHOLD (0).
     
     Returns:
         Texto com parágrafos duplicados removidos
@@ -1531,6 +1695,14 @@ def remover_paragrafos_duplicados(texto: str, min_chars: int = 80) -> str:
     
     print("🔄 Removendo parágrafos duplicados (v2.17)...")
     
+    if near_dup_threshold is None:
+        try:
+            near_dup_threshold = float(os.getenv("IUDEX_PARAGRAPH_NEAR_DUP_THRESHOLD", "0") or 0)
+        except ValueError:
+            near_dup_threshold = 0.0
+    indice_quase = ShingleIndex(threshold=near_dup_threshold) if near_dup_threshold > 0 else None
+    quase_removidos = 0
+    
     # Dividir em blocos por linhas em branco duplas
     blocos = re.split(r'\n\s*\n', texto)
     
@@ -1566,11 +1738,20 @@ def remover_paragrafos_duplicados(texto: str, min_chars: int = 80) -> str:
             removidos += 1
             continue  # Pula duplicata
         
+        if indice_quase is not None:
+            assinatura = indice_quase.signature(normalizado)
+            if indice_quase.query(normalizado, signature=assinatura):
+                removidos += 1
+                quase_removidos += 1
+                continue  # Pula quase-duplicata
+            indice_quase.add(len(blocos_limpos), normalizado, signature=assinatura)
+        
         vistos.add(bloco_hash)
         blocos_limpos.append(bloco)
     
     if removidos > 0:
-        print(f"   ✅ {removidos} parágrafos duplicados removidos")
+        detalhe = f" ({quase_removidos} quase-duplicatas)" if quase_removidos else ""
+        print(f"   ✅ {removidos} parágrafos duplicados removidos{detalhe}")
     else:
         print(f"   ℹ️  Nenhum parágrafo duplicado encontrado")
     
@@ -1593,8 +1774,6 @@ def remover_titulos_orfaos(texto: str, similaridade_minima: float = 0.85) -> str
     Returns:
         Texto limpo
     """
-    from difflib import SequenceMatcher
-    
     print("🧹 Removendo títulos órfãos (v2.17)...")
     
     linhas = texto.split('\n')
@@ -1614,6 +1793,8 @@ def remover_titulos_orfaos(texto: str, similaridade_minima: float = 0.85) -> str
         return texto
     
     # 2. Identificar linhas órfãs para remoção
+    # v2.48: H2 indexados por tamanho/perfil de caracteres (mesmo veredito do ratio)
+    indice_h2 = RatioIndex(enumerate(titulos_h2))
     linhas_para_remover = set()
     
     for i, linha in enumerate(linhas):
@@ -1639,13 +1820,8 @@ def remover_titulos_orfaos(texto: str, similaridade_minima: float = 0.85) -> str
         elif stripped.startswith('### '):
             texto_candidato = re.sub(r'^###\s*\d*\.?\s*', '', stripped).strip().lower()
         
-        if texto_candidato:
-            # Comparar com todos os H2
-            for h2 in titulos_h2:
-                sim = SequenceMatcher(None, texto_candidato, h2).ratio()
-                if sim >= similaridade_minima:
-                    linhas_para_remover.add(i)
-                    break
+        if texto_candidato and indice_h2.has_ratio_match(texto_candidato, similaridade_minima):
+            linhas_para_remover.add(i)
     
     # 3. Reconstruir sem as linhas órfãs
     if linhas_para_remover:
@@ -4988,7 +5164,11 @@ metrics = MetricsCollector()
 def get_checkpoint_path(video_name, folder):
     return Path(folder) / f"{video_name}.checkpoint.json"
 
+def get_checkpoint_journal_path(video_name, folder):
+    return Path(folder) / f"{video_name}.checkpoint.jsonl"
+
 def save_checkpoint(video_name, folder, results, segments_info, current_idx):
+    """Snapshot completo (compacta o journal, que passa a ser redundante)."""
     path = get_checkpoint_path(video_name, folder)
     data = {
         'video_name': video_name,
@@ -4999,22 +5179,70 @@ def save_checkpoint(video_name, folder, results, segments_info, current_idx):
     }
     with open(path, 'w', encoding='utf-8') as f:
         json.dump(data, f, ensure_ascii=False, indent=2)
+    journal = get_checkpoint_journal_path(video_name, folder)
+    if journal.exists():
+        journal.unlink()
+
+def append_checkpoint_segment(video_name, folder, idx, result):
+    """v2.48: Acrescenta um segmento concluído ao journal (custo O(1) por chunk,
+    em vez de reescrever a lista inteira de resultados a cada segmento)."""
+    path = get_checkpoint_journal_path(video_name, folder)
+    entry = {'idx': idx, 'result': result, 'timestamp': time.strftime('%Y-%m-%d %H:%M:%S')}
+    with open(path, 'a+b') as f:
+        # Linha truncada por queda anterior: fecha-a antes de acrescentar, senão a
+        # nova entrada seria colada nela e perdida na leitura.
+        if f.tell() > 0:
+            f.seek(-1, os.SEEK_END)
+            if f.read(1) != b"\n":
+                f.write(b"\n")
+        f.write((json.dumps(entry, ensure_ascii=False) + "\n").encode('utf-8'))
+        f.flush()
 
 def load_checkpoint(video_name, folder):
+    """Carrega o snapshot (se houver) e aplica o journal em ordem.
+
+    Só entram entradas contíguas a partir do snapshot (idx == len(results), em
+    qualquer ordem no arquivo); linhas truncadas por queda do processo são ignoradas.
+    """
+    data = None
     path = get_checkpoint_path(video_name, folder)
     if path.exists():
         try:
             with open(path, 'r', encoding='utf-8') as f:
-                return json.load(f)
+                data = json.load(f)
         except Exception as e:
             print(f"⚠️ Erro ao carregar checkpoint: {e}")
-    return None
+
+    journal = get_checkpoint_journal_path(video_name, folder)
+    if journal.exists():
+        if data is None:
+            data = {'video_name': video_name, 'results': []}
+        results = list(data.get('results') or [])
+        entries = {}
+        try:
+            with open(journal, 'r', encoding='utf-8', errors='replace') as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except json.JSONDecodeError:
+                        continue
+                    if isinstance(entry, dict) and isinstance(entry.get('idx'), int):
+                        entries[entry['idx']] = entry
+        except Exception as e:
+            print(f"⚠️ Erro ao ler journal do checkpoint: {e}")
+        while len(results) in entries:
+            entry = entries[len(results)]
+            results.append(entry.get('result'))
+            data['timestamp'] = entry.get('timestamp')
+        data['results'] = results
+        data['current_idx'] = len(results)
+    return data
 
 def delete_checkpoint(video_name, folder):
-    path = get_checkpoint_path(video_name, folder)
-    if path.exists(): 
-        path.unlink()
-        print(f"🧹 Checkpoint removido: {path.name}")
+    for path in (get_checkpoint_path(video_name, folder), get_checkpoint_journal_path(video_name, folder)):
+        if path.exists():
+            path.unlink()
+            print(f"🧹 Checkpoint removido: {path.name}")
 
 def get_hil_output_path(video_name, folder, mode_suffix):
     return Path(folder) / f"{video_name}_{mode_suffix}_HIL.md"
@@ -5032,6 +5260,235 @@ def save_hil_output(formatted_text, video_name, folder, mode_suffix, reason=None
     except Exception as e:
         print(f"{Fore.YELLOW}⚠️ Falha ao salvar HIL checkpoint: {e}")
 
+# ==================== SEGMENTAÇÃO DE ÁUDIO EM PASSADA ÚNICA (v2.48) ====================
+AUDIO_SAMPLE_RATE = 16000
+_PCM_BYTES_PER_SAMPLE = 2
+
+
+def plan_audio_chunks(total_duration, chunk_duration, overlap):
+    """Janelas (start, end) em segundos, com overlap entre chunks consecutivos."""
+    plan = []
+    current_start = 0.0
+    while current_start < total_duration:
+        chunk_end = min(current_start + chunk_duration, total_duration)
+        plan.append((current_start, chunk_end))
+        current_start = chunk_end - overlap
+        if current_start >= total_duration - overlap:
+            break
+    return plan
+
+
+class StreamingAudioSegmenter:
+    """Decodifica a fonte uma única vez e entrega os chunks à medida que ficam prontos.
+
+    Um único ffmpeg converte o container para PCM 16 kHz mono (s16le) num pipe;
+    uma thread lê o stream e grava cada janela do plano (com overlap) como WAV
+    no diretório temporário exclusivo do job — ou, com ``as_arrays=True``, grava
+    só o PCM bruto e expõe cada chunk como ``np.memmap`` (sem arquivos por chunk).
+
+    Iterar devolve os chunks em ordem, bloqueando até cada um estar completo:
+    o primeiro chunk pode ser transcrito enquanto o resto ainda está sendo
+    decodificado. O último chunk vai até o fim real do stream (a duração do
+    ffprobe pode ser estimada).
+    """
+
+    def __init__(self, source_path, plan, *, as_arrays=False, job_dir=None, decode_cmd=None, read_size=1 << 20):
+        import tempfile
+
+        self.source_path = source_path
+        self.plan = list(plan)
+        self.as_arrays = as_arrays
+        self._owns_dir = job_dir is None
+        stem = re.sub(r"[^\w-]+", "_", Path(source_path).stem)[:40] or "audio"
+        self.job_dir = job_dir or tempfile.mkdtemp(prefix=f"vomo_{stem}_")
+        self._cmd = decode_cmd or [
+            "ffmpeg", "-nostdin", "-hide_banner", "-loglevel", "error",
+            "-i", source_path, "-vn", "-ac", "1", "-ar", str(AUDIO_SAMPLE_RATE),
+            "-f", "s16le", "pipe:1",
+        ]
+        self._read_size = read_size
+        self._pcm_path = os.path.join(self.job_dir, "source.pcm") if as_arrays else None
+        self._cond = threading.Condition()
+        self._ready = {}
+        self._decoded_samples = 0
+        self._eof = False
+        self._error = None
+        self._stopped = False  # cleanup() encerrou o ffmpeg de propósito
+        self._proc = None
+        self._thread = None
+
+    # ---- API pública ----
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._decode, name="vomo-audio-segmenter", daemon=True)
+            self._thread.start()
+        return self
+
+    def __len__(self):
+        return len(self.plan)
+
+    def __bool__(self):
+        return bool(self.plan)
+
+    def __iter__(self):
+        for idx in range(len(self.plan)):
+            chunk = self.wait_for(idx)
+            if chunk is None:
+                return
+            yield chunk
+
+    def wait_for(self, idx, timeout=None):
+        """Bloqueia até o chunk ``idx`` estar pronto; None se o áudio acabou antes dele."""
+        self.start()
+        with self._cond:
+            while idx not in self._ready and not self._eof and self._error is None:
+                if not self._cond.wait(timeout):
+                    raise TimeoutError(f"chunk {idx} não ficou pronto em {timeout}s")
+            if idx in self._ready:
+                return self._ready[idx]
+            if self._error is not None:
+                raise self._error
+            return None
+
+    @property
+    def decoded_seconds(self):
+        return self._decoded_samples / AUDIO_SAMPLE_RATE
+
+    def cleanup(self):
+        self._stopped = True
+        proc = self._proc
+        if proc is not None and proc.poll() is None:
+            try:
+                proc.kill()
+            except Exception:
+                pass
+        if self._thread is not None:
+            self._thread.join(timeout=10)
+        with self._cond:
+            for chunk in self._ready.values():
+                chunk.pop('audio', None)
+        if self._owns_dir:
+            shutil.rmtree(self.job_dir, ignore_errors=True)
+
+    # ---- decodificação ----
+
+    def _bounds(self):
+        bounds = [
+            (int(round(start * AUDIO_SAMPLE_RATE)), int(round(end * AUDIO_SAMPLE_RATE)))
+            for start, end in self.plan
+        ]
+        if bounds:
+            bounds[-1] = (bounds[-1][0], None)
+        return bounds
+
+    def _decode(self):
+        import wave
+
+        bounds = self._bounds()
+        writers = {}
+        pcm = open(self._pcm_path, "wb") if self._pcm_path else None
+        pos = 0
+        carry = b""
+        stderr_path = os.path.join(self.job_dir, "ffmpeg.log")
+
+        def _finalize(idx, start, end):
+            if idx in self._ready or end <= start:
+                return
+            chunk = {
+                'path': None,
+                'start': start / AUDIO_SAMPLE_RATE,
+                'end': end / AUDIO_SAMPLE_RATE,
+                'is_temp': True,
+            }
+            if pcm is not None:
+                import numpy as np
+                pcm.flush()
+                chunk['audio'] = np.memmap(
+                    self._pcm_path, dtype=np.int16, mode='r',
+                    offset=start * _PCM_BYTES_PER_SAMPLE, shape=(end - start,),
+                )
+            else:
+                writer = writers.pop(idx, None)
+                if writer is None:
+                    return
+                writer.close()
+                chunk['path'] = self._chunk_path(idx)
+            with self._cond:
+                self._ready[idx] = chunk
+                self._cond.notify_all()
+
+        try:
+            with open(stderr_path, "wb") as stderr:
+                self._proc = subprocess.Popen(self._cmd, stdout=subprocess.PIPE, stderr=stderr)
+                while True:
+                    data = self._proc.stdout.read1(self._read_size)  # devolve o que já chegou, sem esperar encher
+                    if not data:
+                        break
+                    data = carry + data
+                    usable = len(data) - (len(data) % _PCM_BYTES_PER_SAMPLE)
+                    data, carry = data[:usable], data[usable:]
+                    block_start = pos
+                    pos += usable // _PCM_BYTES_PER_SAMPLE
+
+                    if pcm is not None:
+                        pcm.write(data)
+                    else:
+                        for idx, (start, end) in enumerate(bounds):
+                            lo = max(start, block_start)
+                            hi = pos if end is None else min(end, pos)
+                            if hi <= lo:
+                                continue
+                            writer = writers.get(idx)
+                            if writer is None:
+                                writer = wave.open(self._chunk_path(idx), "wb")
+                                writer.setnchannels(1)
+                                writer.setsampwidth(_PCM_BYTES_PER_SAMPLE)
+                                writer.setframerate(AUDIO_SAMPLE_RATE)
+                                writers[idx] = writer
+                            writer.writeframesraw(
+                                data[(lo - block_start) * _PCM_BYTES_PER_SAMPLE:(hi - block_start) * _PCM_BYTES_PER_SAMPLE]
+                            )
+
+                    for idx, (start, end) in enumerate(bounds):
+                        if end is not None and end <= pos:
+                            _finalize(idx, start, end)
+                    with self._cond:
+                        self._decoded_samples = pos
+                        self._cond.notify_all()
+
+                returncode = self._proc.wait()
+            if returncode != 0 and not self._stopped:
+                # Falha no meio do stream não é fim de arquivo: os chunks já prontos
+                # continuam disponíveis, os demais levantam o erro.
+                with open(stderr_path, "r", encoding="utf-8", errors="replace") as f:
+                    detail = f.read().strip()[-500:]
+                raise RuntimeError(
+                    f"ffmpeg falhou (código {returncode}) após {pos / AUDIO_SAMPLE_RATE:.1f}s: {detail}"
+                )
+
+            # Fim do stream: fecha o que tiver amostras (inclusive o último chunk)
+            for idx, (start, end) in enumerate(bounds):
+                if start < pos:
+                    _finalize(idx, start, pos if end is None else min(end, pos))
+        except Exception as exc:
+            self._error = exc
+        finally:
+            for writer in writers.values():
+                try:
+                    writer.close()
+                except Exception:
+                    pass
+            if pcm is not None:
+                pcm.close()
+            with self._cond:
+                self._eof = True
+                self._cond.notify_all()
+
+    def _chunk_path(self, idx):
+        return os.path.join(self.job_dir, f"chunk{idx:03d}.wav")
+
+
 class VomoMLX:
     # GPT-5 Mini: 400k tokens input, 128k output
     MAX_CHUNK_SIZE = 100000  
@@ -6589,22 +7046,25 @@ Se você receber um CONTEXTO de referência (entre delimitadores ━━━):
 
         return duration
 
-    def _split_audio_into_chunks(self, audio_path: str, chunk_duration: float, overlap: float = 30.0) -> list:
+    def _split_audio_into_chunks(self, audio_path: str, chunk_duration: float, overlap: float = 30.0, as_arrays: bool = False):
         """
         Divide áudio longo em chunks temporários.
 
         v2.32: Evita problemas de memória do MLX-Whisper com arquivos muito longos.
+        v2.48: Decodifica a fonte uma única vez (StreamingAudioSegmenter) em vez de
+        um ffmpeg com seek por chunk, num diretório temporário exclusivo do job.
+        Os chunks ficam disponíveis à medida que a decodificação avança.
 
         Args:
             audio_path: Caminho do arquivo de áudio
             chunk_duration: Duração de cada chunk em segundos
             overlap: Overlap entre chunks em segundos (para continuidade)
+            as_arrays: Expor chunks como np.memmap (chave 'audio') em vez de WAV
 
         Returns:
-            Lista de dicts: [{'path': str, 'start': float, 'end': float, 'is_temp': bool}]
+            Iterável de dicts: [{'path': str, 'start': float, 'end': float, 'is_temp': bool}]
+            (lista simples quando o áudio não precisa ser dividido)
         """
-        import tempfile
-
         total_duration = self._get_audio_duration(audio_path)
         if total_duration <= 0:
             return [{'path': audio_path, 'start': 0, 'end': 0, 'is_temp': False}]
@@ -6613,65 +7073,34 @@ Se você receber um CONTEXTO de referência (entre delimitadores ━━━):
         if total_duration <= chunk_duration:
             return [{'path': audio_path, 'start': 0, 'end': total_duration, 'is_temp': False}]
 
-        chunks = []
-        current_start = 0.0
-        chunk_index = 0
-
-        print(f"{Fore.CYAN}   🔪 Dividindo áudio longo ({total_duration/3600:.1f}h) em chunks de {chunk_duration/3600:.1f}h...{Style.RESET_ALL}")
+        plan = plan_audio_chunks(total_duration, chunk_duration, overlap)
 
-        while current_start < total_duration:
-            chunk_end = min(current_start + chunk_duration, total_duration)
-            actual_duration = chunk_end - current_start
+        print(f"{Fore.CYAN}   🔪 Dividindo áudio longo ({total_duration/3600:.1f}h) em {len(plan)} chunks de {chunk_duration/3600:.1f}h (decodificação única)...{Style.RESET_ALL}")
+        for chunk_index, (chunk_start, chunk_end) in enumerate(plan):
+            print(f"{Fore.GREEN}      ✂️ Chunk {chunk_index + 1}: {self._format_timestamp(chunk_start)} → {self._format_timestamp(chunk_end)}{Style.RESET_ALL}")
 
-            # Criar arquivo temporário para o chunk
-            base_name = Path(audio_path).stem
-            temp_dir = tempfile.gettempdir()
-            chunk_path = os.path.join(temp_dir, f"{base_name}_chunk{chunk_index}.wav")
+        return StreamingAudioSegmenter(audio_path, plan, as_arrays=as_arrays).start()
 
-            # Extrair chunk com ffmpeg
-            cmd = [
-                "ffmpeg", "-y",
-                "-ss", str(current_start),
-                "-i", audio_path,
-                "-t", str(actual_duration),
-                "-ar", "16000",
-                "-ac", "1",
-                "-acodec", "pcm_s16le",
-                chunk_path,
-                "-hide_banner",
-                "-loglevel", "error"
-            ]
-
-            try:
-                subprocess.run(cmd, check=True, capture_output=True)
-                chunks.append({
-                    'path': chunk_path,
-                    'start': current_start,
-                    'end': chunk_end,
-                    'is_temp': True
-                })
-                print(f"{Fore.GREEN}      ✂️ Chunk {chunk_index + 1}: {self._format_timestamp(current_start)} → {self._format_timestamp(chunk_end)}{Style.RESET_ALL}")
-            except subprocess.CalledProcessError as e:
-                print(f"{Fore.RED}      ❌ Erro ao criar chunk {chunk_index}: {e}{Style.RESET_ALL}")
-
-            # Próximo chunk com overlap
-            current_start = chunk_end - overlap
-            if current_start >= total_duration - overlap:
-                break
-            chunk_index += 1
-
-        print(f"{Fore.GREEN}   ✅ Criados {len(chunks)} chunks de áudio{Style.RESET_ALL}")
-        return chunks
-
-    def _cleanup_audio_chunks(self, chunks: list):
+    def _cleanup_audio_chunks(self, chunks):
         """Remove arquivos temporários de chunks."""
+        if isinstance(chunks, StreamingAudioSegmenter):
+            chunks.cleanup()
+            return
         for chunk in chunks:
-            if chunk.get('is_temp') and os.path.exists(chunk['path']):
+            if chunk.get('is_temp') and chunk.get('path') and os.path.exists(chunk['path']):
                 try:
                     os.unlink(chunk['path'])
                 except Exception:
                     pass
 
+    def _transcribe_audio_chunk(self, chunk: dict, mlx_kwargs: dict) -> dict:
+        """v2.48: Chunk em arquivo passa pelo VAD; chunk em memória (memmap) vai direto ao Whisper."""
+        if chunk.get('audio') is not None:
+            import numpy as np
+            audio = np.asarray(chunk['audio'], dtype=np.float32) / 32768.0
+            return mlx_whisper.transcribe(audio, **mlx_kwargs)
+        return self._transcribe_with_vad(chunk['path'], mlx_kwargs, skip_silence=True)
+
     def _merge_chunk_segments(self, all_segments: list, overlap_seconds: float = 30.0) -> list:
         """
         Mescla segmentos de múltiplos chunks, removendo duplicatas do overlap.
@@ -6684,24 +7113,30 @@ Se você receber um CONTEXTO de referência (entre delimitadores ━━━):
 
         merged = []
         last_end_time = 0.0
-        recent_texts = []  # Buffer das últimas N frases para detectar duplicatas
+        # Buffer das últimas N frases para detectar duplicatas.
+        # v2.48: guarda (normalizado, palavras, início) já calculados em vez de
+        # renormalizar as 10 frases a cada segmento da zona de overlap.
+        recent_texts = deque(maxlen=10)
 
         def normalize_for_compare(text: str) -> str:
             """Normaliza texto para comparação (lowercase, sem pontuação extra)."""
-            import re
             text = (text or '').strip().lower()
             text = re.sub(r'[^\w\s]', '', text)  # Remove pontuação
             text = re.sub(r'\s+', ' ', text)  # Normaliza espaços
             return text
 
-        def is_duplicate(new_text: str, recent: list) -> bool:
+        def fingerprint(text: str) -> tuple:
+            norm = normalize_for_compare(text)
+            words = norm.split()
+            return norm, set(words), ' '.join(words[:8])
+
+        def is_duplicate(new_fp: tuple, recent) -> bool:
             """Verifica se texto é duplicata de algum texto recente."""
-            new_norm = normalize_for_compare(new_text)
+            new_norm, new_words, new_start = new_fp
             if not new_norm or len(new_norm) < 10:
                 return False
 
-            for old_text in recent:
-                old_norm = normalize_for_compare(old_text)
+            for old_norm, old_words, old_start in recent:
                 if not old_norm:
                     continue
 
@@ -6715,8 +7150,6 @@ Se você receber um CONTEXTO de referência (entre delimitadores ━━━):
                         return True
 
                 # Estratégia 3: Similaridade alta (Jaccard de palavras)
-                new_words = set(new_norm.split())
-                old_words = set(old_norm.split())
                 if new_words and old_words:
                     intersection = len(new_words & old_words)
                     union = len(new_words | old_words)
@@ -6724,8 +7157,6 @@ Se você receber um CONTEXTO de referência (entre delimitadores ━━━):
                         return True
 
                 # Estratégia 4: Início igual (primeiras N palavras)
-                new_start = ' '.join(new_norm.split()[:8])
-                old_start = ' '.join(old_norm.split()[:8])
                 if len(new_start) > 20 and new_start == old_start:
                     return True
 
@@ -6741,21 +7172,21 @@ Se você receber um CONTEXTO de referência (entre delimitadores ━━━):
                 if not seg_text:
                     continue
 
+                seg_fp = fingerprint(seg_text)
+
                 # Para segmentos no período de overlap, verificar duplicatas mais rigorosamente
                 in_overlap_zone = seg_start < last_end_time + overlap_seconds * 0.5
 
                 if in_overlap_zone and chunk_idx > 0:
                     # Verificar se é duplicata
-                    if is_duplicate(seg_text, recent_texts):
+                    if is_duplicate(seg_fp, recent_texts):
                         continue
 
                 merged.append(seg)
                 last_end_time = max(last_end_time, seg.get('end', seg_start))
 
                 # Manter buffer das últimas 10 frases para comparação
-                recent_texts.append(seg_text)
-                if len(recent_texts) > 10:
-                    recent_texts.pop(0)
+                recent_texts.append(seg_fp)
 
         print(f"{Fore.CYAN}   🔗 Merge: {sum(len(s) for s in all_segments)} → {len(merged)} segmentos (removidas duplicatas do overlap){Style.RESET_ALL}")
         return merged
@@ -6770,11 +7201,12 @@ Se você receber um CONTEXTO de referência (entre delimitadores ━━━):
         print(f"{Fore.CYAN}   🎬 Iniciando transcrição em chunks (máx {self.AUDIO_MAX_DURATION_SECONDS/3600:.0f}h cada)...{Style.RESET_ALL}")
         start_time = time.time()
 
-        # Dividir áudio em chunks
+        # Dividir áudio em chunks (v2.48: VOMO_AUDIO_CHUNK_MMAP=1 evita WAVs por chunk)
         chunks = self._split_audio_into_chunks(
             audio_path,
             chunk_duration=self.AUDIO_MAX_DURATION_SECONDS,
-            overlap=self.AUDIO_CHUNK_OVERLAP_SECONDS
+            overlap=self.AUDIO_CHUNK_OVERLAP_SECONDS,
+            as_arrays=bool(_env_truthy("VOMO_AUDIO_CHUNK_MMAP", default=False)),
         )
 
         if not chunks:
@@ -6804,19 +7236,18 @@ Se você receber um CONTEXTO de referência (entre delimitadores ━━━):
 
         try:
             for i, chunk in enumerate(chunks):
-                chunk_path = chunk['path']
                 chunk_start = chunk['start']
                 chunk_end = chunk['end']
 
                 print(f"{Fore.CYAN}   📝 Transcrevendo chunk {i+1}/{len(chunks)} ({self._format_timestamp(chunk_start)} → {self._format_timestamp(chunk_end)})...{Style.RESET_ALL}")
 
                 try:
-                    result = self._transcribe_with_vad(chunk_path, mlx_kwargs, skip_silence=True)
+                    result = self._transcribe_audio_chunk(chunk, mlx_kwargs)
                 except TypeError:
                     mlx_kwargs_copy = dict(mlx_kwargs)
                     mlx_kwargs_copy.pop("beam_size", None)
                     mlx_kwargs_copy.pop("best_of", None)
-                    result = self._transcribe_with_vad(chunk_path, mlx_kwargs_copy, skip_silence=True)
+                    result = self._transcribe_audio_chunk(chunk, mlx_kwargs_copy)
 
                 segments = result.get("segments", [])
 
@@ -11271,6 +11702,9 @@ Retorne APENAS o texto Markdown corrigido, sem explicações adicionais."""
                     if idx < total_segments:
                         results_map[idx] = res
                 print(f"   ✅ {len(results_map)} segmentos recuperados.")
+            # Compacta snapshot + journal (descarta linhas truncadas de uma queda anterior)
+            recovered = [results_map[i] for i in range(len(results_map))]
+            save_checkpoint(video_name, output_folder, recovered, chunks_info, len(recovered))
         
         # v2.19: Context Caching Setup
         cached_context = None
@@ -11446,11 +11880,10 @@ Retorne APENAS o texto Markdown corrigido, sem explicações adicionais."""
                             progress = 72 + int(((i + 1) / total_segments) * 23)
                             await emit("formatting", min(progress, 95), f"Segmento {i+1}/{total_segments} concluído")
 
-                        save_checkpoint(video_name, output_folder, ordered_results, chunks_info, i + 1)
+                        append_checkpoint_segment(video_name, output_folder, i, formatted)
 
                     except Exception as e:
                         print(f"{Fore.RED}❌ Falha Fatal no segmento {i+1}: {e}")
-                        save_checkpoint(video_name, output_folder, ordered_results, chunks_info, i)
                         raise e
                     finally:
                         hb_done.set()
@@ -11460,68 +11893,45 @@ Retorne APENAS o texto Markdown corrigido, sem explicações adicionais."""
                             except Exception:
                                 pass
             else:
-                # Parallel mode (v2.40): Process in batches with semaphore
-                print(f"▶ Iniciando processamento PARALELO ({parallel_chunks} workers) do segmento {start_idx + 1}...")
-                semaphore = asyncio.Semaphore(parallel_chunks)
+                # Parallel mode (v2.48): janela deslizante com commit em ordem.
+                # As ondas de gather (v2.40) esperavam o chunk mais lento de cada
+                # onda; aqui um chunk novo entra assim que qualquer outro termina.
+                print(f"▶ Iniciando processamento PARALELO (janela de até {parallel_chunks}) do segmento {start_idx + 1}...")
+                window = AdaptiveChunkWindow(parallel_chunks)
+
+                async def _run_chunk(idx: int, prev_res: Optional[str]) -> str:
+                    if segment_timeout_seconds and segment_timeout_seconds > 0:
+                        return await asyncio.wait_for(
+                            _process_single_chunk(idx, prev_res),
+                            timeout=segment_timeout_seconds,
+                        )
+                    return await _process_single_chunk(idx, prev_res)
 
-                async def process_with_semaphore(idx: int, prev_res: Optional[str]) -> tuple:
-                    async with semaphore:
+                async def _commit_chunk(idx: int, result: str) -> None:
+                    # Smart stitching (sempre contra o segmento anterior já consolidado)
+                    if ordered_results:
                         try:
-                            if segment_timeout_seconds and segment_timeout_seconds > 0:
-                                result = await asyncio.wait_for(
-                                    _process_single_chunk(idx, prev_res),
-                                    timeout=segment_timeout_seconds,
-                                )
-                            else:
-                                result = await _process_single_chunk(idx, prev_res)
-                            return (idx, result, None)
-                        except Exception as e:
-                            return (idx, None, e)
-
-                # Process in waves: first chunk sequential, then batches
-                remaining = list(range(start_idx, total_segments))
-
-                while remaining:
-                    batch_size = min(parallel_chunks, len(remaining))
-                    batch = remaining[:batch_size]
-                    remaining = remaining[batch_size:]
-
-                    await emit("formatting", 72 + int((total_segments - len(remaining) - batch_size) / total_segments * 23),
-                              f"Processando batch de {len(batch)} segmentos...")
-
-                    # First chunk in batch gets context from previous result
-                    first_idx = batch[0]
-                    prev_result = ordered_results[-1] if ordered_results else None
-
-                    # Process batch in parallel
-                    tasks = []
-                    for j, idx in enumerate(batch):
-                        # Only first chunk gets previous context for better stitching
-                        ctx = prev_result if j == 0 else None
-                        tasks.append(process_with_semaphore(idx, ctx))
-
-                    results = await asyncio.gather(*tasks)
-
-                    # Sort by index and append
-                    results_sorted = sorted(results, key=lambda x: x[0])
-                    for idx, result, error in results_sorted:
-                        if error:
-                            print(f"{Fore.RED}❌ Falha no segmento {idx+1}: {error}")
-                            save_checkpoint(video_name, output_folder, ordered_results, chunks_info, idx)
-                            raise error
-
-                        # Apply stitching
-                        if ordered_results:
-                            try:
-                                result = limpar_inicio_redundante(result, ordered_results[-1])
-                            except Exception:
-                                pass
-
-                        ordered_results.append(result)
-                        print(f"   ✅ Segmento {idx+1}/{total_segments} concluído")
+                            result = limpar_inicio_redundante(result, ordered_results[-1])
+                        except Exception:
+                            pass
+                    ordered_results.append(result)
+                    append_checkpoint_segment(video_name, output_folder, idx, result)
+                    print(f"   ✅ Segmento {idx+1}/{total_segments} concluído (janela: {window.size})")
+                    progress = 72 + int(((idx + 1) / total_segments) * 23)
+                    await emit("formatting", min(progress, 95), f"Segmento {idx+1}/{total_segments} concluído")
 
-                    # Checkpoint after batch
-                    save_checkpoint(video_name, output_folder, ordered_results, chunks_info, batch[-1] + 1)
+                try:
+                    await run_pipelined_chunks(
+                        start_idx,
+                        total_segments,
+                        _run_chunk,
+                        _commit_chunk,
+                        window,
+                        initial_context=ordered_results[-1] if ordered_results else None,
+                    )
+                except Exception as e:
+                    print(f"{Fore.RED}❌ Falha no processamento paralelo ({len(ordered_results)}/{total_segments} segmentos consolidados): {e}")
+                    raise
 
                 await emit("formatting", 95, f"Todos os {total_segments} segmentos processados")
         
@@ -0,0 +1,254 @@
+"""
+near_duplicates.py - Detecção de quase-duplicatas em tempo ~linear.
+
+Usado pela deduplicação final do mlx_vomo (merge de chunks formatados e de
+segmentos ASR), que comparava todos os pares de parágrafos/títulos/seções com
+difflib.SequenceMatcher.
+
+Duas famílias de métricas, cada uma com o seu índice:
+
+1. Similaridades do difflib (quick_ratio / ratio), usadas pelas heurísticas
+   existentes. ``CharProfile`` pré-computa o multiconjunto de caracteres de um
+   texto, de modo que ``quick_ratio`` sai em O(alfabeto) em vez de O(len), e
+   ``RatioIndex`` descarta candidatos pelo limite de tamanho
+   (2·min/(la+lb) ≥ quick_ratio ≥ ratio) antes de qualquer comparação. Os
+   veredictos são idênticos aos das comparações par-a-par originais.
+
+2. Similaridade de Jaccard sobre shingles de palavras, com assinaturas MinHash
+   e LSH por bandas (``MinHasher`` / ``ShingleIndex``): candidatos em O(1) por
+   consulta, limiar ajustável, verificação final pela estimativa da assinatura.
+"""
+import bisect
+import hashlib
+import re
+import struct
+import unicodedata
+from collections import Counter
+from difflib import SequenceMatcher
+from typing import Dict, Hashable, Iterable, List, Optional, Sequence, Tuple
+
+_PUNCT_RE = re.compile(r"[^\w\s]")
+_MARKDOWN_RE = re.compile(r"[#*-]")
+_MERSENNE_PRIME = (1 << 61) - 1
+_MAX_HASH = (1 << 32) - 1
+
+
+# ==================== NORMALIZAÇÃO ====================
+
+def normalize_text(text: str, *, strip_markdown: bool = True, strip_accents: bool = False) -> str:
+    """Lowercase, sem pontuação e com espaços colapsados (mesma regra do 7-DIFF)."""
+    if not text:
+        return ""
+    if strip_markdown:
+        text = _MARKDOWN_RE.sub(" ", text)
+    text = _PUNCT_RE.sub("", text)
+    text = " ".join(text.lower().split())
+    if strip_accents:
+        text = unicodedata.normalize("NFKD", text).encode("ASCII", "ignore").decode("ASCII")
+    return text
+
+
+# ==================== MÉTRICAS DO DIFFLIB ====================
+
+class CharProfile:
+    """Multiconjunto de caracteres de um texto, para quick_ratio em O(alfabeto)."""
+
+    __slots__ = ("text", "length", "counts")
+
+    def __init__(self, text: str):
+        self.text = text or ""
+        self.length = len(self.text)
+        self.counts = Counter(self.text)
+
+    def quick_ratio(self, other: "CharProfile") -> float:
+        """Igual a ``SequenceMatcher(None, self.text, other.text).quick_ratio()``."""
+        total = self.length + other.length
+        if not total:
+            return 1.0
+        small, large = (self.counts, other.counts) if len(self.counts) <= len(other.counts) else (other.counts, self.counts)
+        matches = sum(min(n, large.get(ch, 0)) for ch, n in small.items())
+        return 2.0 * matches / total
+
+
+def length_bound(len_a: int, len_b: int) -> float:
+    """Limite superior de ratio/quick_ratio dado só o tamanho (real_quick_ratio)."""
+    total = len_a + len_b
+    return 2.0 * min(len_a, len_b) / total if total else 1.0
+
+
+def ratio_at_least(a: str, b: str, threshold: float) -> Tuple[bool, float]:
+    """Cascata do difflib: tamanho → quick_ratio → ratio.
+
+    Retorna (ratio > threshold, valor). Quando um limite superior já fica abaixo
+    do limiar, o valor retornado é esse limite (o ratio exato não é calculado).
+    """
+    bound = length_bound(len(a), len(b))
+    if bound <= threshold:
+        return False, bound
+    quick = CharProfile(a).quick_ratio(CharProfile(b))
+    if quick <= threshold:
+        return False, quick
+    value = SequenceMatcher(None, a, b).ratio()
+    return value > threshold, value
+
+
+class RatioIndex:
+    """Índice de textos para buscas "quick_ratio/ratio > limiar".
+
+    Os textos ficam ordenados por tamanho; uma consulta só examina a faixa de
+    tamanhos compatível com o limiar, e dentro dela compara perfis de caracteres.
+    """
+
+    def __init__(self, items: Iterable[Tuple[Hashable, str]] = ()):
+        self._lengths: List[int] = []
+        self._entries: List[Tuple[Hashable, CharProfile]] = []
+        for key, text in items:
+            self.add(key, text)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def add(self, key: Hashable, text: str) -> None:
+        profile = CharProfile(text)
+        pos = bisect.bisect_right(self._lengths, profile.length)
+        self._lengths.insert(pos, profile.length)
+        self._entries.insert(pos, (key, profile))
+
+    def candidates(self, length: int, threshold: float) -> List[Tuple[Hashable, CharProfile]]:
+        """Entradas cujo tamanho permite similaridade > threshold."""
+        if threshold <= 0:
+            return list(self._entries)
+        # 2·min/(la+lb) > t  ⇔  lb ∈ (la·t/(2−t), la·(2−t)/t)
+        low = length * threshold / (2.0 - threshold)
+        high = length * (2.0 - threshold) / threshold
+        lo = bisect.bisect_right(self._lengths, low)
+        hi = bisect.bisect_left(self._lengths, high)
+        return self._entries[lo:hi]
+
+    def quick_matches(self, text: str, threshold: float) -> List[Tuple[Hashable, float]]:
+        """Entradas com quick_ratio > threshold, em ordem de tamanho."""
+        probe = CharProfile(text)
+        out = []
+        for key, profile in self.candidates(probe.length, threshold):
+            score = probe.quick_ratio(profile)
+            if score > threshold:
+                out.append((key, score))
+        return out
+
+    def has_ratio_match(self, text: str, threshold: float) -> bool:
+        """Se alguma entrada tem ``SequenceMatcher(None, text, entrada).ratio() >= threshold``."""
+        probe = CharProfile(text)
+        for _key, profile in self.candidates(probe.length, threshold - 1e-9):
+            if probe.quick_ratio(profile) < threshold:
+                continue
+            if SequenceMatcher(None, text, profile.text).ratio() >= threshold:
+                return True
+        return False
+
+
+# ==================== MINHASH / LSH (JACCARD) ====================
+
+def shingles(text: str, k: int = 5) -> set:
+    """Conjunto de k-shingles de palavras (texto curto vira um único shingle)."""
+    words = text.split()
+    if len(words) <= k:
+        return {" ".join(words)} if words else set()
+    return {" ".join(words[i:i + k]) for i in range(len(words) - k + 1)}
+
+
+def jaccard(a: set, b: set) -> float:
+    if not a and not b:
+        return 1.0
+    union = len(a | b)
+    return len(a & b) / union if union else 0.0
+
+
+def _hash32(token: str) -> int:
+    return struct.unpack("<I", hashlib.blake2b(token.encode("utf-8"), digest_size=4).digest())[0]
+
+
+def _optimal_bands(num_perm: int, threshold: float) -> Tuple[int, int]:
+    """(bandas, linhas) cujo ponto de inflexão (1/b)^(1/r) fica mais perto do limiar."""
+    best = (num_perm, 1)
+    best_err = float("inf")
+    for rows in range(1, num_perm + 1):
+        if num_perm % rows:
+            continue
+        bands = num_perm // rows
+        err = abs((1.0 / bands) ** (1.0 / rows) - threshold)
+        if err < best_err:
+            best, best_err = (bands, rows), err
+    return best
+
+
+class MinHasher:
+    """Assinaturas MinHash determinísticas (permutações universais a·h+b mod p)."""
+
+    def __init__(self, num_perm: int = 64, seed: int = 1):
+        import random
+
+        rng = random.Random(seed)
+        self.num_perm = num_perm
+        self._perms = [
+            (rng.randrange(1, _MERSENNE_PRIME), rng.randrange(0, _MERSENNE_PRIME))
+            for _ in range(num_perm)
+        ]
+
+    def signature(self, tokens: Iterable[str]) -> Tuple[int, ...]:
+        hashes = [_hash32(t) for t in tokens]
+        if not hashes:
+            return tuple([_MAX_HASH] * self.num_perm)
+        return tuple(
+            min(((a * h + b) % _MERSENNE_PRIME) & _MAX_HASH for h in hashes)
+            for a, b in self._perms
+        )
+
+    @staticmethod
+    def estimate(sig_a: Sequence[int], sig_b: Sequence[int]) -> float:
+        if not sig_a:
+            return 0.0
+        return sum(1 for x, y in zip(sig_a, sig_b) if x == y) / len(sig_a)
+
+
+class ShingleIndex:
+    """Índice LSH de textos por similaridade de Jaccard entre shingles.
+
+    ``query`` devolve as chaves cuja similaridade estimada pela assinatura é
+    >= threshold. Inserção e consulta custam O(num_perm + nº de shingles).
+    """
+
+    def __init__(self, threshold: float = 0.8, num_perm: int = 64, shingle_size: int = 5, seed: int = 1):
+        self.threshold = threshold
+        self.shingle_size = shingle_size
+        self._hasher = MinHasher(num_perm=num_perm, seed=seed)
+        # Inflexão da curva LSH abaixo do limiar: prioriza recall, a estimativa
+        # da assinatura filtra os falsos positivos
+        self._bands, self._rows = _optimal_bands(num_perm, max(0.05, threshold * 0.75))
+        self._buckets: List[Dict[Tuple[int, ...], List[Hashable]]] = [dict() for _ in range(self._bands)]
+        self._signatures: Dict[Hashable, Tuple[int, ...]] = {}
+
+    def __len__(self) -> int:
+        return len(self._signatures)
+
+    def signature(self, text: str) -> Tuple[int, ...]:
+        return self._hasher.signature(shingles(text, self.shingle_size))
+
+    def add(self, key: Hashable, text: str, signature: Optional[Tuple[int, ...]] = None) -> None:
+        sig = signature or self.signature(text)
+        self._signatures[key] = sig
+        for band, bucket in enumerate(self._buckets):
+            bucket.setdefault(sig[band * self._rows:(band + 1) * self._rows], []).append(key)
+
+    def query(self, text: str, signature: Optional[Tuple[int, ...]] = None) -> List[Tuple[Hashable, float]]:
+        sig = signature or self.signature(text)
+        seen = set()
+        out = []
+        for band, bucket in enumerate(self._buckets):
+            for key in bucket.get(sig[band * self._rows:(band + 1) * self._rows], ()):
+                if key in seen:
+                    continue
+                seen.add(key)
+                score = MinHasher.estimate(sig, self._signatures[key])
+                if score >= self.threshold:
+                    out.append((key, score))
+        return out
@@ -14,14 +14,22 @@ Uso:
 
 import os
 import re
+import math
+import time
+import uuid
 import hashlib
 import logging
 import tempfile
+import threading
+import weakref
+from collections import OrderedDict
 from pathlib import Path
 from datetime import datetime, timedelta
-from typing import List, Dict, Optional, Any, Iterable, Tuple
+from typing import List, Dict, Optional, Any, Callable, Iterable, Sequence, Tuple
 from dataclasses import dataclass, field
 
+import numpy as np
+
 # Third-party imports
 try:
     import chromadb
@@ -31,7 +39,6 @@ try:
         from sentence_transformers import CrossEncoder
     except Exception:
         CrossEncoder = None
-    from rank_bm25 import BM25Okapi
 except ImportError as e:
     print(f"❌ RAG Local - Dependências faltando: {e}")
     raise
@@ -50,6 +57,302 @@ logger = logging.getLogger("RAGLocal")
 
 from app.core.config import settings
 
+# Limites do gerenciador de índices (memória total estimada e ociosidade mínima
+# antes de um índice vivo poder ser liberado por pressão de memória)
+RAG_LOCAL_MAX_TOTAL_MB = float(os.getenv("RAG_LOCAL_MAX_TOTAL_MB", "2048"))
+RAG_LOCAL_EVICT_IDLE_SECONDS = float(os.getenv("RAG_LOCAL_EVICT_IDLE_SECONDS", "60"))
+RAG_LOCAL_ENCODE_BATCH_SIZE = int(os.getenv("RAG_LOCAL_ENCODE_BATCH_SIZE", "32"))
+RAG_LOCAL_QUERY_CACHE_SIZE = int(os.getenv("RAG_LOCAL_QUERY_CACHE_SIZE", "256"))
+
+# =============================================================================
+# SHARED RESOURCES (modelos e cliente Chroma por processo)
+# =============================================================================
+
+class EmbeddingModelPool:
+    """
+    Pool de modelos por processo: cada modelo (embedding ou reranker) é
+    carregado uma única vez e compartilhado por todos os índices.
+    """
+
+    def __init__(
+        self,
+        loader: Optional[Callable[[str], Any]] = None,
+        reranker_loader: Optional[Callable[[str], Any]] = None,
+    ):
+        self._loader = loader or SentenceTransformer
+        self._reranker_loader = reranker_loader or CrossEncoder
+        self._models: Dict[Tuple[str, str], Any] = {}
+        self._lock = threading.Lock()
+        self._load_locks: Dict[Tuple[str, str], threading.Lock] = {}
+
+    def _get(self, kind: str, name: str, loader: Callable[[str], Any]) -> Any:
+        key = (kind, name)
+        model = self._models.get(key)
+        if model is not None:
+            return model
+        with self._lock:
+            load_lock = self._load_locks.setdefault(key, threading.Lock())
+        # Lock por modelo: carregamentos simultâneos do mesmo modelo esperam o primeiro
+        with load_lock:
+            model = self._models.get(key)
+            if model is None:
+                logger.info(f"🔄 Carregando modelo ({kind}): {name}")
+                model = loader(name)
+                self._models[key] = model
+        return model
+
+    def get(self, model_name: str) -> Any:
+        return self._get("embedding", model_name, self._loader)
+
+    def get_reranker(self, model_name: str) -> Any:
+        if self._reranker_loader is None:
+            return None
+        return self._get("reranker", model_name, self._reranker_loader)
+
+    def encode(self, model_name: str, texts: Sequence[str], batch_size: Optional[int] = None) -> np.ndarray:
+        """Codifica vários textos em uma chamada (batch)."""
+        if not texts:
+            return np.zeros((0, 0), dtype=np.float32)
+        model = self.get(model_name)
+        vectors = model.encode(
+            list(texts),
+            batch_size=int(batch_size or RAG_LOCAL_ENCODE_BATCH_SIZE),
+            show_progress_bar=False,
+        )
+        return np.asarray(vectors, dtype=np.float32).reshape(len(texts), -1)
+
+    def loaded_models(self) -> List[str]:
+        return [f"{kind}:{name}" for kind, name in self._models]
+
+
+_model_pool: Optional[EmbeddingModelPool] = None
+_chroma_client = None
+_shared_lock = threading.Lock()
+
+
+def get_embedding_model_pool() -> EmbeddingModelPool:
+    global _model_pool
+    if _model_pool is None:
+        with _shared_lock:
+            if _model_pool is None:
+                _model_pool = EmbeddingModelPool()
+    return _model_pool
+
+
+def reset_embedding_model_pool() -> None:
+    """Reset the singleton (for tests)."""
+    global _model_pool
+    _model_pool = None
+
+
+def get_chroma_client():
+    """Cliente Chroma in-memory único; cada índice usa a sua coleção."""
+    global _chroma_client
+    if _chroma_client is None:
+        with _shared_lock:
+            if _chroma_client is None:
+                _chroma_client = chromadb.Client()
+    return _chroma_client
+
+
+def _drop_collection(client, name: str) -> None:
+    try:
+        client.delete_collection(name)
+    except Exception:
+        pass
+
+
+# =============================================================================
+# INCREMENTAL BM25
+# =============================================================================
+
+class IncrementalBM25:
+    """
+    BM25 Okapi incremental (mesmas fórmulas do rank_bm25.BM25Okapi).
+
+    Documentos entram com ``add`` sem reconstruir o índice; a consulta percorre
+    só as listas invertidas dos termos da query e seleciona o top-k com
+    ``argpartition`` em vez de ordenar todas as pontuações.
+    """
+
+    def __init__(self, k1: float = 1.5, b: float = 0.75, epsilon: float = 0.25):
+        self.k1 = k1
+        self.b = b
+        self.epsilon = epsilon
+        self._postings: Dict[str, List[Tuple[int, int]]] = {}
+        self._doc_len: List[int] = []
+        self._total_len = 0
+        self._idf: Optional[Dict[str, float]] = None
+        self._doc_len_arr: Optional[np.ndarray] = None
+
+    def __len__(self) -> int:
+        return len(self._doc_len)
+
+    def add(self, tokens: Sequence[str]) -> int:
+        idx = len(self._doc_len)
+        freqs: Dict[str, int] = {}
+        for tok in tokens:
+            freqs[tok] = freqs.get(tok, 0) + 1
+        for tok, tf in freqs.items():
+            self._postings.setdefault(tok, []).append((idx, tf))
+        self._doc_len.append(len(tokens))
+        self._total_len += len(tokens)
+        self._idf = None
+        self._doc_len_arr = None
+        return idx
+
+    def _ensure_stats(self) -> None:
+        if self._idf is not None:
+            return
+        n = len(self._doc_len)
+        idf: Dict[str, float] = {}
+        idf_sum = 0.0
+        negatives = []
+        for tok, posting in self._postings.items():
+            df = len(posting)
+            value = math.log(n - df + 0.5) - math.log(df + 0.5)
+            idf[tok] = value
+            idf_sum += value
+            if value < 0:
+                negatives.append(tok)
+        eps = self.epsilon * (idf_sum / len(idf)) if idf else 0.0
+        for tok in negatives:
+            idf[tok] = eps
+        self._idf = idf
+        self._doc_len_arr = np.asarray(self._doc_len, dtype=np.float64)
+
+    def get_scores(self, query_tokens: Sequence[str]) -> np.ndarray:
+        n = len(self._doc_len)
+        scores = np.zeros(n, dtype=np.float64)
+        if not n:
+            return scores
+        self._ensure_stats()
+        avgdl = self._total_len / n if self._total_len else 1.0
+        k1, b = self.k1, self.b
+        # Como no rank_bm25, termos repetidos na query somam de novo
+        for tok in query_tokens:
+            posting = self._postings.get(tok)
+            if not posting:
+                continue
+            idx = np.fromiter((p[0] for p in posting), dtype=np.int64, count=len(posting))
+            tf = np.fromiter((p[1] for p in posting), dtype=np.float64, count=len(posting))
+            dl = self._doc_len_arr[idx]
+            scores[idx] += self._idf[tok] * (tf * (k1 + 1) / (tf + k1 * (1 - b + b * dl / avgdl)))
+        return scores
+
+    def top_k(self, query_tokens: Sequence[str], k: int) -> List[Tuple[int, float]]:
+        """(índice, score) dos k melhores; empates ficam na ordem de inserção."""
+        scores = self.get_scores(query_tokens)
+        n = len(scores)
+        if not n or k <= 0:
+            return []
+        k = min(int(k), n)
+        if k < n:
+            candidates = np.argpartition(-scores, k - 1)[:k]
+            # Empates na fronteira: inclui todos os de mesmo score e desempata pelo índice
+            kth = scores[candidates].min()
+            candidates = np.union1d(candidates, np.nonzero(scores == kth)[0])
+        else:
+            candidates = np.arange(n)
+        order = sorted(candidates.tolist(), key=lambda i: (-scores[i], i))[:k]
+        return [(i, float(scores[i])) for i in order]
+
+
+# =============================================================================
+# INDEX MANAGER
+# =============================================================================
+
+class LocalIndexManager:
+    """
+    Controla os índices vivos do processo.
+
+    Mantém referências fracas (o índice some quando o chamador o descarta) e,
+    a cada registro/uso, libera índices expirados e — se a memória estimada
+    total passar de ``max_total_bytes`` — os menos usados recentemente que
+    estejam ociosos há pelo menos ``min_idle_seconds``.
+    """
+
+    def __init__(self, max_total_bytes: Optional[int] = None, min_idle_seconds: Optional[float] = None):
+        self.max_total_bytes = int(max_total_bytes if max_total_bytes is not None else RAG_LOCAL_MAX_TOTAL_MB * 1024 * 1024)
+        self.min_idle_seconds = float(min_idle_seconds if min_idle_seconds is not None else RAG_LOCAL_EVICT_IDLE_SECONDS)
+        self._indexes: "OrderedDict[str, weakref.ReferenceType]" = OrderedDict()
+        self._lock = threading.RLock()
+        self.evictions = 0
+
+    def register(self, index: "LocalProcessIndex") -> None:
+        with self._lock:
+            self._indexes[index.index_key] = weakref.ref(index)
+        self.enforce(exclude=index.index_key)
+
+    def touch(self, index: "LocalProcessIndex") -> None:
+        with self._lock:
+            if index.index_key in self._indexes:
+                self._indexes.move_to_end(index.index_key)
+
+    def unregister(self, index: "LocalProcessIndex") -> None:
+        with self._lock:
+            self._indexes.pop(index.index_key, None)
+
+    def live_indexes(self) -> List["LocalProcessIndex"]:
+        with self._lock:
+            alive = []
+            for key, ref in list(self._indexes.items()):
+                index = ref()
+                if index is None or index.released:
+                    self._indexes.pop(key, None)
+                else:
+                    alive.append(index)
+            return alive
+
+    def total_bytes(self) -> int:
+        return sum(index.memory_bytes() for index in self.live_indexes())
+
+    def enforce(self, exclude: Optional[str] = None) -> int:
+        """Libera expirados e, acima do limite, os LRU ociosos. Retorna quantos liberou."""
+        released = 0
+        with self._lock:
+            live = self.live_indexes()
+            for index in live:
+                if index.index_key != exclude and index.is_expired():
+                    index.release(reason="expirado")
+                    released += 1
+            live = [i for i in live if not i.released]
+            total = sum(i.memory_bytes() for i in live)
+            now = time.monotonic()
+            for index in live:  # ordem LRU
+                if total <= self.max_total_bytes:
+                    break
+                if index.index_key == exclude or now - index.last_used < self.min_idle_seconds:
+                    continue
+                total -= index.memory_bytes()
+                index.release(reason="limite de memória")
+                released += 1
+            if total > self.max_total_bytes:
+                logger.warning(
+                    f"⚠️ [RAG Local] Índices ativos usam ~{total / 1e6:.0f}MB "
+                    f"(limite {self.max_total_bytes / 1e6:.0f}MB); nenhum ocioso para liberar"
+                )
+        self.evictions += released
+        return released
+
+
+_index_manager: Optional[LocalIndexManager] = None
+
+
+def get_index_manager() -> LocalIndexManager:
+    global _index_manager
+    if _index_manager is None:
+        with _shared_lock:
+            if _index_manager is None:
+                _index_manager = LocalIndexManager()
+    return _index_manager
+
+
+def reset_index_manager() -> None:
+    """Reset the singleton (for tests)."""
+    global _index_manager
+    _index_manager = None
+
 # =============================================================================
 # METADATA SCHEMA
 # =============================================================================
@@ -118,25 +421,33 @@ class LocalProcessIndex:
         self.tenant_id = tenant_id
         self.created_at = datetime.now()
         self.expiry = self.created_at + timedelta(hours=ttl_hours)
+        self.index_key = uuid.uuid4().hex
+        self.last_used = time.monotonic()
+        self.released = False
         
-        # ChromaDB in-memory
-        self.client = chromadb.Client()
-        self.collection_name = f"proc_{re.sub(r'[^a-zA-Z0-9]', '_', processo_id)}"
+        # ChromaDB in-memory (cliente compartilhado; coleção própria por índice)
+        self.client = get_chroma_client()
+        self.collection_name = f"proc_{re.sub(r'[^a-zA-Z0-9]', '_', processo_id)}"[:48] + f"_{self.index_key[:12]}"
         self.collection = self.client.create_collection(
             name=self.collection_name,
             metadata={"hnsw:space": "cosine"}
         )
+        # Coleção removida quando o índice é descartado sem cleanup()
+        self._finalizer = weakref.finalize(self, _drop_collection, self.client, self.collection_name)
         
-        # Embedding model
-        logger.info(f"🔄 Carregando modelo de embeddings...")
-        self.embedding_model = SentenceTransformer(self.EMBEDDING_MODEL)
+        # Embedding model (pool do processo, carregado uma vez)
+        self._model_pool = get_embedding_model_pool()
+        self.embedding_model = self._model_pool.get(self.EMBEDDING_MODEL)
+        self._query_cache: "OrderedDict[str, np.ndarray]" = OrderedDict()
         
-        # BM25 index (lazy)
+        # BM25 index (incremental)
         self._documents = []
         self._metadatas = []
         self._chunk_ids: List[str] = []
         self._doc_chunk_indices: Dict[str, List[int]] = {}
-        self._bm25 = None
+        self._bm25 = IncrementalBM25()
+        self._text_chars = 0
+        self._embedding_bytes = 0
 
         # Optional reranker (lazy)
         self._reranker = None
@@ -151,10 +462,62 @@ class LocalProcessIndex:
         
         logger.info(f"📁 Índice criado para processo: {processo_id} ({sistema})")
         logger.info(f"   Expira em: {self.expiry.strftime('%Y-%m-%d %H:%M')}")
+        get_index_manager().register(self)
     
     def is_expired(self) -> bool:
         """Verifica se o índice expirou"""
         return datetime.now() > self.expiry
+
+    def memory_bytes(self) -> int:
+        """Estimativa de memória: textos (lista local + cópia no Chroma), vetores (+HNSW) e BM25."""
+        return self._text_chars * 2 + self._embedding_bytes * 2 + len(self._bm25) * 64
+
+    def _touch(self) -> None:
+        if self.released:
+            raise RuntimeError(f"Índice do processo {self.processo_id} foi liberado (expirado ou limite de memória)")
+        self.last_used = time.monotonic()
+        get_index_manager().touch(self)
+
+    def _index_chunks(self, items: List[Tuple[str, Dict[str, Any]]]) -> int:
+        """Codifica os chunks em batch e grava tudo com um único collection.add."""
+        if not items:
+            return 0
+        self._touch()
+        texts = [text for text, _ in items]
+        embeddings = self._model_pool.encode(self.EMBEDDING_MODEL, texts)
+        self.collection.add(
+            ids=[meta["chunk_id"] for _, meta in items],
+            embeddings=embeddings.tolist(),
+            documents=texts,
+            metadatas=[meta for _, meta in items],
+        )
+        for text, metadata in items:
+            global_idx = len(self._documents)
+            self._documents.append(text)
+            self._metadatas.append(metadata)
+            self._chunk_ids.append(metadata["chunk_id"])
+            self._doc_chunk_indices.setdefault(str(metadata["doc_id"]), []).append(global_idx)
+            self._bm25.add(text.lower().split())
+            self._text_chars += len(text)
+            self._graph_ingest_chunk(text, metadata)
+        self._embedding_bytes += int(embeddings.nbytes)
+        get_index_manager().enforce(exclude=self.index_key)
+        return len(items)
+
+    def _encode_queries(self, queries: Sequence[str]) -> List[np.ndarray]:
+        """Embeddings das queries: cache LRU por índice + uma chamada em batch para as novas."""
+        missing = [q for q in dict.fromkeys(queries) if q not in self._query_cache]
+        if missing:
+            vectors = self._model_pool.encode(self.EMBEDDING_MODEL, missing)
+            for q, vec in zip(missing, vectors):
+                self._query_cache[q] = vec
+        out = []
+        for q in queries:
+            self._query_cache.move_to_end(q)
+            out.append(self._query_cache[q])
+        while len(self._query_cache) > RAG_LOCAL_QUERY_CACHE_SIZE:
+            self._query_cache.popitem(last=False)
+        return out
     
     def _chunk_text(self, text: str, page_start: int = 0) -> List[Dict]:
         """Divide texto em chunks com metadados de página estimada"""
@@ -290,7 +653,7 @@ class LocalProcessIndex:
         data_doc = self._extract_date(full_text)
         
         # Indexar por página
-        total_chunks = 0
+        items: List[Tuple[str, Dict[str, Any]]] = []
         chunk_index = 0
         for page_data in pages:
             chunks = self._chunk_text(page_data["text"], page_start=page_data["page"])
@@ -300,9 +663,6 @@ class LocalProcessIndex:
                 chunk_id = hashlib.md5(f"{self.processo_id}_{doc_id}_{chunk['page']}_{chunk['word_start']}".encode()).hexdigest()
                 source_hash = hashlib.sha256(chunk["text"].encode("utf-8")).hexdigest()
                 
-                # Embedding
-                embedding = self.embedding_model.encode(chunk["text"]).tolist()
-                
                 # Metadata
                 metadata = {
                     "processo_id": self.processo_id,
@@ -318,29 +678,11 @@ class LocalProcessIndex:
                     "filename": filename,
                     "file_path": str(file_path)
                 }
-                
-                # Add to collection
-                self.collection.add(
-                    ids=[chunk_id],
-                    embeddings=[embedding],
-                    documents=[chunk["text"]],
-                    metadatas=[metadata]
-                )
-                
-                # Store for BM25
-                global_idx = len(self._documents)
-                self._documents.append(chunk["text"])
-                self._metadatas.append(metadata)
-                self._chunk_ids.append(chunk_id)
-                self._doc_chunk_indices.setdefault(str(doc_id), []).append(global_idx)
-
-                self._graph_ingest_chunk(chunk["text"], metadata)
-                
-                total_chunks += 1
+                items.append((chunk["text"], metadata))
                 chunk_index += 1
         
-        # Invalidate BM25 cache
-        self._bm25 = None
+        # Embeddings em batch + Chroma + BM25 incremental
+        total_chunks = self._index_chunks(items)
         
         logger.info(f"   ✅ {filename}: {total_chunks} chunks ({tipo_doc})")
         return total_chunks
@@ -365,14 +707,12 @@ class LocalProcessIndex:
         page_start = 1
         chunks = self._chunk_text(full_text, page_start=page_start)
 
-        total_chunks = 0
-        chunk_index = 0
-        for chunk in chunks:
+        items: List[Tuple[str, Dict[str, Any]]] = []
+        for chunk_index, chunk in enumerate(chunks):
             chunk_id = hashlib.md5(
                 f"{self.processo_id}_{doc_id}_{chunk['page']}_{chunk['word_start']}".encode()
             ).hexdigest()
             source_hash = hashlib.sha256(chunk["text"].encode("utf-8")).hexdigest()
-            embedding = self.embedding_model.encode(chunk["text"]).tolist()
             metadata = {
                 "processo_id": self.processo_id,
                 "sistema": self.sistema,
@@ -387,22 +727,9 @@ class LocalProcessIndex:
                 "filename": filename,
                 "file_path": source_path or filename,
             }
-            self.collection.add(
-                ids=[chunk_id],
-                embeddings=[embedding],
-                documents=[chunk["text"]],
-                metadatas=[metadata],
-            )
-            global_idx = len(self._documents)
-            self._documents.append(chunk["text"])
-            self._metadatas.append(metadata)
-            self._chunk_ids.append(chunk_id)
-            self._doc_chunk_indices.setdefault(str(doc_id), []).append(global_idx)
-            self._graph_ingest_chunk(chunk["text"], metadata)
-            total_chunks += 1
-            chunk_index += 1
+            items.append((chunk["text"], metadata))
 
-        self._bm25 = None
+        total_chunks = self._index_chunks(items)
         logger.info(f"   ✅ {filename}: {total_chunks} chunks ({tipo_doc}) [texto]")
         return total_chunks
     
@@ -443,12 +770,6 @@ class LocalProcessIndex:
         print(f"\n{Fore.GREEN}✅ Total indexado: {total} chunks{Style.RESET_ALL}")
         return total
     
-    def _build_bm25(self):
-        """Constrói índice BM25 (lazy)"""
-        if self._bm25 is None and self._documents:
-            tokenized = [doc.lower().split() for doc in self._documents]
-            self._bm25 = BM25Okapi(tokenized)
-
     def _get_reranker(self, model_name: Optional[str] = None):
         if CrossEncoder is None:
             return None
@@ -456,7 +777,7 @@ class LocalProcessIndex:
         if self._reranker is not None and self._reranker_name == model_name:
             return self._reranker
         try:
-            self._reranker = CrossEncoder(model_name)
+            self._reranker = self._model_pool.get_reranker(model_name)
             self._reranker_name = model_name
             logger.info(f"🔁 [RAG Local] Reranker carregado: {model_name}")
             return self._reranker
@@ -688,11 +1009,15 @@ class LocalProcessIndex:
         bm25_weight: float,
         semantic_weight: float,
         rrf_k: int,
+        query_embedding: Optional[np.ndarray] = None,
     ) -> List[Dict[str, Any]]:
+        self._touch()
         if self.is_expired():
             logger.warning("⚠️ Índice expirado!")
 
-        query_embedding = self.embedding_model.encode(query).tolist()
+        if query_embedding is None:
+            query_embedding = self._encode_queries([query])[0]
+        query_embedding = np.asarray(query_embedding, dtype=np.float32).tolist()
         where_filter: Optional[dict] = {}
         if tipo_doc:
             where_filter["tipo_doc"] = tipo_doc
@@ -705,7 +1030,7 @@ class LocalProcessIndex:
             query_embeddings=[query_embedding],
             n_results=max(2, int(top_k) * 2),
             where=where_filter,
-            include=["documents", "metadatas", "distances", "ids"],
+            include=["documents", "metadatas", "distances"],  # ids sempre retornados
         )
 
         semantic_rank_map: Dict[str, Dict[str, Any]] = {}
@@ -721,13 +1046,10 @@ class LocalProcessIndex:
                 "raw_semantic_sim": float(1.0 - float(dist)),
             }
 
-        self._build_bm25()
         bm25_rank_map: Dict[str, Dict[str, Any]] = {}
-        if self._bm25 and self._documents:
-            scores = self._bm25.get_scores(query.lower().split())
-            scored_docs = [(i, float(score)) for i, score in enumerate(scores)]
-            scored_docs.sort(key=lambda x: x[1], reverse=True)
-            for rank, (idx, score) in enumerate(scored_docs[: max(2, int(top_k) * 2)], start=1):
+        if self._documents:
+            scored_docs = self._bm25.top_k(query.lower().split(), max(2, int(top_k) * 2))
+            for rank, (idx, score) in enumerate(scored_docs, start=1):
                 if idx >= len(self._documents) or idx >= len(self._chunk_ids):
                     continue
                 cid = self._chunk_ids[idx]
@@ -764,7 +1086,13 @@ class LocalProcessIndex:
         per_query_top_k = int(per_query_top_k or max(top_k, 8))
         rrf_k = max(1, int(rrf_k))
         per_query_results: List[List[Dict[str, Any]]] = []
-        for q in queries:
+        # Todas as queries codificadas em uma única chamada ao modelo
+        try:
+            embeddings: List[Optional[np.ndarray]] = list(self._encode_queries(queries))
+        except Exception as exc:
+            logger.warning(f"⚠️ [RAG Local] Embedding em batch falhou: {exc}")
+            embeddings = [None] * len(queries)
+        for q, q_embedding in zip(queries, embeddings):
             try:
                 per_query_results.append(
                     self._single_search(
@@ -774,6 +1102,7 @@ class LocalProcessIndex:
                         bm25_weight=bm25_weight,
                         semantic_weight=semantic_weight,
                         rrf_k=rrf_k,
+                        query_embedding=q_embedding,
                     )
                 )
             except Exception as exc:
@@ -1004,11 +1333,13 @@ class LocalProcessIndex:
         return {
             "processo_id": self.processo_id,
             "sistema": self.sistema,
-            "total_chunks": self.collection.count(),
+            "total_chunks": len(self._documents) if self.released else self.collection.count(),
             "total_documents": len(set(m.get("doc_id", "") for m in self._metadatas)),
             "created_at": self.created_at.isoformat(),
             "expires_at": self.expiry.isoformat(),
-            "is_expired": self.is_expired()
+            "is_expired": self.is_expired(),
+            "memory_bytes": self.memory_bytes(),
+            "released": self.released,
         }
     
     def cronologia(self) -> List[Dict]:
@@ -1042,13 +1373,30 @@ class LocalProcessIndex:
         cronologia.sort(key=lambda x: x.get("data_doc", ""))
         return cronologia
     
-    def cleanup(self):
-        """Libera recursos do índice"""
+    def release(self, reason: str = "") -> None:
+        """Remove a coleção e os dados em memória (modelos do pool continuam carregados)."""
+        if self.released:
+            return
+        self.released = True
+        self._finalizer.detach()
+        get_index_manager().unregister(self)
         try:
             self.client.delete_collection(self.collection_name)
-            logger.info(f"🗑️ Índice {self.processo_id} removido.")
+            suffix = f" ({reason})" if reason else ""
+            logger.info(f"🗑️ Índice {self.processo_id} removido{suffix}.")
         except Exception as e:
             logger.warning(f"Erro ao limpar índice: {e}")
+        self._bm25 = IncrementalBM25()
+        self._query_cache.clear()
+        self._documents = []
+        self._chunk_ids = []
+        self._doc_chunk_indices = {}
+        self._text_chars = 0
+        self._embedding_bytes = 0
+
+    def cleanup(self):
+        """Libera recursos do índice"""
+        self.release()
 
 
 # =============================================================================
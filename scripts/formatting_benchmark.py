@@ -0,0 +1,842 @@
+#!/usr/bin/env python3
+"""
+Benchmark: pipeline de formatacao pos-ASR (VomoMLX.format_transcription_async)
+
+Reexecuta transcricoes brutas longas contra respostas de LLM gravadas
+(fixtures record/replay) e mede, so em CPU, cada etapa da formatacao:
+chunking, formatacao por chunk, dedupe, correcoes estruturais, auditorias,
+o pos-processamento do TranscriptionService.process_file (analise de
+qualidade, auto-fix estrutural) e a geracao do DOCX.
+
+Saidas:
+    - perfil por etapa (tempo inclusivo e proprio, chamadas) em JSON;
+    - pilhas colapsadas (`--collapsed`, formato flamegraph.pl/speedscope),
+      amostradas em todas as threads (to_thread/executor incluidos);
+    - `--pstats` opcional (cProfile da thread principal, p/ snakeviz).
+
+Uso:
+    # 1) gravar fixtures uma vez (chama o Gemini de verdade)
+    python scripts/formatting_benchmark.py ./transcricoes/ --record --fixtures bench/llm_fixtures
+    # 2) replay offline, sem rede nem chaves
+    python scripts/formatting_benchmark.py ./transcricoes/ --fixtures bench/llm_fixtures \\
+        --output bench/formatting_profile.json --collapsed bench/formatting.folded
+    # sem corpus: transcricoes sinteticas (respostas sinteticas nos misses)
+    python scripts/formatting_benchmark.py --synthetic-chars 200000 600000
+"""
+
+import argparse
+import asyncio
+import contextlib
+import contextvars
+import cProfile
+import functools
+import hashlib
+import inspect
+import io
+import json
+import os
+import random
+import re
+import sys
+import tempfile
+import threading
+import time
+from collections import Counter, defaultdict
+from dataclasses import dataclass, field, asdict
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Any, Callable, Optional
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+API_ROOT = PROJECT_ROOT / "apps" / "api"
+TRANSCRIPT_EXTENSIONS = {".txt", ".md"}
+FIXTURES_FILENAME = "fixtures.jsonl"
+
+# Funcoes de modulo chamadas por format_transcription_async, agrupadas por etapa.
+# O patch e feito no namespace de mlx_vomo (onde o orquestrador resolve os nomes).
+MODULE_STAGES = {
+    "structure_map": [
+        "filtrar_niveis_excessivos",
+        "simplificar_estrutura_se_necessario",
+        "limpar_estrutura_para_review",
+    ],
+    "chunking": [
+        "dividir_por_blocos_markdown",
+        "dividir_sequencial",
+        "validar_chunks",
+        "chunk_texto_seguro",
+    ],
+    "stitching": [
+        "_extract_style_context",
+        "remover_eco_do_contexto",
+        "limpar_inicio_redundante",
+        "remover_marcadores_continua",
+    ],
+    "checkpoint": [
+        "load_checkpoint",
+        "append_checkpoint_segment",
+        "delete_checkpoint",
+    ],
+    "dedupe": [
+        "remover_duplicacoes_literais",
+        "remover_secoes_duplicadas",
+        "remover_paragrafos_duplicados",
+        "remover_titulos_orfaos",
+    ],
+    "tables": [
+        "mesclar_tabelas_divididas",
+        "mover_tabelas_para_fim_de_secao",
+        "garantir_titulo_tabela_banca",
+        "reatribuir_tabelas_por_topico",
+    ],
+    "structural_fixes": [
+        "normalize_headings",
+        "deterministic_structure_fix",
+        "renumerar_secoes",
+        "audit_heading_levels",
+        "aplicar_correcoes_automaticas",
+        "enforce_fidelity_heading_guard",
+    ],
+    "llm_review": [
+        "ai_structure_review",
+        "ai_structure_review_lite",
+    ],
+    "audit": [
+        "auditar_fidelidade_preventiva",
+        "gerar_relatorio_markdown_completo",
+        "auditar_consistencia_legal",
+    ],
+    "final_cleanup": [
+        "remover_vocativos_girias",
+        "normalizar_temas_markdown",
+    ],
+}
+
+# Metodos de VomoMLX (patch na instancia).
+METHOD_STAGES = {
+    "structure_map": ["map_structure", "create_context_cache"],
+    "llm_format": ["process_chunk_async", "_split_and_retry_async"],
+    "structural_fixes": ["renumber_headings", "auto_fix_smart"],
+    "audit": [
+        "final_structure_audit",
+        "check_coverage",
+        "validate_completeness_full",
+        "validate_fidelity_primary",
+        "_ai_reassign_tables",
+    ],
+    "docx": ["save_as_word"],
+}
+
+
+# ============================================================
+# Record/replay de respostas do LLM
+# ============================================================
+
+class FixtureMissError(KeyError):
+    """Prompt sem resposta gravada (modo replay estrito)."""
+
+
+def _content_text(contents: Any) -> str:
+    """Texto canonico de `contents` (str, lista de partes ou types.Content)."""
+    if contents is None:
+        return ""
+    if isinstance(contents, str):
+        return contents
+    if isinstance(contents, (list, tuple)):
+        return "\n".join(_content_text(c) for c in contents)
+    parts = getattr(contents, "parts", None)
+    if parts:
+        return "\n".join(_content_text(p) for p in parts)
+    text = getattr(contents, "text", None)
+    if isinstance(text, str):
+        return text
+    data = getattr(contents, "inline_data", None) or getattr(contents, "data", None)
+    if isinstance(data, (bytes, bytearray)):
+        return hashlib.sha256(data).hexdigest()
+    return repr(contents)
+
+
+def fixture_key(model: str, contents: Any, config: Any = None) -> str:
+    """Chave estavel da chamada: modelo + conteudo + campos do config que mudam a resposta."""
+    payload = {
+        "model": model or "",
+        "contents": _content_text(contents),
+        "system": _content_text(getattr(config, "system_instruction", None)),
+        "mime": getattr(config, "response_mime_type", None) or "",
+    }
+    raw = json.dumps(payload, ensure_ascii=False, sort_keys=True)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+class FixtureStore:
+    """Fixtures em JSONL (uma chamada por linha), carregadas em memoria."""
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = Path(path) / FIXTURES_FILENAME if path else None
+        self._records: dict[str, dict] = {}
+        self._lock = threading.Lock()
+        if self.path and self.path.exists():
+            with open(self.path, encoding="utf-8") as f:
+                for line in f:
+                    line = line.strip()
+                    if line:
+                        rec = json.loads(line)
+                        self._records[rec["key"]] = rec
+
+    def __len__(self):
+        return len(self._records)
+
+    def get(self, key: str) -> Optional[dict]:
+        return self._records.get(key)
+
+    def put(self, record: dict) -> None:
+        with self._lock:
+            self._records[record["key"]] = record
+            if self.path:
+                self.path.parent.mkdir(parents=True, exist_ok=True)
+                with open(self.path, "a", encoding="utf-8") as f:
+                    f.write(json.dumps(record, ensure_ascii=False) + "\n")
+
+
+@dataclass
+class LLMStats:
+    calls: int = 0
+    hits: int = 0
+    misses: int = 0
+    recorded: int = 0
+    recorded_latency_s: float = 0.0
+    prompt_chars: int = 0
+    response_chars: int = 0
+
+
+def synthetic_response(prompt: str) -> str:
+    """
+    Resposta deterministica para prompts sem fixture.
+
+    Chunks de formatacao viram Markdown com titulo + paragrafos do proprio
+    texto bruto (o volume de texto pos-LLM fica realista); demais prompts
+    recebem string vazia, que o pipeline ja trata como "sem resultado".
+    """
+    match = re.search(r"<texto_para_formatar>\s*(.*?)\s*</texto_para_formatar>", prompt, re.DOTALL)
+    if not match:
+        return ""
+    raw = re.sub(r"\[\d{1,2}:\d{2}(?::\d{2})?\]\s*", "", match.group(1))
+    sentences = [s.strip() for s in re.split(r"(?<=[.!?])\s+", raw) if s.strip()]
+    if not sentences:
+        return ""
+    digest = int(hashlib.sha256(raw.encode("utf-8")).hexdigest()[:8], 16)
+    title = " ".join(sentences[0].split()[:6]).rstrip(".,;:")
+    out = [f"## {digest % 9 + 1}. {title}"]
+    for i in range(0, len(sentences), 5):
+        if i and i % 20 == 0:
+            out.append(f"### {(i // 20)}. {' '.join(sentences[i].split()[:5]).rstrip('.,;:')}")
+        out.append(" ".join(sentences[i:i + 5]))
+    return "\n\n".join(out)
+
+
+class _FixtureModels:
+    def __init__(self, owner: "FixtureLLMClient"):
+        self._owner = owner
+
+    def generate_content(self, model=None, contents=None, config=None, **kwargs):
+        return self._owner._generate(model, contents, config, **kwargs)
+
+    def count_tokens(self, model=None, contents=None, **kwargs):
+        return SimpleNamespace(total_tokens=max(1, len(_content_text(contents)) // 4))
+
+
+class FixtureLLMClient:
+    """
+    Substituto de `genai.Client` com record/replay.
+
+    Expoe apenas `.models` (sem `.caches`): criar_cache_contexto falha e o
+    pipeline segue sem context caching nos dois modos, entao os prompts
+    gravados e reexecutados sao identicos.
+    """
+
+    def __init__(self, store: FixtureStore, inner: Any = None, strict: bool = False):
+        self.store = store
+        self.inner = inner
+        self.strict = strict
+        self.stats = LLMStats()
+        self._lock = threading.Lock()
+        self.models = _FixtureModels(self)
+
+    @property
+    def recording(self) -> bool:
+        return self.inner is not None
+
+    def _generate(self, model, contents, config, **kwargs):
+        key = fixture_key(model, contents, config)
+        prompt = _content_text(contents)
+        rec = self.store.get(key)
+        if rec is None and self.recording:
+            start = time.perf_counter()
+            response = self.inner.models.generate_content(model=model, contents=contents, config=config, **kwargs)
+            latency = time.perf_counter() - start
+            try:
+                text = response.text or ""
+            except ValueError:
+                text = ""
+            usage = getattr(response, "usage_metadata", None)
+            rec = {
+                "key": key,
+                "model": model,
+                "prompt_chars": len(prompt),
+                "prompt_head": prompt[:200],
+                "text": text,
+                "prompt_tokens": getattr(usage, "prompt_token_count", 0) or 0,
+                "completion_tokens": getattr(usage, "candidates_token_count", 0) or 0,
+                "latency_s": round(latency, 4),
+            }
+            self.store.put(rec)
+            with self._lock:
+                self.stats.recorded += 1
+        with self._lock:
+            self.stats.calls += 1
+            self.stats.prompt_chars += len(prompt)
+            if rec is not None:
+                self.stats.hits += 1
+                self.stats.recorded_latency_s += float(rec.get("latency_s", 0.0))
+            else:
+                self.stats.misses += 1
+        if rec is None:
+            if self.strict:
+                raise FixtureMissError(f"sem fixture para {key[:12]} ({prompt[:80]!r})")
+            rec = {"text": synthetic_response(prompt), "prompt_tokens": len(prompt) // 4}
+            rec["completion_tokens"] = len(rec["text"]) // 4
+        with self._lock:
+            self.stats.response_chars += len(rec["text"])
+        return SimpleNamespace(
+            text=rec["text"],
+            candidates=[],
+            usage_metadata=SimpleNamespace(
+                prompt_token_count=rec.get("prompt_tokens", 0),
+                candidates_token_count=rec.get("completion_tokens", 0),
+                cached_content_token_count=0,
+                total_token_count=rec.get("prompt_tokens", 0) + rec.get("completion_tokens", 0),
+            ),
+        )
+
+
+# ============================================================
+# Profiler por etapa
+# ============================================================
+
+@dataclass
+class StageStats:
+    group: str
+    calls: int = 0
+    inclusive_s: float = 0.0
+    self_s: float = 0.0
+    max_s: float = 0.0
+
+
+class _Frame:
+    __slots__ = ("children_s",)
+
+    def __init__(self):
+        self.children_s = 0.0
+
+
+_current_frame: contextvars.ContextVar[Optional[_Frame]] = contextvars.ContextVar("_current_frame", default=None)
+
+
+class StageProfiler:
+    """
+    Tempo inclusivo e proprio por etapa.
+
+    O tempo proprio desconta as etapas aninhadas (ex.: stitching dentro de
+    process_chunk_async). O frame atual vive num ContextVar, entao segue as
+    tasks e o asyncio.to_thread. Com chunks em paralelo o tempo proprio do
+    pai pode ser subestimado; ele e limitado a zero.
+    """
+
+    def __init__(self):
+        self.stages: dict[str, StageStats] = {}
+        self._lock = threading.Lock()
+
+    @contextlib.contextmanager
+    def stage(self, name: str, group: str = "other"):
+        frame = _Frame()
+        parent = _current_frame.get()
+        token = _current_frame.set(frame)
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            _current_frame.reset(token)
+            with self._lock:
+                if parent is not None:
+                    parent.children_s += elapsed
+                st = self.stages.get(name)
+                if st is None:
+                    st = self.stages[name] = StageStats(group=group)
+                st.calls += 1
+                st.inclusive_s += elapsed
+                st.self_s += max(0.0, elapsed - frame.children_s)
+                st.max_s = max(st.max_s, elapsed)
+
+    def wrap(self, fn: Callable, name: str, group: str) -> Callable:
+        if inspect.iscoroutinefunction(fn):
+            @functools.wraps(fn)
+            async def async_wrapper(*args, **kwargs):
+                with self.stage(name, group):
+                    return await fn(*args, **kwargs)
+            return async_wrapper
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with self.stage(name, group):
+                return fn(*args, **kwargs)
+        return wrapper
+
+    @contextlib.contextmanager
+    def instrument(self, module: Any, vomo: Any):
+        """Aplica os wrappers em mlx_vomo e na instancia; desfaz na saida."""
+        patched = []
+        for group, names in MODULE_STAGES.items():
+            for name in names:
+                fn = getattr(module, name, None)
+                if callable(fn):
+                    patched.append((module, name, fn))
+                    setattr(module, name, self.wrap(fn, name, group))
+        for group, names in METHOD_STAGES.items():
+            for name in names:
+                fn = getattr(vomo, name, None)
+                if callable(fn):
+                    patched.append((vomo, name, None))
+                    setattr(vomo, name, self.wrap(fn, name, group))
+        try:
+            yield self
+        finally:
+            for target, name, original in reversed(patched):
+                if original is None:
+                    delattr(target, name)  # volta a resolver pelo metodo da classe
+                else:
+                    setattr(target, name, original)
+
+    def snapshot(self, total_s: float) -> dict:
+        stages = {name: asdict(st) for name, st in self.stages.items()}
+        groups: dict[str, dict] = defaultdict(lambda: {"self_s": 0.0, "calls": 0})
+        for st in self.stages.values():
+            groups[st.group]["self_s"] += st.self_s
+            groups[st.group]["calls"] += st.calls
+        attributed = sum(st.self_s for st in self.stages.values())
+        groups["unattributed"] = {"self_s": max(0.0, total_s - attributed), "calls": 0}
+        for g in groups.values():
+            g["share"] = round(g["self_s"] / total_s, 4) if total_s > 0 else 0.0
+            g["self_s"] = round(g["self_s"], 4)
+        for st in stages.values():
+            for k in ("inclusive_s", "self_s", "max_s"):
+                st[k] = round(st[k], 4)
+        return {"stages": stages, "groups": dict(groups)}
+
+
+# ============================================================
+# Amostragem de pilhas (flamegraph)
+# ============================================================
+
+_IDLE_LEAVES = {"wait", "select", "poll", "_worker", "_wait_for_tstate_lock", "get", "run_forever", "sleep"}
+
+
+class StackSampler:
+    """
+    Amostra as pilhas de todas as threads e agrega no formato colapsado
+    (`func;func;func N`), lido por flamegraph.pl, inferno e speedscope.
+    Threads ociosas (esperando fila/selector) sao descartadas.
+    """
+
+    def __init__(self, interval_s: float = 0.005):
+        self.interval_s = interval_s
+        self.stacks: Counter = Counter()
+        self.samples = 0
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    @staticmethod
+    def _label(code) -> str:
+        return f"{code.co_name} ({Path(code.co_filename).name}:{code.co_firstlineno})"
+
+    def _run(self):
+        own = threading.get_ident()
+        while not self._stop.wait(self.interval_s):
+            for ident, frame in sys._current_frames().items():
+                if ident == own or frame.f_code.co_name in _IDLE_LEAVES:
+                    continue
+                labels = []
+                while frame is not None:
+                    labels.append(self._label(frame.f_code))
+                    frame = frame.f_back
+                self.stacks[";".join(reversed(labels))] += 1
+                self.samples += 1
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name="stack-sampler", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        if self._thread:
+            self._thread.join()
+
+    def collapsed(self) -> str:
+        return "".join(f"{stack} {count}\n" for stack, count in self.stacks.most_common())
+
+    def top_functions(self, n: int = 15) -> list[dict]:
+        """Funcoes com mais amostras no topo da pilha (tempo proprio)."""
+        leaves: Counter = Counter()
+        for stack, count in self.stacks.items():
+            leaves[stack.rsplit(";", 1)[-1]] += count
+        total = sum(leaves.values()) or 1
+        return [{"function": f, "samples": c, "share": round(c / total, 4)} for f, c in leaves.most_common(n)]
+
+
+# ============================================================
+# Transcricoes de entrada
+# ============================================================
+
+_SYNTH_WORDS = (
+    "a prescrição intercorrente na execução fiscal segundo o artigo 40 da lei 6830 "
+    "o tribunal fixou a tese no tema 566 do STJ e a súmula 314 trata do prazo "
+    "pessoal então vamos lembrar que o contribuinte pode alegar a exceção de "
+    "pré-executividade quando a matéria for de ordem pública e não depender de prova"
+).split()
+
+
+def synthetic_transcript(chars: int, seed: int = 0) -> str:
+    """Transcricao bruta deterministica (falas com timestamps, sem Markdown)."""
+    rng = random.Random(seed)
+    out, size, seconds = [], 0, 0
+    while size < chars:
+        sentence = " ".join(rng.choice(_SYNTH_WORDS) for _ in range(rng.randint(8, 28)))
+        sentence = sentence[0].upper() + sentence[1:] + "."
+        if rng.random() < 0.15:
+            seconds += rng.randint(20, 90)
+            sentence = f"[{seconds // 3600:02d}:{seconds // 60 % 60:02d}:{seconds % 60:02d}] {sentence}"
+        out.append(sentence)
+        size += len(sentence) + 1
+        if rng.random() < 0.12:
+            out.append("\n\n")
+    return " ".join(out).replace(" \n\n ", "\n\n")
+
+
+def collect_transcripts(paths: list[str], synthetic_chars: list[int], seed: int = 0) -> list[tuple[str, str]]:
+    items = []
+    for p in paths:
+        path = Path(p)
+        files = sorted(f for f in path.iterdir() if f.suffix.lower() in TRANSCRIPT_EXTENSIONS) if path.is_dir() else [path]
+        for f in files:
+            items.append((f.stem, f.read_text(encoding="utf-8", errors="ignore")))
+    for i, chars in enumerate(synthetic_chars):
+        items.append((f"sintetico_{chars}", synthetic_transcript(chars, seed=seed + i)))
+    return items
+
+
+# ============================================================
+# Pipeline
+# ============================================================
+
+def load_vomo_module():
+    if str(PROJECT_ROOT) not in sys.path:
+        sys.path.insert(0, str(PROJECT_ROOT))
+    import mlx_vomo
+    return mlx_vomo
+
+
+def build_offline_vomo(module: Any, client: Any, cache_dir: str):
+    """
+    VomoMLX sem o __init__ (que conecta no Vertex/OpenAI): mesmos atributos,
+    cliente de fixtures, OpenAI desligado e cache de chunks vazio (senao o
+    cache local curto-circuitaria a formatacao na segunda execucao).
+    """
+    vomo = module.VomoMLX.__new__(module.VomoMLX)
+    vomo.model_name = "large-v3-turbo"
+    vomo.provider = "gemini"
+    vomo.thinking_level = "medium"
+    vomo.use_openai_primary = False
+    vomo._diarization_enabled = False
+    vomo._diarization_required = False
+    vomo._condition_on_previous = True
+    vomo.llm_model = "gemini-3-flash-preview"
+    vomo.client = client
+    vomo._gemini_use_vertex = False
+    vomo._gemini_vertex_project = None
+    vomo._gemini_vertex_location = None
+    vomo.openai_model = "gpt-5-mini-2025-08-07"
+    vomo.openai_client = None
+    vomo.prompt_apostila = vomo.PROMPT_APOSTILA_ACTIVE
+    vomo.async_client = None
+    vomo.cache_dir = Path(cache_dir)
+    vomo.cache_dir.mkdir(parents=True, exist_ok=True)
+    module.metrics.set_provider("gemini")
+    return vomo
+
+
+def _load_service_postprocess():
+    """Pos-processamento do TranscriptionService (opcional: requer deps de apps/api)."""
+    if str(API_ROOT) not in sys.path:
+        sys.path.insert(0, str(API_ROOT))
+    try:
+        from app.services.quality_service import quality_service
+        from app.services.transcription_service import TranscriptionService
+    except Exception as e:
+        print(f"⚠️ Pos-processamento do serviço indisponível ({e}); medindo só o mlx_vomo.")
+        return None
+    return quality_service, TranscriptionService()
+
+
+async def run_service_postprocess(service, vomo, profiler: StageProfiler, raw: str, formatted: str,
+                                  name: str, mode: str, output_dir: str) -> str:
+    """Mesma sequencia de process_file apos a formatacao (relatorios, auto-fix, DOCX)."""
+    quality_service, transcription_service = service
+    previous_vomo = quality_service._vomo
+    quality_service._vomo = vomo
+    try:
+        with profiler.stage("service.analyze_structural_issues", "service_quality"):
+            analysis = await quality_service.analyze_structural_issues(
+                content=formatted, document_name=name, raw_content=raw
+            )
+        with profiler.stage("service.validate_document_full", "service_quality"):
+            await quality_service.validate_document_full(
+                raw_content=raw, formatted_content=formatted, document_name=name, mode=mode
+            )
+        if (analysis or {}).get("total_issues", 0) > 0:
+            with profiler.stage("service.auto_apply_structural_fixes", "service_fixes"):
+                formatted, applied, _ = await transcription_service._auto_apply_structural_fixes(
+                    final_text=formatted, transcription_text=raw, video_name=name
+                )
+            if applied:
+                with profiler.stage("service.analyze_structural_issues", "service_quality"):
+                    await quality_service.analyze_structural_issues(
+                        content=formatted, document_name=name, raw_content=raw
+                    )
+        with profiler.stage("service.generate_docx", "docx"):
+            transcription_service._generate_docx(vomo, formatted, name, Path(output_dir), mode)
+    finally:
+        quality_service._vomo = previous_vomo
+    return formatted
+
+
+@dataclass
+class BenchmarkOptions:
+    mode: str = "APOSTILA"
+    fixtures: Optional[str] = None
+    record: bool = False
+    strict: bool = False
+    service: bool = True
+    docx: bool = True
+    skip_audit: bool = False
+    skip_fidelity_audit: bool = False
+    sample_interval_ms: float = 5.0
+    pstats: Optional[str] = None
+    verbose: bool = False
+    work_dir: Optional[str] = None
+
+
+@dataclass
+class TranscriptReport:
+    name: str
+    raw_chars: int
+    formatted_chars: int = 0
+    wall_s: float = 0.0
+    stages: dict = field(default_factory=dict)
+    groups: dict = field(default_factory=dict)
+    llm: dict = field(default_factory=dict)
+    error: Optional[str] = None
+
+
+async def profile_transcript(module, client: FixtureLLMClient, name: str, raw: str,
+                             options: BenchmarkOptions, service=None) -> TranscriptReport:
+    report = TranscriptReport(name=name, raw_chars=len(raw))
+    profiler = StageProfiler()
+    before = asdict(client.stats)
+    with tempfile.TemporaryDirectory(dir=options.work_dir) as work:
+        vomo = build_offline_vomo(module, client, cache_dir=os.path.join(work, "cache"))
+        start = time.perf_counter()
+        try:
+            with profiler.instrument(module, vomo), profiler.stage("format_transcription_async", "orchestration"):
+                formatted = await vomo.format_transcription_async(
+                    raw,
+                    name,
+                    work,
+                    mode=options.mode,
+                    skip_audit=options.skip_audit,
+                    skip_fidelity_audit=options.skip_fidelity_audit,
+                )
+                if service is not None:
+                    formatted = await run_service_postprocess(
+                        service, vomo, profiler, raw, formatted, name, options.mode, work
+                    )
+                elif options.docx:
+                    vomo.save_as_word(formatted, name, work, mode=options.mode)
+            report.formatted_chars = len(formatted or "")
+        except Exception as e:
+            report.error = f"{type(e).__name__}: {e}"
+        report.wall_s = round(time.perf_counter() - start, 4)
+    # O tempo proprio da raiz e o custo do orquestrador (regex de limpeza,
+    # montagem de prompts, escrita de relatorios) fora das etapas instrumentadas.
+    snap = profiler.snapshot(report.wall_s)
+    report.stages, report.groups = snap["stages"], snap["groups"]
+    after = asdict(client.stats)
+    report.llm = {k: round(after[k] - before[k], 4) for k in after}
+    return report
+
+
+def aggregate(reports: list[TranscriptReport]) -> dict:
+    stages: dict[str, dict] = {}
+    groups: dict[str, float] = defaultdict(float)
+    total = sum(r.wall_s for r in reports)
+    for r in reports:
+        for name, st in r.stages.items():
+            agg = stages.setdefault(name, {"group": st["group"], "calls": 0, "inclusive_s": 0.0, "self_s": 0.0})
+            agg["calls"] += st["calls"]
+            agg["inclusive_s"] += st["inclusive_s"]
+            agg["self_s"] += st["self_s"]
+        for g, data in r.groups.items():
+            groups[g] += data["self_s"]
+    for agg in stages.values():
+        agg["inclusive_s"] = round(agg["inclusive_s"], 4)
+        agg["self_s"] = round(agg["self_s"], 4)
+        agg["share"] = round(agg["self_s"] / total, 4) if total > 0 else 0.0
+    return {
+        "wall_s": round(total, 4),
+        "raw_chars": sum(r.raw_chars for r in reports),
+        "stages": dict(sorted(stages.items(), key=lambda kv: -kv[1]["self_s"])),
+        "groups": {g: round(s, 4) for g, s in sorted(groups.items(), key=lambda kv: -kv[1])},
+    }
+
+
+async def run_benchmark(transcripts: list[tuple[str, str]], options: BenchmarkOptions,
+                        sampler: Optional[StackSampler] = None) -> dict:
+    module = load_vomo_module()
+    store = FixtureStore(options.fixtures)
+    inner = None
+    if options.record:
+        inner = module.VomoMLX(provider="gemini").client
+    client = FixtureLLMClient(store, inner=inner, strict=options.strict)
+    service = _load_service_postprocess() if options.service else None
+
+    # Rate limit e espera de rede, nao CPU: no replay o limitador nao deve dormir.
+    original_limiter = module.rate_limiter
+    if not options.record:
+        module.rate_limiter = module.RateLimiter(max_requests_per_minute=10**9)
+
+    profile = cProfile.Profile() if options.pstats else None
+    reports = []
+    sink = contextlib.nullcontext() if options.verbose else contextlib.redirect_stdout(io.StringIO())
+    try:
+        if sampler:
+            sampler.start()
+        if profile:
+            profile.enable()
+        with sink:
+            for name, raw in transcripts:
+                reports.append(await profile_transcript(module, client, name, raw, options, service=service))
+    finally:
+        if profile:
+            profile.disable()
+            Path(options.pstats).parent.mkdir(parents=True, exist_ok=True)
+            profile.dump_stats(options.pstats)
+        if sampler:
+            sampler.stop()
+        module.rate_limiter = original_limiter
+
+    result = {
+        "config": {
+            "mode": options.mode,
+            "fixtures": options.fixtures,
+            "fixtures_loaded": len(store),
+            "record": options.record,
+            "service_postprocess": service is not None,
+            "python": sys.version.split()[0],
+        },
+        "transcripts": [asdict(r) for r in reports],
+        "aggregate": aggregate(reports),
+        "llm": asdict(client.stats),
+    }
+    if sampler:
+        result["sampling"] = {"samples": sampler.samples, "top_self": sampler.top_functions()}
+    return result
+
+
+def print_report(result: dict) -> None:
+    agg = result["aggregate"]
+    llm = result["llm"]
+    print(f"\n== Formatação: {len(result['transcripts'])} transcrição(ões), "
+          f"{agg['raw_chars']:,} chars, {agg['wall_s']:.2f}s de CPU/parede ==")
+    print(f"LLM: {llm['calls']} chamadas (hits={llm['hits']} misses={llm['misses']}), "
+          f"latência gravada evitada={llm['recorded_latency_s']:.1f}s")
+    for r in result["transcripts"]:
+        status = f" ERRO: {r['error']}" if r["error"] else ""
+        print(f"- {r['name']}: {r['raw_chars']:,} → {r['formatted_chars']:,} chars em {r['wall_s']:.2f}s{status}")
+    print("\nPor grupo (tempo próprio):")
+    for g, s in agg["groups"].items():
+        share = s / agg["wall_s"] * 100 if agg["wall_s"] else 0
+        print(f"  {g:<18} {s:8.3f}s {share:5.1f}%")
+    print("\nPor etapa (tempo próprio / inclusivo):")
+    for name, st in list(agg["stages"].items())[:25]:
+        print(f"  {name:<38} {st['self_s']:8.3f}s {st['inclusive_s']:8.3f}s  n={st['calls']}")
+    for item in result.get("sampling", {}).get("top_self", [])[:10]:
+        print(f"  [amostra] {item['share'] * 100:5.1f}% {item['function']}")
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmark do pipeline de formatação (replay de LLM).")
+    parser.add_argument("inputs", nargs="*", help="Arquivos ou pastas com transcrições brutas (.txt/.md)")
+    parser.add_argument("--synthetic-chars", type=int, nargs="*", default=[], help="Gera transcrições sintéticas")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--mode", default="APOSTILA")
+    parser.add_argument("--fixtures", default=None, help="Pasta das fixtures (fixtures.jsonl)")
+    parser.add_argument("--record", action="store_true", help="Chama o LLM real nos misses e grava")
+    parser.add_argument("--strict", action="store_true", help="Falha em prompt sem fixture (replay)")
+    parser.add_argument("--no-service", action="store_true", help="Não mede o pós-processamento do serviço")
+    parser.add_argument("--no-docx", action="store_true")
+    parser.add_argument("--skip-audit", action="store_true")
+    parser.add_argument("--skip-fidelity-audit", action="store_true")
+    parser.add_argument("--output", default=None, help="Relatório JSON por etapa")
+    parser.add_argument("--collapsed", default=None, help="Pilhas colapsadas p/ flamegraph")
+    parser.add_argument("--sample-interval-ms", type=float, default=5.0)
+    parser.add_argument("--pstats", default=None, help="Dump cProfile (thread principal)")
+    parser.add_argument("--work-dir", default=None)
+    parser.add_argument("--verbose", action="store_true", help="Mantém os logs do mlx_vomo")
+    args = parser.parse_args()
+
+    transcripts = collect_transcripts(args.inputs, args.synthetic_chars, seed=args.seed)
+    if not transcripts:
+        parser.error("informe transcrições ou --synthetic-chars")
+
+    options = BenchmarkOptions(
+        mode=args.mode.upper(),
+        fixtures=args.fixtures,
+        record=args.record,
+        strict=args.strict,
+        service=not args.no_service,
+        docx=not args.no_docx,
+        skip_audit=args.skip_audit,
+        skip_fidelity_audit=args.skip_fidelity_audit,
+        sample_interval_ms=args.sample_interval_ms,
+        pstats=args.pstats,
+        verbose=args.verbose,
+        work_dir=args.work_dir,
+    )
+    sampler = StackSampler(interval_s=args.sample_interval_ms / 1000.0) if args.collapsed else None
+    result = asyncio.run(run_benchmark(transcripts, options, sampler=sampler))
+    print_report(result)
+
+    if args.output:
+        Path(args.output).parent.mkdir(parents=True, exist_ok=True)
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(result, f, ensure_ascii=False, indent=2)
+        print(f"\nRelatório salvo em {args.output}")
+    if sampler:
+        Path(args.collapsed).parent.mkdir(parents=True, exist_ok=True)
+        Path(args.collapsed).write_text(sampler.collapsed(), encoding="utf-8")
+        print(f"Pilhas colapsadas salvas em {args.collapsed} (flamegraph.pl / speedscope)")
+    return 1 if any(r["error"] for r in result["transcripts"]) else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,91 @@
+"""
+Tests for scripts/formatting_benchmark.py (record/replay LLM fixtures + stage profile).
+Run with: pytest tests/test_formatting_benchmark.py -v
+"""
+import asyncio
+import importlib.util
+import os
+import time
+from types import SimpleNamespace
+
+import pytest
+
+REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), os.pardir))
+_spec = importlib.util.spec_from_file_location(
+    "formatting_benchmark", os.path.join(REPO_ROOT, "scripts", "formatting_benchmark.py")
+)
+fb = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(fb)
+
+
+class FakeGemini:
+    def __init__(self):
+        self.calls = 0
+        self.models = self
+
+    def generate_content(self, model=None, contents=None, config=None):
+        self.calls += 1
+        return SimpleNamespace(
+            text=f"resposta {len(contents)}",
+            usage_metadata=SimpleNamespace(prompt_token_count=7, candidates_token_count=3),
+        )
+
+
+def test_record_then_replay_from_disk(tmp_path):
+    inner = FakeGemini()
+    recorder = fb.FixtureLLMClient(fb.FixtureStore(str(tmp_path)), inner=inner)
+    first = recorder.models.generate_content(model="m", contents="prompt A")
+    recorder.models.generate_content(model="m", contents="prompt A")
+    assert inner.calls == 1 and recorder.stats.recorded == 1
+
+    replay = fb.FixtureLLMClient(fb.FixtureStore(str(tmp_path)), strict=True)
+    again = replay.models.generate_content(model="m", contents="prompt A")
+    assert again.text == first.text
+    assert again.usage_metadata.prompt_token_count == 7
+    with pytest.raises(fb.FixtureMissError):
+        replay.models.generate_content(model="m", contents="prompt B")
+
+
+def test_synthetic_response_formats_only_chunk_prompts():
+    prompt = "SYSTEM\n<texto_para_formatar>\n[00:01:02] Primeira frase aqui. Segunda frase.\n</texto_para_formatar>"
+    out = fb.synthetic_response(prompt)
+    assert out.startswith("## ") and "Segunda frase." in out and "[00:01:02]" not in out
+    assert fb.synthetic_response("mapeie a estrutura") == ""
+
+
+def test_stage_profiler_separates_self_time():
+    profiler = fb.StageProfiler()
+
+    def inner():
+        time.sleep(0.02)
+
+    wrapped_inner = profiler.wrap(inner, "inner", "dedupe")
+
+    async def outer():
+        await asyncio.to_thread(wrapped_inner)  # ContextVar segue a thread
+        time.sleep(0.01)
+
+    asyncio.run(profiler.wrap(outer, "outer", "llm_format")())
+    snap = profiler.snapshot(total_s=0.03)
+    assert snap["stages"]["inner"]["self_s"] >= 0.02
+    assert snap["stages"]["outer"]["inclusive_s"] >= 0.03
+    assert snap["stages"]["outer"]["self_s"] < 0.02
+    assert set(snap["groups"]) >= {"dedupe", "llm_format", "unattributed"}
+
+
+def test_offline_run_profiles_format_pipeline(tmp_path):
+    try:
+        fb.load_vomo_module()
+    except Exception as e:  # dependências opcionais ausentes
+        pytest.skip(f"mlx_vomo não disponível: {e}")
+
+    options = fb.BenchmarkOptions(service=False, work_dir=str(tmp_path))
+    transcripts = [("aula", fb.synthetic_transcript(20000, seed=1))]
+    result = asyncio.run(fb.run_benchmark(transcripts, options, sampler=fb.StackSampler(0.002)))
+
+    report = result["transcripts"][0]
+    assert report["error"] is None and report["formatted_chars"] > 0
+    stages = result["aggregate"]["stages"]
+    assert {"dividir_sequencial", "process_chunk_async", "remover_paragrafos_duplicados", "save_as_word"} <= set(stages)
+    assert result["llm"]["calls"] >= stages["process_chunk_async"]["calls"] > 0
+    assert result["sampling"]["samples"] > 0
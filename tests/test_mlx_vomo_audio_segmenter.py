@@ -0,0 +1,155 @@
+"""
+Tests for the single-pass audio segmenter in mlx_vomo.py (no ffmpeg needed:
+the decoder command is replaced by a Python process that streams PCM).
+Run with: pytest tests/test_mlx_vomo_audio_segmenter.py -v
+"""
+import importlib
+import os
+import struct
+import sys
+import wave
+
+import pytest
+
+SR = 16000
+
+
+@pytest.fixture(scope="module")
+def vomo():
+    repo_root = os.path.abspath(os.path.join(os.path.dirname(__file__), os.pardir))
+    if repo_root not in sys.path:
+        sys.path.insert(0, repo_root)
+    try:
+        return importlib.import_module("mlx_vomo")
+    except Exception as e:  # dependências opcionais ausentes
+        pytest.skip(f"mlx_vomo não disponível: {e}")
+
+
+def _fake_decoder(seconds, block_seconds=0.5, pause=0.0):
+    """Processo que escreve PCM s16le onde a amostra i vale i % 30000."""
+    code = (
+        "import struct, sys, time\n"
+        f"total = {int(seconds * SR)}; block = {int(block_seconds * SR)}\n"
+        "i = 0\n"
+        "while i < total:\n"
+        "    n = min(block, total - i)\n"
+        "    sys.stdout.buffer.write(struct.pack('<%dh' % n, *[(j % 30000) for j in range(i, i + n)]))\n"
+        "    sys.stdout.buffer.flush()\n"
+        f"    time.sleep({pause})\n"
+        "    i += n\n"
+    )
+    return [sys.executable, "-c", code]
+
+
+def _gated_decoder(first_seconds, total_seconds, gate_path, exit_code=0):
+    """Escreve ``first_seconds`` de PCM, espera ``gate_path`` existir e escreve o resto."""
+    code = (
+        "import os, struct, sys, time\n"
+        "def emit(a, b):\n"
+        "    sys.stdout.buffer.write(struct.pack('<%dh' % (b - a), *[(j % 30000) for j in range(a, b)]))\n"
+        "    sys.stdout.buffer.flush()\n"
+        f"first = {int(first_seconds * SR)}; total = {int(total_seconds * SR)}\n"
+        "emit(0, first)\n"
+        "deadline = time.time() + 30\n"
+        f"while not os.path.exists({gate_path!r}) and time.time() < deadline:\n"
+        "    time.sleep(0.01)\n"
+        "emit(first, total)\n"
+        f"sys.exit({exit_code})\n"
+    )
+    return [sys.executable, "-c", code]
+
+
+def _samples(path):
+    with wave.open(path, "rb") as w:
+        assert w.getframerate() == SR and w.getnchannels() == 1
+        raw = w.readframes(w.getnframes())
+    return list(struct.unpack("<%dh" % (len(raw) // 2), raw))
+
+
+def test_plan_matches_overlap_rule(vomo):
+    assert vomo.plan_audio_chunks(10, 4, 1) == [(0.0, 4), (3, 7), (6, 10)]
+    assert vomo.plan_audio_chunks(3, 4, 1) == [(0.0, 3)]
+
+
+def test_single_pass_writes_overlapping_wav_chunks(vomo):
+    plan = vomo.plan_audio_chunks(10, 4, 1)
+    seg = vomo.StreamingAudioSegmenter("aula.mp4", plan, decode_cmd=_fake_decoder(10)).start()
+    try:
+        chunks = list(seg)
+        assert [(c["start"], c["end"]) for c in chunks] == [(0, 4), (3, 7), (6, 10)]
+        for c in chunks:
+            assert os.path.dirname(c["path"]) == seg.job_dir
+            data = _samples(c["path"])
+            first = int(c["start"] * SR)
+            assert len(data) == int((c["end"] - c["start"]) * SR)
+            assert data[0] == first % 30000 and data[-1] == (first + len(data) - 1) % 30000
+    finally:
+        seg.cleanup()
+    assert not os.path.exists(seg.job_dir)
+
+
+def test_memmap_chunks_and_last_chunk_runs_to_real_eof(vomo):
+    # ffprobe estimou 10s, mas o stream tem 10.5s
+    plan = vomo.plan_audio_chunks(10, 4, 1)
+    seg = vomo.StreamingAudioSegmenter("aula.mp4", plan, as_arrays=True, decode_cmd=_fake_decoder(10.5)).start()
+    try:
+        chunks = list(seg)
+        assert all(c["path"] is None for c in chunks)
+        assert chunks[1]["audio"][0] == (3 * SR) % 30000
+        assert chunks[-1]["end"] == 10.5
+        assert len(chunks[-1]["audio"]) == int(4.5 * SR)
+        assert not [f for f in os.listdir(seg.job_dir) if f.endswith(".wav")]
+    finally:
+        seg.cleanup()
+
+
+def test_first_chunk_is_ready_before_decode_finishes(vomo, tmp_path):
+    gate = str(tmp_path / "go")
+    plan = vomo.plan_audio_chunks(8, 2, 0.5)
+    seg = vomo.StreamingAudioSegmenter("audiencia.mkv", plan, decode_cmd=_gated_decoder(2.5, 8, gate)).start()
+    try:
+        first = seg.wait_for(0, timeout=10)
+        assert first["end"] == 2
+        assert seg.decoded_seconds <= 2.5  # o decoder está parado no gate
+        open(gate, "w").close()
+        assert len(list(seg)) == len(plan)
+        assert seg.decoded_seconds == 8
+    finally:
+        seg.cleanup()
+
+
+def test_concurrent_jobs_use_separate_dirs(vomo):
+    plan = vomo.plan_audio_chunks(4, 2, 0.5)
+    a = vomo.StreamingAudioSegmenter("same.mp4", plan, decode_cmd=_fake_decoder(4)).start()
+    b = vomo.StreamingAudioSegmenter("same.mp4", plan, decode_cmd=_fake_decoder(4)).start()
+    try:
+        paths_a = {c["path"] for c in a}
+        paths_b = {c["path"] for c in b}
+        assert a.job_dir != b.job_dir
+        assert not paths_a & paths_b
+    finally:
+        a.cleanup()
+        b.cleanup()
+
+
+def test_decoder_failure_is_raised(vomo):
+    cmd = [sys.executable, "-c", "import sys; sys.stderr.write('Invalid data'); sys.exit(1)"]
+    seg = vomo.StreamingAudioSegmenter("broken.mp4", [(0, 2), (1.5, 4)], decode_cmd=cmd).start()
+    try:
+        with pytest.raises(RuntimeError, match="Invalid data"):
+            list(seg)
+    finally:
+        seg.cleanup()
+
+
+def test_decoder_failure_mid_stream_is_raised(vomo, tmp_path):
+    gate = str(tmp_path / "go")
+    open(gate, "w").close()
+    plan = vomo.plan_audio_chunks(8, 2, 0.5)
+    seg = vomo.StreamingAudioSegmenter("cortado.mp4", plan, decode_cmd=_gated_decoder(3, 3, gate, exit_code=1)).start()
+    try:
+        assert seg.wait_for(0, timeout=10)["end"] == 2
+        with pytest.raises(RuntimeError, match="código 1"):
+            list(seg)
+    finally:
+        seg.cleanup()
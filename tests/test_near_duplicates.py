@@ -0,0 +1,119 @@
+"""
+Tests for near_duplicates.py and the indexed dedup passes in mlx_vomo.py.
+Run with: pytest tests/test_near_duplicates.py -v
+"""
+import importlib
+import os
+import random
+import sys
+from difflib import SequenceMatcher
+
+import pytest
+
+REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), os.pardir))
+if REPO_ROOT not in sys.path:
+    sys.path.insert(0, REPO_ROOT)
+
+from near_duplicates import CharProfile, RatioIndex, ShingleIndex, normalize_text, ratio_at_least  # noqa: E402
+
+WORDS = (
+    "o juiz decidiu que a prescrição intercorrente aplica se ao caso concreto "
+    "conforme súmula do tribunal em execução fiscal com penhora de bens"
+).split()
+
+
+def _sentence(rng, n):
+    return " ".join(rng.choice(WORDS) for _ in range(n))
+
+
+@pytest.fixture(scope="module")
+def vomo():
+    try:
+        return importlib.import_module("mlx_vomo")
+    except Exception as e:  # dependências opcionais ausentes
+        pytest.skip(f"mlx_vomo não disponível: {e}")
+
+
+def test_normalize_text_matches_legacy_rule():
+    assert normalize_text("## **Art. 5º** - Prescrição!") == "art 5º prescrição"
+    assert normalize_text("Execução", strip_accents=True) == "execucao"
+
+
+def test_char_profile_quick_ratio_equals_difflib():
+    rng = random.Random(1)
+    for _ in range(200):
+        a, b = _sentence(rng, rng.randint(0, 15)), _sentence(rng, rng.randint(0, 15))
+        expected = SequenceMatcher(None, a, b).quick_ratio()
+        assert CharProfile(a).quick_ratio(CharProfile(b)) == pytest.approx(expected)
+
+
+def test_ratio_at_least_verdict_equals_difflib():
+    rng = random.Random(2)
+    for _ in range(200):
+        a, b = _sentence(rng, rng.randint(1, 20)), _sentence(rng, rng.randint(1, 20))
+        ok, _ = ratio_at_least(a, b, 0.6)
+        assert ok == (SequenceMatcher(None, a, b).ratio() > 0.6)
+
+
+def test_ratio_index_matches_brute_force():
+    rng = random.Random(3)
+    corpus = [_sentence(rng, rng.randint(1, 12)) for _ in range(150)]
+    index = RatioIndex(enumerate(corpus))
+    for _ in range(50):
+        probe = rng.choice(corpus) if rng.random() < 0.3 else _sentence(rng, rng.randint(1, 12))
+        expected = {i for i, t in enumerate(corpus) if SequenceMatcher(None, probe, t).quick_ratio() > 0.85}
+        assert {k for k, _ in index.quick_matches(probe, 0.85)} == expected
+        brute = any(SequenceMatcher(None, probe, t).ratio() >= 0.85 for t in corpus)
+        assert index.has_ratio_match(probe, 0.85) == brute
+
+
+def test_shingle_index_finds_near_duplicates_only():
+    rng = random.Random(4)
+    base = [_sentence(rng, 60) for _ in range(30)]
+    index = ShingleIndex(threshold=0.7)
+    for i, text in enumerate(base):
+        index.add(i, text)
+
+    words = base[7].split()
+    words[30] = "alterado"  # uma palavra trocada
+    assert 7 in {k for k, _ in index.query(" ".join(words))}
+    assert index.query(_sentence(random.Random(99), 60)) == []
+
+
+def test_remover_paragrafos_duplicados_near_dup_is_opt_in(vomo, monkeypatch):
+    monkeypatch.delenv("IUDEX_PARAGRAPH_NEAR_DUP_THRESHOLD", raising=False)
+    rng = random.Random(5)
+    p1 = _sentence(rng, 40).capitalize() + "."
+    words = p1.split()
+    words[20] = "alterado"
+    p2 = " ".join(words)
+    p3 = _sentence(rng, 40).capitalize() + "."
+    texto = "\n\n".join(["## 1. Tema", p1, p2, p3])
+
+    assert vomo.remover_paragrafos_duplicados(texto) == texto
+    assert vomo.remover_paragrafos_duplicados(texto, near_dup_threshold=0.7) == "\n\n".join(["## 1. Tema", p1, p3])
+
+
+def test_remover_titulos_orfaos_uses_h2_index(vomo):
+    texto = "\n".join([
+        "## 1. Prescrição Intercorrente na Execução Fiscal",
+        "**1. Prescrição Intercorrente na Execução Fiscal**",
+        "Texto da seção.",
+        "**2. Penhora de bens**",
+    ])
+    limpo = vomo.remover_titulos_orfaos(texto)
+    assert "**1. Prescrição" not in limpo
+    assert "**2. Penhora de bens**" in limpo
+
+
+def test_detectar_secoes_duplicadas_buckets_by_title_words(vomo):
+    texto = "\n".join([
+        "## 1. Prescrição Intercorrente",
+        "Texto A.",
+        "## 2. Penhora de Bens",
+        "Texto B.",
+        "## 3. Prescrição Intercorrente (Continuação)",
+        "Texto C.",
+    ])
+    duplicadas = vomo.detectar_secoes_duplicadas(texto)
+    assert len(duplicadas) == 1
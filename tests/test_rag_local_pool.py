@@ -0,0 +1,116 @@
+import os
+import random
+import sys
+
+import numpy as np
+import pytest
+
+ROOT = os.path.join(os.path.dirname(__file__), "..")
+sys.path.insert(0, os.path.join(ROOT, "apps", "api"))
+sys.path.insert(0, ROOT)
+
+rag_local = pytest.importorskip("rag_local")
+
+
+class FakeModel:
+    """Embedding determinístico por hash de palavras; conta chamadas a encode."""
+
+    def __init__(self, name):
+        self.name = name
+        self.calls = []
+
+    def encode(self, texts, batch_size=32, show_progress_bar=False):
+        self.calls.append(list(texts))
+        out = np.zeros((len(texts), 16), dtype=np.float32)
+        for row, text in enumerate(texts):
+            for word in text.lower().split():
+                out[row, hash(word) % 16] += 1.0
+            out[row, 0] += 1e-3
+        return out
+
+
+@pytest.fixture
+def pool(monkeypatch):
+    loads = []
+
+    def loader(name):
+        loads.append(name)
+        return FakeModel(name)
+
+    pool = rag_local.EmbeddingModelPool(loader=loader, reranker_loader=None)
+    pool.loads = loads
+    monkeypatch.setattr(rag_local, "_model_pool", pool)
+    monkeypatch.setattr(rag_local, "_index_manager", rag_local.LocalIndexManager())
+    return pool
+
+
+def _text(seed, n=120):
+    rng = random.Random(seed)
+    words = "laudo pericial contestação sentença penhora prescrição multa juros recurso prazo".split()
+    return " ".join(rng.choice(words) for _ in range(n))
+
+
+def test_indexes_share_one_model_and_batch_encode(pool):
+    a = rag_local.LocalProcessIndex("SEI-1/2024")
+    b = rag_local.LocalProcessIndex("SEI-1/2024")  # mesmo processo aberto duas vezes
+    assert pool.loads == [a.EMBEDDING_MODEL]
+    assert a.embedding_model is b.embedding_model
+    assert a.collection_name != b.collection_name
+
+    model = a.embedding_model
+    a.index_text(_text(1, 4000), filename="autos.txt")
+    assert len(model.calls) == 1 and len(model.calls[0]) > 1  # todos os chunks em um batch
+
+    model.calls.clear()
+    a.multi_query_search(["laudo pericial", "prazo do recurso", "multa"], top_k=3)
+    assert model.calls == [["laudo pericial", "prazo do recurso", "multa"]]
+    a.search("multa", top_k=2)
+    assert model.calls == [["laudo pericial", "prazo do recurso", "multa"]]  # cache de query
+
+
+def test_incremental_bm25_matches_rank_bm25():
+    rank_bm25 = pytest.importorskip("rank_bm25")
+    docs = [_text(i, random.Random(i).randint(5, 60)).split() for i in range(40)]
+    bm25 = rag_local.IncrementalBM25()
+    for d in docs[:25]:
+        bm25.add(d)
+    for d in docs[25:]:  # adicionados depois de consultas
+        bm25.get_scores(["laudo"])
+        bm25.add(d)
+    reference = rank_bm25.BM25Okapi(docs)
+    for query in (["laudo", "pericial"], ["multa", "multa", "juros"], ["inexistente"]):
+        np.testing.assert_allclose(bm25.get_scores(query), reference.get_scores(query))
+        expected = sorted(range(len(docs)), key=lambda i: (-reference.get_scores(query)[i], i))[:7]
+        assert [i for i, _ in bm25.top_k(query, 7)] == expected
+
+
+def test_manager_evicts_expired_and_lru_under_memory_cap(pool, monkeypatch):
+    manager = rag_local.LocalIndexManager(max_total_bytes=10**12, min_idle_seconds=0)
+    monkeypatch.setattr(rag_local, "_index_manager", manager)
+
+    expired = rag_local.LocalProcessIndex("SEI-old", ttl_hours=0)
+    expired.index_text(_text(2), filename="a.txt")
+    fresh = rag_local.LocalProcessIndex("SEI-new")
+    assert expired.released and not fresh.released
+    with pytest.raises(RuntimeError):
+        expired.search("laudo")
+
+    fresh.index_text(_text(3), filename="b.txt")
+    other = rag_local.LocalProcessIndex("SEI-other")
+    other.index_text(_text(4), filename="c.txt")
+    fresh.search("laudo")  # fresh passa a ser o mais recente
+    manager.max_total_bytes = fresh.memory_bytes() + other.memory_bytes() - 1
+    assert manager.enforce() == 1
+    assert other.released and not fresh.released
+    assert manager.live_indexes() == [fresh]
+
+
+def test_dropped_index_frees_its_collection(pool):
+    index = rag_local.LocalProcessIndex("SEI-gc")
+    name = index.collection_name
+    client = index.client
+    del index
+    import gc
+
+    gc.collect()
+    assert name not in [c.name if hasattr(c, "name") else c for c in client.list_collections()]